@@ -7,22 +7,75 @@ Memenuhi 8 unit kompetensi sertifikasi programmer
 
 import sys
 import os
+import csv
+import json
+import argparse
 import subprocess
-from datetime import datetime, timedelta
+import threading
+from collections import deque
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database.db_connection import DatabaseConnection
 from database.crud_operations import CRUDOperations
+from database.bulk_pelanggan import PelangganBulkIO
+from database.outbox import OutboxConsumer, nama_consumer
+from database.arsip import ArsipPesanan, cutoff_dari_hari
+from database.routing import RoutedDatabaseConnection, ROUTE_WRITE, koneksi_baca
+from database.stok_ledger import StokLedger, StokTidakCukup
+from database.verifikasi_total import VerifikasiTotal
+from database.ketahanan import (KoneksiTangguh, JurnalPesanan, CacheMaster, kesalahan_koneksi,
+                                replay_jurnal, simpan_pesanan)
+from database.terukur import KoneksiTerukur, instrumentasi_pool
+from database.shard import ShardRouter, LaporanOutlet
+from database.migrasi import Migrator, cek_rencana
 from models.pelanggan import Pelanggan
 from models.meja import Meja
 from models.pesanan import Pesanan
 from models.laporan import LaporanGenerator
 from models.menu import Menu
+from models.antrian_dapur import AntrianDapur, STATUS_TERBUKA
+from models.analitik import AnalitikPenjualan
+from models.tutup_harian import TutupHarian
+from models.timeline_meja import timeline_terakhir, format_durasi
 from utils.validasi_input import Validator
 from utils.pdf_generator import PDFGenerator
 from utils.logger import setup_logger
+from utils.tampilan import Layar, input_berwaktu
+from utils.struk import RendererStruk, data_struk, muat_dari_db as muat_data_struk
+from utils.kode_pesanan import buat_kode_pesanan, worker_id_dari_env
+from utils.profiler import Profiler, profil_aktif
+from utils.metrics import (REGISTRY, ProxyTerukur, bungkus_aksi, mulai_server, PenulisBerkala,
+                           ENV_METRICS_PORT, ENV_METRICS_FILE)
+
+STATUS_MEJA = ('tersedia', 'dipesan', 'terisi')
+
+# Exit code mode non-interaktif (2 dipakai argparse untuk argumen salah)
+EXIT_SUKSES = 0
+EXIT_GAGAL = 1
+EXIT_DATABASE = 3
+
+# Aksi menu yang diukur metrik dan dibungkus profiler pada mode --profile
+AKSI_MENU = (
+    'daftar_pelanggan', 'tambah_pelanggan', 'update_pelanggan', 'hapus_pelanggan',
+    'import_pelanggan', 'export_pelanggan', 'daftar_meja', 'meja_tersedia',
+    'update_status_meja', 'buat_pesanan', 'generate_laporan', 'antrian_dapur',
+    'analitik_penjualan', 'arsipkan_pesanan', 'restock_menu', 'kompaksi_stok',
+    'tutup_harian', 'verifikasi_total',
+)
+
+# Metrik aplikasi, metrik koneksi/query ada di database/terukur.py
+DURASI_AKSI = REGISTRY.histogram(
+    'resto_aksi_detik', 'Durasi aksi menu (termasuk menunggu input)', ('aksi',),
+    bucket=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600))
+ERROR_AKSI = REGISTRY.counter('resto_aksi_error_total', 'Aksi menu yang berakhir dengan exception', ('aksi',))
+DURASI_CRUD = REGISTRY.histogram('resto_crud_detik', 'Durasi pemanggilan CRUDOperations', ('operasi',))
+ERROR_CRUD = REGISTRY.counter('resto_crud_error_total', 'Pemanggilan CRUDOperations yang raise exception', ('operasi',))
+PESANAN_DIBUAT = REGISTRY.counter('resto_pesanan_total', 'Pesanan dibuat (online atau ke jurnal offline)', ('mode',))
+NILAI_PESANAN = REGISTRY.counter('resto_pesanan_rupiah_total', 'Total nilai pesanan dibuat (Rp)')
 
 class SistemRestoran:
     """
@@ -30,39 +83,95 @@ class SistemRestoran:
     Mengintegrasikan semua komponen yang dibangun
     """
     
-    def __init__(self):
-        """Initialize sistem dengan semua komponen"""
+    def __init__(self, interaktif=True):
+        """
+        Initialize sistem dengan semua komponen.
+        interaktif=False (subcommand CLI) melewati komponen tampilan,
+        PDF, antrian dapur dan outbox.
+        """
         self.logger = setup_logger('app_main')
-        self.db = DatabaseConnection()
-        self.crud = CRUDOperations()
+        # Koneksi pool milik CRUDOperations (DatabaseConnection sendiri) ikut terukur
+        instrumentasi_pool()
+        # Laporan dibaca dari replica jika DB_REPLICA_HOST diset.
+        # Koneksi primary dicoba ulang dengan backoff dan circuit breaker.
+        self.db = RoutedDatabaseConnection(KoneksiTangguh(KoneksiTerukur(DatabaseConnection())))
+        self.crud = ProxyTerukur(CRUDOperations(), DURASI_CRUD, ERROR_CRUD)
         self.validator = Validator()
-        self.pdf_gen = PDFGenerator()
+        self.stok = StokLedger(self.db)
+        # Nama pelayan terminal ini, dicatat di setiap pesanan
+        self.pelayan = os.environ.get('RESTO_PELAYAN')
+        
+        # Mode offline (juga untuk jalur non-interaktif seperti load test):
+        # pesanan dicatat di jurnal lokal, data master dari cache di disk
+        self._cache = CacheMaster()
+        self._jurnal = None
+        self._lock_offline = threading.Lock()
+        self._id_offline = 0
+        self._id_sementara = {}
+        
+        jurnal_tertunda = REGISTRY.gauge('resto_jurnal_tertunda', 'Entri jurnal offline yang belum disimpan')
+        jurnal_tertunda.set_fungsi(lambda: self._jurnal.jumlah_tertunda() if self._jurnal else 0)
         
-        self.logger.info("Sistem Restoran diinisialisasi")
+        if interaktif:
+            # Gagal di awal jika TERMINAL_ID belum diset, bukan saat pesanan pertama
+            worker_id_dari_env()
+            self.pdf_gen = PDFGenerator()
+            # Template dan metrik font struk disiapkan sekali, bukan per pesanan
+            self.struk = RendererStruk()
+            self.layar = Layar()
+            self.antrian = AntrianDapur()
+            # Timeline meja dimuat sekali, tampilan berikutnya hanya membaca transisi baru
+            self._timeline_meja = None
+            # Checkpoint per terminal, bukan satu baris yang ditimpa semua terminal
+            self.outbox = OutboxConsumer(nama_consumer('antrian_dapur'), self.db)
+            self.outbox.subscribe('pesanan', self._sinkron_antrian)
+            # Terminal interaktif langsung mengunci folder jurnalnya, gagal di awal jika dipakai proses lain
+            self._buka_jurnal()
+            bungkus_aksi(self, AKSI_MENU, DURASI_AKSI, ERROR_AKSI)
+        
+        breaker_terbuka = REGISTRY.gauge('resto_db_breaker_terbuka', 'Circuit breaker database terbuka (1/0)')
+        breaker_terbuka.set_fungsi(lambda: int(self.db.breaker.terbuka))
+        
+        self.logger.info(f"Sistem Restoran diinisialisasi ({'interaktif' if interaktif else 'CLI'})")
     
     def run(self):
         """Main program loop"""
-        self.clear_screen()
-        print("=" * 60)
-        print("SISTEM PEMESANAN RESTORAN - UNILA CERTIFICATION")
-        print("=" * 60)
-        print("Dibuat untuk sertifikasi programmer")
-        print("Memenuhi 8 unit kompetensi SKKNI")
-        print("=" * 60)
+        self.layar.bersihkan()
+        self.layar.tulis("=" * 60)
+        self.layar.tulis("SISTEM PEMESANAN RESTORAN - UNILA CERTIFICATION")
+        self.layar.tulis("=" * 60)
+        self.layar.tulis("Dibuat untuk sertifikasi programmer")
+        self.layar.tulis("Memenuhi 8 unit kompetensi SKKNI")
+        self.layar.tulis("=" * 60)
+        self.layar.cetak()
         
         # Test koneksi database
         if not self.test_database():
-            print("\n❌ ERROR: Tidak bisa terkoneksi ke database!")
+            print("\n⚠️  Tidak bisa terkoneksi ke database, sistem berjalan dalam MODE OFFLINE")
+            print("Pesanan dicatat di jurnal lokal dan disimpan otomatis saat MySQL kembali")
             print("Pastikan MySQL berjalan dan database 'restoran_db' ada")
             print("Setup database: mysql -u root -p < database_schema.sql")
-            input("\nTekan Enter untuk keluar...")
-            sys.exit(1)
+            input("\nTekan Enter untuk melanjutkan...")
+        else:
+            # Pesanan offline dari sesi sebelumnya, lalu isi cache data master
+            self._sinkron_jurnal()
+            self._baca_atau_cache('menu', self._muat_menu)
+            self._baca_atau_cache('meja', self.crud.get_meja_tersedia)
+            self._baca_atau_cache('pelanggan', self.crud.read_pelanggan)
+        
+        # Isi antrian dapur sekali, update berikutnya lewat event outbox
+        try:
+            # Checkpoint dibaca sebelum snapshot: event sesudahnya diterapkan ulang di atas snapshot
+            self.outbox.lanjutkan()
+            self.antrian.muat_dari_db(self.db)
+        except Exception as e:
+            self.logger.error(f"Gagal memuat antrian dapur: {e}")
         
         self.main_menu()
     
     def clear_screen(self):
-        """Clear console screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Clear console screen (escape ANSI, tanpa subprocess)"""
+        self.layar.bersihkan()
     
     def test_database(self):
         """Test koneksi database"""
@@ -77,24 +186,90 @@ class SistemRestoran:
             self.logger.error(f"Database test failed: {e}")
             return False
     
+    def _buka_jurnal(self):
+        """Jurnal offline; subcommand CLI baru membukanya saat pertama kali dibutuhkan"""
+        if self._jurnal is None:
+            with self._lock_offline:
+                if self._jurnal is None:
+                    self._jurnal = JurnalPesanan()
+        return self._jurnal
+    
+    @property
+    def jurnal(self):
+        return self._buka_jurnal()
+    
+    def _baca_atau_cache(self, nama, fungsi):
+        """
+        Baca data master lewat fungsi dan simpan hasilnya di cache (memori dan
+        disk). Saat database tidak tersedia, hasil terakhir dari cache yang
+        dipakai, termasuk dari run sebelumnya jika aplikasi baru dijalankan.
+        """
+        if not self.db.breaker.terbuka:
+            try:
+                hasil = fungsi()
+            except Exception as e:
+                if not kesalahan_koneksi(e):
+                    raise
+                hasil = None
+            
+            if hasil is not None:
+                self._cache.simpan(nama, hasil)
+                return hasil
+            # None bisa berarti query gagal; pastikan lewat test koneksi (membuka breaker)
+            if self.db.test_connection():
+                return hasil
+        
+        self.logger.warning(f"Database tidak tersedia, data {nama} dari cache")
+        return self._cache.get(nama) or []
+    
+    def _sinkron_jurnal(self):
+        """Replay jurnal offline jika ada entri tertunda dan database bisa dicoba lagi"""
+        if not self.jurnal.jumlah_tertunda() or self.db.breaker.terbuka:
+            return
+        
+        try:
+            hasil = replay_jurnal(self.jurnal, self.db)
+        except Exception as e:
+            self.logger.error(f"Replay jurnal gagal: {e}")
+            return
+        
+        if hasil:
+            self.db.tandai_tulis()
+        # Pesanan offline di antrian dapur memakai id sementara (negatif)
+        for kode, pesanan_id in hasil.items():
+            id_sementara = self._id_sementara.pop(kode, None)
+            if id_sementara is not None:
+                self.antrian.ganti_id(id_sementara, pesanan_id)
+    
     def main_menu(self):
         """Display main menu"""
+        pesan = ""
         while True:
-            self.clear_screen()
-            print("\n" + "=" * 60)
-            print("MENU UTAMA - SISTEM PEMESANAN RESTORAN")
-            print("=" * 60)
-            print("1.  Kelola Pelanggan")
-            print("2.  Kelola Meja")
-            print("3.  Buat Pesanan Baru")
-            print("4.  Laporan Pesanan")
-            print("5.  Debugging Demo")
-            print("6.  Dokumentasi Sistem")
-            print("0.  Keluar")
-            print("=" * 60)
+            self._sinkron_jurnal()
+            
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis("MENU UTAMA - SISTEM PEMESANAN RESTORAN")
+            self.layar.tulis("=" * 60)
+            tertunda = self.jurnal.jumlah_tertunda()
+            if self.db.breaker.terbuka or tertunda:
+                self.layar.tulis(f"⚠️  MODE OFFLINE - {tertunda} transaksi di jurnal menunggu sinkronisasi")
+            self.layar.tulis("1.  Kelola Pelanggan")
+            self.layar.tulis("2.  Kelola Meja")
+            self.layar.tulis("3.  Buat Pesanan Baru")
+            self.layar.tulis("4.  Laporan Pesanan")
+            self.layar.tulis("5.  Debugging Demo")
+            self.layar.tulis("6.  Dokumentasi Sistem")
+            self.layar.tulis("7.  Antrian Dapur")
+            self.layar.tulis("8.  Analitik Penjualan")
+            self.layar.tulis("9.  Utilitas Sistem")
+            self.layar.tulis("0.  Keluar")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis(pesan)
+            self.layar.render()
+            pesan = ""
             
             try:
-                choice = input("\nPilih menu [0-8]: ").strip()
+                choice = input("\nPilih menu [0-9]: ").strip()
                 
                 if choice == "1":
                     self.kelola_pelanggan()
@@ -108,13 +283,23 @@ class SistemRestoran:
                     self.run_debugging_demo()
                 elif choice == "6":
                     self.tampilkan_dokumentasi()
+                elif choice == "7":
+                    self.antrian_dapur()
+                elif choice == "8":
+                    self.analitik_penjualan()
+                elif choice == "9":
+                    self.utilitas_sistem()
                 elif choice == "0":
                     print("\nTerima kasih telah menggunakan sistem!")
                     print("Sistem dibuat untuk sertifikasi programmer UNILA")
                     break
                 else:
-                    print("⚠️  Pilihan tidak valid! Silakan pilih 0-8")
-                    input("Tekan Enter untuk melanjutkan...")
+                    # Cukup ubah baris pesan, menu tidak digambar ulang
+                    pesan = "⚠️  Pilihan tidak valid! Silakan pilih 0-9"
+                    continue
+                
+                # Submenu menulis langsung ke terminal, gambar ulang menu penuh
+                self.layar.invalidasi()
                     
             except KeyboardInterrupt:
                 print("\n\nProgram dihentikan oleh user")
@@ -123,22 +308,28 @@ class SistemRestoran:
                 self.logger.error(f"Error di main menu: {e}")
                 print(f"❌ Error: {e}")
                 input("Tekan Enter untuk melanjutkan...")
+                self.layar.invalidasi()
     
     # ========== MENU 1: KELOLA PELANGGAN ==========
     
     def kelola_pelanggan(self):
         """Menu kelola pelanggan"""
+        pesan = ""
         while True:
-            self.clear_screen()
-            print("\n" + "=" * 60)
-            print("KELOLA PELANGGAN")
-            print("=" * 60)
-            print("1.  Daftar Pelanggan")
-            print("2.  Tambah Pelanggan Baru")
-            print("3.  Update Data Pelanggan")
-            print("4.  Hapus Pelanggan")
-            print("0.  Kembali ke Menu Utama")
-            print("=" * 60)
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis("KELOLA PELANGGAN")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis("1.  Daftar Pelanggan")
+            self.layar.tulis("2.  Tambah Pelanggan Baru")
+            self.layar.tulis("3.  Update Data Pelanggan")
+            self.layar.tulis("4.  Hapus Pelanggan")
+            self.layar.tulis("6.  Import Pelanggan dari CSV")
+            self.layar.tulis("7.  Export Pelanggan ke CSV")
+            self.layar.tulis("0.  Kembali ke Menu Utama")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis(pesan)
+            self.layar.render()
+            pesan = ""
             
             choice = input("\nPilih aksi: ").strip()
             
@@ -152,16 +343,23 @@ class SistemRestoran:
                 self.update_pelanggan()
             elif choice == "5":
                 self.hapus_pelanggan()
+            elif choice == "6":
+                self.import_pelanggan()
+            elif choice == "7":
+                self.export_pelanggan()
             elif choice == "0":
                 break
             else:
-                print("Pilihan tidak valid!")
+                pesan = "Pilihan tidak valid!"
+                continue
+            
+            self.layar.invalidasi()
     
     def daftar_pelanggan(self):
         """Tampilkan semua pelanggan"""
-        print("\n" + "-" * 60)
-        print("DAFTAR PELANGGAN")
-        print("-" * 60)
+        self.layar.tulis("\n" + "-" * 60)
+        self.layar.tulis("DAFTAR PELANGGAN")
+        self.layar.tulis("-" * 60)
         
         try:
             pelanggan_list = self.crud.read_pelanggan()
@@ -171,31 +369,35 @@ class SistemRestoran:
                 pelanggan_list = []
             
             if len(pelanggan_list) == 0:
-                print("📭 Belum ada pelanggan terdaftar.")
-                print("\n💡 Tips: Tambah pelanggan baru di menu 'Tambah Pelanggan Baru'")
+                self.layar.tulis("📭 Belum ada pelanggan terdaftar.")
+                self.layar.tulis("\n💡 Tips: Tambah pelanggan baru di menu 'Tambah Pelanggan Baru'")
             else:
-                print(f"{'ID':<5} {'Nama':<25} {'Telepon':<15} {'Email':<20}")
-                print("-" * 70)
-                
+                baris = []
                 for p in pelanggan_list:
                     # Pastikan p adalah dictionary
                     if isinstance(p, dict):
                         email = p.get('email', '-')
                         if email is None:
                             email = '-'
-                        print(f"{p.get('id', '-'):<5} {p.get('nama', '-'):<25} {p.get('no_telepon', '-'):<15} {email[:20]:<20}")
+                        baris.append(f"{p.get('id', '-'):<5} {p.get('nama', '-'):<25} {p.get('no_telepon', '-'):<15} {email[:20]:<20}")
                     else:
-                        print(f"⚠️  Data tidak valid: {p}")
+                        baris.append(f"⚠️  Data tidak valid: {p}")
                 
-                print(f"\n📊 Total: {len(pelanggan_list)} pelanggan")
+                self.layar.cetak()
+                self.layar.halaman(baris, header=[
+                    f"{'ID':<5} {'Nama':<25} {'Telepon':<15} {'Email':<20}",
+                    "-" * 70,
+                ])
+                self.layar.tulis(f"\n📊 Total: {len(pelanggan_list)} pelanggan")
         
         except Exception as e:
             self.logger.error(f"Error membaca pelanggan: {e}")
-            print(f"❌ Error membaca data pelanggan")
-            print(f"🔧 Detail: {e}")
-            print("\n💡 Cek: Apakah database 'restoran_db' sudah dibuat?")
-            print("       Jalankan: mysql -u root -p < database_schema.sql")
+            self.layar.tulis(f"❌ Error membaca data pelanggan")
+            self.layar.tulis(f"🔧 Detail: {e}")
+            self.layar.tulis("\n💡 Cek: Apakah database 'restoran_db' sudah dibuat?")
+            self.layar.tulis("       Jalankan: mysql -u root -p < database_schema.sql")
         
+        self.layar.cetak()
         input("\nTekan Enter untuk melanjutkan...")
     
     def tambah_pelanggan(self):
@@ -227,6 +429,7 @@ class SistemRestoran:
                 
                 # Save to database
                 pelanggan_id = self.crud.create_pelanggan(nama, telepon, email)
+                self.db.tandai_tulis()
                 
                 if pelanggan_id:
                     print(f"\n✅ Pelanggan berhasil ditambahkan!")
@@ -289,6 +492,7 @@ class SistemRestoran:
                             int(pelanggan_id),
                             **updates
                         )
+                        self.db.tandai_tulis()
                         
                         if success:
                             print("\n✅ Data pelanggan berhasil diupdate!")
@@ -321,6 +525,7 @@ class SistemRestoran:
                 
                 if confirm == 'y':
                     self.crud.delete_pelanggan(int(pelanggan_id))
+                    self.db.tandai_tulis()
                     print("✅ Pelanggan berhasil dihapus (soft delete)")
                     self.logger.info(f"Pelanggan ID {pelanggan_id} dihapus")
                 else:
@@ -332,20 +537,76 @@ class SistemRestoran:
         
         input("\nTekan Enter untuk melanjutkan...")
     
+    def import_pelanggan(self):
+        """Import pelanggan massal dari file CSV"""
+        print("\n" + "-" * 60)
+        print("IMPORT PELANGGAN DARI CSV")
+        print("-" * 60)
+        print("Format kolom: nama, no_telepon, email")
+        
+        path_csv = input("Path file CSV: ").strip()
+        
+        if not os.path.isfile(path_csv):
+            print(f"❌ File {path_csv} tidak ditemukan")
+        else:
+            try:
+                stats = PelangganBulkIO(self.db).import_csv(path_csv)
+                self.db.tandai_tulis()
+                
+                print(f"\n✅ Import selesai!")
+                print(f"   Baris dibaca   : {stats['dibaca']:,}")
+                print(f"   Ditulis/update : {stats['ditulis']:,}")
+                print(f"   Duplikat       : {stats['duplikat']:,}")
+                print(f"   Ditolak        : {stats['ditolak']:,}")
+                print(f"   Durasi         : {stats['durasi']:.2f} detik")
+                print(f"   Throughput     : {stats['baris_per_detik']:,.0f} baris/detik")
+                if stats['ditolak']:
+                    print(f"   File reject    : {stats['file_reject']}")
+                
+                self.logger.info(f"Import pelanggan dari {path_csv}: {stats['ditulis']} baris")
+            
+            except Exception as e:
+                self.logger.error(f"Error import pelanggan: {e}")
+                print(f"❌ Error: {e}")
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
+    def export_pelanggan(self):
+        """Export semua pelanggan ke file CSV"""
+        print("\n" + "-" * 60)
+        print("EXPORT PELANGGAN KE CSV")
+        print("-" * 60)
+        
+        default_path = f"pelanggan_{datetime.now().strftime('%Y-%m-%d')}.csv"
+        path_csv = input(f"Path file tujuan [{default_path}]: ").strip() or default_path
+        
+        try:
+            jumlah = PelangganBulkIO(self.db).export_csv(path_csv)
+            print(f"\n✅ {jumlah:,} pelanggan diexport ke {path_csv}")
+            self.logger.info(f"Export pelanggan ke {path_csv}: {jumlah} baris")
+        except Exception as e:
+            self.logger.error(f"Error export pelanggan: {e}")
+            print(f"❌ Error: {e}")
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
     # ========== MENU 2: KELOLA MEJA ==========
     
     def kelola_meja(self):
         """Menu kelola meja"""
+        pesan = ""
         while True:
-            self.clear_screen()
-            print("\n" + "=" * 60)
-            print("KELOLA MEJA RESTORAN")
-            print("=" * 60)
-            print("1.  Daftar Semua Meja")
-            print("2.  Lihat Meja Tersedia")
-            print("3.  Update Status Meja")
-            print("0.  Kembali ke Menu Utama")
-            print("=" * 60)
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis("KELOLA MEJA RESTORAN")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis("1.  Daftar Semua Meja")
+            self.layar.tulis("2.  Lihat Meja Tersedia")
+            self.layar.tulis("3.  Update Status Meja")
+            self.layar.tulis("0.  Kembali ke Menu Utama")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis(pesan)
+            self.layar.render()
+            pesan = ""
             
             choice = input("\nPilih aksi: ").strip()
             
@@ -358,13 +619,16 @@ class SistemRestoran:
             elif choice == "0":
                 break
             else:
-                print("Pilihan tidak valid!")
+                pesan = "Pilihan tidak valid!"
+                continue
+            
+            self.layar.invalidasi()
     
     def daftar_meja(self):
         """Tampilkan semua meja"""
-        print("\n" + "-" * 60)
-        print("DAFTAR MEJA RESTORAN")
-        print("-" * 60)
+        self.layar.tulis("\n" + "-" * 60)
+        self.layar.tulis("DAFTAR MEJA RESTORAN")
+        self.layar.tulis("-" * 60)
         
         try:
             # Query untuk semua meja
@@ -373,12 +637,25 @@ class SistemRestoran:
             cursor.execute("SELECT * FROM meja ORDER BY nomor_meja")
             meja_list = cursor.fetchall()
             
+            # Lama status saat ini dan rata-rata lama duduk 7 hari dari riwayat status meja
+            try:
+                if self._timeline_meja is None:
+                    self._timeline_meja = timeline_terakhir(self.db, hari=7)
+                else:
+                    self._timeline_meja.perbarui()
+                timeline = self._timeline_meja
+                status_sekarang = timeline.status_sekarang()
+                dwell = timeline.rata_dwell()
+            except Exception as e:
+                self.logger.warning(f"Riwayat status meja tidak bisa dibaca: {e}")
+                timeline = None
+                status_sekarang, dwell = {}, {}
+            sekarang = datetime.now()
+            
             if not meja_list:
-                print("Belum ada data meja.")
+                self.layar.tulis("Belum ada data meja.")
             else:
-                print(f"{'ID':<5} {'No Meja':<10} {'Kapasitas':<10} {'Status':<15} {'Lokasi':<15}")
-                print("-" * 60)
-                
+                baris = []
                 for m in meja_list:
                     # Color coding untuk status
                     status = m['status']
@@ -389,34 +666,51 @@ class SistemRestoran:
                     else:
                         status_display = f"❌ {status}"
                     
-                    print(f"{m['id']:<5} {m['nomor_meja']:<10} {m['kapasitas']:<10} {status_display:<15} {m.get('lokasi', '-'):<15}")
+                    status_db, sejak = status_sekarang.get(m['id'], (None, None))
+                    lama = format_durasi((sekarang - sejak).total_seconds()) if sejak and status_db == status else '-'
+                    rata_duduk = format_durasi(dwell.get(m['id'], {}).get('rata_detik'))
+                    
+                    baris.append(f"{m['id']:<5} {m['nomor_meja']:<10} {m['kapasitas']:<10} {status_display:<15} "
+                                 f"{lama:<9} {rata_duduk:<11} {m.get('lokasi', '-'):<15}")
+                
+                self.layar.cetak()
+                self.layar.halaman(baris, header=[
+                    f"{'ID':<5} {'No Meja':<10} {'Kapasitas':<10} {'Status':<15} {'Sejak':<9} {'Rata Duduk':<11} {'Lokasi':<15}",
+                    "-" * 80,
+                ])
                 
                 # Statistik
                 total = len(meja_list)
                 tersedia = len([m for m in meja_list if m['status'] == 'tersedia'])
                 terisi = len([m for m in meja_list if m['status'] == 'terisi'])
                 
-                print(f"\n📊 STATISTIK:")
-                print(f"   Total Meja    : {total}")
-                print(f"   Tersedia      : {tersedia}")
-                print(f"   Terisi/Dipesan: {terisi}")
+                self.layar.tulis(f"\n📊 STATISTIK:")
+                self.layar.tulis(f"   Total Meja    : {total}")
+                self.layar.tulis(f"   Tersedia      : {tersedia}")
+                self.layar.tulis(f"   Terisi/Dipesan: {terisi}")
+                if timeline is not None:
+                    utilisasi = timeline.utilisasi_total()
+                    if utilisasi is not None:
+                        self.layar.tulis(f"   Utilisasi 7 hr: {utilisasi * 100:.1f}%")
         
         except Exception as e:
             self.logger.error(f"Error membaca meja: {e}")
-            print(f"❌ Error: {e}")
+            self.layar.tulis(f"❌ Error: {e}")
         finally:
             if 'cursor' in locals():
                 cursor.close()
             if 'conn' in locals():
                 conn.close()
         
+        self.layar.cetak()
         input("\nTekan Enter untuk melanjutkan...")
     
     def meja_tersedia(self):
         """Tampilkan meja yang tersedia"""
-        print("\n" + "-" * 60)
-        print("MEJA TERSEDIA")
-        print("-" * 60)
+        self.layar.tulis("\n" + "-" * 60)
+        self.layar.tulis("MEJA TERSEDIA")
+        self.layar.tulis("-" * 60)
+        self.layar.cetak()
         
         try:
             kapasitas = input("Kapasitas minimal (kosongkan untuk semua): ").strip()
@@ -426,21 +720,23 @@ class SistemRestoran:
             
             if not meja_tersedia:
                 if kapasitas_min > 0:
-                    print(f"Tidak ada meja tersedia dengan kapasitas minimal {kapasitas_min}")
+                    self.layar.tulis(f"Tidak ada meja tersedia dengan kapasitas minimal {kapasitas_min}")
                 else:
-                    print("Tidak ada meja tersedia saat ini")
+                    self.layar.tulis("Tidak ada meja tersedia saat ini")
             else:
-                print(f"\nDitemukan {len(meja_tersedia)} meja tersedia:")
-                print(f"{'ID':<5} {'No Meja':<10} {'Kapasitas':<10} {'Lokasi':<15}")
-                print("-" * 45)
-                
-                for m in meja_tersedia:
-                    print(f"{m['id']:<5} {m['nomor_meja']:<10} {m['kapasitas']:<10} {m.get('lokasi', '-'):<15}")
+                self.layar.tulis(f"\nDitemukan {len(meja_tersedia)} meja tersedia:")
+                self.layar.cetak()
+                self.layar.halaman(
+                    [f"{m['id']:<5} {m['nomor_meja']:<10} {m['kapasitas']:<10} {m.get('lokasi', '-'):<15}"
+                     for m in meja_tersedia],
+                    header=[f"{'ID':<5} {'No Meja':<10} {'Kapasitas':<10} {'Lokasi':<15}", "-" * 45]
+                )
         
         except Exception as e:
             self.logger.error(f"Error membaca meja tersedia: {e}")
-            print(f"❌ Error: {e}")
+            self.layar.tulis(f"❌ Error: {e}")
         
+        self.layar.cetak()
         input("\nTekan Enter untuk melanjutkan...")
     
     def update_status_meja(self):
@@ -479,6 +775,7 @@ class SistemRestoran:
                         status_baru = status_map[pilihan]
                         
                         success = self.crud.update_status_meja(int(meja_id), status_baru)
+                        self.db.tandai_tulis()
                         
                         if success:
                             print(f"\n✅ Status meja {meja['nomor_meja']} diubah menjadi: {status_baru}")
@@ -499,6 +796,34 @@ class SistemRestoran:
         
         input("\nTekan Enter untuk melanjutkan...")
     
+    def ubah_status_meja(self, status_baru, meja_ids=None):
+        """Ubah status meja tertentu, atau semua meja jika meja_ids None. Return jumlah meja"""
+        if status_baru not in STATUS_MEJA:
+            raise ValueError(f"Status meja tidak valid: {status_baru}")
+        
+        query = "UPDATE meja SET status = %s"
+        params = (status_baru,)
+        if meja_ids is not None:
+            if not meja_ids:
+                return 0
+            query += " WHERE id IN (" + ", ".join(["%s"] * len(meja_ids)) + ")"
+            params += tuple(meja_ids)
+        
+        try:
+            conn = self.db.get_connection(route=ROUTE_WRITE)
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            conn.commit()
+            jumlah = cursor.rowcount
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+        
+        self.logger.info(f"Status {jumlah} meja diubah: {status_baru}")
+        return jumlah
+    
     # ========== MENU 3: BUAT PESANAN BARU ==========
     
     def buat_pesanan(self):
@@ -513,6 +838,7 @@ class SistemRestoran:
             print("-" * 40)
             
             pelanggan_id = None
+            pelanggan_baru = None
             
             # Opsi: pelanggan baru atau existing
             print("\nPilih opsi:")
@@ -528,13 +854,19 @@ class SistemRestoran:
                 telepon = input("Telepon: ").strip()
                 email = input("Email (opsional): ").strip() or None
                 
-                pelanggan_id = self.crud.create_pelanggan(nama, telepon, email)
-                print(f"✅ Pelanggan baru dibuat (ID: {pelanggan_id})")
+                if self.db.breaker.terbuka:
+                    # Pelanggan disimpan bersama pesanan saat replay jurnal
+                    pelanggan_baru = {'nama': nama, 'no_telepon': telepon, 'email': email}
+                    print("⚠️  Mode offline: pelanggan disimpan bersama pesanan")
+                else:
+                    pelanggan_id = self.crud.create_pelanggan(nama, telepon, email)
+                    self.db.tandai_tulis()
+                    print(f"✅ Pelanggan baru dibuat (ID: {pelanggan_id})")
                 
             elif opsi_pelanggan == "2":
                 # Pilih dari pelanggan existing
                 print("\nPilih pelanggan:")
-                pelanggan_list = self.crud.read_pelanggan()
+                pelanggan_list = self._baca_atau_cache('pelanggan', self.crud.read_pelanggan)
                 
                 if pelanggan_list:
                     for p in pelanggan_list[:10]:  # Tampilkan 10 pertama
@@ -553,7 +885,7 @@ class SistemRestoran:
                 print("❌ Pilihan tidak valid")
                 return
             
-            if not pelanggan_id:
+            if not pelanggan_id and not pelanggan_baru:
                 print("❌ Gagal mendapatkan pelanggan")
                 return
             
@@ -563,7 +895,7 @@ class SistemRestoran:
             print("-" * 40)
             
             # Tampilkan meja tersedia
-            meja_tersedia = self.crud.get_meja_tersedia()
+            meja_tersedia = self._baca_atau_cache('meja', self.crud.get_meja_tersedia)
             
             if not meja_tersedia:
                 print("❌ Tidak ada meja tersedia saat ini")
@@ -590,16 +922,7 @@ class SistemRestoran:
             
             while True:
                 # Tampilkan menu
-                conn = self.db.get_connection()
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("""
-                    SELECT m.*, km.nama_kategori 
-                    FROM menu m 
-                    LEFT JOIN kategori_menu km ON m.kategori_id = km.id
-                    WHERE m.stok > 0
-                    ORDER BY km.nama_kategori, m.nama_menu
-                """)
-                menu_list = cursor.fetchall()
+                menu_list = [menu for menu in self._baca_atau_cache('menu', self._muat_menu) if menu['stok'] > 0]
                 
                 if not menu_list:
                     print("❌ Tidak ada menu tersedia")
@@ -683,7 +1006,7 @@ class SistemRestoran:
                 for mid, jumlah in items
             )
             
-            print(f"Pelanggan ID : {pelanggan_id}")
+            print(f"Pelanggan ID : {pelanggan_id or '(baru) ' + pelanggan_baru['nama']}")
             print(f"Meja ID      : {meja_id}")
             print(f"Jumlah Item  : {len(items)}")
             print(f"Total Harga  : Rp{total_akhir:,.0f}")
@@ -692,22 +1015,63 @@ class SistemRestoran:
             konfirmasi = input("\nKonfirmasi pesanan? (y/n): ").strip().lower()
             
             if konfirmasi == 'y':
-                # Simpan pesanan
-                result = self.crud.create_pesanan(
-                    pelanggan_id=pelanggan_id,
-                    meja_id=meja_id,
-                    items=items,
-                    catatan=catatan
-                )
+                # Simpan pesanan (ke jurnal lokal jika database tidak tersedia)
+                menu_map = {m['id']: m for m in menu_list}
+                result = self._simpan_pesanan(pelanggan_id, meja_id, items, catatan, menu_map, pelanggan_baru)
+                offline = bool(result and result.get('offline'))
                 
                 if result:
                     print(f"\n🎉 PESANAN BERHASIL DIBUAT!")
                     print(f"Kode Pesanan : {result['kode_pesanan']}")
-                    print(f"Pesanan ID   : {result['pesanan_id']}")
+                    if offline:
+                        print("Pesanan ID   : - (tersimpan di jurnal lokal, menunggu database)")
+                    else:
+                        print(f"Pesanan ID   : {result['pesanan_id']}")
                     print(f"Total        : Rp{result['total_harga']:,.0f}")
                     
                     # Log activity
                     self.logger.info(f"Pesanan baru dibuat: {result['kode_pesanan']} (ID: {result['pesanan_id']})")
+                    
+                    # Kirim ke antrian dapur
+                    nomor_meja = next((m['nomor_meja'] for m in meja_tersedia if m['id'] == meja_id), None)
+                    self.antrian.tambah_pesanan(
+                        result['pesanan_id'],
+                        result['kode_pesanan'],
+                        nomor_meja,
+                        [
+                            {
+                                'nama_menu': menu_map[mid]['nama_menu'],
+                                'jumlah': jml,
+                                'nama_kategori': menu_map[mid]['nama_kategori'],
+                            }
+                            for mid, jml in items
+                        ]
+                    )
+                    
+                    # Cetak struk
+                    try:
+                        if opsi_pelanggan == "1":
+                            nama_pelanggan = nama
+                        else:
+                            nama_pelanggan = next((p['nama'] for p in pelanggan_list if p['id'] == pelanggan_id), None)
+                        path_struk = self.struk.pdf_pesanan(data_struk(
+                            result,
+                            [
+                                {
+                                    'nama_menu': menu_map[mid]['nama_menu'],
+                                    'jumlah': jml,
+                                    'harga_satuan': menu_map[mid]['harga'],
+                                }
+                                for mid, jml in items
+                            ],
+                            nomor_meja=nomor_meja,
+                            pelanggan=nama_pelanggan,
+                            catatan=catatan
+                        ))
+                        print(f"🧾 Struk     : {path_struk}")
+                    except Exception as e:
+                        self.logger.error(f"Gagal membuat struk {result['kode_pesanan']}: {e}")
+                        print(f"⚠️  Struk gagal dibuat: {e}")
                 else:
                     print("❌ Gagal membuat pesanan")
             else:
@@ -718,32 +1082,119 @@ class SistemRestoran:
             print(f"❌ Error: {e}")
             import traceback
             traceback.print_exc()
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
+    def _muat_menu(self):
+        """Semua menu beserta kategori, stok dibaca dari ledger bukan dari baris menu.stok"""
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT m.*, km.nama_kategori 
+                FROM menu m 
+                LEFT JOIN kategori_menu km ON m.kategori_id = km.id
+                ORDER BY km.nama_kategori, m.nama_menu
+            """)
+            menu_list = cursor.fetchall()
         finally:
             if 'cursor' in locals():
                 cursor.close()
             if 'conn' in locals():
                 conn.close()
         
-        input("\nTekan Enter untuk melanjutkan...")
+        stok_ledger = self.stok.stok_semua()
+        for menu in menu_list:
+            menu['stok'] = stok_ledger.get(menu['id'], menu['stok'])
+        return menu_list
+    
+    def _simpan_pesanan(self, pelanggan_id, meja_id, items, catatan, menu_map, pelanggan_baru=None):
+        """
+        Simpan pesanan lewat jalur yang sama dengan replay jurnal (stok
+        diperiksa dari ledger, bukan menu.stok). kode_pesanan dibuat sekali
+        dan menjadi kunci idempotensi: jika database tidak tersedia atau
+        koneksi putus saat menyimpan (commit mungkin sudah terjadi), data yang
+        sama dicatat di jurnal lokal dan replay melewatinya bila kode itu
+        ternyata sudah tersimpan. Hasil offline memakai id sementara (negatif)
+        dan offline=True.
+        """
+        kode = buat_kode_pesanan()
+        total = sum(jml * menu_map[mid]['harga'] for mid, jml in items)
+        data = {
+            'kode_pesanan': kode,
+            'pelanggan_id': pelanggan_id,
+            'pelanggan_baru': pelanggan_baru,
+            'meja_id': meja_id,
+            'tanggal': datetime.now().isoformat(),
+            'total_harga': total,
+            'catatan': catatan,
+            'pelayan': self.pelayan,
+            'items': [
+                {'menu_id': mid, 'jumlah': jml, 'harga_satuan': menu_map[mid]['harga']}
+                for mid, jml in items
+            ],
+        }
+        
+        if pelanggan_baru is None and not self.db.breaker.terbuka:
+            try:
+                pesanan_id = simpan_pesanan(self.db, data)
+            except StokTidakCukup as e:
+                self.logger.warning(f"Pesanan ditolak: {e}")
+                return None
+            except Exception as e:
+                if not kesalahan_koneksi(e):
+                    raise
+                self.logger.warning(f"Koneksi putus saat menyimpan pesanan {kode}: {e}")
+            else:
+                self.db.tandai_tulis()
+                PESANAN_DIBUAT.inc(mode='online')
+                NILAI_PESANAN.inc(float(total))
+                return {'kode_pesanan': kode, 'pesanan_id': pesanan_id, 'total_harga': total}
+        
+        self.jurnal.catat('pesanan', data)
+        
+        with self._lock_offline:
+            self._id_offline -= 1
+            id_sementara = self._id_sementara[kode] = self._id_offline
+        
+        # Cache ikut diperbarui agar pesanan offline berikutnya tidak memakai meja/stok yang sama
+        self._cache.simpan('meja', [m for m in self._cache.get('meja') or [] if m['id'] != meja_id])
+        for mid, jml in items:
+            menu_map[mid]['stok'] -= jml
+        if self._cache.get('menu') is not None:
+            self._cache.simpan('menu', self._cache.get('menu'))
+        
+        PESANAN_DIBUAT.inc(mode='offline')
+        NILAI_PESANAN.inc(float(total))
+        self.logger.warning(f"Database tidak tersedia, pesanan {kode} dicatat di jurnal lokal")
+        return {'kode_pesanan': kode, 'pesanan_id': id_sementara, 'total_harga': total, 'offline': True}
         
     
     # ========== MENU 5: LAPORAN ==========
     
-    def generate_laporan(self):
-        """Generate laporan sederhana - tampilkan semua pesanan"""
-        print("\n" + "=" * 60)
-        print("LAPORAN")
-        print("=" * 60)
+    def data_laporan(self, mulai=None, akhir=None, limit=50):
+        """
+        Data laporan pesanan pada rentang [mulai, akhir) tanpa interaksi user.
+        Return dict statistik (sudah termasuk arsip), ringkasan arsip dan pesanan terbaru.
+        """
+        filter_sql = []
+        params = []
+        if mulai:
+            filter_sql.append("p.tanggal_pesanan >= %s")
+            params.append(mulai)
+        if akhir:
+            filter_sql.append("p.tanggal_pesanan < %s")
+            params.append(akhir)
+        where = ("WHERE " + " AND ".join(filter_sql)) if filter_sql else ""
         
         try:
-            print("\n📊 MEMUAT DATA PESANAN...")
-            
-            conn = self.db.get_connection()
+            # Query laporan berat diarahkan ke replica
+            conn = koneksi_baca(self.db)
             cursor = conn.cursor(dictionary=True)
             
-            # Query sederhana: semua pesanan
-            query = """
+            query = f"""
             SELECT 
+                p.id,
                 p.kode_pesanan,
                 p.tanggal_pesanan,
                 pl.nama as pelanggan,
@@ -753,51 +1204,121 @@ class SistemRestoran:
             FROM pesanan p
             LEFT JOIN pelanggan pl ON p.pelanggan_id = pl.id
             LEFT JOIN meja m ON p.meja_id = m.id
+            {where}
             ORDER BY p.tanggal_pesanan DESC
-            LIMIT 50
+            LIMIT %s
             """
             
-            cursor.execute(query)
+            cursor.execute(query, tuple(params) + (limit,))
             semua_pesanan = cursor.fetchall()
             
             # Statistik total
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     COUNT(*) as total_pesanan,
                     SUM(total_harga) as total_pendapatan,
                     MIN(tanggal_pesanan) as pertama,
                     MAX(tanggal_pesanan) as terakhir
-                FROM pesanan
-            """)
+                FROM pesanan p
+                {where}
+            """, tuple(params))
             statistik = cursor.fetchone()
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+        
+        # Gabungkan dengan pesanan yang sudah dipindah ke arsip
+        arsip = ArsipPesanan(self.db).ringkasan(mulai, akhir)
+        if statistik and arsip['total_pesanan']:
+            statistik['total_pesanan'] = (statistik['total_pesanan'] or 0) + arsip['total_pesanan']
+            statistik['total_pendapatan'] = (statistik['total_pendapatan'] or 0) + arsip['total_pendapatan']
+            tanggal_pertama = [t for t in (statistik['pertama'], arsip['pertama']) if t]
+            tanggal_terakhir = [t for t in (statistik['terakhir'], arsip['terakhir']) if t]
+            statistik['pertama'] = min(tanggal_pertama) if tanggal_pertama else None
+            statistik['terakhir'] = max(tanggal_terakhir) if tanggal_terakhir else None
+        
+        return {'statistik': statistik, 'arsip': arsip, 'pesanan': semua_pesanan}
+    
+    def data_statistik(self):
+        """Ringkasan kondisi restoran saat ini untuk monitoring/cron"""
+        hari_ini = datetime.combine(datetime.now().date(), datetime.min.time())
+        
+        try:
+            conn = koneksi_baca(self.db)
+            cursor = conn.cursor(dictionary=True)
+            
+            cursor.execute("SELECT COUNT(*) AS total FROM pelanggan")
+            total_pelanggan = cursor.fetchone()['total']
+            
+            cursor.execute("SELECT status, COUNT(*) AS jumlah FROM meja GROUP BY status")
+            meja = {row['status']: row['jumlah'] for row in cursor.fetchall()}
+            
+            cursor.execute("""
+                SELECT status_pesanan, COUNT(*) AS jumlah, COALESCE(SUM(total_harga), 0) AS total
+                FROM pesanan
+                WHERE tanggal_pesanan >= %s
+                GROUP BY status_pesanan
+            """, (hari_ini,))
+            pesanan_hari_ini = cursor.fetchall()
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+        
+        return {
+            'waktu': datetime.now(),
+            'total_pelanggan': total_pelanggan,
+            'meja': meja,
+            'pesanan_hari_ini': {row['status_pesanan']: row['jumlah'] for row in pesanan_hari_ini},
+            'pendapatan_hari_ini': sum(row['total'] for row in pesanan_hari_ini
+                                       if row['status_pesanan'] != 'dibatalkan'),
+        }
+    
+    def generate_laporan(self):
+        """Generate laporan sederhana - tampilkan semua pesanan"""
+        self.layar.tulis("\n" + "=" * 60)
+        self.layar.tulis("LAPORAN")
+        self.layar.tulis("=" * 60)
+        
+        try:
+            self.layar.tulis("\n📊 MEMUAT DATA PESANAN...")
+            self.layar.cetak()
+            
+            laporan = self.data_laporan(limit=50)
+            semua_pesanan = laporan['pesanan']
+            statistik = laporan['statistik']
+            arsip = laporan['arsip']
             
             # TAMPILKAN HASIL
-            print("\n" + "=" * 60)
-            print("📈 STATISTIK KESELURUHAN")
-            print("=" * 60)
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis("📈 STATISTIK KESELURUHAN")
+            self.layar.tulis("=" * 60)
             
             if statistik:
-                print(f"Total Pesanan     : {statistik['total_pesanan'] or 0}")
-                print(f"Total Pendapatan  : Rp{statistik['total_pendapatan'] or 0:,.0f}")
+                self.layar.tulis(f"Total Pesanan     : {statistik['total_pesanan'] or 0}")
+                self.layar.tulis(f"Total Pendapatan  : Rp{statistik['total_pendapatan'] or 0:,.0f}")
+                if arsip['total_pesanan']:
+                    self.layar.tulis(f"Termasuk Arsip    : {arsip['total_pesanan']} pesanan")
                 
                 if statistik['pertama'] and statistik['terakhir']:
-                    print(f"Rentang Waktu     : {statistik['pertama'].strftime('%d/%m/%Y')} - {statistik['terakhir'].strftime('%d/%m/%Y')}")
+                    self.layar.tulis(f"Rentang Waktu     : {statistik['pertama'].strftime('%d/%m/%Y')} - {statistik['terakhir'].strftime('%d/%m/%Y')}")
             
-            print("\n" + "=" * 60)
-            print("📋 DAFTAR PESANAN TERBARU")
-            print("=" * 60)
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis("📋 DAFTAR PESANAN TERBARU")
+            self.layar.tulis("=" * 60)
             
             if not semua_pesanan:
-                print("📭 Tidak ada data pesanan")
+                self.layar.tulis("📭 Tidak ada data pesanan")
             else:
-                print(f"{'No':<3} {'Kode':<12} {'Tanggal':<12} {'Pelanggan':<20} {'Meja':<6} {'Total':<12} {'Status':<10}")
-                print("-" * 80)
-                
+                baris = []
                 for i, pesanan in enumerate(semua_pesanan, 1):
                     tanggal = pesanan['tanggal_pesanan'].strftime('%d/%m/%Y') if pesanan['tanggal_pesanan'] else '-'
                     pelanggan = pesanan['pelanggan'] or 'Tanpa Nama'
                     
-                    print(f"{i:<3} "
+                    baris.append(f"{i:<3} "
                         f"{pesanan['kode_pesanan']:<12} "
                         f"{tanggal:<12} "
                         f"{pelanggan[:18]:<20} "
@@ -805,13 +1326,19 @@ class SistemRestoran:
                         f"Rp{pesanan['total_harga'] or 0:<10,.0f} "
                         f"{pesanan['status_pesanan']:<10}")
                 
-                print(f"\n📄 Menampilkan {len(semua_pesanan)} pesanan terbaru")
+                self.layar.cetak()
+                self.layar.halaman(baris, header=[
+                    f"{'No':<3} {'Kode':<12} {'Tanggal':<12} {'Pelanggan':<20} {'Meja':<6} {'Total':<12} {'Status':<10}",
+                    "-" * 80,
+                ])
+                self.layar.tulis(f"\n📄 Menampilkan {len(semua_pesanan)} pesanan terbaru")
             
             # DETAIL 1 PESANAN PILIHAN
             if semua_pesanan:
-                print("\n" + "-" * 60)
-                print("🔍 LIHAT DETAIL PESANAN")
-                print("-" * 60)
+                self.layar.tulis("\n" + "-" * 60)
+                self.layar.tulis("🔍 LIHAT DETAIL PESANAN")
+                self.layar.tulis("-" * 60)
+                self.layar.cetak()
                 
                 pilihan = input("Masukkan nomor pesanan untuk detail (0 untuk skip): ").strip()
                 
@@ -819,59 +1346,498 @@ class SistemRestoran:
                     idx = int(pilihan) - 1
                     pesanan_terpilih = semua_pesanan[idx]
                     
-                    # Ambil detail item pesanan
+                    # Ambil detail item pesanan (nama menu dari snapshot saat pesan)
+                    conn = koneksi_baca(self.db)
+                    cursor = conn.cursor(dictionary=True)
                     query_detail = """
                     SELECT 
-                        mn.nama_menu,
+                        dp.nama_menu,
                         dp.jumlah,
                         dp.harga_satuan,
-                        (dp.jumlah * dp.harga_satuan) as subtotal
+                        dp.subtotal
                     FROM detail_pesanan dp
-                    LEFT JOIN menu mn ON dp.menu_id = mn.id
-                    WHERE dp.pesanan_id = (
-                        SELECT id FROM pesanan WHERE kode_pesanan = %s
-                    )
+                    WHERE dp.pesanan_id = %s
                     """
                     
-                    cursor.execute(query_detail, (pesanan_terpilih['kode_pesanan'],))
+                    cursor.execute(query_detail, (pesanan_terpilih['id'],))
                     detail_items = cursor.fetchall()
                     
                     # Tampilkan detail
-                    print("\n" + "=" * 60)
-                    print(f"DETAIL PESANAN: {pesanan_terpilih['kode_pesanan']}")
-                    print("=" * 60)
+                    self.layar.tulis("\n" + "=" * 60)
+                    self.layar.tulis(f"DETAIL PESANAN: {pesanan_terpilih['kode_pesanan']}")
+                    self.layar.tulis("=" * 60)
                     
-                    print(f"Kode Pesanan   : {pesanan_terpilih['kode_pesanan']}")
-                    print(f"Tanggal        : {pesanan_terpilih['tanggal_pesanan']}")
-                    print(f"Pelanggan      : {pesanan_terpilih['pelanggan']}")
-                    print(f"Meja           : {pesanan_terpilih['nomor_meja']}")
-                    print(f"Status         : {pesanan_terpilih['status_pesanan']}")
-                    print(f"Total          : Rp{pesanan_terpilih['total_harga']:,.0f}")
+                    self.layar.tulis(f"Kode Pesanan   : {pesanan_terpilih['kode_pesanan']}")
+                    self.layar.tulis(f"Tanggal        : {pesanan_terpilih['tanggal_pesanan']}")
+                    self.layar.tulis(f"Pelanggan      : {pesanan_terpilih['pelanggan']}")
+                    self.layar.tulis(f"Meja           : {pesanan_terpilih['nomor_meja']}")
+                    self.layar.tulis(f"Status         : {pesanan_terpilih['status_pesanan']}")
+                    self.layar.tulis(f"Total          : Rp{pesanan_terpilih['total_harga']:,.0f}")
                     
-                    print("\n" + "-" * 60)
-                    print("ITEM PESANAN:")
-                    print("-" * 60)
+                    self.layar.tulis("\n" + "-" * 60)
+                    self.layar.tulis("ITEM PESANAN:")
+                    self.layar.tulis("-" * 60)
                     
                     if detail_items:
                         total_items = 0
                         for item in detail_items:
                             subtotal = item['jumlah'] * item['harga_satuan']
                             total_items += subtotal
-                            print(f"  {item['nama_menu']:30} x{item['jumlah']:<3} @Rp{item['harga_satuan']:,.0f} = Rp{subtotal:,.0f}")
+                            self.layar.tulis(f"  {item['nama_menu']:30} x{item['jumlah']:<3} @Rp{item['harga_satuan']:,.0f} = Rp{subtotal:,.0f}")
                         
-                        print("-" * 60)
-                        print(f"  TOTAL: Rp{total_items:,.0f}")
+                        self.layar.tulis("-" * 60)
+                        self.layar.tulis(f"  TOTAL: Rp{total_items:,.0f}")
+                    else:
+                        self.layar.tulis("  Tidak ada item ditemukan")
+            
+        except Exception as e:
+            self.layar.tulis(f"❌ Error: {e}")
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+        
+        self.layar.cetak()
+        input("\nTekan Enter untuk kembali ke menu...")
+        
+    # ========== MENU 7: ANTRIAN DAPUR ==========
+    
+    def update_status_pesanan(self, pesanan_id, status_baru):
+        """
+        Simpan status pesanan ke database lalu teruskan ke antrian dapur.
+        Pesanan offline (id negatif) atau database yang tidak tersedia:
+        status dicatat di jurnal, urutannya terjaga terhadap pesanan offline.
+        """
+        if pesanan_id < 0 or self.db.breaker.terbuka:
+            return self._jurnal_status(pesanan_id, status_baru)
+        
+        try:
+            conn = self.db.get_connection(route=ROUTE_WRITE)
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE pesanan SET status_pesanan = %s WHERE id = %s",
+                (status_baru, pesanan_id)
+            )
+            conn.commit()
+            success = cursor.rowcount > 0
+        except Exception as e:
+            if not kesalahan_koneksi(e):
+                raise
+            # UPDATE status idempotent, aman dicatat ulang walau sempat diterapkan
+            return self._jurnal_status(pesanan_id, status_baru)
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+        
+        if success:
+            self.antrian.ubah_status(pesanan_id, status_baru)
+            self.logger.info(f"Status pesanan {pesanan_id} diubah: {status_baru}")
+        return success
+    
+    def _jurnal_status(self, pesanan_id, status_baru):
+        """Catat perubahan status di jurnal lokal dan terapkan langsung ke antrian"""
+        pesanan = self.antrian.get(pesanan_id)
+        self.jurnal.catat('status', {
+            'pesanan_id': pesanan_id,
+            'kode_pesanan': pesanan['kode_pesanan'] if pesanan else None,
+            'status': status_baru,
+        })
+        self.antrian.ubah_status(pesanan_id, status_baru)
+        self.logger.warning(f"Status pesanan {pesanan_id} dicatat di jurnal: {status_baru}")
+        return True
+    
+    def _sinkron_antrian(self, event):
+        """Terapkan event pesanan dari outbox (termasuk dari terminal lain) ke antrian"""
+        pesanan_id = event['row_id']
+        status = event['payload'].get('status_pesanan')
+        pesanan = self.antrian.get(pesanan_id)
+        
+        if event['aksi'] == 'delete':
+            if pesanan:
+                self.antrian.ubah_status(pesanan_id, 'dibatalkan')
+        elif pesanan is None:
+            if status in STATUS_TERBUKA:
+                self.antrian.muat_dari_db(self.db, pesanan_id)
+        elif pesanan['status'] != status:
+            self.antrian.ubah_status(pesanan_id, status)
+    
+    def antrian_dapur(self):
+        """
+        Tampilan antrian dapur dengan filter per stasiun.
+        Outbox di-tail di thread latar selama layar terbuka; layar digambar
+        ulang begitu ada event dari terminal lain tanpa menunggu Enter.
+        """
+        stasiun = None
+        notifikasi = deque(maxlen=5)
+        ada_perubahan = threading.Event()
+        berhenti = threading.Event()
+        
+        def catat_notifikasi(event, pesanan):
+            notifikasi.append(f"🔔 {event.upper()}: {pesanan['kode_pesanan']} "
+                              f"(Meja {pesanan['nomor_meja']}) - {pesanan['status']}")
+            ada_perubahan.set()
+        
+        self.antrian.subscribe(catat_notifikasi)
+        consumer = threading.Thread(target=self.outbox.jalankan, name="outbox-dapur",
+                                    kwargs={'interval': 1.0, 'stop_event': berhenti}, daemon=True)
+        consumer.start()
+        
+        try:
+            while True:
+                self.layar.tulis("\n" + "=" * 60)
+                self.layar.tulis(f"ANTRIAN DAPUR - Stasiun: {stasiun or 'semua'}")
+                self.layar.tulis("=" * 60)
+                
+                # Perubahan dari terminal lain masuk lewat consumer outbox di thread latar
+                self._sinkron_jurnal()
+                if self.db.breaker.terbuka:
+                    self.layar.tulis("⚠️  MODE OFFLINE - perubahan dicatat di jurnal lokal")
+                
+                ada_perubahan.clear()
+                for pesan in list(notifikasi):
+                    self.layar.tulis(pesan)
+                notifikasi.clear()
+                
+                daftar = self.antrian.daftar(stasiun)
+                if not daftar:
+                    self.layar.tulis("\n📭 Tidak ada pesanan terbuka")
+                else:
+                    sekarang = datetime.now()
+                    self.layar.tulis(f"\n{'No':<3} {'Kode':<15} {'Meja':<6} {'Umur':<8} {'Status':<10} Item")
+                    self.layar.tulis("-" * 70)
+                    
+                    for i, p in enumerate(daftar, 1):
+                        umur = int((sekarang - p['tanggal']).total_seconds() // 60)
+                        item_str = ", ".join(f"{it['nama_menu']} x{it['jumlah']}" for it in p['items'])
+                        self.layar.tulis(f"{i:<3} {p['kode_pesanan']:<15} {p['nomor_meja']:<6} "
+                                         f"{umur:>4} mnt {p['status']:<10} {item_str[:40]}")
+                
+                self.layar.tulis("\n" + "-" * 60)
+                self.layar.tulis("[nomor] Lanjutkan status  |  b[nomor] Batalkan")
+                self.layar.tulis("s  Ganti stasiun          |  0  Kembali")
+                # Hanya baris yang berubah (status, umur, notifikasi) yang ditulis ulang
+                self.layar.render()
+                
+                # Gambar ulang saat ada event, atau tiap 30 detik agar umur pesanan ikut berjalan
+                pilihan = input_berwaktu("\nPilih aksi: ", ada_perubahan, batas=30)
+                if pilihan is None:
+                    continue
+                pilihan = pilihan.strip().lower()
+                
+                if pilihan == "0":
+                    break
+                elif pilihan == "s":
+                    pilihan_stasiun = self.antrian.daftar_stasiun()
+                    print(f"Stasiun tersedia: {', '.join(pilihan_stasiun) or '-'}")
+                    stasiun = input("Stasiun (kosongkan untuk semua): ").strip() or None
+                elif pilihan.lstrip("b").isdigit() and 1 <= int(pilihan.lstrip("b")) <= len(daftar):
+                    pesanan = daftar[int(pilihan.lstrip("b")) - 1]
+                    
+                    if pilihan.startswith("b"):
+                        status_baru = 'dibatalkan'
                     else:
-                        print("  Tidak ada item ditemukan")
+                        status_baru = self.antrian.status_berikutnya(pesanan['id'])
+                    
+                    try:
+                        if not self.update_status_pesanan(pesanan['id'], status_baru):
+                            print("❌ Gagal mengupdate status pesanan")
+                            input("Tekan Enter untuk melanjutkan...")
+                    except Exception as e:
+                        self.logger.error(f"Error update status pesanan: {e}")
+                        print(f"❌ Error: {e}")
+                        input("Tekan Enter untuk melanjutkan...")
+                else:
+                    print("Pilihan tidak valid!")
+                    input("Tekan Enter untuk melanjutkan...")
+        finally:
+            berhenti.set()
+            consumer.join(timeout=5)
+            self.antrian.unsubscribe(catat_notifikasi)
+    
+    # ========== MENU 8: ANALITIK PENJUALAN ==========
+    
+    def analitik_penjualan(self):
+        """Tampilkan analitik penjualan untuk rentang tanggal"""
+        self.layar.tulis("\n" + "=" * 60)
+        self.layar.tulis("ANALITIK PENJUALAN")
+        self.layar.tulis("=" * 60)
+        self.layar.cetak()
+        
+        try:
+            hari_ini = datetime.now().date()
+            default_mulai = hari_ini - timedelta(days=30)
+            
+            mulai = input(f"Tanggal mulai (YYYY-MM-DD) [{default_mulai}]: ").strip()
+            akhir = input(f"Tanggal akhir (YYYY-MM-DD) [{hari_ini}]: ").strip()
+            
+            mulai = datetime.strptime(mulai, '%Y-%m-%d').date() if mulai else default_mulai
+            akhir = datetime.strptime(akhir, '%Y-%m-%d').date() if akhir else hari_ini
+            
+            self.layar.tulis("\n📊 MENGHITUNG ANALITIK...")
+            self.layar.cetak()
+            hasil = AnalitikPenjualan(self.db).hitung(mulai, akhir + timedelta(days=1))
+            
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis(f"📈 RINGKASAN {mulai.strftime('%d/%m/%Y')} - {akhir.strftime('%d/%m/%Y')}")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis(f"Total Pesanan     : {hasil['jumlah_pesanan']:,}")
+            self.layar.tulis(f"Total Pendapatan  : Rp{hasil['total_pendapatan']:,.0f}")
+            self.layar.tulis(f"Rata-rata Item    : {hasil['basket']['item_per_pesanan']:.1f} item/pesanan")
+            self.layar.tulis(f"Rata-rata Nilai   : Rp{hasil['basket']['nilai_per_pesanan']:,.0f}/pesanan")
             
-            cursor.close()
-            conn.close()
+            self.layar.tulis("\n🏆 TOP MENU")
+            self.layar.tulis("-" * 60)
+            self.layar.tulis(f"{'Menu':<25} {'Terjual':>8} {'Pendapatan':>15}")
+            for nama_menu, row in hasil['top_menu'].iterrows():
+                self.layar.tulis(f"{nama_menu:<25} {row['jumlah']:>8,} Rp{row['pendapatan']:>13,.0f}")
             
+            self.layar.tulis("\n🍽️  PENDAPATAN PER KATEGORI")
+            self.layar.tulis("-" * 60)
+            for kategori, total in hasil['pendapatan_kategori'].items():
+                self.layar.tulis(f"{kategori:<25} Rp{total:>13,.0f}")
+            
+            self.layar.tulis("\n🪑 PERPUTARAN MEJA (pesanan/hari)")
+            self.layar.tulis("-" * 60)
+            for nomor_meja, rata in hasil['perputaran_meja'].items():
+                self.layar.tulis(f"Meja {nomor_meja:<10} {rata:>6.1f}")
+            
+            self.layar.tulis("\n🕒 HEATMAP PESANAN (hari x jam)")
+            self.layar.tulis("-" * 60)
+            heatmap = hasil['heatmap']
+            jam_aktif = [jam for jam in heatmap.columns if heatmap[jam].sum() > 0]
+            if not jam_aktif:
+                self.layar.tulis("📭 Tidak ada data pesanan")
+            else:
+                self.layar.tulis(f"{'':<8}" + "".join(f"{jam:>4}" for jam in jam_aktif))
+                for hari, row in heatmap.iterrows():
+                    self.layar.tulis(f"{hari:<8}" + "".join(f"{row[jam]:>4}" for jam in jam_aktif))
+        
+        except ValueError:
+            self.layar.tulis("❌ Format tanggal harus YYYY-MM-DD")
         except Exception as e:
-            print(f"❌ Error: {e}")
+            self.logger.error(f"Error analitik penjualan: {e}")
+            self.layar.tulis(f"❌ Error: {e}")
         
+        self.layar.cetak()
         input("\nTekan Enter untuk kembali ke menu...")
+    
+    # ========== MENU 9: UTILITAS SISTEM ==========
+    
+    def utilitas_sistem(self):
+        """Menu job pemeliharaan sistem"""
+        pesan = ""
+        while True:
+            self.layar.tulis("\n" + "=" * 60)
+            self.layar.tulis("UTILITAS SISTEM")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis("1.  Arsipkan Pesanan Lama")
+            self.layar.tulis("2.  Restock / Penyesuaian Stok")
+            self.layar.tulis("3.  Kompaksi & Rekonsiliasi Stok")
+            self.layar.tulis("4.  Tutup Harian")
+            self.layar.tulis("5.  Verifikasi Total Pesanan")
+            self.layar.tulis("0.  Kembali ke Menu Utama")
+            self.layar.tulis("=" * 60)
+            self.layar.tulis(pesan)
+            self.layar.render()
+            pesan = ""
+            
+            choice = input("\nPilih aksi: ").strip()
+            
+            if choice == "1":
+                self.arsipkan_pesanan()
+            elif choice == "2":
+                self.restock_menu()
+            elif choice == "3":
+                self.kompaksi_stok()
+            elif choice == "4":
+                self.tutup_harian()
+            elif choice == "5":
+                self.verifikasi_total()
+            elif choice == "0":
+                break
+            else:
+                pesan = "Pilihan tidak valid!"
+                continue
+            
+            self.layar.invalidasi()
+    
+    def arsipkan_pesanan(self):
+        """Pindahkan pesanan lama ke arsip parquet"""
+        print("\n" + "-" * 60)
+        print("ARSIPKAN PESANAN LAMA")
+        print("-" * 60)
+        
+        try:
+            hari = input("Arsipkan pesanan lebih tua dari berapa hari? [365]: ").strip() or "365"
+            
+            if not hari.isdigit():
+                print("❌ Jumlah hari harus berupa angka")
+            else:
+                cutoff = cutoff_dari_hari(int(hari))
+                confirm = input(f"Pindahkan pesanan sebelum {cutoff:%d/%m/%Y} ke arsip? (y/n): ").strip().lower()
+                
+                if confirm == 'y':
+                    stats = ArsipPesanan(self.db).arsipkan(cutoff)
+                    self.db.tandai_tulis()
+                    print(f"\n✅ Arsip selesai!")
+                    print(f"   Pesanan diarsip : {stats['pesanan']:,}")
+                    print(f"   Item diarsip    : {stats['detail']:,}")
+                    print(f"   File ditulis    : {stats['file']:,}")
+                    self.logger.info(f"Arsip pesanan sebelum {cutoff:%Y-%m-%d}: {stats}")
+                else:
+                    print("❌ Arsip dibatalkan")
+        
+        except Exception as e:
+            self.logger.error(f"Error arsip pesanan: {e}")
+            print(f"❌ Error: {e}")
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
+    def restock_menu(self):
+        """Catat restock atau penyesuaian stok ke ledger"""
+        print("\n" + "-" * 60)
+        print("RESTOCK / PENYESUAIAN STOK")
+        print("-" * 60)
+        
+        try:
+            menu_id = input("ID Menu: ").strip()
+            jumlah = input("Jumlah (negatif untuk pengurangan): ").strip()
+            jenis = 'penyesuaian' if jumlah.startswith('-') else 'restock'
+            
+            if not menu_id.isdigit() or not jumlah.lstrip('-').isdigit() or int(jumlah) == 0:
+                print("❌ ID menu dan jumlah harus berupa angka")
+            else:
+                keterangan = input("Keterangan (opsional): ").strip() or None
+                self.stok.catat(int(menu_id), jenis, int(jumlah), keterangan)
+                self.db.tandai_tulis()
+                
+                print(f"\n✅ {jenis.capitalize()} dicatat")
+                print(f"   Stok sekarang: {self.stok.stok_saat_ini(int(menu_id))}")
+                self.logger.info(f"Stok menu {menu_id} {jenis}: {jumlah}")
+        
+        except Exception as e:
+            self.logger.error(f"Error restock menu: {e}")
+            print(f"❌ Error: {e}")
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
+    def kompaksi_stok(self):
+        """Kompaksi ledger stok lalu rekonsiliasi dengan menu.stok"""
+        print("\n" + "-" * 60)
+        print("KOMPAKSI & REKONSILIASI STOK")
+        print("-" * 60)
+        
+        try:
+            hasil = self.stok.kompaksi()
+            print(f"✅ Kompaksi selesai: {hasil['menu_diperbarui']} menu (ledger id <= {hasil['batas_id']})")
+            
+            selisih = self.stok.rekonsiliasi()
+            if not selisih:
+                print("✅ Stok ledger sama dengan menu.stok")
+            else:
+                print(f"\n⚠️  {len(selisih)} menu berbeda:")
+                print(f"{'ID':<5} {'Menu':<25} {'menu.stok':>10} {'Ledger':>10}")
+                print("-" * 55)
+                for s in selisih:
+                    print(f"{s['menu_id']:<5} {s['nama_menu']:<25} {s['stok_menu']:>10} {str(s['stok_ledger']):>10}")
+                
+                confirm = input("\nSamakan menu.stok dengan ledger? (y/n): ").strip().lower()
+                if confirm == 'y':
+                    self.stok.rekonsiliasi(perbaiki=True)
+                    self.db.tandai_tulis()
+                    print("✅ menu.stok diperbarui")
+            
+            self.logger.info(f"Kompaksi stok: {hasil}, selisih {len(selisih)} menu")
+        
+        except Exception as e:
+            self.logger.error(f"Error kompaksi stok: {e}")
+            print(f"❌ Error: {e}")
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
+    def tutup_harian(self):
+        """Tutup hari: rekap satu lintasan, cek anomali, reset status meja"""
+        print("\n" + "-" * 60)
+        print("TUTUP HARIAN")
+        print("-" * 60)
+        
+        try:
+            tanggal = input(f"Tanggal (YYYY-MM-DD) [{datetime.now().date()}]: ").strip()
+            tanggal = datetime.strptime(tanggal, '%Y-%m-%d').date() if tanggal else None
+            
+            confirm = input("Semua meja akan direset ke 'tersedia'. Lanjutkan? (y/n): ").strip().lower()
+            if confirm != 'y':
+                print("❌ Dibatalkan")
+            else:
+                hasil = TutupHarian(self.db).jalankan(tanggal)
+                self.db.tandai_tulis()
+                
+                print(f"\n✅ Tutup harian {hasil['tanggal'].strftime('%d/%m/%Y')} selesai")
+                print(f"   Jumlah Pesanan   : {hasil['jumlah_pesanan']}")
+                print(f"   Total Pendapatan : Rp{hasil['total_pendapatan']:,.0f}")
+                print(f"   Meja Direset     : {hasil['meja_direset']}")
+                
+                for judul, kunci in (("STATUS", 'per_status'), ("MEJA", 'per_meja'),
+                                     ("KATEGORI", 'per_kategori'), ("PELAYAN", 'per_pelayan')):
+                    print(f"\n📊 PER {judul}")
+                    for nama, agregat in sorted(hasil[kunci].items()):
+                        print(f"   {nama:<20} {agregat['jumlah']:>5}  Rp{agregat['total']:>13,.0f}")
+                
+                if hasil['anomali']:
+                    print(f"\n⚠️  {len(hasil['anomali'])} ANOMALI:")
+                    for anomali in hasil['anomali']:
+                        detail = ", ".join(f"{k}={v}" for k, v in anomali.items() if k != 'jenis')
+                        print(f"   - {anomali['jenis']}: {detail}")
+                else:
+                    print("\n✅ Tidak ada anomali")
+        
+        except ValueError:
+            print("❌ Format tanggal harus YYYY-MM-DD")
+        except Exception as e:
+            self.logger.error(f"Error tutup harian: {e}")
+            print(f"❌ Error: {e}")
         
+        input("\nTekan Enter untuk melanjutkan...")
+    
+    def verifikasi_total(self):
+        """Cek total_harga pesanan baru/berubah terhadap jumlah subtotal item"""
+        print("\n" + "-" * 60)
+        print("VERIFIKASI TOTAL PESANAN")
+        print("-" * 60)
+        
+        try:
+            verifikasi = VerifikasiTotal(self.db)
+            stats = verifikasi.jalankan()
+            
+            print(f"✅ Diperiksa: {stats['diperiksa_baru']} pesanan baru, "
+                  f"{stats['diperiksa_diubah']} pesanan berubah ({stats['durasi']:.2f} detik)")
+            
+            selisih = verifikasi.daftar_selisih()
+            if not selisih:
+                print("✅ Semua total pesanan sesuai dengan detail")
+            else:
+                print(f"\n⚠️  {len(selisih)} pesanan dengan total tidak sesuai:")
+                print(f"{'Kode':<18} {'Tersimpan':>14} {'Jumlah Item':>14}")
+                print("-" * 50)
+                for row in selisih:
+                    print(f"{row['kode_pesanan'] or row['pesanan_id']:<18} "
+                          f"Rp{row['total_tersimpan']:>12,.0f} Rp{row['total_item']:>12,.0f}")
+                
+                confirm = input("\nPerbaiki total_harga sesuai detail? (y/n): ").strip().lower()
+                if confirm == 'y':
+                    stats = verifikasi.jalankan(perbaiki=True, ulang=True)
+                    self.db.tandai_tulis()
+                    print(f"✅ {stats['diperbaiki']} pesanan diperbaiki")
+        
+        except Exception as e:
+            self.logger.error(f"Error verifikasi total: {e}")
+            print(f"❌ Error: {e}")
+        
+        input("\nTekan Enter untuk melanjutkan...")
+    
     # ========== MENU 6: DEBUGGING DEMO ==========
     
     def run_debugging_demo(self):
@@ -963,18 +1929,46 @@ class SistemRestoran:
         print("   │   ├── pelanggan.py         # Class Pelanggan")
         print("   │   ├── meja.py              # Class Meja")
         print("   │   ├── pesanan.py           # Class Pesanan")
-        print("   │   └── laporan.py           # Class Laporan")
+        print("   │   ├── laporan.py           # Class Laporan")
+        print("   │   ├── antrian_dapur.py     # Antrian pesanan dapur")
+        print("   │   ├── timeline_meja.py     # Timeline & utilisasi status meja")
+        print("   │   ├── tutup_harian.py      # Job tutup hari")
+        print("   │   └── analitik.py          # Analitik penjualan (pandas)")
         print("   ├── database/                 # Database operations")
         print("   │   ├── db_connection.py     # Connection pooling")
-        print("   │   └── crud_operations.py   # CRUD operations")
+        print("   │   ├── crud_operations.py   # CRUD operations")
+        print("   │   ├── bulk_pelanggan.py    # Import/export CSV pelanggan")
+        print("   │   ├── outbox.py            # Change feed consumer")
+        print("   │   ├── arsip.py             # Arsip pesanan (parquet)")
+        print("   │   ├── routing.py           # Read/write splitting replica")
+        print("   │   ├── stok_ledger.py       # Ledger stok append-only")
+        print("   │   ├── ketahanan.py         # Retry, circuit breaker, jurnal offline")
+        print("   │   ├── terukur.py           # Metrik koneksi dan query")
+        print("   │   ├── shard.py             # Router multi-outlet & laporan konsolidasi")
+        print("   │   ├── migrasi.py           # Runner migrasi & cek rencana query")
+        print("   │   └── verifikasi_total.py  # Cek total_harga vs detail")
         print("   ├── utils/                   # Utilities")
         print("   │   ├── validasi_input.py    # Input validation")
         print("   │   ├── pdf_generator.py     # PDF generation")
+        print("   │   ├── tampilan.py          # Buffer & render layar terminal")
+        print("   │   ├── struk.py             # Struk pesanan (PDF/thermal)")
+        print("   │   ├── profiler.py          # Mode --profile (cProfile/tracemalloc)")
+        print("   │   ├── metrics.py           # Metrik format Prometheus")
         print("   │   └── logger.py            # Logging system")
-        print("   ├── tests/                   # Unit tests")
-        print("   │   ├── test_models.py       # Test OOP models")
-        print("   │   ├── test_database.py     # Test database")
-        print("   │   └── test_integration.py  # Integration tests")
+        print("   ├── tests/                   # Unit tests (tanpa server MySQL)")
+        print("   │   ├── db_palsu.py          # Database palsu untuk test")
+        print("   │   ├── test_kode_pesanan.py # Generator kode pesanan")
+        print("   │   ├── test_ketahanan.py    # Retry, circuit breaker, jurnal")
+        print("   │   ├── test_outbox.py       # Consumer outbox & celah id")
+        print("   │   ├── test_stok_ledger.py  # Ledger stok & kompaksi")
+        print("   │   ├── test_verifikasi_total.py # Verifikasi total pesanan")
+        print("   │   ├── test_migrasi.py      # Runner migrasi")
+        print("   │   ├── test_timeline_meja.py # Timeline & utilisasi meja")
+        print("   │   ├── test_antrian_dapur.py # Antrian dapur")
+        print("   │   ├── test_validasi_batch.py # Validasi batch vs Validator")
+        print("   │   ├── test_metrics.py      # Registry metrik & metrik koneksi")
+        print("   │   ├── test_shard.py        # Penggabungan hasil multi-outlet")
+        print("   │   └── test_tampilan.py     # Render layar terminal")
         print("   └── docs/                    # Dokumentasi")
         
         print("\n🎯 KOMPETENSI YANG DICOVER:")
@@ -991,13 +1985,14 @@ class SistemRestoran:
         print("   - mysql-connector-python: Koneksi database")
         print("   - fpdf2: Generate PDF reports")
         print("   - pandas: Data manipulation (untuk laporan)")
+        print("   - pyarrow: File arsip parquet")
         print("   - logging: Built-in Python logging")
         
         print("\n🔧 CARA MENJALANKAN:")
         print("   1. Setup database: mysql -u root -p < database_schema.sql")
         print("   2. Install dependencies: pip install -r requirements.txt")
-        print("   3. Run aplikasi: python app.py")
-        print("   4. Run tests: python run_tests.py")
+        print("   3. Run aplikasi: TERMINAL_ID=<0-1023> python app.py (id unik per terminal)")
+        print("   4. Run tests: python run-tests.py")
         
         print("\n📞 SUPPORT:")
         print("   Untuk masalah teknis, cek file README.md")
@@ -1005,18 +2000,390 @@ class SistemRestoran:
         
         input("\nTekan Enter untuk kembali ke menu utama...")
 
-def main():
-    """Main function"""
+# ========== MODE NON-INTERAKTIF (CLI) ==========
+
+def _json_default(obj):
+    """Serialisasi nilai dari MySQL (datetime, Decimal) ke JSON"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Tipe {type(obj).__name__} tidak bisa dijadikan JSON")
+
+
+def _tulis_output(data, fmt, baris_csv=None):
+    """
+    Tulis hasil ke stdout sebagai JSON atau CSV.
+    baris_csv: list dict untuk format CSV (default data itu sendiri).
+    """
+    if fmt == 'csv':
+        baris = baris_csv if baris_csv is not None else data
+        if baris:
+            writer = csv.DictWriter(sys.stdout, fieldnames=list(baris[0].keys()), lineterminator='\n')
+            writer.writeheader()
+            for row in baris:
+                writer.writerow({k: _json_default(v) if isinstance(v, (datetime, date, Decimal)) else v
+                                 for k, v in row.items()})
+    else:
+        json.dump(data, sys.stdout, default=_json_default, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+
+
+def _tanggal(teks):
+    """Tipe argparse untuk tanggal YYYY-MM-DD"""
+    try:
+        return datetime.strptime(teks, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"format tanggal harus YYYY-MM-DD: {teks}")
+
+
+def cmd_report(app, args):
+    """Laporan pesanan untuk rentang tanggal"""
+    mulai, akhir = args.mulai, args.akhir
+    if args.tanggal:
+        mulai, akhir = args.tanggal, args.tanggal
+    # --akhir inklusif, query memakai batas eksklusif
+    akhir = akhir + timedelta(days=1) if akhir else None
+    
+    laporan = app.data_laporan(mulai, akhir, limit=args.limit)
+    _tulis_output(laporan, args.format, baris_csv=laporan['pesanan'])
+    return EXIT_SUKSES
+
+
+def cmd_stats(app, args):
+    """Ringkasan kondisi restoran saat ini"""
+    statistik = app.data_statistik()
+    baris = [{'metrik': 'total_pelanggan', 'nilai': statistik['total_pelanggan']},
+             {'metrik': 'pendapatan_hari_ini', 'nilai': statistik['pendapatan_hari_ini']}]
+    baris += [{'metrik': f"meja_{status}", 'nilai': jumlah} for status, jumlah in statistik['meja'].items()]
+    baris += [{'metrik': f"pesanan_{status}", 'nilai': jumlah}
+              for status, jumlah in statistik['pesanan_hari_ini'].items()]
+    _tulis_output(statistik, args.format, baris_csv=baris)
+    return EXIT_SUKSES
+
+
+def cmd_export(app, args):
+    """Export pelanggan ke CSV"""
+    path_csv = args.output or f"pelanggan_{datetime.now().strftime('%Y-%m-%d')}.csv"
+    jumlah = PelangganBulkIO(app.db).export_csv(path_csv)
+    _tulis_output({'file': path_csv, 'jumlah': jumlah}, 'json')
+    return EXIT_SUKSES
+
+
+def cmd_import(app, args):
+    """Import pelanggan dari CSV; gagal jika --strict dan ada baris ditolak"""
+    if not os.path.isfile(args.file):
+        print(f"File {args.file} tidak ditemukan", file=sys.stderr)
+        return EXIT_GAGAL
+    
+    stats = PelangganBulkIO(app.db).import_csv(args.file, args.reject)
+    _tulis_output(stats, 'json')
+    return EXIT_GAGAL if args.strict and stats['ditolak'] else EXIT_SUKSES
+
+
+def cmd_meja_set_status(app, args):
+    """Ubah status meja tertentu atau semua meja"""
+    if not args.semua and not args.meja_id:
+        print("Sebutkan ID meja atau gunakan --semua", file=sys.stderr)
+        return EXIT_GAGAL
+    
+    jumlah = app.ubah_status_meja(args.status, None if args.semua else args.meja_id)
+    _tulis_output({'status': args.status, 'meja_diubah': jumlah}, 'json')
+    return EXIT_SUKSES
+
+
+def cmd_meja_utilisasi(app, args):
+    """Rata-rata lama duduk per meja dan profil utilisasi per jam dari riwayat status meja"""
+    timeline = timeline_terakhir(app.db, hari=args.hari)
+    dwell = timeline.rata_dwell()
+    # Satu lintasan per jam dipakai untuk profil harian dan utilisasi total
+    per_jam = timeline.utilisasi_per_jam()
+    profil = timeline.profil_jam(per_jam=per_jam)
+    
+    data = {
+        'mulai': timeline.mulai,
+        'akhir': timeline.akhir,
+        'utilisasi_total': timeline.utilisasi_total(per_jam=per_jam),
+        'rata_duduk': [dict(meja_id=meja_id, **nilai) for meja_id, nilai in sorted(dwell.items())],
+        'per_jam': profil,
+    }
+    _tulis_output(data, args.format, baris_csv=profil)
+    return EXIT_SUKSES
+
+
+def cmd_outlet(app, args):
+    """Laporan konsolidasi semua outlet (query paralel ke setiap database cabang)"""
+    mulai = args.mulai
+    akhir = args.akhir + timedelta(days=1) if args.akhir else None
+    
+    router = ShardRouter()
     try:
-        app = SistemRestoran()
-        app.run()
-    except KeyboardInterrupt:
-        print("\n\nProgram dihentikan oleh pengguna")
+        laporan = LaporanOutlet(router)
+        if args.aksi_outlet == 'ringkasan':
+            hasil = laporan.ringkasan(mulai, akhir)
+            baris = hasil['per_outlet']
+        elif args.aksi_outlet == 'terlaris':
+            hasil = laporan.menu_terlaris(args.limit, mulai, akhir)
+            baris = hasil['menu']
+        else:
+            hasil = laporan.pesanan(args.halaman, args.limit, mulai, akhir)
+            baris = hasil['pesanan']
+    finally:
+        router.close()
+    
+    _tulis_output(hasil, args.format, baris_csv=baris)
+    for outlet, error in hasil['outlet_gagal'].items():
+        print(f"Outlet {outlet} tidak ikut dihitung: {error}", file=sys.stderr)
+    # Hasil parsial tetap ditulis, exit code menandai ada outlet yang gagal
+    return EXIT_DATABASE if hasil['outlet_gagal'] else EXIT_SUKSES
+
+
+def cmd_migrasi(app, args):
+    """Status/penerapan migrasi schema dan cek rencana query panas"""
+    migrator = Migrator(app.db)
+    
+    if args.aksi_migrasi == 'status':
+        _tulis_output(migrator.status(), args.format)
+        return EXIT_SUKSES
+    
+    if args.aksi_migrasi == 'baseline':
+        _tulis_output({'ditandai': migrator.baseline(args.versi)}, 'json')
+        return EXIT_SUKSES
+    
+    if args.aksi_migrasi == 'jalankan':
+        diterapkan = migrator.jalankan(args.sampai)
+        print(f"{len(diterapkan)} migrasi diterapkan", file=sys.stderr)
+        for nama in diterapkan:
+            print(f"  {nama}", file=sys.stderr)
+        if not args.cek:
+            return EXIT_SUKSES
+    
+    # cek-rencana, atau jalankan --cek: gagal jika ada full scan tanpa indeks
+    rencana = cek_rencana(app.db)
+    _tulis_output(rencana, args.format)
+    regresi = [r for r in rencana if r['status'] == 'regresi']
+    for r in regresi:
+        print(f"REGRESI: {r['query']} full table scan pada {r['tabel']}", file=sys.stderr)
+    return EXIT_GAGAL if regresi else EXIT_SUKSES
+
+
+def cmd_struk(app, args):
+    """Cetak ulang struk beberapa pesanan dalam satu file (PDF atau teks thermal)"""
+    data_list = muat_data_struk(app.db, args.pesanan_id)
+    if not data_list:
+        print("Pesanan tidak ditemukan", file=sys.stderr)
+        return EXIT_GAGAL
+    
+    renderer = RendererStruk(lebar_mm=args.lebar)
+    if args.format == 'pdf':
+        path = args.output or f"struk/struk_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        renderer.pdf(data_list, path)
+    else:
+        isi = renderer.teks(data_list, escpos=args.format == 'escpos')
+        if isinstance(isi, str):
+            isi = isi.encode('utf-8')
+        
+        path = args.output or '-'
+        if path == '-':
+            sys.stdout.buffer.write(isi)
+            return EXIT_SUKSES
+        with open(path, 'wb') as f:
+            f.write(isi)
+    
+    _tulis_output({'file': path, 'jumlah': len(data_list)}, 'json')
+    return EXIT_SUKSES
+
+
+def cmd_tutup_harian(app, args):
+    """Job tutup hari untuk cron; exit code 1 jika --strict dan ada anomali"""
+    hasil = TutupHarian(app.db).jalankan(args.tanggal, reset_meja=not args.tanpa_reset)
+    _tulis_output(hasil, 'json')
+    return EXIT_GAGAL if args.strict and hasil['anomali'] else EXIT_SUKSES
+
+
+def cmd_verifikasi_total(app, args):
+    """Verifikasi inkremental total pesanan (untuk cron per jam)"""
+    stats = VerifikasiTotal(app.db, ukuran_chunk=args.chunk).jalankan(perbaiki=args.perbaiki, ulang=args.ulang)
+    _tulis_output(stats, 'json')
+    return EXIT_GAGAL if stats['selisih'] > stats['diperbaiki'] else EXIT_SUKSES
+
+
+def buat_parser():
+    """Parser argumen; tanpa subcommand aplikasi berjalan interaktif"""
+    parser = argparse.ArgumentParser(
+        prog='app.py',
+        description="Sistem Pemesanan Restoran. Tanpa subcommand berjalan dalam mode menu interaktif."
+    )
+    parser.add_argument('--profile', action='store_true',
+                        help='Profil setiap aksi (cProfile, tracemalloc, collapsed stack); juga env RESTO_PROFILE=1')
+    parser.add_argument('--metrics-port', type=int,
+                        help=f'Endpoint metrik Prometheus di http://127.0.0.1:PORT/metrics; juga env {ENV_METRICS_PORT}')
+    parser.add_argument('--metrics-file',
+                        help=f'Tulis metrik ke file tiap 60 detik dan saat keluar; juga env {ENV_METRICS_FILE}')
+    sub = parser.add_subparsers(dest='perintah', metavar='PERINTAH')
+    
+    p_report = sub.add_parser('report', help='Laporan pesanan (JSON/CSV)')
+    p_report.add_argument('--tanggal', type=_tanggal, help='Satu hari, YYYY-MM-DD')
+    p_report.add_argument('--mulai', type=_tanggal, help='Tanggal mulai, YYYY-MM-DD')
+    p_report.add_argument('--akhir', type=_tanggal, help='Tanggal akhir (inklusif), YYYY-MM-DD')
+    p_report.add_argument('--limit', type=int, default=50, help='Jumlah pesanan terbaru (default 50)')
+    p_report.add_argument('--format', choices=('json', 'csv'), default='json')
+    p_report.set_defaults(fungsi=cmd_report)
+    
+    p_stats = sub.add_parser('stats', help='Ringkasan pelanggan, meja dan pesanan hari ini')
+    p_stats.add_argument('--format', choices=('json', 'csv'), default='json')
+    p_stats.set_defaults(fungsi=cmd_stats)
+    
+    p_export = sub.add_parser('export', help='Export pelanggan ke CSV')
+    p_export.add_argument('-o', '--output', help='Path file tujuan (default pelanggan_YYYY-MM-DD.csv)')
+    p_export.set_defaults(fungsi=cmd_export)
+    
+    p_import = sub.add_parser('import', help='Import pelanggan dari CSV (nama, no_telepon, email)')
+    p_import.add_argument('file', help='Path file CSV')
+    p_import.add_argument('--reject', help='Path file baris yang ditolak')
+    p_import.add_argument('--strict', action='store_true', help='Exit code 1 jika ada baris ditolak')
+    p_import.set_defaults(fungsi=cmd_import)
+    
+    p_struk = sub.add_parser('struk', help='Cetak struk banyak pesanan sekaligus')
+    p_struk.add_argument('pesanan_id', type=int, nargs='+', help='ID pesanan')
+    p_struk.add_argument('--format', choices=('pdf', 'teks', 'escpos'), default='pdf')
+    p_struk.add_argument('--lebar', type=int, choices=(58, 80), default=58, help='Lebar kertas (mm)')
+    p_struk.add_argument('-o', '--output', help="Path file tujuan ('-' untuk stdout pada format teks)")
+    p_struk.set_defaults(fungsi=cmd_struk)
+    
+    p_tutup = sub.add_parser('tutup-harian', help='Rekap akhir hari, cek anomali dan reset meja')
+    p_tutup.add_argument('--tanggal', type=_tanggal, help='Tanggal yang ditutup (default hari ini)')
+    p_tutup.add_argument('--tanpa-reset', action='store_true', help='Jangan reset status meja')
+    p_tutup.add_argument('--strict', action='store_true', help='Exit code 1 jika ada anomali')
+    p_tutup.set_defaults(fungsi=cmd_tutup_harian)
+    
+    p_verifikasi = sub.add_parser('verifikasi-total', help='Cek total_harga vs detail pesanan')
+    p_verifikasi.add_argument('--perbaiki', action='store_true', help='Samakan total_harga dengan detail')
+    p_verifikasi.add_argument('--ulang', action='store_true', help='Abaikan checkpoint, periksa semua pesanan')
+    p_verifikasi.add_argument('--chunk', type=int, default=1000, help='Jumlah id pesanan per query')
+    p_verifikasi.set_defaults(fungsi=cmd_verifikasi_total)
+    
+    p_meja = sub.add_parser('meja', help='Operasi meja')
+    sub_meja = p_meja.add_subparsers(dest='aksi_meja', metavar='AKSI', required=True)
+    p_set_status = sub_meja.add_parser('set-status', help='Ubah status meja')
+    p_set_status.add_argument('status', choices=STATUS_MEJA)
+    p_set_status.add_argument('meja_id', type=int, nargs='*', help='ID meja')
+    p_set_status.add_argument('--semua', action='store_true', help='Ubah status semua meja')
+    p_set_status.set_defaults(fungsi=cmd_meja_set_status)
+    p_utilisasi = sub_meja.add_parser('utilisasi', help='Lama duduk dan utilisasi per jam dari riwayat status')
+    p_utilisasi.add_argument('--hari', type=int, default=28, help='Rentang riwayat (hari terakhir)')
+    p_utilisasi.add_argument('--format', choices=('json', 'csv'), default='json',
+                             help='csv: profil utilisasi per jam')
+    p_utilisasi.set_defaults(fungsi=cmd_meja_utilisasi)
+    
+    p_migrasi = sub.add_parser('migrasi', help='Migrasi schema berversi (folder migrations/)')
+    sub_migrasi = p_migrasi.add_subparsers(dest='aksi_migrasi', metavar='AKSI', required=True)
+    p_m_status = sub_migrasi.add_parser('status', help='Daftar migrasi dan yang sudah diterapkan')
+    p_m_status.add_argument('--format', choices=('json', 'csv'), default='json')
+    p_m_jalankan = sub_migrasi.add_parser('jalankan', help='Terapkan migrasi yang tertunda')
+    p_m_jalankan.add_argument('--sampai', type=int, help='Berhenti di versi ini')
+    p_m_jalankan.add_argument('--cek', action='store_true', help='Cek rencana query panas sesudahnya')
+    p_m_jalankan.add_argument('--format', choices=('json', 'csv'), default='json')
+    p_m_baseline = sub_migrasi.add_parser('baseline', help='Tandai migrasi sampai VERSI sudah diterapkan')
+    p_m_baseline.add_argument('versi', type=int)
+    p_m_cek = sub_migrasi.add_parser('cek-rencana', help='EXPLAIN query panas, exit 1 jika ada full scan')
+    p_m_cek.add_argument('--format', choices=('json', 'csv'), default='json')
+    p_migrasi.set_defaults(fungsi=cmd_migrasi)
+    
+    p_outlet = sub.add_parser('outlet', help='Laporan konsolidasi semua outlet (RESTO_OUTLET_CONFIG)')
+    sub_outlet = p_outlet.add_subparsers(dest='aksi_outlet', metavar='AKSI', required=True)
+    for nama, bantuan in (('ringkasan', 'Pesanan dan pendapatan per outlet'),
+                          ('terlaris', 'Menu terlaris lintas outlet'),
+                          ('pesanan', 'Pesanan terbaru semua outlet, per halaman')):
+        p_aksi = sub_outlet.add_parser(nama, help=bantuan)
+        p_aksi.add_argument('--mulai', type=_tanggal, help='Tanggal mulai, YYYY-MM-DD')
+        p_aksi.add_argument('--akhir', type=_tanggal, help='Tanggal akhir (inklusif), YYYY-MM-DD')
+        p_aksi.add_argument('--limit', type=int, default=10 if nama == 'terlaris' else 20)
+        p_aksi.add_argument('--halaman', type=int, default=1)
+        p_aksi.add_argument('--format', choices=('json', 'csv'), default='json')
+        # Kantor pusat tidak harus punya restoran_db lokal
+        p_aksi.set_defaults(fungsi=cmd_outlet, tanpa_db_lokal=True)
+    
+    return parser
+
+
+def jalankan_perintah(args, profiler=None):
+    """Jalankan satu subcommand tanpa banner/menu, return exit code"""
+    try:
+        if getattr(args, 'tanpa_db_lokal', False):
+            if profiler:
+                return profiler.profil(args.perintah, args.fungsi, None, args)
+            return args.fungsi(None, args)
+        
+        app = SistemRestoran(interaktif=False)
+        if not app.db.test_connection():
+            print("Tidak bisa terkoneksi ke database", file=sys.stderr)
+            return EXIT_DATABASE
+        if profiler:
+            return profiler.profil(args.perintah, args.fungsi, app, args)
+        return args.fungsi(app, args)
     except Exception as e:
-        print(f"\n❌ ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        input("\nTekan Enter untuk keluar...")
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_GAGAL
+
+def _mulai_ekspor_metrik(args):
+    """Endpoint HTTP dan/atau penulis file metrik sesuai argumen/env, return (server, penulis)"""
+    port = args.metrics_port or int(os.environ.get(ENV_METRICS_PORT) or 0)
+    path = args.metrics_file or os.environ.get(ENV_METRICS_FILE)
+    
+    server = None
+    if port:
+        try:
+            server = mulai_server(port)
+        except OSError as e:
+            print(f"⚠️  Endpoint metrik port {port} gagal dibuka: {e}", file=sys.stderr)
+    penulis = PenulisBerkala(path).start() if path else None
+    return server, penulis
+
+def main(argv=None):
+    """Main function"""
+    args = buat_parser().parse_args(argv)
+    # Tanpa --profile method tidak dibungkus sama sekali
+    profiler = Profiler() if profil_aktif(args.profile) else None
+    server_metrik, penulis_metrik = _mulai_ekspor_metrik(args)
+    
+    try:
+        if args.perintah:
+            # Ringkasan profil ke stderr agar stdout (JSON/CSV) tetap bersih
+            kode = jalankan_perintah(args, profiler)
+            if profiler:
+                print(profiler.ringkasan(), file=sys.stderr)
+            return kode
+        
+        try:
+            worker_id_dari_env()
+        except ValueError as e:
+            # Petunjuk satu baris, bukan traceback dari konstruktor SistemRestoran
+            print(f"❌ {e}. Contoh: TERMINAL_ID=1 python app.py")
+            return 1
+        
+        try:
+            app = SistemRestoran()
+            if profiler:
+                profiler.bungkus(app, AKSI_MENU)
+            app.run()
+        except KeyboardInterrupt:
+            print("\n\nProgram dihentikan oleh pengguna")
+        except Exception as e:
+            print(f"\n❌ ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            input("\nTekan Enter untuk keluar...")
+        finally:
+            if profiler:
+                print("\n🔬 RINGKASAN PROFIL")
+                print(profiler.ringkasan())
+    finally:
+        # Dump terakhir agar file metrik memuat seluruh sesi
+        if penulis_metrik:
+            penulis_metrik.stop()
+        if server_metrik:
+            server_metrik.shutdown()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
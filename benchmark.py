@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite untuk komponen kritis performa
+Jalankan: python benchmark.py [nama_benchmark ...]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+# ========== KODE PESANAN ==========
+
+def _generate_kode(args):
+    """Worker proses: generate kode dengan worker_id sendiri"""
+    from utils.kode_pesanan import GeneratorKodePesanan
+
+    worker_id, jumlah = args
+    generator = GeneratorKodePesanan(worker_id)
+    mulai = time.perf_counter()
+    kode_list = [generator.next_kode() for _ in range(jumlah)]
+    return kode_list, time.perf_counter() - mulai
+
+
+def bench_kode_pesanan(jumlah_proses=8, per_proses=100000):
+    """Stress test generator kode_pesanan: tanpa tabrakan antar proses"""
+    print(f"Proses: {jumlah_proses}, kode per proses: {per_proses:,}")
+
+    mulai = time.perf_counter()
+    with Pool(jumlah_proses) as pool:
+        hasil = pool.map(_generate_kode, [(i, per_proses) for i in range(jumlah_proses)])
+    durasi = time.perf_counter() - mulai
+
+    semua_kode = set()
+    monoton = True
+    for kode_list, _ in hasil:
+        semua_kode.update(kode_list)
+        # Urutan string harus sama dengan urutan pembuatan per worker
+        if any(a >= b for a, b in zip(kode_list, kode_list[1:])):
+            monoton = False
+
+    total = jumlah_proses * per_proses
+    tabrakan = total - len(semua_kode)
+    rate_worker = max(per_proses / d for _, d in hasil)
+
+    print(f"Total kode        : {total:,}")
+    print(f"Tabrakan          : {tabrakan}")
+    print(f"Monoton per worker: {'ya' if monoton else 'TIDAK'}")
+    print(f"Throughput total  : {total / durasi:,.0f} kode/detik")
+    print(f"Throughput worker : {rate_worker:,.0f} kode/detik")
+
+    return tabrakan == 0 and monoton
+
+
+# ========== STRUK ==========
+
+def _data_struk_sintetis(jumlah):
+    from utils.struk import data_struk
+
+    menu = [('Nasi Goreng Spesial', 25000), ('Mie Ayam Bakso', 20000), ('Es Teh Manis', 5000),
+            ('Ayam Bakar Madu', 32000), ('Jus Alpukat', 15000), ('Sate Kambing', 45000)]
+    hasil = []
+    for i in range(jumlah):
+        items = [{'nama_menu': nama, 'jumlah': 1 + (i + j) % 3, 'harga_satuan': harga}
+                 for j, (nama, harga) in enumerate(menu[:2 + i % 5])]
+        total = sum(it['jumlah'] * it['harga_satuan'] for it in items)
+        hasil.append(data_struk({'kode_pesanan': f"RES{i:013d}", 'total_harga': total},
+                                items, nomor_meja=f"M{i % 20 + 1:02d}", pelanggan='Pelanggan Benchmark'))
+    return hasil
+
+
+def bench_struk(jumlah=1000, sampel_tunggal=200):
+    """Render struk: latensi per struk dan throughput batch PDF/teks"""
+    from utils.struk import RendererStruk
+
+    mulai = time.perf_counter()
+    renderer = RendererStruk()
+    durasi_init = time.perf_counter() - mulai
+    data_list = _data_struk_sintetis(jumlah)
+
+    # Latensi checkout: satu struk per dokumen
+    latensi = []
+    for data in data_list[:sampel_tunggal]:
+        mulai = time.perf_counter()
+        renderer.pdf(data)
+        latensi.append(time.perf_counter() - mulai)
+    latensi.sort()
+
+    mulai = time.perf_counter()
+    pdf_batch = renderer.pdf(data_list)
+    durasi_pdf = time.perf_counter() - mulai
+
+    mulai = time.perf_counter()
+    teks_batch = renderer.teks(data_list, escpos=True)
+    durasi_teks = time.perf_counter() - mulai
+
+    print(f"Init renderer     : {durasi_init * 1000:.1f} ms (sekali)")
+    print(f"Struk tunggal p50 : {latensi[len(latensi) // 2] * 1000:.2f} ms")
+    print(f"Struk tunggal p95 : {latensi[int(len(latensi) * 0.95)] * 1000:.2f} ms")
+    print(f"Batch PDF         : {jumlah / durasi_pdf:,.0f} struk/detik ({len(pdf_batch) / 1024:,.0f} KB)")
+    print(f"Batch teks ESC/POS: {jumlah / durasi_teks:,.0f} struk/detik ({len(teks_batch) / 1024:,.0f} KB)")
+
+    return pdf_batch.startswith(b"%PDF") and teks_batch.count(b"\x1dV") == jumlah
+
+
+# ========== VALIDASI BATCH ==========
+
+def _kolom_pelanggan_sintetis(jumlah):
+    nama, telepon, email = [], [], []
+    for i in range(jumlah):
+        # Kira-kira 5% baris tidak valid dengan alasan berbeda
+        rusak = i % 20 == 0
+        nama.append('' if rusak and i % 3 == 0 else f"Pelanggan {chr(65 + i % 26)} Nomor")
+        telepon.append(f"12{i:08d}" if rusak and i % 3 == 1 else f"08{1 + i % 9}{i:09d}")
+        email.append(f"p{i}@contoh" if rusak and i % 3 == 2 else (f"p{i}@contoh.com" if i % 2 else ''))
+    return nama, telepon, email
+
+
+def bench_validasi(jumlah=1000000):
+    """Validasi batch satu juta baris pelanggan: Python murni vs pandas"""
+    from utils.validasi_batch import BatchValidator, pd
+
+    kolom = _kolom_pelanggan_sintetis(jumlah)
+    print(f"Baris: {jumlah:,}")
+
+    mulai = time.perf_counter()
+    hasil_python = BatchValidator(pakai_pandas=False).validasi(*kolom)
+    durasi = time.perf_counter() - mulai
+    print(f"Python murni      : {durasi:.2f} detik ({jumlah / durasi:,.0f} baris/detik), "
+          f"valid {hasil_python.jumlah_valid():,}")
+
+    if pd is None:
+        print("pandas tidak terpasang, jalur vektor dilewati")
+        return True
+
+    mulai = time.perf_counter()
+    hasil_pandas = BatchValidator(ambang_pandas=0).validasi(*kolom)
+    durasi = time.perf_counter() - mulai
+    print(f"pandas            : {durasi:.2f} detik ({jumlah / durasi:,.0f} baris/detik), "
+          f"valid {hasil_pandas.jumlah_valid():,}")
+
+    # Kedua jalur harus menghasilkan pesan error yang sama per baris
+    return all(hasil_python.pesan(i) == hasil_pandas.pesan(i) for i in range(jumlah))
+
+
+BENCHMARKS = {
+    'kode_pesanan': bench_kode_pesanan,
+    'struk': bench_struk,
+    'validasi': bench_validasi,
+}
+
+
+def main(nama_list):
+    print("=" * 70)
+    print("BENCHMARK SUITE - RESTORAN PEMESANAN APP")
+    print(f"Waktu Eksekusi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 70)
+
+    sukses = True
+    for nama in nama_list or BENCHMARKS:
+        if nama not in BENCHMARKS:
+            print(f"\n⚠️ Benchmark tidak dikenal: {nama}")
+            sukses = False
+            continue
+
+        print("\n" + "-" * 70)
+        print(f"BENCHMARK: {nama}")
+        print("-" * 70)
+        if not BENCHMARKS[nama]():
+            print(f"❌ {nama} GAGAL")
+            sukses = False
+
+    print("\n" + "=" * 70)
+    print("✅ SEMUA BENCHMARK LULUS" if sukses else "❌ ADA BENCHMARK GAGAL")
+    print("=" * 70)
+    return 0 if sukses else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,300 @@
+"""
+Arsip pesanan lama ke file kolumnar (Parquet, terkompresi)
+Pesanan yang lebih tua dari cutoff dipindah ke arsip/<tabel>/tanggal=YYYY-MM-DD/
+lalu dihapus dari MySQL per batch, sehingga tabel pesanan dan detail_pesanan
+tetap kecil. Reader menggabungkan arsip dengan data live untuk laporan.
+Kolom uang disimpan sebagai decimal(…,2), bukan integer, agar sen tidak hilang.
+Ringkasan per file (jumlah, total, rentang tanggal) di-cache di
+arsip/pesanan/_ringkasan.json sehingga laporan tidak membuka semua parquet.
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ARSIP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'arsip')
+KOMPRESI = 'zstd'
+
+KOLOM_UANG = ('total_harga', 'harga_satuan')
+SEN = Decimal('0.01')
+
+# Cache ringkasan per file parquet pesanan, divalidasi dengan mtime dan ukuran file
+FILE_RINGKASAN = '_ringkasan.json'
+
+QUERY_PESANAN = """
+    SELECT
+        p.id AS pesanan_id, p.kode_pesanan, p.pelanggan_id, pl.nama AS pelanggan,
+        p.meja_id, m.nomor_meja, p.tanggal_pesanan, p.status_pesanan,
+        p.total_harga, p.catatan
+    FROM pesanan p
+    LEFT JOIN pelanggan pl ON p.pelanggan_id = pl.id
+    LEFT JOIN meja m ON p.meja_id = m.id
+    WHERE p.id IN ({ids})
+"""
+
+QUERY_DETAIL = """
+    SELECT
+        dp.id AS detail_id, dp.pesanan_id, dp.menu_id, dp.nama_menu, dp.nama_kategori,
+        dp.jumlah, dp.harga_satuan, p.tanggal_pesanan
+    FROM detail_pesanan dp
+    JOIN pesanan p ON dp.pesanan_id = p.id
+    WHERE dp.pesanan_id IN ({ids})
+"""
+
+
+def _uang(nilai):
+    """Nilai uang (Decimal/int/str, termasuk arsip lama berisi integer) ke Decimal 2 digit"""
+    if nilai is None or (isinstance(nilai, float) and nilai != nilai):
+        return Decimal('0.00')
+    return Decimal(str(nilai)).quantize(SEN)
+
+
+def _filter_rentang(df, mulai, akhir):
+    """Filter jam untuk batas rentang; partisi harian sudah disaring sebelumnya"""
+    if 'tanggal_pesanan' in df.columns:
+        if mulai:
+            df = df[df['tanggal_pesanan'] >= pd.Timestamp(mulai)]
+        if akhir:
+            df = df[df['tanggal_pesanan'] < pd.Timestamp(akhir)]
+    return df
+
+
+def _statistik(df):
+    """(jumlah, total Decimal, pertama, terakhir) dari DataFrame tanggal_pesanan + total_harga"""
+    if df.empty:
+        return 0, Decimal('0.00'), None, None
+    total = sum((_uang(v) for v in df['total_harga']), Decimal('0.00'))
+    return (len(df), total, df['tanggal_pesanan'].min().to_pydatetime(),
+            df['tanggal_pesanan'].max().to_pydatetime())
+
+
+class ArsipPesanan:
+    """
+    Job arsip dan reader untuk pesanan lama.
+    File ditulis dan di-fsync sebelum baris dihapus dari MySQL; nama file
+    memakai rentang id sehingga menjalankan ulang batch yang sama aman.
+    """
+
+    def __init__(self, db=None, arsip_dir=ARSIP_DIR, batch_size=1000):
+        self.db = db or DatabaseConnection()
+        self.arsip_dir = arsip_dir
+        self.batch_size = batch_size
+
+    # ---------- tulis arsip ----------
+
+    def _tulis_partisi(self, tabel, df):
+        """Tulis DataFrame ke partisi harian, return jumlah file"""
+        if df.empty:
+            return 0
+
+        df = df.copy()
+        df['tanggal_pesanan'] = pd.to_datetime(df['tanggal_pesanan'])
+        for kolom in KOLOM_UANG:
+            if kolom in df.columns:
+                # Ditulis pyarrow sebagai decimal128, bukan float/int
+                df[kolom] = [_uang(v) for v in df[kolom]]
+
+        jumlah_file = 0
+        for tanggal, bagian in df.groupby(df['tanggal_pesanan'].dt.date):
+            folder = os.path.join(self.arsip_dir, tabel, f"tanggal={tanggal.isoformat()}")
+            os.makedirs(folder, exist_ok=True)
+
+            id_min, id_max = bagian['pesanan_id'].min(), bagian['pesanan_id'].max()
+            path = os.path.join(folder, f"part-{id_min}-{id_max}.parquet")
+            bagian.to_parquet(path, compression=KOMPRESI, index=False)
+
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+            jumlah_file += 1
+
+        if tabel == 'pesanan':
+            # Ringkasan file baru langsung dihitung, laporan berikutnya tidak perlu membuka parquet
+            self.ringkasan()
+        return jumlah_file
+
+    def arsipkan(self, cutoff, max_batch=None):
+        """
+        Pindahkan pesanan dengan tanggal < cutoff ke arsip.
+        Setiap batch: baca -> tulis parquet -> hapus dari MySQL (detail ikut
+        terhapus lewat ON DELETE CASCADE). Return dict statistik.
+        """
+        stats = {'pesanan': 0, 'detail': 0, 'file': 0, 'batch': 0}
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+
+            while max_batch is None or stats['batch'] < max_batch:
+                cursor.execute(
+                    "SELECT id FROM pesanan WHERE tanggal_pesanan < %s ORDER BY id LIMIT %s",
+                    (cutoff, self.batch_size)
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+
+                placeholder = ", ".join(["%s"] * len(ids))
+                # coerce_float=False: DECIMAL tetap Decimal, tidak lewat float
+                pesanan = pd.read_sql(QUERY_PESANAN.format(ids=placeholder), conn, params=ids,
+                                      coerce_float=False)
+                detail = pd.read_sql(QUERY_DETAIL.format(ids=placeholder), conn, params=ids,
+                                     coerce_float=False)
+
+                stats['file'] += self._tulis_partisi('pesanan', pesanan)
+                stats['file'] += self._tulis_partisi('detail_pesanan', detail)
+
+                cursor.execute(f"DELETE FROM pesanan WHERE id IN ({placeholder})", ids)
+                conn.commit()
+
+                stats['pesanan'] += len(pesanan)
+                stats['detail'] += len(detail)
+                stats['batch'] += 1
+                logger.info(f"Arsip batch {stats['batch']}: pesanan id {ids[0]}-{ids[-1]}")
+
+        except Exception as e:
+            logger.error(f"Arsip pesanan gagal: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        logger.info(f"Arsip pesanan sebelum {cutoff} selesai: {stats}")
+        return stats
+
+    # ---------- baca arsip ----------
+
+    def _partisi(self, tabel, mulai=None, akhir=None):
+        """List file parquet pada partisi tanggal yang beririsan dengan [mulai, akhir)"""
+        folder_tabel = os.path.join(self.arsip_dir, tabel)
+        if not os.path.isdir(folder_tabel):
+            return []
+
+        mulai = mulai.isoformat()[:10] if mulai else None
+        akhir = akhir.isoformat()[:10] if akhir else None
+
+        files = []
+        for nama in sorted(os.listdir(folder_tabel)):
+            if not nama.startswith('tanggal='):
+                continue
+            tanggal = nama.split('=', 1)[1]
+            if mulai and tanggal < mulai:
+                continue
+            if akhir and tanggal > akhir:
+                continue
+            folder = os.path.join(folder_tabel, nama)
+            files.extend(
+                os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith('.parquet')
+            )
+        return files
+
+    def baca(self, tabel, mulai=None, akhir=None, kolom=None):
+        """
+        Baca arsip 'pesanan' atau 'detail_pesanan' pada rentang [mulai, akhir).
+        Hanya partisi yang masuk rentang yang dibuka.
+        """
+        files = self._partisi(tabel, mulai, akhir)
+        if not files:
+            return pd.DataFrame(columns=kolom) if kolom else pd.DataFrame()
+
+        df = pd.concat((pd.read_parquet(f, columns=kolom) for f in files), ignore_index=True)
+        return _filter_rentang(df, mulai, akhir)
+
+    # ---------- ringkasan ----------
+
+    def _path_ringkasan(self):
+        return os.path.join(self.arsip_dir, 'pesanan', FILE_RINGKASAN)
+
+    def _muat_ringkasan(self):
+        try:
+            with open(self._path_ringkasan(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _simpan_ringkasan(self, cache):
+        path = self._path_ringkasan()
+        sementara = f"{path}.tmp"
+        try:
+            with open(sementara, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(sementara, path)
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan cache ringkasan arsip: {e}")
+
+    def _ringkasan_file(self, path, cache):
+        """Statistik satu file parquet dari cache, dihitung ulang jika file berubah"""
+        stat = os.stat(path)
+        kunci = os.path.relpath(path, self.arsip_dir)
+        entry = cache.get(kunci)
+        if entry is None or entry['mtime'] != stat.st_mtime or entry['ukuran'] != stat.st_size:
+            df = pd.read_parquet(path, columns=['tanggal_pesanan', 'total_harga'])
+            jumlah, total, pertama, terakhir = _statistik(df)
+            entry = cache[kunci] = {
+                'mtime': stat.st_mtime,
+                'ukuran': stat.st_size,
+                'jumlah': jumlah,
+                'total': str(total),
+                'pertama': pertama.isoformat() if pertama else None,
+                'terakhir': terakhir.isoformat() if terakhir else None,
+            }
+            cache['_berubah'] = True
+
+        return (entry['jumlah'], Decimal(entry['total']),
+                datetime.fromisoformat(entry['pertama']) if entry['pertama'] else None,
+                datetime.fromisoformat(entry['terakhir']) if entry['terakhir'] else None)
+
+    @staticmethod
+    def _hari_penuh(path, mulai, akhir):
+        """True jika partisi file seluruhnya berada di dalam [mulai, akhir)"""
+        awal = pd.Timestamp(os.path.basename(os.path.dirname(path)).split('=', 1)[1])
+        return ((mulai is None or pd.Timestamp(mulai) <= awal) and
+                (akhir is None or awal + pd.Timedelta(days=1) <= pd.Timestamp(akhir)))
+
+    def ringkasan(self, mulai=None, akhir=None):
+        """
+        Statistik pesanan yang sudah diarsip (jumlah, total, rentang tanggal).
+        Partisi yang seluruhnya masuk rentang dibaca dari cache ringkasan;
+        hanya partisi di batas rentang (jam tidak tepat tengah malam) yang dibuka.
+        """
+        cache = self._muat_ringkasan()
+        total_pesanan, total_pendapatan = 0, Decimal('0.00')
+        semua_pertama, semua_terakhir = [], []
+
+        for path in self._partisi('pesanan', mulai, akhir):
+            if self._hari_penuh(path, mulai, akhir):
+                jumlah, total, pertama, terakhir = self._ringkasan_file(path, cache)
+            else:
+                df = pd.read_parquet(path, columns=['tanggal_pesanan', 'total_harga'])
+                jumlah, total, pertama, terakhir = _statistik(_filter_rentang(df, mulai, akhir))
+            total_pesanan += jumlah
+            total_pendapatan += total
+            if pertama:
+                semua_pertama.append(pertama)
+                semua_terakhir.append(terakhir)
+
+        if cache.pop('_berubah', False):
+            self._simpan_ringkasan(cache)
+
+        return {
+            'total_pesanan': total_pesanan,
+            'total_pendapatan': total_pendapatan,
+            'pertama': min(semua_pertama) if semua_pertama else None,
+            'terakhir': max(semua_terakhir) if semua_terakhir else None,
+        }
+
+
+def cutoff_dari_hari(hari):
+    """Tanggal cutoff: awal hari, `hari` hari sebelum hari ini"""
+    return datetime.combine(date.today(), datetime.min.time()) - timedelta(days=hari)
@@ -0,0 +1,172 @@
+"""
+Import/Export massal data pelanggan (CSV)
+Dipakai untuk migrasi daftar loyalty dari sistem lain
+"""
+
+import csv
+import os
+import time
+
+from mysql.connector import Error
+
+from database.db_connection import DatabaseConnection
+from utils.validasi_batch import BatchValidator
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+KOLOM_CSV = ['nama', 'no_telepon', 'email']
+
+QUERY_UPSERT = """
+    INSERT INTO pelanggan (nama, no_telepon, email)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        nama = VALUES(nama),
+        email = VALUES(email)
+"""
+
+
+class PelangganBulkIO:
+    """
+    Import dan export pelanggan dalam batch.
+    Import membaca CSV secara streaming, validasi satu batch sekaligus
+    dengan BatchValidator, dedupe berdasarkan no_telepon lalu upsert
+    dengan executemany.
+    """
+
+    def __init__(self, db=None, validator=None, batch_size=5000):
+        self.db = db or DatabaseConnection()
+        self.validator = validator or BatchValidator()
+        self.batch_size = batch_size
+
+    def _proses_batch(self, baris_mentah, telepon_terlihat, reject_writer, stats):
+        """
+        Validasi satu batch baris CSV (list (nomor_baris, row)).
+        Return list data valid yang belum pernah muncul.
+        """
+        nama = [(row.get('nama') or '').strip() for _, row in baris_mentah]
+        telepon = [(row.get('no_telepon') or '').strip() for _, row in baris_mentah]
+        email = [(row.get('email') or '').strip() for _, row in baris_mentah]
+
+        hasil = self.validator.validasi(nama, telepon, email)
+
+        data = []
+        for i, valid in enumerate(hasil.valid):
+            if not valid:
+                stats['ditolak'] += 1
+                nomor_baris, row = baris_mentah[i]
+                reject_writer.writerow(
+                    [nomor_baris] + [row.get(k, '') for k in KOLOM_CSV] + [hasil.pesan(i)]
+                )
+                continue
+
+            # Dedupe: no_telepon pertama di file yang dipakai
+            if telepon[i] in telepon_terlihat:
+                stats['duplikat'] += 1
+                continue
+            telepon_terlihat.add(telepon[i])
+            data.append((nama[i], telepon[i], email[i] or None))
+        return data
+
+    def _tulis_batch(self, conn, cursor, batch):
+        """Upsert satu batch dalam satu transaksi"""
+        cursor.executemany(QUERY_UPSERT, batch)
+        conn.commit()
+
+    def import_csv(self, path_csv, path_reject=None):
+        """
+        Import pelanggan dari file CSV (kolom: nama, no_telepon, email).
+        Baris yang tidak valid ditulis ke file reject beserta alasannya.
+        Return dict statistik import.
+        """
+        if path_reject is None:
+            path_reject = os.path.splitext(path_csv)[0] + '_reject.csv'
+
+        stats = {
+            'dibaca': 0,
+            'ditulis': 0,
+            'ditolak': 0,
+            'duplikat': 0,
+            'file_reject': path_reject,
+        }
+        telepon_terlihat = set()
+        baris_mentah = []
+        mulai = time.perf_counter()
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+
+            with open(path_csv, newline='', encoding='utf-8') as f_in, \
+                    open(path_reject, 'w', newline='', encoding='utf-8') as f_rej:
+                reader = csv.DictReader(f_in)
+                reject_writer = csv.writer(f_rej)
+                reject_writer.writerow(['baris'] + KOLOM_CSV + ['alasan'])
+
+                # Baris 1 adalah header
+                for nomor_baris, row in enumerate(reader, start=2):
+                    stats['dibaca'] += 1
+                    baris_mentah.append((nomor_baris, row))
+
+                    if len(baris_mentah) >= self.batch_size:
+                        batch = self._proses_batch(baris_mentah, telepon_terlihat, reject_writer, stats)
+                        if batch:
+                            self._tulis_batch(conn, cursor, batch)
+                            stats['ditulis'] += len(batch)
+                        baris_mentah = []
+
+                if baris_mentah:
+                    batch = self._proses_batch(baris_mentah, telepon_terlihat, reject_writer, stats)
+                    if batch:
+                        self._tulis_batch(conn, cursor, batch)
+                        stats['ditulis'] += len(batch)
+
+        except Error as e:
+            logger.error(f"Import pelanggan gagal: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        stats['durasi'] = time.perf_counter() - mulai
+        stats['baris_per_detik'] = stats['dibaca'] / stats['durasi'] if stats['durasi'] else 0
+        logger.info(f"Import pelanggan selesai: {stats}")
+        return stats
+
+    def export_csv(self, path_csv):
+        """Export semua pelanggan ke CSV secara streaming, return jumlah baris"""
+        jumlah = 0
+        mulai = time.perf_counter()
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT nama, no_telepon, email FROM pelanggan ORDER BY id")
+
+            with open(path_csv, 'w', newline='', encoding='utf-8') as f_out:
+                writer = csv.writer(f_out)
+                writer.writerow(KOLOM_CSV)
+
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    writer.writerows((n, t, e or '') for n, t, e in rows)
+                    jumlah += len(rows)
+
+        except Error as e:
+            logger.error(f"Export pelanggan gagal: {e}")
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        durasi = time.perf_counter() - mulai
+        logger.info(f"Export pelanggan selesai: {jumlah} baris dalam {durasi:.2f} detik")
+        return jumlah
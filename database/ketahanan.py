@@ -0,0 +1,568 @@
+"""
+Ketahanan terhadap gangguan MySQL
+- KoneksiTangguh: retry dengan exponential backoff dan circuit breaker
+  di depan DatabaseConnection
+- JurnalPesanan: write-ahead journal lokal (JSONL, fsync per kelompok)
+  untuk pesanan dan perubahan status selama database tidak tersedia
+- CacheMaster: salinan data master di disk untuk start saat database mati
+- replay_jurnal: terapkan jurnal ke database secara idempotent
+  (kunci: kode_pesanan dari generator Snowflake)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from mysql.connector import Error
+
+from database.db_connection import DatabaseConnection
+from database.stok_ledger import periksa_stok
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Error client MySQL yang berarti server tidak bisa dihubungi
+KODE_ERROR_KONEKSI = {
+    2003,  # Can't connect to MySQL server
+    2005,  # Unknown MySQL server host
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2055,  # Lost connection at system error
+}
+
+JURNAL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'jurnal')
+
+# Folder jurnal per terminal jika beberapa terminal berjalan di satu mesin
+ENV_JURNAL_DIR = 'RESTO_JURNAL_DIR'
+
+# Baris penanda kompaksi: menyimpan seq terakhir agar seq tidak kembali ke 1
+PENANDA_KOMPAKSI = 'kompaksi'
+
+
+class DatabaseTidakTersedia(Exception):
+    """Database tidak bisa dihubungi atau circuit breaker sedang terbuka"""
+
+
+class JurnalTerkunci(RuntimeError):
+    """Folder jurnal sedang dipakai proses lain"""
+
+
+def folder_jurnal():
+    """Folder jurnal dari env RESTO_JURNAL_DIR, default jurnal/ di folder aplikasi"""
+    return os.environ.get(ENV_JURNAL_DIR) or JURNAL_DIR
+
+
+def kesalahan_koneksi(e):
+    """True jika exception berarti database tidak tersedia (bukan error query)"""
+    if isinstance(e, DatabaseTidakTersedia):
+        return True
+    return isinstance(e, Error) and e.errno in KODE_ERROR_KONEKSI
+
+
+# ========== CIRCUIT BREAKER ==========
+
+class CircuitBreaker:
+    """
+    Circuit breaker tiga keadaan.
+    - tertutup: semua panggilan jalan, kegagalan beruntun dihitung
+    - terbuka: panggilan langsung ditolak selama waktu_buka detik
+    - setengah: satu panggilan percobaan; sukses menutup, gagal membuka lagi
+    """
+
+    TERTUTUP = 'tertutup'
+    TERBUKA = 'terbuka'
+    SETENGAH = 'setengah'
+
+    def __init__(self, ambang_gagal=3, waktu_buka=15.0):
+        self.ambang_gagal = ambang_gagal
+        self.waktu_buka = waktu_buka
+        self._lock = threading.Lock()
+        self._status = self.TERTUTUP
+        self._gagal = 0
+        self._dibuka_pada = 0.0
+
+    @property
+    def status(self):
+        with self._lock:
+            if self._status == self.TERBUKA and time.monotonic() - self._dibuka_pada >= self.waktu_buka:
+                return self.SETENGAH
+            return self._status
+
+    @property
+    def terbuka(self):
+        return self.status == self.TERBUKA
+
+    def giliran(self):
+        """
+        Giliran pemanggil: TERTUTUP (jalan biasa), SETENGAH (pemanggil ini
+        mendapat satu-satunya giliran percobaan) atau None (ditolak).
+        """
+        with self._lock:
+            if self._status == self.TERTUTUP:
+                return self.TERTUTUP
+            if self._status == self.TERBUKA and time.monotonic() - self._dibuka_pada >= self.waktu_buka:
+                # Hanya satu pemanggil yang mendapat giliran percobaan
+                self._status = self.SETENGAH
+                return self.SETENGAH
+            return None
+
+    def izinkan(self):
+        """True jika panggilan boleh dicoba sekarang"""
+        return self.giliran() is not None
+
+    def catat_sukses(self):
+        with self._lock:
+            if self._status != self.TERTUTUP:
+                logger.info("Circuit breaker database tertutup kembali")
+            self._status = self.TERTUTUP
+            self._gagal = 0
+
+    def catat_gagal(self):
+        with self._lock:
+            self._gagal += 1
+            if self._status == self.SETENGAH or self._gagal >= self.ambang_gagal:
+                if self._status != self.TERBUKA:
+                    logger.warning(f"Circuit breaker database terbuka selama {self.waktu_buka} detik")
+                self._status = self.TERBUKA
+                self._dibuka_pada = time.monotonic()
+
+    def batalkan_percobaan(self):
+        """
+        Percobaan setengah-terbuka berakhir tanpa sukses maupun error koneksi
+        (pool habis, too many connections, exception lain): buka lagi agar
+        percobaan berikutnya tetap mendapat giliran setelah waktu_buka.
+        """
+        with self._lock:
+            if self._status == self.SETENGAH:
+                logger.warning(f"Percobaan circuit breaker gagal, terbuka lagi selama {self.waktu_buka} detik")
+                self._status = self.TERBUKA
+                self._dibuka_pada = time.monotonic()
+
+
+# ========== KONEKSI DENGAN RETRY ==========
+
+class KoneksiTangguh:
+    """
+    Pembungkus DatabaseConnection: get_connection() dicoba ulang dengan
+    exponential backoff + jitter untuk error koneksi, dan ditolak cepat
+    (DatabaseTidakTersedia) selama circuit breaker terbuka.
+    Atribut lain diteruskan ke DatabaseConnection.
+    """
+
+    def __init__(self, db=None, percobaan=3, jeda_awal=0.2, jeda_max=2.0, breaker=None):
+        self.db = db or DatabaseConnection()
+        self.percobaan = percobaan
+        self.jeda_awal = jeda_awal
+        self.jeda_max = jeda_max
+        self.breaker = breaker or CircuitBreaker()
+
+    def __getattr__(self, name):
+        if name == 'db':
+            raise AttributeError(name)
+        return getattr(self.db, name)
+
+    def _dengan_retry(self, fungsi):
+        giliran = self.breaker.giliran()
+        if giliran is None:
+            raise DatabaseTidakTersedia("Circuit breaker terbuka, database dianggap tidak tersedia")
+
+        try:
+            return self._coba(fungsi)
+        except BaseException:
+            if giliran == CircuitBreaker.SETENGAH:
+                # Tanpa ini breaker tertahan di 'setengah' dan menolak semua panggilan
+                self.breaker.batalkan_percobaan()
+            raise
+
+    def _coba(self, fungsi):
+        for percobaan in range(self.percobaan):
+            try:
+                hasil = fungsi()
+                if hasil is None:
+                    raise DatabaseTidakTersedia("DatabaseConnection tidak mengembalikan koneksi")
+                self.breaker.catat_sukses()
+                return hasil
+            except (Error, DatabaseTidakTersedia) as e:
+                if not kesalahan_koneksi(e):
+                    raise
+                # Setiap percobaan gagal dihitung, breaker bisa terbuka di tengah retry
+                self.breaker.catat_gagal()
+                if percobaan == self.percobaan - 1 or self.breaker.terbuka:
+                    raise DatabaseTidakTersedia(str(e)) from e
+
+                jeda = min(self.jeda_max, self.jeda_awal * (2 ** percobaan)) * random.uniform(0.5, 1.0)
+                logger.warning(f"Koneksi database gagal ({e}), coba lagi dalam {jeda:.2f} detik")
+                time.sleep(jeda)
+
+    def get_connection(self, *args, **kwargs):
+        return self._dengan_retry(lambda: self.db.get_connection(*args, **kwargs))
+
+    def test_connection(self):
+        """Test koneksi lewat retry dan breaker, False jika tidak tersedia"""
+        try:
+            conn = self.get_connection()
+            conn.close()
+            return True
+        except DatabaseTidakTersedia as e:
+            logger.error(f"Database tidak tersedia: {e}")
+            return False
+
+
+# ========== JURNAL LOKAL ==========
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Tipe {type(obj).__name__} tidak bisa dijadikan JSON")
+
+
+def _kunci_folder(folder):
+    """Kunci eksklusif folder jurnal (file .lock) selama proses hidup, return file handle-nya"""
+    f = open(os.path.join(folder, '.lock'), 'a+')
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        raise JurnalTerkunci(
+            f"Folder jurnal {folder} sedang dipakai proses lain; "
+            f"beri setiap terminal folder sendiri lewat {ENV_JURNAL_DIR}"
+        ) from None
+    return f
+
+
+class JurnalPesanan:
+    """
+    Write-ahead journal append-only di disk.
+    Setiap entri ditulis sebagai satu baris JSON; fsync dilakukan per
+    kelompok: pemanggil yang datang bersamaan berbagi satu fsync
+    (group commit). Entri yang sudah diterapkan dicatat di file .selesai
+    sehingga replay yang terputus bisa dilanjutkan tanpa duplikasi.
+    Folder jurnal dikunci satu proses (dua proses akan membagikan seq yang
+    sama), dan seq terus naik melewati kompaksi maupun restart.
+    """
+
+    def __init__(self, nama='pesanan', jurnal_dir=None):
+        jurnal_dir = jurnal_dir or folder_jurnal()
+        os.makedirs(jurnal_dir, exist_ok=True)
+        self._file_kunci = _kunci_folder(jurnal_dir)
+        self.path = os.path.join(jurnal_dir, f"{nama}.jsonl")
+        self.path_selesai = os.path.join(jurnal_dir, f"{nama}.selesai")
+        self.path_gagal = os.path.join(jurnal_dir, f"{nama}.gagal")
+
+        self._lock = threading.Lock()
+        self._lock_fsync = threading.Lock()
+        self._entri, self._selesai, seq_awal = self._muat()
+        self._seq = max([seq_awal] + [e['seq'] for e in self._entri])
+        self._seq_ditulis = self._seq
+        self._seq_fsync = self._seq
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _muat(self):
+        """(entri, seq selesai, seq penanda kompaksi terakhir)"""
+        entri = []
+        seq_awal = 0
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for baris in f:
+                    try:
+                        data = json.loads(baris)
+                    except json.JSONDecodeError:
+                        # Baris terakhir bisa terpotong jika proses mati saat menulis
+                        logger.warning(f"Baris jurnal rusak dilewati: {baris[:80]!r}")
+                        continue
+                    if data['jenis'] == PENANDA_KOMPAKSI:
+                        seq_awal = max(seq_awal, data['seq'])
+                    else:
+                        entri.append(data)
+
+        selesai = set()
+        if os.path.exists(self.path_selesai):
+            with open(self.path_selesai, encoding='utf-8') as f:
+                selesai = {int(baris) for baris in f if baris.strip()}
+        return entri, selesai, seq_awal
+
+    def catat(self, jenis, data, tunggu_fsync=True):
+        """
+        Tambah entri ke jurnal, return seq entri.
+        Dengan tunggu_fsync=True, return setelah entri aman di disk.
+        """
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            entri = {'seq': seq, 'jenis': jenis, 'waktu': datetime.now(), 'data': data}
+            self._file.write(json.dumps(entri, default=_json_default) + "\n")
+            self._file.flush()
+            self._seq_ditulis = seq
+            self._entri.append(json.loads(json.dumps(entri, default=_json_default)))
+
+        if tunggu_fsync:
+            self.sinkron(seq)
+        return seq
+
+    def sinkron(self, seq=None):
+        """fsync sampai entri seq; dilewati jika fsync pemanggil lain sudah mencakupnya"""
+        seq = seq or self._seq_ditulis
+        with self._lock_fsync:
+            if self._seq_fsync >= seq:
+                return
+            target = self._seq_ditulis
+            os.fsync(self._file.fileno())
+            self._seq_fsync = target
+
+    def tertunda(self):
+        """Entri yang belum diterapkan ke database, urut seq"""
+        with self._lock:
+            return [e for e in self._entri if e['seq'] not in self._selesai]
+
+    def jumlah_tertunda(self):
+        with self._lock:
+            return sum(1 for e in self._entri if e['seq'] not in self._selesai)
+
+    def tandai_selesai(self, seq):
+        """Catat entri sudah diterapkan (append + fsync)"""
+        with self._lock:
+            with open(self.path_selesai, 'a', encoding='utf-8') as f:
+                f.write(f"{seq}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._selesai.add(seq)
+
+    def tandai_gagal(self, entri, alasan):
+        """Pindahkan entri yang tidak bisa diterapkan ke file .gagal untuk dicek manual"""
+        with open(self.path_gagal, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'entri': entri, 'alasan': alasan}, default=_json_default) + "\n")
+        self.tandai_selesai(entri['seq'])
+
+    def kompaksi(self):
+        """
+        Kosongkan jurnal jika semua entri sudah diterapkan.
+        Jurnal diganti secara atomik dengan satu baris penanda berisi seq
+        terakhir, baru kemudian .selesai dikosongkan: jika proses mati di
+        antaranya, seq di .selesai lama tidak pernah dipakai lagi oleh entri baru.
+        """
+        with self._lock:
+            if not self._entri or any(e['seq'] not in self._selesai for e in self._entri):
+                return False
+            self._file.close()
+            sementara = f"{self.path}.tmp"
+            with open(sementara, 'w', encoding='utf-8') as f:
+                penanda = {'seq': self._seq, 'jenis': PENANDA_KOMPAKSI, 'waktu': datetime.now()}
+                f.write(json.dumps(penanda, default=_json_default) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(sementara, self.path)
+            with open(self.path_selesai, 'w', encoding='utf-8'):
+                pass
+            self._entri = []
+            self._selesai = set()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            return True
+
+
+# ========== CACHE DATA MASTER ==========
+
+def _ke_json_cache(obj):
+    if isinstance(obj, Decimal):
+        return {'$decimal': str(obj)}
+    if isinstance(obj, datetime):
+        return {'$datetime': obj.isoformat()}
+    if isinstance(obj, date):
+        return {'$date': obj.isoformat()}
+    if isinstance(obj, timedelta):
+        return {'$detik': obj.total_seconds()}
+    raise TypeError(f"Tipe {type(obj).__name__} tidak bisa dijadikan JSON")
+
+
+def _dari_json_cache(obj):
+    if len(obj) == 1:
+        (kunci, nilai), = obj.items()
+        if kunci == '$decimal':
+            return Decimal(nilai)
+        if kunci == '$datetime':
+            return datetime.fromisoformat(nilai)
+        if kunci == '$date':
+            return date.fromisoformat(nilai)
+        if kunci == '$detik':
+            return timedelta(seconds=nilai)
+    return obj
+
+
+class CacheMaster:
+    """
+    Salinan terakhir data master (menu, meja, pelanggan) di disk, di samping
+    jurnal. Aplikasi yang baru dijalankan saat database mati tetap punya data
+    untuk mencatat pesanan offline. Tipe Decimal/datetime dipertahankan.
+    """
+
+    def __init__(self, jurnal_dir=None):
+        jurnal_dir = jurnal_dir or folder_jurnal()
+        os.makedirs(jurnal_dir, exist_ok=True)
+        self.path = os.path.join(jurnal_dir, 'cache_master.json')
+        self._lock = threading.Lock()
+        self._data = self._muat()
+
+    def _muat(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f, object_hook=_dari_json_cache)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache data master tidak bisa dibaca: {e}")
+            return {}
+
+    def get(self, nama):
+        return self._data.get(nama)
+
+    def simpan(self, nama, data):
+        """Perbarui satu jenis data lalu tulis ulang file cache secara atomik"""
+        with self._lock:
+            self._data[nama] = data
+            sementara = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(sementara, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, default=_ke_json_cache)
+                os.replace(sementara, self.path)
+            except OSError as e:
+                logger.warning(f"Cache data master gagal ditulis: {e}")
+
+
+# ========== REPLAY ==========
+
+def _terapkan_pesanan(cursor, data):
+    """
+    Simpan pesanan (online maupun dari jurnal); jika kode_pesanan sudah ada,
+    pakai yang ada. Stok diperiksa dari ledger, pengurangannya dicatat trigger
+    detail_pesanan; stok tidak cukup menggagalkan entri (StokTidakCukup).
+    """
+    cursor.execute("SELECT id FROM pesanan WHERE kode_pesanan = %s", (data['kode_pesanan'],))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+
+    periksa_stok(cursor, [(item['menu_id'], item['jumlah']) for item in data['items']])
+
+    pelanggan_id = data.get('pelanggan_id')
+    pelanggan_baru = data.get('pelanggan_baru')
+    if pelanggan_baru:
+        cursor.execute("""
+            INSERT INTO pelanggan (nama, no_telepon, email) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)
+        """, (pelanggan_baru['nama'], pelanggan_baru['no_telepon'], pelanggan_baru.get('email')))
+        pelanggan_id = cursor.lastrowid
+
+    cursor.execute("""
+        INSERT INTO pesanan
+            (kode_pesanan, pelanggan_id, meja_id, tanggal_pesanan, total_harga, catatan, pelayan)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (data['kode_pesanan'], pelanggan_id, data['meja_id'], datetime.fromisoformat(data['tanggal']),
+          Decimal(data['total_harga']), data.get('catatan'), data.get('pelayan')))
+    pesanan_id = cursor.lastrowid
+
+    cursor.executemany("""
+        INSERT INTO detail_pesanan (pesanan_id, menu_id, jumlah, harga_satuan)
+        VALUES (%s, %s, %s, %s)
+    """, [(pesanan_id, item['menu_id'], item['jumlah'], Decimal(item['harga_satuan']))
+          for item in data['items']])
+
+    cursor.execute("UPDATE meja SET status = 'terisi' WHERE id = %s", (data['meja_id'],))
+    return pesanan_id
+
+
+def _terapkan_status(cursor, data):
+    """Status pesanan di-set ke nilai akhir, aman diulang"""
+    if data.get('kode_pesanan'):
+        cursor.execute("UPDATE pesanan SET status_pesanan = %s WHERE kode_pesanan = %s",
+                       (data['status'], data['kode_pesanan']))
+    else:
+        cursor.execute("UPDATE pesanan SET status_pesanan = %s WHERE id = %s",
+                       (data['status'], data['pesanan_id']))
+
+
+PENERAP = {
+    'pesanan': _terapkan_pesanan,
+    'status': _terapkan_status,
+}
+
+
+def simpan_pesanan(db, data):
+    """Simpan pesanan langsung ke database dalam satu transaksi, return pesanan_id"""
+    try:
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        pesanan_id = _terapkan_pesanan(cursor, data)
+        conn.commit()
+        return pesanan_id
+    except Exception:
+        if 'conn' in locals():
+            try:
+                conn.rollback()
+            except Error:
+                pass
+        raise
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+
+def replay_jurnal(jurnal, db):
+    """
+    Terapkan entri tertunda berurutan, satu transaksi per entri.
+    Berhenti (entri tersisa tetap di jurnal) jika database putus lagi;
+    entri yang ditolak database dipindah ke file .gagal.
+    Return dict kode_pesanan -> pesanan_id untuk pesanan yang disimpan.
+    """
+    hasil = {}
+    for entri in jurnal.tertunda():
+        try:
+            conn = db.get_connection()
+            cursor = conn.cursor()
+            pesanan_id = PENERAP[entri['jenis']](cursor, entri['data'])
+            conn.commit()
+
+            if entri['jenis'] == 'pesanan':
+                hasil[entri['data']['kode_pesanan']] = pesanan_id
+        except Exception as e:
+            if 'conn' in locals():
+                try:
+                    conn.rollback()
+                except Error:
+                    pass
+            if kesalahan_koneksi(e):
+                logger.warning(f"Replay jurnal berhenti, database belum tersedia: {e}")
+                break
+            logger.error(f"Entri jurnal {entri['seq']} gagal diterapkan: {e}")
+            jurnal.tandai_gagal(entri, str(e))
+            continue
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+                del cursor
+            if 'conn' in locals():
+                conn.close()
+                del conn
+
+        jurnal.tandai_selesai(entri['seq'])
+
+    if hasil:
+        logger.info(f"Replay jurnal: {len(hasil)} pesanan offline disimpan")
+    jurnal.kompaksi()
+    return hasil
@@ -0,0 +1,356 @@
+"""
+Runner migrasi schema berversi
+File migrations/NNN_nama.sql dijalankan berurutan sekali per database,
+versi yang sudah diterapkan dicatat di tabel schema_migrations.
+Statement dipisah dengan dukungan DELIMITER (trigger/procedure), dan error
+"sudah ada/tidak ada" (kolom, indeks, tabel, trigger) dilewati sehingga
+migrasi aman dijalankan ulang di database yang sebagian sudah dimigrasi manual.
+
+cek_rencana() menjalankan EXPLAIN pada query panas aplikasi dan gagal
+jika ada yang kembali ke full table scan tanpa indeks yang bisa dipakai.
+"""
+
+import hashlib
+import os
+import re
+import time
+
+from mysql.connector import Error
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+POLA_FILE = re.compile(r'^(\d+)_([\w-]+)\.sql$')
+
+# Mencegah dua terminal menjalankan migrasi bersamaan
+NAMA_LOCK = 'restoran_migrasi'
+
+# Error yang berarti perubahan sudah (atau belum pernah) ada: aman dilewati.
+# Hanya untuk statement dengan satu perubahan; ALTER TABLE berisi beberapa
+# perubahan tidak pernah dilewati karena sisanya mungkin belum diterapkan.
+KODE_SUDAH_DITERAPKAN = {
+    1050,  # Table already exists
+    1060,  # Duplicate column name
+    1061,  # Duplicate key name
+    1091,  # Can't DROP; check that column/key exists
+    1304,  # PROCEDURE already exists
+    1305,  # PROCEDURE does not exist
+    1359,  # Trigger already exists
+    1360,  # Trigger does not exist
+}
+
+QUERY_TABEL_MIGRASI = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        versi INT PRIMARY KEY,
+        nama VARCHAR(200) NOT NULL,
+        checksum CHAR(64),
+        durasi_ms INT,
+        diterapkan_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def pecah_statement(sql):
+    """
+    Pecah isi file SQL menjadi list statement.
+    Mendukung DELIMITER di awal baris, string '...' "..." `...`,
+    dan komentar --, # serta /* */.
+    """
+    statements = []
+    delimiter = ';'
+    buffer = []
+    i = 0
+    n = len(sql)
+    awal_baris = True
+
+    while i < n:
+        if awal_baris:
+            akhir_baris = sql.find('\n', i)
+            akhir_baris = n if akhir_baris == -1 else akhir_baris
+            baris = sql[i:akhir_baris].strip()
+            if baris.upper().startswith('DELIMITER ') and not ''.join(buffer).strip():
+                delimiter = baris.split(None, 1)[1].strip()
+                i = akhir_baris + 1
+                continue
+        awal_baris = False
+
+        c = sql[i]
+        if c in ("'", '"', '`'):
+            j = i + 1
+            while j < n and sql[j] != c:
+                j += 2 if sql[j] == '\\' else 1
+            buffer.append(sql[i:j + 1])
+            i = j + 1
+        elif sql.startswith('--', i) or c == '#':
+            akhir = sql.find('\n', i)
+            i = n if akhir == -1 else akhir
+        elif sql.startswith('/*', i):
+            akhir = sql.find('*/', i + 2)
+            i = n if akhir == -1 else akhir + 2
+        elif sql.startswith(delimiter, i):
+            statement = ''.join(buffer).strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+            i += len(delimiter)
+        else:
+            buffer.append(c)
+            if c == '\n':
+                awal_baris = True
+            i += 1
+
+    sisa = ''.join(buffer).strip()
+    if sisa:
+        statements.append(sisa)
+    return statements
+
+
+def _perubahan_ganda(statement):
+    """True jika ALTER TABLE berisi lebih dari satu perubahan (ALGORITHM/LOCK tidak dihitung)"""
+    if not re.match(r'\s*ALTER\s+TABLE\b', statement, re.IGNORECASE):
+        return False
+
+    klausa = ['']
+    kedalaman = 0
+    kutip = None
+    for c in statement:
+        if kutip:
+            if c == kutip:
+                kutip = None
+        elif c in ("'", '"', '`'):
+            kutip = c
+        elif c == '(':
+            kedalaman += 1
+        elif c == ')':
+            kedalaman -= 1
+        elif c == ',' and kedalaman == 0:
+            klausa.append('')
+            continue
+        klausa[-1] += c
+
+    perubahan = [k for k in klausa if not re.match(r'\s*(ALGORITHM|LOCK)\b', k, re.IGNORECASE)]
+    return len(perubahan) > 1
+
+
+def daftar_file_migrasi(folder=MIGRATIONS_DIR):
+    """List (versi, nama, path) urut versi; versi ganda dianggap error"""
+    hasil = {}
+    for nama_file in sorted(os.listdir(folder)):
+        cocok = POLA_FILE.match(nama_file)
+        if not cocok:
+            continue
+        versi = int(cocok.group(1))
+        if versi in hasil:
+            raise ValueError(f"Versi migrasi ganda: {versi} ({hasil[versi][1]}, {nama_file})")
+        hasil[versi] = (versi, nama_file, os.path.join(folder, nama_file))
+    return [hasil[v] for v in sorted(hasil)]
+
+
+def _checksum(path):
+    with open(path, 'rb') as f:
+        # Normalisasi CRLF agar checksum sama di Windows dan Linux
+        return hashlib.sha256(f.read().replace(b'\r\n', b'\n')).hexdigest()
+
+
+class Migrator:
+    """Penerap migrasi untuk satu database"""
+
+    def __init__(self, db=None, folder=MIGRATIONS_DIR):
+        self.db = db or DatabaseConnection()
+        self.folder = folder
+
+    def _diterapkan(self, cursor):
+        cursor.execute(QUERY_TABEL_MIGRASI)
+        cursor.execute("SELECT versi, checksum, diterapkan_pada FROM schema_migrations")
+        return {versi: (checksum, waktu) for versi, checksum, waktu in cursor.fetchall()}
+
+    def status(self):
+        """List dict versi, nama, diterapkan_pada (None = tertunda) dan berubah (checksum beda)"""
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            diterapkan = self._diterapkan(cursor)
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        hasil = []
+        for versi, nama, path in daftar_file_migrasi(self.folder):
+            checksum, waktu = diterapkan.get(versi, (None, None))
+            hasil.append({
+                'versi': versi,
+                'nama': nama,
+                'diterapkan_pada': waktu,
+                'berubah': checksum is not None and checksum != _checksum(path),
+            })
+        return hasil
+
+    def _jalankan_file(self, cursor, path):
+        with open(path, encoding='utf-8') as f:
+            statements = pecah_statement(f.read())
+
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+                if cursor.with_rows:
+                    cursor.fetchall()
+            except Error as e:
+                if e.errno not in KODE_SUDAH_DITERAPKAN:
+                    raise
+                if _perubahan_ganda(statement):
+                    logger.error(f"ALTER berisi beberapa perubahan, pecah menjadi satu perubahan per statement: {e.msg}")
+                    raise
+                logger.info(f"Dilewati (sudah diterapkan): {e.msg}")
+
+    def jalankan(self, sampai=None):
+        """
+        Terapkan migrasi tertunda berurutan sampai versi `sampai` (default semua).
+        DDL MySQL auto-commit, jadi versi dicatat per file setelah file selesai;
+        file yang gagal di tengah bisa dijalankan ulang karena error
+        "sudah ada" dilewati. Return list nama file yang diterapkan.
+        """
+        diterapkan_baru = []
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT GET_LOCK(%s, 10)", (NAMA_LOCK,))
+            if cursor.fetchone()[0] != 1:
+                raise RuntimeError("Migrasi sedang dijalankan dari terminal lain")
+
+            try:
+                diterapkan = self._diterapkan(cursor)
+                for versi, nama, path in daftar_file_migrasi(self.folder):
+                    if versi in diterapkan or (sampai is not None and versi > sampai):
+                        continue
+
+                    logger.info(f"Menerapkan migrasi {nama}")
+                    mulai = time.perf_counter()
+                    self._jalankan_file(cursor, path)
+                    durasi_ms = int((time.perf_counter() - mulai) * 1000)
+
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (versi, nama, checksum, durasi_ms) VALUES (%s, %s, %s, %s)",
+                        (versi, nama, _checksum(path), durasi_ms)
+                    )
+                    conn.commit()
+                    diterapkan_baru.append(nama)
+                    logger.info(f"Migrasi {nama} selesai ({durasi_ms} ms)")
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (NAMA_LOCK,))
+                cursor.fetchall()
+
+        except Error as e:
+            logger.error(f"Migrasi gagal: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        return diterapkan_baru
+
+    def baseline(self, versi):
+        """
+        Tandai migrasi sampai versi sebagai sudah diterapkan tanpa menjalankannya
+        (database yang dimigrasi manual sebelum ada runner). Return jumlah versi ditandai.
+        """
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            diterapkan = self._diterapkan(cursor)
+            baris = [(v, nama, _checksum(path)) for v, nama, path in daftar_file_migrasi(self.folder)
+                     if v <= versi and v not in diterapkan]
+            if baris:
+                cursor.executemany(
+                    "INSERT INTO schema_migrations (versi, nama, checksum) VALUES (%s, %s, %s)", baris
+                )
+            conn.commit()
+            return len(baris)
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+
+# ========== CEK RENCANA QUERY ==========
+
+# (nama, query, params, tabel yang boleh full scan)
+# Tabel referensi kecil (kategori_menu, meja) boleh di-scan.
+QUERY_PANAS = [
+    ('antrian_dapur', """
+        SELECT p.id FROM pesanan p
+        LEFT JOIN meja mj ON p.meja_id = mj.id
+        LEFT JOIN detail_pesanan dp ON dp.pesanan_id = p.id
+        WHERE p.status_pesanan IN ('diproses', 'disajikan')
+    """, (), ('meja',)),
+    ('laporan_rentang', """
+        SELECT p.id FROM pesanan p
+        WHERE p.status_pesanan <> 'dibatalkan'
+          AND p.tanggal_pesanan >= %s AND p.tanggal_pesanan < %s
+    """, ('2024-01-01', '2024-01-02'), ()),
+    ('tutup_harian', """
+        SELECT p.id, dp.subtotal FROM pesanan p
+        LEFT JOIN meja mj ON p.meja_id = mj.id
+        LEFT JOIN detail_pesanan dp ON dp.pesanan_id = p.id
+        WHERE p.tanggal_pesanan >= %s AND p.tanggal_pesanan < %s
+    """, ('2024-01-01', '2024-01-02'), ('meja',)),
+    ('pesanan_per_kode', "SELECT id FROM pesanan WHERE kode_pesanan = %s", ('RES0000000000000',), ()),
+    ('detail_per_pesanan', "SELECT menu_id, jumlah FROM detail_pesanan WHERE pesanan_id = %s", (1,), ()),
+    ('verifikasi_diubah', "SELECT id FROM pesanan WHERE diubah_pada >= %s", ('2024-01-01',), ()),
+    ('pelanggan_telepon', "SELECT id FROM pelanggan WHERE no_telepon = %s", ('081234567890',), ()),
+    ('stok_ledger_menu', "SELECT SUM(delta) FROM stok_ledger WHERE menu_id = %s AND id > %s", (1, 0), ()),
+    ('outbox_poll', "SELECT id FROM outbox_event WHERE id > %s ORDER BY id LIMIT 100", (0,), ()),
+    ('riwayat_meja', """
+        SELECT meja_id, status_baru, diubah_pada FROM riwayat_status_meja
+        WHERE diubah_pada >= %s AND diubah_pada < %s ORDER BY id
+    """, ('2024-01-01', '2024-01-08'), ()),
+]
+
+
+def cek_rencana(db, query_panas=QUERY_PANAS):
+    """
+    EXPLAIN setiap query panas.
+    - type=ALL tanpa possible_keys: regresi (tidak ada indeks yang bisa dipakai)
+    - type=ALL dengan possible_keys: peringatan (optimizer memilih scan, biasanya tabel kecil)
+    Return list dict nama, tabel, type, key, status ('ok'/'peringatan'/'regresi').
+    """
+    hasil = []
+    try:
+        conn = db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        for nama, query, params, boleh_scan in query_panas:
+            cursor.execute("EXPLAIN " + query, params)
+            for row in cursor.fetchall():
+                tabel = row.get('table')
+                status = 'ok'
+                if row.get('type') == 'ALL' and tabel not in boleh_scan:
+                    status = 'peringatan' if row.get('possible_keys') else 'regresi'
+                hasil.append({
+                    'query': nama,
+                    'tabel': tabel,
+                    'type': row.get('type'),
+                    'key': row.get('key'),
+                    'rows': row.get('rows'),
+                    'status': status,
+                })
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+    for row in hasil:
+        if row['status'] == 'regresi':
+            logger.error(f"Full table scan tanpa indeks: {row['query']} pada {row['tabel']}")
+    return hasil
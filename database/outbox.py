@@ -0,0 +1,307 @@
+"""
+Consumer untuk tabel outbox_event (change feed)
+Event ditulis trigger database di transaksi yang sama dengan perubahan
+pelanggan, menu, meja dan pesanan. Consumer membaca event berdasarkan id
+dan menyimpan offset sehingga bisa replay dari checkpoint.
+
+id AUTO_INCREMENT dibagikan saat INSERT, bukan saat commit: transaksi
+dengan id lebih kecil bisa commit belakangan. Karena itu offset hanya maju
+melewati id yang berurutan; celah id baru dilewati setelah event sesudahnya
+berumur lebih dari jeda_aman detik. jeda_aman adalah batas bawah latensi
+event yang datang setelah celah: setiap rollback menahan consumer selama itu.
+Id yang dilewati tetap dicari ulang selama batas_celah detik (diturunkan dari
+innodb_lock_wait_timeout), sehingga transaksi lambat yang commit setelah
+celahnya dilewati tetap terkirim, ditandai terlambat=True. Baru setelah itu
+celah dianggap rollback. Daftar celah hanya ada di memori consumer.
+"""
+
+import json
+import os
+import socket
+import time
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Lama menunggu celah id sebelum dilewati (detik), sekaligus latensi minimum
+# event setelah rollback; celah yang dilewati tetap dicari ulang
+JEDA_AMAN_DEFAULT = 2
+
+# Statement transaksi menunggu lock paling lama innodb_lock_wait_timeout;
+# celah dicari ulang selama kelipatan nilai tersebut
+KALI_LOCK_WAIT = 2
+BATAS_CELAH_CADANGAN = 120
+
+# Celah lebih besar dari ini (lompatan auto_increment, bukan transaksi) tidak dipantau
+MAKS_CELAH = 1000
+
+
+def nama_consumer(dasar):
+    """Nama consumer per terminal (TERMINAL_ID atau hostname), agar checkpoint tidak saling timpa"""
+    terminal = os.environ.get('TERMINAL_ID') or socket.gethostname()
+    return f"{dasar}@{terminal}"[:50]
+
+
+class OutboxConsumer:
+    """
+    Consumer outbox dengan offset per nama consumer.
+    Subscriber didaftarkan per tabel ('*' untuk semua tabel) dan
+    dipanggil dengan dict event: id, tabel, aksi, row_id, payload
+    (ditambah terlambat=True untuk event dari celah yang sudah dilewati).
+    batas_celah None = jeda_aman + KALI_LOCK_WAIT x innodb_lock_wait_timeout.
+    """
+
+    def __init__(self, nama, db=None, batch_size=500, jeda_aman=JEDA_AMAN_DEFAULT, batas_celah=None):
+        self.nama = nama
+        self.db = db or DatabaseConnection()
+        self.batch_size = batch_size
+        self.jeda_aman = jeda_aman
+        self.batas_celah = batas_celah
+        self._subscribers = {}
+        self._offset = None
+        # id celah yang sudah dilewati -> batas waktu pencarian (time.monotonic)
+        self._celah = {}
+
+    def subscribe(self, tabel, callback):
+        """Daftarkan callback(event) untuk tabel tertentu atau '*'"""
+        self._subscribers.setdefault(tabel, []).append(callback)
+
+    # ---------- offset ----------
+
+    def _baca_checkpoint(self):
+        """Offset tersimpan, None jika consumer ini belum pernah menyimpan checkpoint"""
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT last_event_id FROM outbox_offset WHERE consumer = %s",
+                (self.nama,)
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def offset(self):
+        """Id event terakhir yang sudah diproses consumer ini"""
+        if self._offset is None:
+            checkpoint = self._baca_checkpoint()
+            self._offset = checkpoint if checkpoint is not None else 0
+        return self._offset
+
+    def simpan_offset(self, event_id):
+        """Simpan checkpoint consumer"""
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO outbox_offset (consumer, last_event_id)
+                VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE last_event_id = VALUES(last_event_id)
+            """, (self.nama, event_id))
+            conn.commit()
+            self._offset = event_id
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def event_terakhir(self):
+        """Id event terbaru di outbox"""
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM outbox_event")
+            return cursor.fetchone()[0]
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def replay_dari(self, event_id=0):
+        """Set ulang checkpoint, event setelah event_id akan dikirim ulang"""
+        self.simpan_offset(event_id)
+        logger.info(f"Consumer {self.nama} replay dari event {event_id}")
+
+    def lanjutkan(self):
+        """
+        Lanjut dari checkpoint tersimpan. Consumer yang belum punya checkpoint
+        mulai dari event terbaru (state awal diambil dari tabel, bukan dari outbox).
+        Return offset awal.
+        """
+        checkpoint = self._baca_checkpoint()
+        if checkpoint is None:
+            self.replay_dari(self.event_terakhir())
+        else:
+            self._offset = checkpoint
+            logger.info(f"Consumer {self.nama} lanjut dari checkpoint {checkpoint}")
+        return self._offset
+
+    # ---------- konsumsi ----------
+
+    def _dispatch(self, event):
+        if isinstance(event['payload'], (str, bytes)):
+            event['payload'] = json.loads(event['payload'])
+        callbacks = self._subscribers.get(event['tabel'], []) + self._subscribers.get('*', [])
+        for callback in callbacks:
+            callback(event)
+
+    def _batas_celah(self):
+        """Lama (detik) id celah dicari ulang setelah dilewati"""
+        if self.batas_celah is None:
+            try:
+                conn = self.db.get_connection()
+                cursor = conn.cursor()
+                cursor.execute("SELECT @@innodb_lock_wait_timeout")
+                row = cursor.fetchone()
+                self.batas_celah = self.jeda_aman + KALI_LOCK_WAIT * int(row[0])
+            except Exception as e:
+                logger.warning(f"Gagal membaca innodb_lock_wait_timeout, celah dipantau "
+                               f"{BATAS_CELAH_CADANGAN} detik: {e}")
+                self.batas_celah = BATAS_CELAH_CADANGAN
+            finally:
+                if 'cursor' in locals():
+                    cursor.close()
+                if 'conn' in locals():
+                    conn.close()
+        return self.batas_celah
+
+    def _lewati_celah(self, awal, akhir):
+        """Catat id awal..akhir yang dilewati agar dicari ulang"""
+        if akhir - awal + 1 > MAKS_CELAH:
+            logger.warning(f"Consumer {self.nama} melewati celah id {awal}-{akhir} tanpa dipantau")
+            return
+        batas = self._batas_celah()
+        logger.warning(f"Consumer {self.nama} melewati celah id {awal}-{akhir}, dicari ulang {batas} detik")
+        habis = time.monotonic() + batas
+        for event_id in range(awal, akhir + 1):
+            self._celah[event_id] = habis
+
+    def _cari_celah(self):
+        """
+        Kirim event dari celah yang ternyata commit belakangan, buang celah
+        yang melewati batas_celah. Return jumlah event terlambat yang dikirim.
+        Event terlambat aman dikirim tidak berurutan: perubahan baris yang sama
+        oleh transaksi lain menunggu lock transaksi ini, jadi id-nya lebih besar.
+        """
+        if not self._celah:
+            return 0
+
+        sekarang = time.monotonic()
+        kedaluwarsa = sorted(i for i, habis in self._celah.items() if habis <= sekarang)
+        if kedaluwarsa:
+            for event_id in kedaluwarsa:
+                del self._celah[event_id]
+            logger.warning(f"Consumer {self.nama}: celah id {kedaluwarsa[0]}-{kedaluwarsa[-1]} "
+                           f"tidak muncul, dianggap rollback")
+        if not self._celah:
+            return 0
+
+        ids = sorted(self._celah)
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(f"""
+                SELECT id, tabel, aksi, row_id, payload, dibuat_pada
+                FROM outbox_event
+                WHERE id IN ({', '.join(['%s'] * len(ids))})
+                ORDER BY id
+            """, tuple(ids))
+            events = cursor.fetchall()
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        for event in events:
+            event['terlambat'] = True
+            self._dispatch(event)
+            # Dihapus setelah subscriber sukses, gagal = dicoba lagi di poll berikutnya
+            del self._celah[event['id']]
+        return len(events)
+
+    def poll_sekali(self):
+        """
+        Ambil satu batch event setelah offset dan kirim ke subscriber.
+        Offset disimpan setelah batch selesai diproses (at-least-once).
+        Pemrosesan berhenti di celah id yang event sesudahnya belum berumur
+        jeda_aman detik, karena transaksi id yang hilang mungkin belum commit.
+        Celah yang sudah dilewati dicari ulang lebih dulu.
+        Return jumlah event yang diproses (termasuk event terlambat).
+        """
+        offset = self.offset()
+        terlambat = self._cari_celah()
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, tabel, aksi, row_id, payload, dibuat_pada,
+                       dibuat_pada <= NOW() - INTERVAL %s SECOND AS matang
+                FROM outbox_event
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (self.jeda_aman, offset, self.batch_size))
+            events = cursor.fetchall()
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        if not events:
+            return terlambat
+
+        terakhir = offset
+        diproses = 0
+        try:
+            for event in events:
+                if event['id'] != terakhir + 1:
+                    if not event['matang']:
+                        # Tunggu: event di celah mungkin milik transaksi yang belum commit
+                        break
+                    self._lewati_celah(terakhir + 1, event['id'] - 1)
+
+                self._dispatch(event)
+                terakhir = event['id']
+                diproses += 1
+        finally:
+            # Simpan event terakhir yang sukses meski subscriber gagal di tengah batch
+            if terakhir != offset:
+                self.simpan_offset(terakhir)
+
+        return diproses + terlambat
+
+    def jalankan(self, interval=1.0, stop_event=None):
+        """
+        Tail outbox terus menerus sampai stop_event di-set.
+        Batch penuh langsung diikuti batch berikutnya tanpa menunggu.
+        Selama database gagal, jeda dilipatgandakan sampai 30 detik.
+        """
+        logger.info(f"Consumer outbox {self.nama} mulai dari event {self.offset()}")
+        gagal = 0
+        while stop_event is None or not stop_event.is_set():
+            try:
+                jumlah = self.poll_sekali()
+                gagal = 0
+            except Exception as e:
+                if gagal == 0:
+                    logger.error(f"Consumer outbox {self.nama} gagal: {e}")
+                gagal += 1
+                jumlah = 0
+
+            if jumlah < self.batch_size:
+                jeda = min(interval * 2 ** min(gagal, 5), 30.0) if gagal else interval
+                if stop_event is not None:
+                    stop_event.wait(jeda)
+                else:
+                    time.sleep(jeda)
@@ -0,0 +1,144 @@
+"""
+Read/write splitting untuk DatabaseConnection
+Query laporan dan analitik dibaca dari replica, penulisan tetap ke primary.
+Setelah menulis, sesi membaca dari primary selama jendela read-your-writes,
+dan replica yang tertinggal terlalu jauh otomatis dilewati.
+"""
+
+import os
+import time
+
+from mysql.connector import pooling, Error
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ROUTE_READ = 'read'
+ROUTE_WRITE = 'write'
+
+
+def config_replica_dari_env():
+    """Konfigurasi replica dari environment, None jika DB_REPLICA_HOST tidak diset"""
+    host = os.environ.get('DB_REPLICA_HOST')
+    if not host:
+        return None
+
+    return {
+        'host': host,
+        'port': int(os.environ.get('DB_REPLICA_PORT', 3306)),
+        'user': os.environ.get('DB_REPLICA_USER', 'root'),
+        'password': os.environ.get('DB_REPLICA_PASSWORD', ''),
+        'database': os.environ.get('DB_REPLICA_NAME', 'restoran_db'),
+    }
+
+
+class RoutedDatabaseConnection:
+    """
+    Pembungkus DatabaseConnection dengan pool baca terpisah.
+    Route dipilih per panggilan: get_connection(route=ROUTE_READ) untuk
+    laporan, tanpa route atau ROUTE_WRITE untuk primary. Atribut lain
+    diteruskan ke DatabaseConnection primary.
+    """
+
+    def __init__(self, primary=None, replica_config=None, pool_size=3,
+                 read_your_writes_detik=5.0, max_lag_detik=30, interval_cek_lag=10.0):
+        self.primary = primary or DatabaseConnection()
+        self.read_your_writes_detik = read_your_writes_detik
+        self.max_lag_detik = max_lag_detik
+        self.interval_cek_lag = interval_cek_lag
+
+        self._replica_pool = None
+        self._tulis_terakhir = 0.0
+        self._lag_dicek_pada = 0.0
+        self._replica_sehat = True
+
+        config = replica_config or config_replica_dari_env()
+        if config:
+            try:
+                self._replica_pool = pooling.MySQLConnectionPool(
+                    pool_name='restoran_replica',
+                    pool_size=int(os.environ.get('DB_REPLICA_POOL_SIZE', pool_size)),
+                    **config
+                )
+                logger.info(f"Replica pool created: {config['host']}:{config['port']}")
+            except Error as e:
+                logger.error(f"Error creating replica pool, semua query ke primary: {e}")
+
+    def __getattr__(self, name):
+        if name == 'primary':
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    @property
+    def punya_replica(self):
+        return self._replica_pool is not None
+
+    def tandai_tulis(self):
+        """Catat bahwa sesi ini baru menulis (untuk read-your-writes)"""
+        self._tulis_terakhir = time.monotonic()
+
+    def _cek_lag_replica(self):
+        """
+        Cek Seconds_Behind_Source replica, di-cache selama interval_cek_lag.
+        Replica tanpa status replikasi (salinan statis) dianggap sehat.
+        """
+        sekarang = time.monotonic()
+        if sekarang - self._lag_dicek_pada < self.interval_cek_lag:
+            return self._replica_sehat
+
+        self._lag_dicek_pada = sekarang
+        try:
+            conn = self._replica_pool.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Error:
+                # MySQL < 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+
+            if not status:
+                self._replica_sehat = True
+            else:
+                lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+                self._replica_sehat = lag is not None and lag <= self.max_lag_detik
+                if not self._replica_sehat:
+                    logger.warning(f"Replica tertinggal ({lag} detik), baca dari primary")
+        except Error as e:
+            logger.error(f"Gagal cek lag replica: {e}")
+            self._replica_sehat = False
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        return self._replica_sehat
+
+    def _boleh_baca_replica(self):
+        if self._replica_pool is None:
+            return False
+        if time.monotonic() - self._tulis_terakhir < self.read_your_writes_detik:
+            return False
+        return self._cek_lag_replica()
+
+    def get_connection(self, route=None):
+        """Ambil koneksi sesuai route; ROUTE_READ ke replica jika aman"""
+        if route == ROUTE_READ and self._boleh_baca_replica():
+            try:
+                return self._replica_pool.get_connection()
+            except Error as e:
+                logger.error(f"Error getting replica connection, fallback ke primary: {e}")
+
+        if route == ROUTE_WRITE:
+            self.tandai_tulis()
+        return self.primary.get_connection()
+
+
+def koneksi_baca(db):
+    """Koneksi untuk query baca berat; ke replica jika db mendukung routing"""
+    if isinstance(db, RoutedDatabaseConnection):
+        return db.get_connection(route=ROUTE_READ)
+    return db.get_connection()
@@ -0,0 +1,321 @@
+"""
+Sharding multi-outlet
+Setiap cabang punya restoran_db sendiri (dibuat dari database_schema.sql).
+ShardRouter memetakan id outlet ke connection pool, menjalankan query ke
+semua outlet secara paralel, lalu hasilnya digabung (jumlah, top-N,
+halaman terurut). Laporan pusat selesai dalam waktu outlet paling lambat,
+bukan jumlah waktu semua outlet.
+
+Konfigurasi outlet dibaca dari file JSON (env RESTO_OUTLET_CONFIG,
+default outlet.json):
+    {"outlets": [{"id": "pusat", "nama": "Cabang Pusat", "host": "10.0.0.5",
+                  "port": 3306, "user": "resto", "password": "...",
+                  "database": "restoran_db"}, ...]}
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from mysql.connector import pooling, Error
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ENV_OUTLET_CONFIG = 'RESTO_OUTLET_CONFIG'
+ENV_OUTLET = 'RESTO_OUTLET'
+
+# Nama kolom tambahan di setiap baris hasil fan-out
+KOLOM_OUTLET = 'outlet'
+
+
+def muat_config_outlet(path=None):
+    """List config outlet dari file JSON, None jika file tidak ada"""
+    path = path or os.environ.get(ENV_OUTLET_CONFIG, 'outlet.json')
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    outlets = data['outlets'] if isinstance(data, dict) else data
+
+    ids = [o['id'] for o in outlets]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Id outlet duplikat di {path}")
+    return outlets
+
+
+class HasilFanOut:
+    """
+    Hasil query ke banyak outlet.
+    per_outlet: dict outlet -> list baris (dict, sudah diberi kolom outlet)
+    gagal: dict outlet -> pesan error untuk outlet yang tidak bisa dihubungi
+    durasi: dict outlet -> detik
+    """
+
+    def __init__(self):
+        self.per_outlet = {}
+        self.gagal = {}
+        self.durasi = {}
+
+    @property
+    def lengkap(self):
+        return not self.gagal
+
+    def semua_baris(self):
+        return [row for rows in self.per_outlet.values() for row in rows]
+
+
+class _KoneksiOutlet:
+    """db satu outlet, bisa dipakai di class yang menerima db (TutupHarian, VerifikasiTotal, ...)"""
+
+    def __init__(self, router, outlet):
+        self.router = router
+        self.outlet = outlet
+
+    def get_connection(self, *args, **kwargs):
+        return self.router.get_connection(self.outlet)
+
+    def test_connection(self):
+        try:
+            conn = self.get_connection()
+            conn.close()
+            return True
+        except Error as e:
+            logger.error(f"Outlet {self.outlet} tidak bisa dihubungi: {e}")
+            return False
+
+
+class ShardRouter:
+    """
+    Pemetaan outlet -> connection pool.
+    get_connection(outlet) untuk satu outlet (default RESTO_OUTLET atau
+    outlet pertama), fan_out() untuk query ke semua outlet secara paralel.
+    """
+
+    def __init__(self, config=None, pool_size=3, max_workers=None):
+        config = config if config is not None else muat_config_outlet()
+        if not config:
+            raise ValueError(f"Konfigurasi outlet tidak ditemukan (set {ENV_OUTLET_CONFIG})")
+
+        self.outlets = [o['id'] for o in config]
+        self.nama = {o['id']: o.get('nama', o['id']) for o in config}
+        self.default = os.environ.get(ENV_OUTLET) or self.outlets[0]
+        self._config = {o['id']: o for o in config}
+        self._pool_size = pool_size
+        self._pools = {}
+        # Lock per outlet: outlet yang lambat dibuka tidak menahan outlet lain
+        self._lock_pool = {outlet: threading.Lock() for outlet in self.outlets}
+        # Satu thread per outlet: query fan-out berjalan bersamaan
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or len(self.outlets),
+                                            thread_name_prefix='shard')
+
+    def _pool(self, outlet):
+        """Pool outlet, dibuat saat pertama dipakai agar outlet yang mati tidak menahan start"""
+        pool = self._pools.get(outlet)
+        if pool is not None:
+            return pool
+
+        with self._lock_pool[outlet]:
+            pool = self._pools.get(outlet)
+            if pool is not None:
+                return pool
+
+            config = dict(self._config[outlet])
+            config.pop('id')
+            config.pop('nama', None)
+            pool_size = config.pop('pool_size', self._pool_size)
+            pool = self._pools[outlet] = pooling.MySQLConnectionPool(
+                pool_name=re.sub(r'[^A-Za-z0-9_]', '_', f"outlet_{outlet}")[:60],
+                pool_size=pool_size,
+                **config
+            )
+            logger.info(f"Pool outlet {outlet} dibuat: {config.get('host')}:{config.get('port', 3306)}")
+            return pool
+
+    def get_connection(self, outlet=None):
+        outlet = outlet or self.default
+        if outlet not in self._config:
+            raise KeyError(f"Outlet tidak dikenal: {outlet}")
+        return self._pool(outlet).get_connection()
+
+    def untuk(self, outlet):
+        """Objek db untuk satu outlet (punya get_connection)"""
+        if outlet not in self._config:
+            raise KeyError(f"Outlet tidak dikenal: {outlet}")
+        return _KoneksiOutlet(self, outlet)
+
+    def _query_outlet(self, outlet, query, params):
+        mulai = time.perf_counter()
+        try:
+            conn = self.get_connection(outlet)
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            for row in rows:
+                row[KOLOM_OUTLET] = outlet
+            return rows, time.perf_counter() - mulai
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def fan_out(self, query, params=(), outlets=None):
+        """
+        Jalankan query yang sama di semua outlet secara paralel.
+        Outlet yang gagal dicatat di hasil.gagal, outlet lain tetap dipakai.
+        """
+        outlets = outlets or self.outlets
+        hasil = HasilFanOut()
+
+        futures = {outlet: self._executor.submit(self._query_outlet, outlet, query, params)
+                   for outlet in outlets}
+        for outlet, future in futures.items():
+            try:
+                hasil.per_outlet[outlet], hasil.durasi[outlet] = future.result()
+            except Exception as e:
+                logger.error(f"Query outlet {outlet} gagal: {e}")
+                hasil.gagal[outlet] = str(e)
+
+        if hasil.durasi:
+            lambat = max(hasil.durasi, key=hasil.durasi.get)
+            logger.info(f"Fan-out {len(outlets)} outlet, paling lambat {lambat} "
+                        f"({hasil.durasi[lambat]:.3f} detik)")
+        return hasil
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+# ========== PENGGABUNGAN HASIL ==========
+
+def gabung_jumlah(hasil, kunci, kolom):
+    """
+    Jumlahkan kolom numerik per kunci grup dari semua outlet.
+    kunci: tuple nama kolom grup (kosong = satu baris total).
+    Return list dict kunci + kolom + jumlah_outlet.
+    """
+    grup = {}
+    for row in hasil.semua_baris():
+        k = tuple(row[c] for c in kunci)
+        data = grup.get(k)
+        if data is None:
+            data = grup[k] = dict(zip(kunci, k))
+            data.update({c: 0 for c in kolom})
+            data['jumlah_outlet'] = 0
+        for c in kolom:
+            data[c] += row[c] or 0
+        data['jumlah_outlet'] += 1
+    return list(grup.values())
+
+
+def gabung_top_n(hasil, n, kolom, kunci=None, jumlahkan=()):
+    """
+    Top-N lintas outlet berdasarkan kolom (terbesar dulu).
+    - kunci=None: setiap baris berdiri sendiri (mis. pesanan terbesar);
+      cukup setiap outlet mengirim top-N-nya sendiri.
+    - kunci diisi: baris dengan kunci sama dijumlahkan dulu (kolom dan
+      kolom di jumlahkan, mis. menu terlaris); setiap outlet harus mengirim
+      semua grup, bukan top-N, agar total lintas outlet benar.
+    """
+    if kunci:
+        baris = gabung_jumlah(hasil, kunci, (kolom,) + tuple(jumlahkan))
+    else:
+        baris = hasil.semua_baris()
+    return heapq.nlargest(n, baris, key=lambda row: row[kolom] or 0)
+
+
+def gabung_halaman(hasil, kolom_urut, offset, limit, menurun=True):
+    """
+    Satu halaman dari gabungan hasil terurut.
+    Setiap outlet harus mengirim baris terurut kolom_urut dengan
+    LIMIT offset + limit; hasilnya di-merge tanpa mengurutkan ulang semua baris.
+    """
+    aliran = [rows for rows in hasil.per_outlet.values() if rows]
+    gabungan = heapq.merge(*aliran, key=lambda row: row[kolom_urut], reverse=menurun)
+
+    halaman = []
+    for i, row in enumerate(gabungan):
+        if i >= offset + limit:
+            break
+        if i >= offset:
+            halaman.append(row)
+    return halaman
+
+
+# ========== LAPORAN KONSOLIDASI ==========
+
+class LaporanOutlet:
+    """Laporan pusat: satu query per outlet secara paralel, digabung di sini"""
+
+    def __init__(self, router=None):
+        self.router = router or ShardRouter()
+
+    @staticmethod
+    def _rentang(mulai, akhir):
+        kondisi, params = [], []
+        if mulai:
+            kondisi.append("p.tanggal_pesanan >= %s")
+            params.append(mulai)
+        if akhir:
+            kondisi.append("p.tanggal_pesanan < %s")
+            params.append(akhir)
+        return (" AND " + " AND ".join(kondisi)) if kondisi else "", tuple(params)
+
+    def ringkasan(self, mulai=None, akhir=None):
+        """Jumlah pesanan dan pendapatan per outlet beserta total semua outlet"""
+        filter_tanggal, params = self._rentang(mulai, akhir)
+        hasil = self.router.fan_out(f"""
+            SELECT COUNT(*) AS jumlah_pesanan, COALESCE(SUM(p.total_harga), 0) AS pendapatan
+            FROM pesanan p
+            WHERE p.status_pesanan <> 'dibatalkan'{filter_tanggal}
+        """, params)
+
+        per_outlet = [dict(rows[0], nama_outlet=self.router.nama[outlet])
+                      for outlet, rows in hasil.per_outlet.items() if rows]
+        total = gabung_jumlah(hasil, (), ('jumlah_pesanan', 'pendapatan'))
+        return {
+            'per_outlet': per_outlet,
+            'total': total[0] if total else {'jumlah_pesanan': 0, 'pendapatan': Decimal(0)},
+            'outlet_gagal': hasil.gagal,
+        }
+
+    def menu_terlaris(self, n=10, mulai=None, akhir=None):
+        """Top-N menu lintas outlet (berdasarkan nama menu) menurut jumlah terjual"""
+        filter_tanggal, params = self._rentang(mulai, akhir)
+        hasil = self.router.fan_out(f"""
+            SELECT dp.nama_menu, SUM(dp.jumlah) AS terjual, SUM(dp.subtotal) AS pendapatan
+            FROM detail_pesanan dp
+            JOIN pesanan p ON p.id = dp.pesanan_id
+            WHERE p.status_pesanan <> 'dibatalkan'{filter_tanggal}
+            GROUP BY dp.nama_menu
+        """, params)
+        return {
+            'menu': gabung_top_n(hasil, n, 'terjual', kunci=('nama_menu',), jumlahkan=('pendapatan',)),
+            'outlet_gagal': hasil.gagal,
+        }
+
+    def pesanan(self, halaman=1, per_halaman=20, mulai=None, akhir=None):
+        """Pesanan terbaru semua outlet, satu halaman terurut tanggal menurun"""
+        offset = (halaman - 1) * per_halaman
+        filter_tanggal, params = self._rentang(mulai, akhir)
+        hasil = self.router.fan_out(f"""
+            SELECT p.kode_pesanan, p.tanggal_pesanan, p.status_pesanan, p.total_harga, mj.nomor_meja
+            FROM pesanan p
+            LEFT JOIN meja mj ON mj.id = p.meja_id
+            WHERE 1 = 1{filter_tanggal}
+            ORDER BY p.tanggal_pesanan DESC, p.id DESC
+            LIMIT %s
+        """, params + (offset + per_halaman,))
+        return {
+            'halaman': halaman,
+            'pesanan': gabung_halaman(hasil, 'tanggal_pesanan', offset, per_halaman),
+            'outlet_gagal': hasil.gagal,
+        }
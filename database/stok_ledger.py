@@ -0,0 +1,217 @@
+"""
+Ledger stok append-only
+Penjualan, restock dan penyesuaian dicatat sebagai baris baru di stok_ledger
+sehingga penjualan menu yang sama dari banyak terminal tidak saling menunggu
+lock baris menu.stok. Stok saat ini = stok_snapshot + delta yang belum dikompaksi.
+Ledger adalah satu-satunya sumber stok: layar pesanan, pemeriksaan stok saat
+pesanan disimpan (online maupun replay jurnal) dan restock semua membacanya;
+menu.stok hanya disamakan lewat rekonsiliasi.
+"""
+
+from collections import defaultdict
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+JENIS_PERGERAKAN = ('penjualan', 'restock', 'penyesuaian')
+
+QUERY_STOK = """
+    SELECT s.menu_id, s.stok + COALESCE(SUM(l.delta), 0) AS stok
+    FROM stok_snapshot s
+    LEFT JOIN stok_ledger l
+        ON l.menu_id = s.menu_id AND l.id > s.ledger_id_terakhir
+"""
+
+
+class StokTidakCukup(ValueError):
+    """Stok ledger tidak cukup untuk item pesanan"""
+
+
+def _query_stok(menu_ids=None):
+    query = QUERY_STOK
+    params = ()
+    if menu_ids:
+        query += " WHERE s.menu_id IN (" + ", ".join(["%s"] * len(menu_ids)) + ")"
+        params = tuple(menu_ids)
+    return query + " GROUP BY s.menu_id, s.stok", params
+
+
+def periksa_stok(cursor, items):
+    """
+    Pastikan stok ledger cukup untuk items [(menu_id, jumlah)] di transaksi cursor.
+    Penjualannya sendiri dicatat trigger trg_detail_pesanan_stok saat detail
+    disimpan. Pemeriksaan tanpa lock baris (itu tujuan ledger); penjualan
+    bersamaan yang melewati stok akan terlihat sebagai stok negatif.
+    """
+    diminta = defaultdict(int)
+    for menu_id, jumlah in items:
+        diminta[menu_id] += jumlah
+
+    cursor.execute(*_query_stok(list(diminta)))
+    stok = {menu_id: int(nilai) for menu_id, nilai in cursor.fetchall()}
+
+    kurang = [(menu_id, jumlah, stok.get(menu_id, 0))
+              for menu_id, jumlah in diminta.items() if stok.get(menu_id, 0) < jumlah]
+    if kurang:
+        raise StokTidakCukup("Stok tidak cukup: " + ", ".join(
+            f"menu {menu_id} (diminta {jumlah}, tersedia {tersedia})" for menu_id, jumlah, tersedia in kurang
+        ))
+
+
+class StokLedger:
+    """
+    Pencatatan dan pembacaan stok berbasis ledger.
+    Kompaksi hanya memproses baris ledger yang lebih tua dari jeda_aman_detik
+    agar transaksi yang id-nya sudah dialokasikan tapi belum commit tidak terlewat.
+    """
+
+    def __init__(self, db=None, jeda_aman_detik=60):
+        self.db = db or DatabaseConnection()
+        self.jeda_aman_detik = jeda_aman_detik
+
+    def catat(self, menu_id, jenis, delta, referensi=None, cursor=None):
+        """
+        Tambah pergerakan stok. delta negatif untuk barang keluar.
+        Jika cursor diberikan, insert ikut transaksi pemanggil.
+        """
+        if jenis not in JENIS_PERGERAKAN:
+            raise ValueError(f"Jenis pergerakan tidak valid: {jenis}")
+
+        query = """
+            INSERT INTO stok_ledger (menu_id, jenis, delta, referensi)
+            VALUES (%s, %s, %s, %s)
+        """
+        if cursor is not None:
+            cursor.execute(query, (menu_id, jenis, delta, referensi))
+            return cursor.lastrowid
+
+        try:
+            conn = self.db.get_connection()
+            cur = conn.cursor()
+            cur.execute(query, (menu_id, jenis, delta, referensi))
+            conn.commit()
+            return cur.lastrowid
+        finally:
+            if 'cur' in locals():
+                cur.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def stok_saat_ini(self, menu_id):
+        """Stok satu menu: snapshot + delta setelah snapshot"""
+        hasil = self.stok_semua([menu_id])
+        return hasil.get(menu_id, 0)
+
+    def stok_semua(self, menu_ids=None):
+        """Dict menu_id -> stok untuk semua menu (atau menu_ids tertentu)"""
+        query, params = _query_stok(menu_ids)
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return {menu_id: int(stok) for menu_id, stok in cursor.fetchall()}
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def kompaksi(self):
+        """
+        Lipat delta ledger ke stok_snapshot sampai batas id aman.
+        Return dict jumlah menu yang diperbarui dan batas id.
+        """
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+
+            # Menu tanpa snapshot (normalnya sudah dibuat trigger trg_menu_stok_snapshot)
+            # mulai dari menu.stok pada posisi ledger saat ini, bukan dari id 0:
+            # delta lama sebelum menu punya snapshot sudah tercermin di menu.stok
+            cursor.execute("""
+                INSERT IGNORE INTO stok_snapshot (menu_id, stok, ledger_id_terakhir)
+                SELECT m.id, m.stok, (SELECT COALESCE(MAX(id), 0) FROM stok_ledger)
+                FROM menu m
+            """)
+
+            cursor.execute("""
+                SELECT COALESCE(MAX(id), 0) FROM stok_ledger
+                WHERE dibuat_pada < NOW() - INTERVAL %s SECOND
+            """, (self.jeda_aman_detik,))
+            batas_id = cursor.fetchone()[0]
+
+            cursor.execute("""
+                SELECT l.menu_id, SUM(l.delta)
+                FROM stok_ledger l
+                JOIN stok_snapshot s ON s.menu_id = l.menu_id
+                WHERE l.id > s.ledger_id_terakhir AND l.id <= %s
+                GROUP BY l.menu_id
+            """, (batas_id,))
+            delta_per_menu = cursor.fetchall()
+
+            cursor.executemany("""
+                UPDATE stok_snapshot
+                SET stok = stok + %s, ledger_id_terakhir = %s
+                WHERE menu_id = %s AND ledger_id_terakhir < %s
+            """, [(int(delta), batas_id, menu_id, batas_id) for menu_id, delta in delta_per_menu])
+
+            cursor.execute("""
+                UPDATE stok_snapshot SET ledger_id_terakhir = %s
+                WHERE ledger_id_terakhir < %s
+            """, (batas_id, batas_id))
+            conn.commit()
+
+            logger.info(f"Kompaksi stok sampai ledger id {batas_id}: {len(delta_per_menu)} menu")
+            return {'menu_diperbarui': len(delta_per_menu), 'batas_id': batas_id}
+
+        except Exception as e:
+            logger.error(f"Kompaksi stok gagal: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def rekonsiliasi(self, perbaiki=False):
+        """
+        Bandingkan stok ledger dengan menu.stok.
+        Return list dict selisih; jika perbaiki=True menu.stok disamakan dengan ledger.
+        """
+        stok_ledger = self.stok_semua()
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT id, nama_menu, stok FROM menu ORDER BY id")
+
+            selisih = []
+            for menu in cursor.fetchall():
+                stok_buku = stok_ledger.get(menu['id'])
+                if stok_buku is None or stok_buku != menu['stok']:
+                    selisih.append({
+                        'menu_id': menu['id'],
+                        'nama_menu': menu['nama_menu'],
+                        'stok_menu': menu['stok'],
+                        'stok_ledger': stok_buku,
+                    })
+
+            if perbaiki and selisih:
+                cursor.executemany(
+                    "UPDATE menu SET stok = %s WHERE id = %s",
+                    [(s['stok_ledger'], s['menu_id']) for s in selisih if s['stok_ledger'] is not None]
+                )
+                conn.commit()
+                logger.info(f"Rekonsiliasi stok: {len(selisih)} menu disamakan dengan ledger")
+
+            return selisih
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
@@ -0,0 +1,197 @@
+"""
+Metrik untuk DatabaseConnection
+KoneksiTerukur membungkus DatabaseConnection: lama mengambil koneksi dari
+pool, jumlah koneksi yang sedang dipinjam, durasi query per jenis
+(select/insert/update/delete) dan error, semuanya ke registry metrik.
+instrumentasi_pool() memasang pengukuran yang sama di MySQLConnectionPool,
+sehingga koneksi dari DatabaseConnection yang dibuat sendiri oleh
+CRUDOperations dan model lain juga terukur, per pool beserta kapasitasnya.
+"""
+
+import threading
+import time
+
+from mysql.connector import Error, pooling
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+DURASI_AMBIL_KONEKSI = REGISTRY.histogram(
+    'resto_db_ambil_koneksi_detik', 'Lama mengambil koneksi dari pool')
+KONEKSI_DIPINJAM = REGISTRY.gauge(
+    'resto_db_koneksi_dipinjam', 'Koneksi pool yang sedang dipakai (belum di-close)')
+KONEKSI_POOL_DIPINJAM = REGISTRY.gauge(
+    'resto_db_pool_dipinjam', 'Koneksi yang sedang dipinjam per MySQLConnectionPool', ('pool',))
+KAPASITAS_POOL = REGISTRY.gauge(
+    'resto_db_pool_kapasitas', 'Ukuran setiap MySQLConnectionPool', ('pool',))
+DURASI_QUERY = REGISTRY.histogram(
+    'resto_db_query_detik', 'Durasi execute/executemany per jenis query', ('operasi',))
+ERROR_DB = REGISTRY.counter(
+    'resto_db_error_total', 'Error database per jenis (koneksi/query)', ('jenis',))
+
+JENIS_QUERY = ('select', 'insert', 'update', 'delete')
+
+
+def _operasi(query):
+    kata = query.lstrip().split(None, 1)
+    operasi = kata[0].lower() if kata else ''
+    return operasi if operasi in JENIS_QUERY else 'lain'
+
+
+class CursorTerukur:
+    """Proxy cursor yang mengukur execute dan executemany"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        if name == '_cursor':
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+        return False
+
+    def _ukur(self, fungsi, query, *args, **kwargs):
+        mulai = time.perf_counter()
+        try:
+            return fungsi(query, *args, **kwargs)
+        except Error:
+            ERROR_DB.inc(jenis='query')
+            raise
+        finally:
+            DURASI_QUERY.observe(time.perf_counter() - mulai, operasi=_operasi(query))
+
+    def execute(self, query, *args, **kwargs):
+        return self._ukur(self._cursor.execute, query, *args, **kwargs)
+
+    def executemany(self, query, *args, **kwargs):
+        return self._ukur(self._cursor.executemany, query, *args, **kwargs)
+
+
+class KoneksiPoolTerukur:
+    """Proxy koneksi pool: cursor diukur, close() mengurangi gauge koneksi dipinjam"""
+
+    def __init__(self, conn, pool=None):
+        self._conn = conn
+        self._pool = pool
+        self._ditutup = False
+        KONEKSI_DIPINJAM.inc()
+        if pool is not None:
+            KONEKSI_POOL_DIPINJAM.inc(pool=pool)
+
+    def __getattr__(self, name):
+        if name == '_conn':
+            raise AttributeError(name)
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def cursor(self, *args, **kwargs):
+        return CursorTerukur(self._conn.cursor(*args, **kwargs))
+
+    def close(self):
+        if not self._ditutup:
+            self._ditutup = True
+            KONEKSI_DIPINJAM.dec()
+            if self._pool is not None:
+                KONEKSI_POOL_DIPINJAM.dec(pool=self._pool)
+        return self._conn.close()
+
+
+_lock_instrumentasi = threading.Lock()
+_kapasitas_pool = {}
+
+
+def instrumentasi_pool():
+    """
+    Ukur setiap koneksi yang dipinjam dari MySQLConnectionPool di proses ini.
+    Aman dipanggil berkali-kali; KoneksiTerukur tidak menghitung ulang koneksi
+    yang sudah diukur di sini.
+    """
+    with _lock_instrumentasi:
+        if pool_terukur():
+            return
+        asli = pooling.MySQLConnectionPool.get_connection
+
+        def get_connection(self, *args, **kwargs):
+            mulai = time.perf_counter()
+            try:
+                conn = asli(self, *args, **kwargs)
+            except Error:
+                ERROR_DB.inc(jenis='koneksi')
+                raise
+            finally:
+                DURASI_AMBIL_KONEKSI.observe(time.perf_counter() - mulai)
+            if self.pool_name not in _kapasitas_pool:
+                _kapasitas_pool[self.pool_name] = self.pool_size
+                KAPASITAS_POOL.set(self.pool_size, pool=self.pool_name)
+            return KoneksiPoolTerukur(conn, self.pool_name)
+
+        get_connection.terukur = True
+        pooling.MySQLConnectionPool.get_connection = get_connection
+
+
+def pool_terukur():
+    """True jika instrumentasi_pool() sudah dipasang di proses ini"""
+    return getattr(pooling.MySQLConnectionPool.get_connection, 'terukur', False)
+
+
+def pemakaian_pool():
+    """Dict nama pool -> (koneksi dipinjam, kapasitas) untuk pool yang sudah pernah dipakai"""
+    return {nama: (int(KONEKSI_POOL_DIPINJAM.nilai(pool=nama)), kapasitas)
+            for nama, kapasitas in list(_kapasitas_pool.items())}
+
+
+class KoneksiTerukur:
+    """
+    Pembungkus DatabaseConnection yang mencatat metrik koneksi dan query.
+    Jika instrumentasi_pool() aktif, durasi dan error mengambil koneksi
+    hanya dicatat di pool agar tidak terhitung dua kali.
+    Atribut lain diteruskan ke DatabaseConnection.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def __getattr__(self, name):
+        if name == 'db':
+            raise AttributeError(name)
+        return getattr(self.db, name)
+
+    def get_connection(self, *args, **kwargs):
+        di_pool = pool_terukur()
+        mulai = time.perf_counter()
+        try:
+            conn = self.db.get_connection(*args, **kwargs)
+        except Error:
+            if not di_pool:
+                ERROR_DB.inc(jenis='koneksi')
+            raise
+
+        if isinstance(conn, KoneksiPoolTerukur):
+            # Sudah diukur di pool (instrumentasi_pool)
+            return conn
+        if conn is None:
+            # DatabaseConnection menelan error pool; jika pool terukur, error sudah dihitung di sana
+            if not di_pool:
+                DURASI_AMBIL_KONEKSI.observe(time.perf_counter() - mulai)
+                ERROR_DB.inc(jenis='koneksi')
+            return None
+        DURASI_AMBIL_KONEKSI.observe(time.perf_counter() - mulai)
+        return KoneksiPoolTerukur(conn)
@@ -0,0 +1,203 @@
+"""
+Verifikasi inkremental pesanan.total_harga terhadap SUM(detail_pesanan.subtotal)
+Pesanan diperiksa per rentang id yang dibatasi, progres disimpan di
+verifikasi_checkpoint sehingga run berikutnya hanya memeriksa pesanan baru
+(id > id_terakhir) dan pesanan yang berubah sejak run terakhir (diubah_pada).
+Selisih dicatat di verifikasi_selisih dan bisa diperbaiki otomatis.
+"""
+
+import time
+
+from mysql.connector import Error
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NAMA_CHECKPOINT = 'total_harga'
+
+QUERY_SELISIH = """
+    SELECT p.id, p.total_harga, COALESCE(SUM(dp.subtotal), 0) AS total_item
+    FROM pesanan p
+    LEFT JOIN detail_pesanan dp ON dp.pesanan_id = p.id
+    WHERE {filter}
+    GROUP BY p.id, p.total_harga
+    HAVING p.total_harga <> total_item
+"""
+
+
+class VerifikasiTotal:
+    """
+    Pemeriksa konsistensi total pesanan.
+    Setiap chunk adalah satu query GROUP BY pada rentang id primary key,
+    sehingga lama lock dan memori per query tetap kecil berapa pun ukuran tabel.
+    """
+
+    def __init__(self, db=None, ukuran_chunk=1000, nama=NAMA_CHECKPOINT):
+        self.db = db or DatabaseConnection()
+        self.ukuran_chunk = ukuran_chunk
+        self.nama = nama
+
+    # ---------- checkpoint ----------
+
+    def checkpoint(self, cursor):
+        """(id_terakhir, diubah_terakhir) dari run sebelumnya, (0, None) jika belum pernah"""
+        cursor.execute(
+            "SELECT id_terakhir, diubah_terakhir FROM verifikasi_checkpoint WHERE nama = %s",
+            (self.nama,)
+        )
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def _simpan_checkpoint(self, cursor, id_terakhir, diubah_terakhir=None):
+        cursor.execute("""
+            INSERT INTO verifikasi_checkpoint (nama, id_terakhir, diubah_terakhir)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                id_terakhir = VALUES(id_terakhir),
+                diubah_terakhir = COALESCE(VALUES(diubah_terakhir), diubah_terakhir)
+        """, (self.nama, id_terakhir, diubah_terakhir))
+
+    # ---------- pemeriksaan ----------
+
+    def _periksa(self, conn, cursor, filter_id, params, perbaiki):
+        """
+        Periksa satu chunk: catat selisih baru, tandai selisih lama yang
+        sudah cocok sebagai 'teratasi', dan perbaiki jika diminta.
+        filter_id: kondisi SQL dengan placeholder {kolom} untuk kolom id pesanan.
+        """
+        cursor.execute(QUERY_SELISIH.format(filter=filter_id.format(kolom='p.id')), params)
+        selisih = cursor.fetchall()
+
+        if selisih:
+            cursor.executemany("""
+                INSERT INTO verifikasi_selisih (pesanan_id, total_tersimpan, total_item, status)
+                VALUES (%s, %s, %s, 'terbuka')
+                ON DUPLICATE KEY UPDATE
+                    total_tersimpan = VALUES(total_tersimpan),
+                    total_item = VALUES(total_item),
+                    status = 'terbuka',
+                    ditemukan_pada = CURRENT_TIMESTAMP
+            """, selisih)
+
+        # Selisih terbuka di chunk ini yang sekarang sudah cocok
+        id_selisih = [row[0] for row in selisih]
+        query = ("UPDATE verifikasi_selisih SET status = 'teratasi' WHERE status = 'terbuka' AND "
+                 + filter_id.format(kolom='pesanan_id'))
+        if id_selisih:
+            query += " AND pesanan_id NOT IN (" + ", ".join(["%s"] * len(id_selisih)) + ")"
+        cursor.execute(query, tuple(params) + tuple(id_selisih))
+
+        id_diperbaiki = []
+        if perbaiki and selisih:
+            # Hanya timpa jika total belum diubah pihak lain sejak dibaca;
+            # yang tidak kena (rowcount 0) tetap 'terbuka' untuk run berikutnya
+            for pid, total, total_item in selisih:
+                cursor.execute(
+                    "UPDATE pesanan SET total_harga = %s WHERE id = %s AND total_harga = %s",
+                    (total_item, pid, total)
+                )
+                if cursor.rowcount:
+                    id_diperbaiki.append(pid)
+            if id_diperbaiki:
+                cursor.executemany(
+                    "UPDATE verifikasi_selisih SET status = 'diperbaiki', diperbaiki_pada = CURRENT_TIMESTAMP "
+                    "WHERE pesanan_id = %s",
+                    [(pid,) for pid in id_diperbaiki]
+                )
+
+        conn.commit()
+        return len(selisih), len(id_diperbaiki)
+
+    def jalankan(self, perbaiki=False, ulang=False):
+        """
+        Satu run verifikasi.
+        ulang=True mengabaikan checkpoint dan memeriksa semua pesanan.
+        Return dict statistik run.
+        """
+        stats = {'diperiksa_baru': 0, 'diperiksa_diubah': 0, 'selisih': 0, 'diperbaiki': 0}
+        mulai = time.perf_counter()
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+
+            id_terakhir, diubah_terakhir = (0, None) if ulang else self.checkpoint(cursor)
+
+            # Watermark run ini diambil dari jam database sebelum scan,
+            # perubahan selama run akan diperiksa lagi di run berikutnya
+            cursor.execute("SELECT NOW(), COALESCE(MAX(id), 0) FROM pesanan")
+            waktu_mulai, id_max = cursor.fetchone()
+
+            # 1. Pesanan yang sudah diperiksa tapi berubah sejak run terakhir
+            if diubah_terakhir is not None and id_terakhir:
+                cursor.execute(
+                    "SELECT id FROM pesanan WHERE diubah_pada >= %s AND id <= %s ORDER BY id",
+                    (diubah_terakhir, id_terakhir)
+                )
+                id_diubah = [row[0] for row in cursor.fetchall()]
+
+                for i in range(0, len(id_diubah), self.ukuran_chunk):
+                    chunk = id_diubah[i:i + self.ukuran_chunk]
+                    placeholder = ", ".join(["%s"] * len(chunk))
+                    jumlah, diperbaiki = self._periksa(
+                        conn, cursor, "{kolom} IN (" + placeholder + ")", tuple(chunk), perbaiki
+                    )
+                    stats['diperiksa_diubah'] += len(chunk)
+                    stats['selisih'] += jumlah
+                    stats['diperbaiki'] += diperbaiki
+
+            # 2. Pesanan baru per rentang id, checkpoint disimpan tiap chunk
+            awal = id_terakhir + 1
+            while awal <= id_max:
+                akhir = min(awal + self.ukuran_chunk - 1, id_max)
+                jumlah, diperbaiki = self._periksa(
+                    conn, cursor, "{kolom} BETWEEN %s AND %s", (awal, akhir), perbaiki
+                )
+                self._simpan_checkpoint(cursor, akhir)
+                conn.commit()
+
+                stats['diperiksa_baru'] += akhir - awal + 1
+                stats['selisih'] += jumlah
+                stats['diperbaiki'] += diperbaiki
+                awal = akhir + 1
+
+            self._simpan_checkpoint(cursor, max(id_terakhir, id_max), waktu_mulai)
+            conn.commit()
+
+        except Error as e:
+            logger.error(f"Verifikasi total gagal: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+        stats['durasi'] = time.perf_counter() - mulai
+        logger.info(f"Verifikasi total: {stats}")
+        return stats
+
+    def daftar_selisih(self, status='terbuka', limit=100):
+        """Selisih yang tercatat, terbaru dulu"""
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT vs.pesanan_id, p.kode_pesanan, vs.total_tersimpan, vs.total_item,
+                       vs.status, vs.ditemukan_pada, vs.diperbaiki_pada
+                FROM verifikasi_selisih vs
+                LEFT JOIN pesanan p ON p.id = vs.pesanan_id
+                WHERE vs.status = %s
+                ORDER BY vs.ditemukan_pada DESC
+                LIMIT %s
+            """, (status, limit))
+            return cursor.fetchall()
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
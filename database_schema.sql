@@ -54,11 +54,16 @@ CREATE TABLE pesanan (
     status_pesanan ENUM('diproses', 'disajikan', 'selesai', 'dibatalkan') DEFAULT 'diproses',
     total_harga DECIMAL(12,2) DEFAULT 0,
     catatan TEXT,
+    pelayan VARCHAR(50),
+    -- Disentuh juga oleh trigger detail_pesanan, dipakai verifikasi inkremental
+    diubah_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (pelanggan_id) REFERENCES pelanggan(id),
     FOREIGN KEY (meja_id) REFERENCES meja(id),
     INDEX idx_tanggal (tanggal_pesanan),
-    INDEX idx_status (status_pesanan),
-    INDEX idx_kode (kode_pesanan)
+    -- Antrian dapur dan laporan: filter status lalu rentang tanggal
+    INDEX idx_status_tanggal (status_pesanan, tanggal_pesanan),
+    INDEX idx_kode (kode_pesanan),
+    INDEX idx_diubah (diubah_pada)
 );
 
 -- 6. Table Detail Pesanan
@@ -69,12 +74,205 @@ CREATE TABLE detail_pesanan (
     jumlah INT NOT NULL,
     harga_satuan DECIMAL(10,2) NOT NULL,
     subtotal DECIMAL(10,2) AS (jumlah * harga_satuan) STORED,
+    -- Snapshot nama menu dan kategori saat pesanan dibuat
+    nama_menu VARCHAR(100),
+    nama_kategori VARCHAR(50),
     FOREIGN KEY (pesanan_id) REFERENCES pesanan(id) ON DELETE CASCADE,
     FOREIGN KEY (menu_id) REFERENCES menu(id),
-    INDEX idx_pesanan (pesanan_id)
+    INDEX idx_pesanan_menu (pesanan_id, menu_id)
 );
 
--- 7. Insert Sample Data
+-- 7. Table Outbox Event (change feed)
+-- Diisi oleh trigger di transaksi yang sama dengan perubahan data
+CREATE TABLE outbox_event (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    tabel VARCHAR(30) NOT NULL,
+    aksi ENUM('insert', 'update', 'delete') NOT NULL,
+    row_id INT NOT NULL,
+    payload JSON,
+    dibuat_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_tabel (tabel, id)
+);
+
+-- 8. Table Offset Consumer Outbox
+CREATE TABLE outbox_offset (
+    consumer VARCHAR(50) PRIMARY KEY,
+    last_event_id BIGINT NOT NULL DEFAULT 0,
+    diperbarui_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- 9. Table Stok Ledger (append-only)
+-- Setiap pergerakan stok dicatat sebagai baris baru, bukan update menu.stok
+CREATE TABLE stok_ledger (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    menu_id INT NOT NULL,
+    jenis ENUM('penjualan', 'restock', 'penyesuaian') NOT NULL,
+    delta INT NOT NULL,
+    referensi VARCHAR(50),
+    dibuat_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (menu_id) REFERENCES menu(id),
+    INDEX idx_menu (menu_id, id)
+);
+
+-- 10. Table Stok Snapshot (hasil kompaksi ledger)
+CREATE TABLE stok_snapshot (
+    menu_id INT PRIMARY KEY,
+    stok INT NOT NULL DEFAULT 0,
+    ledger_id_terakhir BIGINT NOT NULL DEFAULT 0,
+    diperbarui_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (menu_id) REFERENCES menu(id)
+);
+
+-- 11. Table Tutup Harian (hasil job end-of-day)
+CREATE TABLE tutup_harian (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    tanggal DATE UNIQUE NOT NULL,
+    jumlah_pesanan INT NOT NULL DEFAULT 0,
+    total_pendapatan DECIMAL(14,2) NOT NULL DEFAULT 0,
+    ringkasan JSON,
+    anomali JSON,
+    meja_direset INT NOT NULL DEFAULT 0,
+    dibuat_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 12. Table Checkpoint Verifikasi Total
+CREATE TABLE verifikasi_checkpoint (
+    nama VARCHAR(50) PRIMARY KEY,
+    id_terakhir INT NOT NULL DEFAULT 0,
+    diubah_terakhir TIMESTAMP NULL,
+    diperbarui_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- 13. Table Selisih Total Pesanan
+CREATE TABLE verifikasi_selisih (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    pesanan_id INT UNIQUE NOT NULL,
+    total_tersimpan DECIMAL(12,2) NOT NULL,
+    total_item DECIMAL(12,2) NOT NULL,
+    status ENUM('terbuka', 'diperbaiki', 'teratasi') DEFAULT 'terbuka',
+    ditemukan_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    diperbaiki_pada TIMESTAMP NULL,
+    INDEX idx_status (status, ditemukan_pada)
+);
+
+-- 14. Table Riwayat Status Meja (diisi trigger)
+CREATE TABLE riwayat_status_meja (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    meja_id INT NOT NULL,
+    status_lama ENUM('tersedia', 'dipesan', 'terisi') NULL,
+    status_baru ENUM('tersedia', 'dipesan', 'terisi') NOT NULL,
+    diubah_pada TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_meja_waktu (meja_id, diubah_pada),
+    INDEX idx_waktu (diubah_pada)
+);
+
+-- 15. Trigger Outbox, Stok Ledger, Snapshot Detail Pesanan dan Riwayat Meja
+DELIMITER $$
+
+CREATE TRIGGER trg_pelanggan_insert AFTER INSERT ON pelanggan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pelanggan', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'nama', NEW.nama, 'no_telepon', NEW.no_telepon, 'email', NEW.email))$$
+CREATE TRIGGER trg_pelanggan_update AFTER UPDATE ON pelanggan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pelanggan', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'nama', NEW.nama, 'no_telepon', NEW.no_telepon, 'email', NEW.email))$$
+CREATE TRIGGER trg_pelanggan_delete AFTER DELETE ON pelanggan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pelanggan', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'nama', OLD.nama, 'no_telepon', OLD.no_telepon, 'email', OLD.email))$$
+
+CREATE TRIGGER trg_menu_insert AFTER INSERT ON menu
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('menu', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'nama_menu', NEW.nama_menu, 'kategori_id', NEW.kategori_id, 'harga', NEW.harga, 'stok', NEW.stok))$$
+CREATE TRIGGER trg_menu_update AFTER UPDATE ON menu
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('menu', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'nama_menu', NEW.nama_menu, 'kategori_id', NEW.kategori_id, 'harga', NEW.harga, 'stok', NEW.stok))$$
+CREATE TRIGGER trg_menu_delete AFTER DELETE ON menu
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('menu', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'nama_menu', OLD.nama_menu, 'kategori_id', OLD.kategori_id, 'harga', OLD.harga, 'stok', OLD.stok))$$
+
+CREATE TRIGGER trg_meja_insert AFTER INSERT ON meja
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('meja', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'nomor_meja', NEW.nomor_meja, 'kapasitas', NEW.kapasitas, 'status', NEW.status, 'lokasi', NEW.lokasi))$$
+CREATE TRIGGER trg_meja_update AFTER UPDATE ON meja
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('meja', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'nomor_meja', NEW.nomor_meja, 'kapasitas', NEW.kapasitas, 'status', NEW.status, 'lokasi', NEW.lokasi))$$
+CREATE TRIGGER trg_meja_delete AFTER DELETE ON meja
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('meja', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'nomor_meja', OLD.nomor_meja, 'kapasitas', OLD.kapasitas, 'status', OLD.status, 'lokasi', OLD.lokasi))$$
+CREATE TRIGGER trg_meja_riwayat_insert AFTER INSERT ON meja
+FOR EACH ROW
+    INSERT INTO riwayat_status_meja (meja_id, status_lama, status_baru)
+    VALUES (NEW.id, NULL, NEW.status)$$
+CREATE TRIGGER trg_meja_riwayat_update AFTER UPDATE ON meja
+FOR EACH ROW
+    INSERT INTO riwayat_status_meja (meja_id, status_lama, status_baru)
+    SELECT NEW.id, OLD.status, NEW.status FROM DUAL
+    WHERE NOT (OLD.status <=> NEW.status)$$
+
+CREATE TRIGGER trg_pesanan_insert AFTER INSERT ON pesanan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pesanan', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'kode_pesanan', NEW.kode_pesanan, 'pelanggan_id', NEW.pelanggan_id, 'meja_id', NEW.meja_id, 'status_pesanan', NEW.status_pesanan, 'total_harga', NEW.total_harga))$$
+CREATE TRIGGER trg_pesanan_update AFTER UPDATE ON pesanan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pesanan', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'kode_pesanan', NEW.kode_pesanan, 'pelanggan_id', NEW.pelanggan_id, 'meja_id', NEW.meja_id, 'status_pesanan', NEW.status_pesanan, 'total_harga', NEW.total_harga))$$
+CREATE TRIGGER trg_pesanan_delete AFTER DELETE ON pesanan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pesanan', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'kode_pesanan', OLD.kode_pesanan, 'pelanggan_id', OLD.pelanggan_id, 'meja_id', OLD.meja_id, 'status_pesanan', OLD.status_pesanan, 'total_harga', OLD.total_harga))$$
+
+CREATE TRIGGER trg_detail_pesanan_snapshot BEFORE INSERT ON detail_pesanan
+FOR EACH ROW
+BEGIN
+    IF NEW.nama_menu IS NULL THEN
+        SET NEW.nama_menu = (SELECT nama_menu FROM menu WHERE id = NEW.menu_id);
+        SET NEW.nama_kategori = (
+            SELECT km.nama_kategori
+            FROM menu m
+            JOIN kategori_menu km ON m.kategori_id = km.id
+            WHERE m.id = NEW.menu_id
+        );
+    END IF;
+END$$
+
+CREATE TRIGGER trg_detail_pesanan_stok AFTER INSERT ON detail_pesanan
+FOR EACH ROW
+    INSERT INTO stok_ledger (menu_id, jenis, delta, referensi)
+    VALUES (NEW.menu_id, 'penjualan', -NEW.jumlah, CONCAT('pesanan:', NEW.pesanan_id))$$
+
+-- Menu baru langsung punya snapshot stok pada posisi ledger saat ini
+CREATE TRIGGER trg_menu_stok_snapshot AFTER INSERT ON menu
+FOR EACH ROW
+    INSERT INTO stok_snapshot (menu_id, stok, ledger_id_terakhir)
+    VALUES (NEW.id, NEW.stok, (SELECT COALESCE(MAX(id), 0) FROM stok_ledger))$$
+
+-- Perubahan item ikut menandai pesanan berubah (untuk verifikasi total),
+-- sekali per pesanan per detik, bukan sekali per item
+CREATE TRIGGER trg_detail_pesanan_sentuh_insert AFTER INSERT ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP
+    WHERE id = NEW.pesanan_id AND diubah_pada < CURRENT_TIMESTAMP$$
+CREATE TRIGGER trg_detail_pesanan_sentuh_update AFTER UPDATE ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.pesanan_id, NEW.pesanan_id) AND diubah_pada < CURRENT_TIMESTAMP$$
+CREATE TRIGGER trg_detail_pesanan_sentuh_delete AFTER DELETE ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP
+    WHERE id = OLD.pesanan_id AND diubah_pada < CURRENT_TIMESTAMP$$
+
+DELIMITER ;
+
+-- 16. Insert Sample Data
 INSERT INTO kategori_menu (nama_kategori, deskripsi) VALUES 
 ('Appetizer', 'Makanan pembuka'),
 ('Main Course', 'Hidangan utama'),
@@ -119,12 +317,43 @@ INSERT INTO detail_pesanan (pesanan_id, menu_id, jumlah, harga_satuan) VALUES
 (2, 4, 1, 150000),
 (2, 7, 2, 20000);
 
--- Update total harga
-UPDATE pesanan SET total_harga = 265000 WHERE id = 1;
-UPDATE pesanan SET total_harga = 190000 WHERE id = 2;
+-- Update total harga dari detail (bukan angka manual)
+UPDATE pesanan p
+JOIN (
+    SELECT pesanan_id, SUM(subtotal) AS total
+    FROM detail_pesanan
+    GROUP BY pesanan_id
+) dp ON dp.pesanan_id = p.id
+SET p.total_harga = dp.total;
 
 -- Update status meja
 UPDATE meja SET status = 'terisi' WHERE id IN (1, 3);
 
+-- Snapshot stok awal (penjualan sample sudah tercermin di menu.stok)
+UPDATE stok_snapshot s
+JOIN menu m ON m.id = s.menu_id
+SET s.stok = m.stok, s.ledger_id_terakhir = (SELECT COALESCE(MAX(id), 0) FROM stok_ledger);
+
+-- 17. Versi Migrasi
+-- Schema ini sudah mencakup migrasi 001-008, runner (python app.py migrasi jalankan)
+-- hanya menerapkan file migrations/ sesudahnya. checksum NULL = bagian dari schema awal.
+CREATE TABLE schema_migrations (
+    versi INT PRIMARY KEY,
+    nama VARCHAR(200) NOT NULL,
+    checksum CHAR(64),
+    durasi_ms INT,
+    diterapkan_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO schema_migrations (versi, nama) VALUES
+(1, '001_detail_pesanan_snapshot.sql'),
+(2, '002_tutup_harian.sql'),
+(3, '003_verifikasi_total.sql'),
+(4, '004_outbox_event.sql'),
+(5, '005_stok_ledger.sql'),
+(6, '006_indeks_komposit.sql'),
+(7, '007_riwayat_status_meja.sql'),
+(8, '008_sentuh_pesanan_sekali.sql');
+
 SELECT 'DATABASE SETUP COMPLETE!' as status;
 
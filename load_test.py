@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Load test terminal pelayan bersamaan
+Mensimulasikan N pelayan yang menjalankan alur kerja nyata lewat jalur
+non-interaktif aplikasi (pesanan baru, ubah status meja, laporan), dengan
+think time dan popularitas menu yang timpang (Zipf). Saturasi pool diukur
+di setiap MySQLConnectionPool proses (pool aplikasi maupun pool milik
+CRUDOperations) terhadap kapasitasnya. Dijalankan bertahap
+(mis. 4, 8, 16, 32 pelayan) untuk mencari jumlah terminal tempat sistem
+mulai jenuh.
+
+Jalankan: python load_test.py --tahap 4,8,16 --durasi 60 --ya
+PERINGATAN: menulis pesanan sungguhan, jalankan ke database staging/test.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+OPERASI = ('meja_tersedia', 'buat_pesanan', 'update_status_meja', 'generate_laporan')
+
+# Interval sampling koneksi pool yang sedang dipinjam (detik)
+INTERVAL_SAMPEL = 0.1
+
+
+def _jenis_error(e):
+    """Kelompokkan exception: deadlock, lock_wait, pool_habis, koneksi, lain"""
+    from database.ketahanan import kesalahan_koneksi
+
+    errno = getattr(e, 'errno', None)
+    if errno == 1213:
+        return 'deadlock'
+    if errno == 1205:
+        return 'lock_wait'
+    if 'pool exhausted' in str(e).lower():
+        return 'pool_habis'
+    if kesalahan_koneksi(e):
+        return 'koneksi'
+    return 'lain'
+
+
+def bobot_zipf(jumlah, s):
+    """Bobot kumulatif Zipf: item peringkat k berbobot 1/k^s"""
+    return list(accumulate(1 / (k ** s) for k in range(1, jumlah + 1)))
+
+
+def persentil(nilai_urut, p):
+    """Persentil nearest-rank dari list yang sudah urut"""
+    if not nilai_urut:
+        return 0.0
+    indeks = max(0, min(len(nilai_urut), math.ceil(p / 100 * len(nilai_urut))) - 1)
+    return nilai_urut[indeks]
+
+
+# ========== PELAYAN ==========
+
+class Pelayan(threading.Thread):
+    """
+    Satu terminal pelayan: loop alur kerja sampai batas waktu.
+    Setiap operasi dicatat sebagai (operasi, detik_ke, latency, jenis_error/None).
+    Pesanan yang hanya masuk jurnal offline dicatat sebagai error 'offline'.
+    """
+
+    def __init__(self, app, data, konfigurasi, seed, mulai, selesai):
+        super().__init__(daemon=True)
+        self.app = app
+        self.data = data
+        self.konfigurasi = konfigurasi
+        self.rng = random.Random(seed)
+        self.mulai = mulai
+        self.selesai = selesai
+        self.catatan = []
+
+    def _think(self):
+        rata = self.konfigurasi['think']
+        if rata > 0:
+            time.sleep(min(self.rng.expovariate(1 / rata), rata * 5))
+
+    def _ukur(self, operasi, fungsi, *args):
+        awal = time.perf_counter()
+        error = None
+        hasil = None
+        try:
+            hasil = fungsi(*args)
+            if hasil is None:
+                error = 'gagal'
+            elif isinstance(hasil, dict) and hasil.get('offline'):
+                error = 'offline'
+        except Exception as e:
+            error = _jenis_error(e)
+        akhir = time.perf_counter()
+        self.catatan.append((operasi, int(time.time() - self.mulai), akhir - awal, error))
+        return hasil
+
+    def _items(self):
+        """1-4 menu berbeda dengan popularitas Zipf, jumlah 1-3"""
+        menu = self.data['menu']
+        pilihan = set()
+        for _ in range(self.rng.randint(1, 4)):
+            pilihan.add(menu[bisect_left(self.data['bobot'], self.rng.random() * self.data['bobot'][-1])]['id'])
+        return [(mid, self.rng.randint(1, 3)) for mid in pilihan]
+
+    def run(self):
+        app = self.app
+        while time.time() < self.selesai:
+            # Manajer sesekali membuka laporan hari ini
+            if self.rng.random() < self.konfigurasi['rasio_laporan']:
+                hari_ini = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+                self._ukur('generate_laporan', app.data_laporan, hari_ini, hari_ini + timedelta(days=1))
+                self._think()
+                continue
+
+            meja = self._ukur('meja_tersedia', app.crud.get_meja_tersedia)
+            self._think()
+            if not meja:
+                continue
+
+            meja_id = self.rng.choice(meja)['id']
+            pelanggan_id = self.rng.choice(self.data['pelanggan'])
+            hasil = self._ukur('buat_pesanan', app._simpan_pesanan,
+                               pelanggan_id, meja_id, self._items(), 'load test', self.data['menu_map'])
+            self._think()
+            if hasil and not hasil.get('offline'):
+                # Tamu selesai makan, meja dikosongkan kembali
+                self._ukur('update_status_meja', app.ubah_status_meja, 'tersedia', [meja_id])
+                self._think()
+
+
+def _siapkan_data(app, zipf):
+    """Menu yang masih ada stok (urut acak = peringkat popularitas) dan id pelanggan"""
+    menu = [m for m in app._muat_menu() if m['stok'] > 0]
+    pelanggan = [p['id'] for p in app.crud.read_pelanggan() or []]
+    if not menu or not pelanggan:
+        raise RuntimeError("Butuh minimal satu menu dengan stok dan satu pelanggan")
+    random.Random(0).shuffle(menu)
+    return {
+        'menu': menu,
+        'menu_map': {m['id']: m for m in menu},
+        'bobot': bobot_zipf(len(menu), zipf),
+        'pelanggan': pelanggan,
+    }
+
+
+def _jalankan_proses(tugas):
+    """Worker proses: satu SistemRestoran (satu pool) dengan beberapa thread pelayan"""
+    from app import SistemRestoran
+    from database.ketahanan import JURNAL_DIR, ENV_JURNAL_DIR, replay_jurnal
+    from database.terukur import KONEKSI_DIPINJAM, pemakaian_pool
+    from utils.kode_pesanan import MAX_WORKER
+
+    indeks, jumlah_pelayan, konfigurasi, mulai = tugas
+    # Worker id kode_pesanan per proses, dari ujung atas agar tidak bentrok dengan terminal sungguhan
+    os.environ['TERMINAL_ID'] = str(MAX_WORKER - indeks)
+    # Folder jurnal offline per proses (satu folder hanya boleh dipakai satu proses)
+    os.environ[ENV_JURNAL_DIR] = os.path.join(JURNAL_DIR, f"load_test_{indeks}")
+    app = SistemRestoran(interaktif=False)
+    data = _siapkan_data(app, konfigurasi['zipf'])
+
+    # Semua proses mulai bersamaan agar detik_ke sejajar
+    time.sleep(max(0.0, mulai - time.time()))
+    selesai = mulai + konfigurasi['durasi']
+    pelayan = [Pelayan(app, data, konfigurasi, indeks * 1000 + i, mulai, selesai)
+               for i in range(jumlah_pelayan)]
+    for p in pelayan:
+        p.start()
+
+    # Koneksi dipinjam (semua pool, termasuk pool CRUDOperations) dan saturasi
+    # pool yang paling penuh (dipinjam / kapasitas), nilai maksimum per detik,
+    # serta detik-detik saat circuit breaker terbuka (pesanan masuk jurnal offline)
+    dipinjam = defaultdict(int)
+    saturasi = defaultdict(float)
+    breaker_terbuka = set()
+    while any(p.is_alive() for p in pelayan):
+        detik = int(time.time() - mulai)
+        dipinjam[detik] = max(dipinjam[detik], int(KONEKSI_DIPINJAM.nilai()))
+        for n, kapasitas in pemakaian_pool().values():
+            saturasi[detik] = max(saturasi[detik], n / kapasitas)
+        if app.db.breaker.terbuka:
+            breaker_terbuka.add(detik)
+        time.sleep(INTERVAL_SAMPEL)
+
+    # Pesanan yang masuk jurnal saat database putus disimpan sebelum proses selesai
+    if app.jurnal.jumlah_tertunda():
+        replay_jurnal(app.jurnal, app.db)
+
+    return {
+        'catatan': [c for p in pelayan for c in p.catatan],
+        'dipinjam': dict(dipinjam),
+        'saturasi': dict(saturasi),
+        'breaker_terbuka': sorted(breaker_terbuka),
+        'kapasitas': sum(kapasitas for _, kapasitas in pemakaian_pool().values()),
+    }
+
+
+# ========== TAHAP & LAPORAN ==========
+
+def jalankan_tahap(jumlah_pelayan, konfigurasi):
+    """Jalankan satu tahap beban, return ringkasan per operasi dan deret waktu"""
+    jumlah_proses = max(1, min(konfigurasi['proses'], jumlah_pelayan))
+    pembagian = [jumlah_pelayan // jumlah_proses + (1 if i < jumlah_pelayan % jumlah_proses else 0)
+                 for i in range(jumlah_proses)]
+    # Beri waktu proses worker membuat pool dan membaca data awal
+    mulai = time.time() + konfigurasi['persiapan']
+    tugas = [(i, n, konfigurasi, mulai) for i, n in enumerate(pembagian)]
+
+    with Pool(jumlah_proses) as pool:
+        hasil_proses = pool.map(_jalankan_proses, tugas)
+
+    catatan = [c for h in hasil_proses for c in h['catatan']]
+    durasi = konfigurasi['durasi']
+
+    per_operasi = {}
+    for operasi in OPERASI:
+        latency = sorted(c[2] for c in catatan if c[0] == operasi)
+        if not latency:
+            continue
+        error = Counter(c[3] for c in catatan if c[0] == operasi and c[3])
+        per_operasi[operasi] = {
+            'jumlah': len(latency),
+            'per_detik': len(latency) / durasi,
+            'p50': persentil(latency, 50),
+            'p95': persentil(latency, 95),
+            'p99': persentil(latency, 99),
+            'maks': latency[-1],
+            'error': sum(error.values()),
+            'jenis_error': dict(error),
+        }
+
+    # Deret waktu: operasi selesai, error, koneksi dipinjam (jumlah semua proses)
+    # saturasi pool paling penuh (maksimum semua proses) dan breaker terbuka
+    # (di proses mana pun) per detik
+    ops_per_detik = Counter(c[1] for c in catatan)
+    error_per_detik = Counter(c[1] for c in catatan if c[3])
+    dipinjam = Counter()
+    saturasi = defaultdict(float)
+    breaker_terbuka = set()
+    for h in hasil_proses:
+        for detik, n in h['dipinjam'].items():
+            dipinjam[int(detik)] += n
+        for detik, rasio in h['saturasi'].items():
+            saturasi[int(detik)] = max(saturasi[int(detik)], rasio)
+        breaker_terbuka.update(h['breaker_terbuka'])
+    deret = [{'detik': d, 'ops': ops_per_detik[d], 'error': error_per_detik[d],
+              'koneksi_dipinjam': dipinjam[d], 'saturasi_pool': saturasi[d],
+              'breaker_terbuka': d in breaker_terbuka}
+             for d in range(durasi)]
+
+    semua_error = Counter(c[3] for c in catatan if c[3])
+    return {
+        'pelayan': jumlah_pelayan,
+        'proses': jumlah_proses,
+        'total_operasi': len(catatan),
+        'per_detik': len(catatan) / durasi,
+        'rasio_error': sum(semua_error.values()) / len(catatan) if catatan else 0.0,
+        'deadlock': semua_error['deadlock'],
+        'jenis_error': dict(semua_error),
+        'koneksi_dipinjam_maks': max(dipinjam.values(), default=0),
+        'kapasitas_pool': sum(h['kapasitas'] for h in hasil_proses),
+        'saturasi_pool_maks': max(saturasi.values(), default=0.0),
+        'detik_pool_penuh': sum(1 for d in range(durasi) if saturasi[d] >= 1),
+        'detik_breaker_terbuka': sum(1 for d in range(durasi) if d in breaker_terbuka),
+        'per_operasi': per_operasi,
+        'deret': deret,
+    }
+
+
+def cetak_tahap(hasil, tampilkan_deret):
+    print(f"\nPelayan: {hasil['pelayan']} ({hasil['proses']} proses) | "
+          f"{hasil['total_operasi']} operasi, {hasil['per_detik']:.1f}/detik | "
+          f"error {hasil['rasio_error'] * 100:.2f}% | deadlock {hasil['deadlock']} | "
+          f"koneksi dipinjam maks {hasil['koneksi_dipinjam_maks']}/{hasil['kapasitas_pool']} | "
+          f"saturasi pool maks {hasil['saturasi_pool_maks'] * 100:.0f}%, penuh {hasil['detik_pool_penuh']} detik | "
+          f"breaker terbuka {hasil['detik_breaker_terbuka']} detik")
+    print(f"  {'Operasi':<20} {'Jumlah':>7} {'/detik':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'Maks':>8} {'Error':>6}")
+    print("  " + "-" * 78)
+    for operasi, data in hasil['per_operasi'].items():
+        print(f"  {operasi:<20} {data['jumlah']:>7} {data['per_detik']:>7.1f} "
+              f"{data['p50'] * 1000:>6.0f}ms {data['p95'] * 1000:>6.0f}ms {data['p99'] * 1000:>6.0f}ms "
+              f"{data['maks'] * 1000:>6.0f}ms {data['error']:>6}")
+    if hasil['jenis_error']:
+        print("  Error: " + ", ".join(f"{jenis}={n}" for jenis, n in sorted(hasil['jenis_error'].items())))
+
+    if tampilkan_deret:
+        print(f"\n  {'Detik':>5} {'Ops':>6} {'Error':>6} {'Koneksi':>8} {'Pool':>6} {'Breaker':>8}")
+        for row in hasil['deret']:
+            print(f"  {row['detik']:>5} {row['ops']:>6} {row['error']:>6} {row['koneksi_dipinjam']:>8} "
+                  f"{row['saturasi_pool'] * 100:>5.0f}% {'terbuka' if row['breaker_terbuka'] else '-':>8}")
+
+
+def jenuh(hasil, konfigurasi):
+    """Alasan tahap dianggap jenuh (list kosong = masih sehat)"""
+    alasan = []
+    if hasil['rasio_error'] > konfigurasi['batas_error']:
+        alasan.append(f"error {hasil['rasio_error'] * 100:.1f}%")
+    pesanan = hasil['per_operasi'].get('buat_pesanan')
+    if pesanan and pesanan['p95'] > konfigurasi['batas_p95']:
+        alasan.append(f"p95 buat_pesanan {pesanan['p95']:.2f}s")
+    if hasil['jenis_error'].get('pool_habis'):
+        alasan.append(f"pool habis {hasil['jenis_error']['pool_habis']} kali")
+    if hasil['detik_breaker_terbuka']:
+        alasan.append(f"breaker terbuka {hasil['detik_breaker_terbuka']} detik")
+    return alasan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test terminal pelayan bersamaan')
+    parser.add_argument('--tahap', default='4,8,16',
+                        help='Jumlah pelayan per tahap, dipisah koma (default: 4,8,16)')
+    parser.add_argument('--durasi', type=int, default=60, help='Detik per tahap (default: 60)')
+    parser.add_argument('--proses', type=int, default=1,
+                        help='Pelayan dibagi ke N proses, masing-masing dengan pool sendiri (default: 1)')
+    parser.add_argument('--think', type=float, default=0.5,
+                        help='Rata-rata think time antar langkah, detik (eksponensial, default: 0.5)')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Kemiringan popularitas menu (default: 1.1)')
+    parser.add_argument('--rasio-laporan', type=float, default=0.05,
+                        help='Peluang satu iterasi membuka laporan (default: 0.05)')
+    parser.add_argument('--batas-error', type=float, default=0.01,
+                        help='Rasio error tahap dianggap jenuh (default: 0.01)')
+    parser.add_argument('--batas-p95', type=float, default=2.0,
+                        help='p95 buat_pesanan (detik) tahap dianggap jenuh (default: 2.0)')
+    parser.add_argument('--deret', action='store_true', help='Tampilkan deret waktu per detik')
+    parser.add_argument('--json', help='Simpan hasil lengkap ke file JSON')
+    parser.add_argument('--ya', action='store_true', help='Konfirmasi: load test menulis pesanan ke database')
+    args = parser.parse_args(argv)
+
+    if not args.ya:
+        print("⚠️ Load test membuat pesanan sungguhan. Jalankan ke database staging/test dengan --ya")
+        return 1
+
+    tahap = [int(n) for n in args.tahap.split(',') if n.strip()]
+    konfigurasi = {
+        'durasi': args.durasi,
+        'proses': args.proses,
+        'think': args.think,
+        'zipf': args.zipf,
+        'rasio_laporan': args.rasio_laporan,
+        'batas_error': args.batas_error,
+        'batas_p95': args.batas_p95,
+        'persiapan': 3.0,
+    }
+
+    print("=" * 70)
+    print("LOAD TEST - RESTORAN PEMESANAN APP")
+    print(f"Waktu Eksekusi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Tahap: {tahap}, {args.durasi} detik/tahap, think {args.think}s, zipf {args.zipf}")
+    print("=" * 70)
+
+    semua_hasil = []
+    titik_jenuh = None
+    for jumlah_pelayan in tahap:
+        print("\n" + "-" * 70)
+        print(f"TAHAP: {jumlah_pelayan} pelayan")
+        print("-" * 70)
+        hasil = jalankan_tahap(jumlah_pelayan, konfigurasi)
+        hasil['jenuh'] = jenuh(hasil, konfigurasi)
+        semua_hasil.append(hasil)
+        cetak_tahap(hasil, args.deret)
+        if hasil['jenuh'] and titik_jenuh is None:
+            titik_jenuh = jumlah_pelayan
+            print(f"  ❌ Jenuh: {', '.join(hasil['jenuh'])}")
+
+    print("\n" + "=" * 70)
+    print(f"{'Pelayan':>7} {'Ops/detik':>10} {'p95 pesanan':>12} {'Error':>7} {'Deadlock':>9} {'Pool':>6} "
+          f"{'Breaker':>8}")
+    for h in semua_hasil:
+        pesanan = h['per_operasi'].get('buat_pesanan', {})
+        print(f"{h['pelayan']:>7} {h['per_detik']:>10.1f} {pesanan.get('p95', 0) * 1000:>10.0f}ms "
+              f"{h['rasio_error'] * 100:>6.2f}% {h['deadlock']:>9} {h['saturasi_pool_maks'] * 100:>5.0f}% "
+              f"{h['detik_breaker_terbuka']:>7}s")
+    if titik_jenuh is None:
+        print(f"✅ Tidak ada tahap yang jenuh sampai {tahap[-1]} pelayan")
+    else:
+        print(f"❌ Sistem mulai jenuh di {titik_jenuh} pelayan")
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'konfigurasi': konfigurasi, 'tahap': semua_hasil}, f, indent=2)
+        print(f"Hasil lengkap disimpan ke {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+-- Migrasi 001: snapshot nama menu dan kategori di detail_pesanan
+-- Laporan historis tidak lagi join ke menu dan tidak berubah saat menu diganti nama
+-- Jalankan: python app.py migrasi jalankan
+
+-- Satu perubahan per ALTER: "kolom sudah ada" hanya melewati perubahan itu sendiri
+ALTER TABLE detail_pesanan ADD COLUMN nama_menu VARCHAR(100);
+ALTER TABLE detail_pesanan ADD COLUMN nama_kategori VARCHAR(50);
+
+DROP TRIGGER IF EXISTS trg_detail_pesanan_snapshot;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_detail_pesanan_snapshot BEFORE INSERT ON detail_pesanan
+FOR EACH ROW
+BEGIN
+    IF NEW.nama_menu IS NULL THEN
+        SET NEW.nama_menu = (SELECT nama_menu FROM menu WHERE id = NEW.menu_id);
+        SET NEW.nama_kategori = (
+            SELECT km.nama_kategori
+            FROM menu m
+            JOIN kategori_menu km ON m.kategori_id = km.id
+            WHERE m.id = NEW.menu_id
+        );
+    END IF;
+END$$
+
+-- Backfill baris lama per rentang id agar lock tetap pendek
+DROP PROCEDURE IF EXISTS backfill_detail_pesanan_snapshot$$
+
+CREATE PROCEDURE backfill_detail_pesanan_snapshot(IN ukuran_batch INT)
+BEGIN
+    DECLARE id_awal INT DEFAULT 0;
+    DECLARE id_max INT;
+
+    SELECT COALESCE(MAX(id), 0) INTO id_max FROM detail_pesanan;
+
+    WHILE id_awal < id_max DO
+        UPDATE detail_pesanan dp
+        JOIN menu m ON dp.menu_id = m.id
+        LEFT JOIN kategori_menu km ON m.kategori_id = km.id
+        SET dp.nama_menu = m.nama_menu,
+            dp.nama_kategori = km.nama_kategori
+        WHERE dp.id > id_awal AND dp.id <= id_awal + ukuran_batch
+          AND dp.nama_menu IS NULL;
+
+        SET id_awal = id_awal + ukuran_batch;
+    END WHILE;
+END$$
+
+DELIMITER ;
+
+CALL backfill_detail_pesanan_snapshot(10000);
+DROP PROCEDURE backfill_detail_pesanan_snapshot;
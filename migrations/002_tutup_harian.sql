@@ -0,0 +1,17 @@
+-- Migrasi 002: kolom pelayan di pesanan dan tabel tutup_harian
+-- Dipakai job tutup hari (models/tutup_harian.py)
+-- Jalankan: python app.py migrasi jalankan
+
+ALTER TABLE pesanan
+    ADD COLUMN pelayan VARCHAR(50);
+
+CREATE TABLE IF NOT EXISTS tutup_harian (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    tanggal DATE UNIQUE NOT NULL,
+    jumlah_pesanan INT NOT NULL DEFAULT 0,
+    total_pendapatan DECIMAL(14,2) NOT NULL DEFAULT 0,
+    ringkasan JSON,
+    anomali JSON,
+    meja_direset INT NOT NULL DEFAULT 0,
+    dibuat_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,44 @@
+-- Migrasi 003: verifikasi inkremental pesanan.total_harga
+-- Kolom diubah_pada + trigger detail_pesanan, tabel checkpoint dan selisih
+-- Jalankan: python app.py migrasi jalankan
+
+-- Satu perubahan per ALTER: "kolom sudah ada" tidak ikut melewati pembuatan indeks
+ALTER TABLE pesanan
+    ADD COLUMN diubah_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+ALTER TABLE pesanan ADD INDEX idx_diubah (diubah_pada);
+
+CREATE TABLE IF NOT EXISTS verifikasi_checkpoint (
+    nama VARCHAR(50) PRIMARY KEY,
+    id_terakhir INT NOT NULL DEFAULT 0,
+    diubah_terakhir TIMESTAMP NULL,
+    diperbarui_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS verifikasi_selisih (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    pesanan_id INT UNIQUE NOT NULL,
+    total_tersimpan DECIMAL(12,2) NOT NULL,
+    total_item DECIMAL(12,2) NOT NULL,
+    status ENUM('terbuka', 'diperbaiki', 'teratasi') DEFAULT 'terbuka',
+    ditemukan_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    diperbaiki_pada TIMESTAMP NULL,
+    INDEX idx_status (status, ditemukan_pada)
+);
+
+DROP TRIGGER IF EXISTS trg_detail_pesanan_sentuh_insert;
+DROP TRIGGER IF EXISTS trg_detail_pesanan_sentuh_update;
+DROP TRIGGER IF EXISTS trg_detail_pesanan_sentuh_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_detail_pesanan_sentuh_insert AFTER INSERT ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP WHERE id = NEW.pesanan_id$$
+CREATE TRIGGER trg_detail_pesanan_sentuh_update AFTER UPDATE ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP WHERE id IN (OLD.pesanan_id, NEW.pesanan_id)$$
+CREATE TRIGGER trg_detail_pesanan_sentuh_delete AFTER DELETE ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP WHERE id = OLD.pesanan_id$$
+
+DELIMITER ;
@@ -0,0 +1,89 @@
+-- Migrasi 004: outbox event (change feed) untuk antrian dapur dan consumer lain
+-- Tabel outbox_event dan outbox_offset, trigger insert/update/delete pada
+-- pelanggan, menu, meja dan pesanan yang menulis event di transaksi yang sama
+-- Jalankan: python app.py migrasi jalankan
+
+CREATE TABLE IF NOT EXISTS outbox_event (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    tabel VARCHAR(30) NOT NULL,
+    aksi ENUM('insert', 'update', 'delete') NOT NULL,
+    row_id INT NOT NULL,
+    payload JSON,
+    dibuat_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_tabel (tabel, id)
+);
+
+CREATE TABLE IF NOT EXISTS outbox_offset (
+    consumer VARCHAR(50) PRIMARY KEY,
+    last_event_id BIGINT NOT NULL DEFAULT 0,
+    diperbarui_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+DROP TRIGGER IF EXISTS trg_pelanggan_insert;
+DROP TRIGGER IF EXISTS trg_pelanggan_update;
+DROP TRIGGER IF EXISTS trg_pelanggan_delete;
+DROP TRIGGER IF EXISTS trg_menu_insert;
+DROP TRIGGER IF EXISTS trg_menu_update;
+DROP TRIGGER IF EXISTS trg_menu_delete;
+DROP TRIGGER IF EXISTS trg_meja_insert;
+DROP TRIGGER IF EXISTS trg_meja_update;
+DROP TRIGGER IF EXISTS trg_meja_delete;
+DROP TRIGGER IF EXISTS trg_pesanan_insert;
+DROP TRIGGER IF EXISTS trg_pesanan_update;
+DROP TRIGGER IF EXISTS trg_pesanan_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_pelanggan_insert AFTER INSERT ON pelanggan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pelanggan', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'nama', NEW.nama, 'no_telepon', NEW.no_telepon, 'email', NEW.email))$$
+CREATE TRIGGER trg_pelanggan_update AFTER UPDATE ON pelanggan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pelanggan', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'nama', NEW.nama, 'no_telepon', NEW.no_telepon, 'email', NEW.email))$$
+CREATE TRIGGER trg_pelanggan_delete AFTER DELETE ON pelanggan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pelanggan', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'nama', OLD.nama, 'no_telepon', OLD.no_telepon, 'email', OLD.email))$$
+
+CREATE TRIGGER trg_menu_insert AFTER INSERT ON menu
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('menu', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'nama_menu', NEW.nama_menu, 'kategori_id', NEW.kategori_id, 'harga', NEW.harga, 'stok', NEW.stok))$$
+CREATE TRIGGER trg_menu_update AFTER UPDATE ON menu
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('menu', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'nama_menu', NEW.nama_menu, 'kategori_id', NEW.kategori_id, 'harga', NEW.harga, 'stok', NEW.stok))$$
+CREATE TRIGGER trg_menu_delete AFTER DELETE ON menu
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('menu', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'nama_menu', OLD.nama_menu, 'kategori_id', OLD.kategori_id, 'harga', OLD.harga, 'stok', OLD.stok))$$
+
+CREATE TRIGGER trg_meja_insert AFTER INSERT ON meja
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('meja', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'nomor_meja', NEW.nomor_meja, 'kapasitas', NEW.kapasitas, 'status', NEW.status, 'lokasi', NEW.lokasi))$$
+CREATE TRIGGER trg_meja_update AFTER UPDATE ON meja
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('meja', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'nomor_meja', NEW.nomor_meja, 'kapasitas', NEW.kapasitas, 'status', NEW.status, 'lokasi', NEW.lokasi))$$
+CREATE TRIGGER trg_meja_delete AFTER DELETE ON meja
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('meja', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'nomor_meja', OLD.nomor_meja, 'kapasitas', OLD.kapasitas, 'status', OLD.status, 'lokasi', OLD.lokasi))$$
+
+CREATE TRIGGER trg_pesanan_insert AFTER INSERT ON pesanan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pesanan', 'insert', NEW.id, JSON_OBJECT('id', NEW.id, 'kode_pesanan', NEW.kode_pesanan, 'pelanggan_id', NEW.pelanggan_id, 'meja_id', NEW.meja_id, 'status_pesanan', NEW.status_pesanan, 'total_harga', NEW.total_harga))$$
+CREATE TRIGGER trg_pesanan_update AFTER UPDATE ON pesanan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pesanan', 'update', NEW.id, JSON_OBJECT('id', NEW.id, 'kode_pesanan', NEW.kode_pesanan, 'pelanggan_id', NEW.pelanggan_id, 'meja_id', NEW.meja_id, 'status_pesanan', NEW.status_pesanan, 'total_harga', NEW.total_harga))$$
+CREATE TRIGGER trg_pesanan_delete AFTER DELETE ON pesanan
+FOR EACH ROW
+    INSERT INTO outbox_event (tabel, aksi, row_id, payload)
+    VALUES ('pesanan', 'delete', OLD.id, JSON_OBJECT('id', OLD.id, 'kode_pesanan', OLD.kode_pesanan, 'pelanggan_id', OLD.pelanggan_id, 'meja_id', OLD.meja_id, 'status_pesanan', OLD.status_pesanan, 'total_harga', OLD.total_harga))$$
+
+DELIMITER ;
@@ -0,0 +1,44 @@
+-- Migrasi 005: ledger stok append-only
+-- Tabel stok_ledger dan stok_snapshot, trigger penjualan di detail_pesanan
+-- dan snapshot untuk menu baru. Snapshot awal diambil dari menu.stok pada
+-- posisi ledger saat ini.
+-- Jalankan: python app.py migrasi jalankan
+
+CREATE TABLE IF NOT EXISTS stok_ledger (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    menu_id INT NOT NULL,
+    jenis ENUM('penjualan', 'restock', 'penyesuaian') NOT NULL,
+    delta INT NOT NULL,
+    referensi VARCHAR(50),
+    dibuat_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (menu_id) REFERENCES menu(id),
+    INDEX idx_menu (menu_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS stok_snapshot (
+    menu_id INT PRIMARY KEY,
+    stok INT NOT NULL DEFAULT 0,
+    ledger_id_terakhir BIGINT NOT NULL DEFAULT 0,
+    diperbarui_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (menu_id) REFERENCES menu(id)
+);
+
+DROP TRIGGER IF EXISTS trg_detail_pesanan_stok;
+DROP TRIGGER IF EXISTS trg_menu_stok_snapshot;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_detail_pesanan_stok AFTER INSERT ON detail_pesanan
+FOR EACH ROW
+    INSERT INTO stok_ledger (menu_id, jenis, delta, referensi)
+    VALUES (NEW.menu_id, 'penjualan', -NEW.jumlah, CONCAT('pesanan:', NEW.pesanan_id))$$
+
+CREATE TRIGGER trg_menu_stok_snapshot AFTER INSERT ON menu
+FOR EACH ROW
+    INSERT INTO stok_snapshot (menu_id, stok, ledger_id_terakhir)
+    VALUES (NEW.id, NEW.stok, (SELECT COALESCE(MAX(id), 0) FROM stok_ledger))$$
+
+DELIMITER ;
+
+INSERT IGNORE INTO stok_snapshot (menu_id, stok, ledger_id_terakhir)
+SELECT id, stok, (SELECT COALESCE(MAX(id), 0) FROM stok_ledger) FROM menu;
@@ -0,0 +1,49 @@
+-- Migrasi 006: indeks komposit untuk antrian dapur, laporan dan detail pesanan
+-- Indeks dibuat online (ALGORITHM=INPLACE, LOCK=NONE): tabel tetap bisa
+-- dibaca/ditulis selama build, dan migrasi gagal alih-alih mengunci tabel
+-- jika MySQL tidak bisa membuatnya secara online.
+-- Jalankan: python app.py migrasi jalankan
+
+DROP PROCEDURE IF EXISTS ubah_indeks_online;
+
+DELIMITER $$
+
+-- Tambah indeks jika belum ada, hapus indeks jika masih ada (idempotent)
+CREATE PROCEDURE ubah_indeks_online(IN p_tabel VARCHAR(64), IN p_indeks VARCHAR(64),
+                                    IN p_kolom VARCHAR(255))
+BEGIN
+    DECLARE ada INT;
+
+    SELECT COUNT(*) INTO ada
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = p_tabel AND index_name = p_indeks;
+
+    IF p_kolom IS NOT NULL AND ada = 0 THEN
+        SET @sql_indeks = CONCAT('ALTER TABLE `', p_tabel, '` ADD INDEX `', p_indeks, '` (', p_kolom, '), ',
+                                 'ALGORITHM=INPLACE, LOCK=NONE');
+    ELSEIF p_kolom IS NULL AND ada > 0 THEN
+        SET @sql_indeks = CONCAT('ALTER TABLE `', p_tabel, '` DROP INDEX `', p_indeks, '`, ',
+                                 'ALGORITHM=INPLACE, LOCK=NONE');
+    ELSE
+        SET @sql_indeks = NULL;
+    END IF;
+
+    IF @sql_indeks IS NOT NULL THEN
+        PREPARE stmt FROM @sql_indeks;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- Antrian dapur dan laporan: filter status lalu rentang tanggal
+CALL ubah_indeks_online('pesanan', 'idx_status_tanggal', 'status_pesanan, tanggal_pesanan');
+-- idx_status sudah tercakup prefix idx_status_tanggal
+CALL ubah_indeks_online('pesanan', 'idx_status', NULL);
+
+-- Detail per pesanan dan join ke menu; idx_pesanan tercakup prefix (juga untuk foreign key)
+CALL ubah_indeks_online('detail_pesanan', 'idx_pesanan_menu', 'pesanan_id, menu_id');
+CALL ubah_indeks_online('detail_pesanan', 'idx_pesanan', NULL);
+
+DROP PROCEDURE ubah_indeks_online;
@@ -0,0 +1,36 @@
+-- Migrasi 007: riwayat perubahan status meja
+-- Setiap perubahan meja.status dicatat trigger (termasuk dari CRUD, CLI dan tutup harian)
+-- Jalankan: python app.py migrasi jalankan
+
+CREATE TABLE IF NOT EXISTS riwayat_status_meja (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    meja_id INT NOT NULL,
+    status_lama ENUM('tersedia', 'dipesan', 'terisi') NULL,
+    status_baru ENUM('tersedia', 'dipesan', 'terisi') NOT NULL,
+    diubah_pada TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_meja_waktu (meja_id, diubah_pada),
+    INDEX idx_waktu (diubah_pada)
+);
+
+DROP TRIGGER IF EXISTS trg_meja_riwayat_insert;
+DROP TRIGGER IF EXISTS trg_meja_riwayat_update;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_meja_riwayat_insert AFTER INSERT ON meja
+FOR EACH ROW
+    INSERT INTO riwayat_status_meja (meja_id, status_lama, status_baru)
+    VALUES (NEW.id, NULL, NEW.status)$$
+CREATE TRIGGER trg_meja_riwayat_update AFTER UPDATE ON meja
+FOR EACH ROW
+    INSERT INTO riwayat_status_meja (meja_id, status_lama, status_baru)
+    SELECT NEW.id, OLD.status, NEW.status FROM DUAL
+    WHERE NOT (OLD.status <=> NEW.status)$$
+
+DELIMITER ;
+
+-- Titik awal timeline: status meja saat migrasi dijalankan
+INSERT INTO riwayat_status_meja (meja_id, status_lama, status_baru)
+SELECT m.id, NULL, m.status
+FROM meja m
+WHERE NOT EXISTS (SELECT 1 FROM riwayat_status_meja r WHERE r.meja_id = m.id);
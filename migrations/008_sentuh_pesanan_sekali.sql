@@ -0,0 +1,29 @@
+-- Migrasi 008: trigger sentuh detail_pesanan cukup sekali per pesanan
+-- Sebelumnya setiap item yang disimpan meng-UPDATE pesanan (dan memicu
+-- trigger outbox pesanan) sekali per item. Sekarang pesanan hanya diubah jika
+-- diubah_pada masih lebih lama dari waktu statement: item dalam satu INSERT
+-- (atau detik yang sama dengan pembuatan pesanan) tidak menyentuh pesanan lagi.
+-- Verifikasi memakai diubah_pada >= checkpoint, jadi perubahan di detik yang
+-- sama tetap ikut diperiksa.
+-- Jalankan: python app.py migrasi jalankan
+
+DROP TRIGGER IF EXISTS trg_detail_pesanan_sentuh_insert;
+DROP TRIGGER IF EXISTS trg_detail_pesanan_sentuh_update;
+DROP TRIGGER IF EXISTS trg_detail_pesanan_sentuh_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_detail_pesanan_sentuh_insert AFTER INSERT ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP
+    WHERE id = NEW.pesanan_id AND diubah_pada < CURRENT_TIMESTAMP$$
+CREATE TRIGGER trg_detail_pesanan_sentuh_update AFTER UPDATE ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.pesanan_id, NEW.pesanan_id) AND diubah_pada < CURRENT_TIMESTAMP$$
+CREATE TRIGGER trg_detail_pesanan_sentuh_delete AFTER DELETE ON detail_pesanan
+FOR EACH ROW
+    UPDATE pesanan SET diubah_pada = CURRENT_TIMESTAMP
+    WHERE id = OLD.pesanan_id AND diubah_pada < CURRENT_TIMESTAMP$$
+
+DELIMITER ;
@@ -0,0 +1,266 @@
+"""
+Class AnalitikPenjualan - analitik penjualan berbasis pandas
+Data pesanan dan detail_pesanan dimuat per chunk ke DataFrame bertipe
+(categorical untuk teks berulang, integer sen untuk kolom uang), semua
+perhitungan memakai groupby vektor dan hasilnya di-cache ke disk.
+"""
+
+import hashlib
+from decimal import Decimal
+import os
+import pickle
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from database.db_connection import DatabaseConnection
+from database.arsip import ArsipPesanan
+from database.routing import koneksi_baca
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'analitik')
+
+# Naikkan jika isi hasil berubah, agar cache lama tidak dipakai lagi
+VERSI_CACHE = 2
+
+NAMA_HARI = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+QUERY_PESANAN = """
+    SELECT
+        p.id AS pesanan_id,
+        p.tanggal_pesanan,
+        p.status_pesanan,
+        m.nomor_meja,
+        p.total_harga
+    FROM pesanan p
+    LEFT JOIN meja m ON p.meja_id = m.id
+    WHERE p.tanggal_pesanan >= %s AND p.tanggal_pesanan < %s
+      AND p.status_pesanan <> 'dibatalkan'
+"""
+
+QUERY_DETAIL = """
+    SELECT
+        dp.pesanan_id,
+        dp.nama_menu,
+        dp.nama_kategori,
+        dp.jumlah,
+        dp.harga_satuan
+    FROM detail_pesanan dp
+    JOIN pesanan p ON dp.pesanan_id = p.id
+    WHERE p.tanggal_pesanan >= %s AND p.tanggal_pesanan < %s
+      AND p.status_pesanan <> 'dibatalkan'
+"""
+
+TIPE_PESANAN = {
+    'kategori': ['status_pesanan', 'nomor_meja'],
+    'integer': ['pesanan_id'],
+    'uang': ['total_harga'],
+    'tanggal': ['tanggal_pesanan'],
+}
+
+TIPE_DETAIL = {
+    'kategori': ['nama_menu', 'nama_kategori'],
+    'integer': ['pesanan_id', 'jumlah'],
+    'uang': ['harga_satuan'],
+    'tanggal': [],
+}
+
+
+def _kolom(tipe):
+    return tipe['kategori'] + tipe['integer'] + tipe['uang'] + tipe['tanggal']
+
+
+def _rupiah(sen):
+    """Jumlah sen (integer) ke rupiah Decimal 2 digit, tanpa lewat float"""
+    return Decimal(int(sen)).scaleb(-2)
+
+
+def _ketik_chunk(df, tipe):
+    """Konversi tipe kolom satu chunk"""
+    for kolom in tipe['integer']:
+        df[kolom] = df[kolom].astype('float64').fillna(0).astype('int64')
+    for kolom in tipe['uang']:
+        # Disimpan dalam sen: DECIMAL(…,2) tidak terpotong dan penjumlahan tetap eksak
+        df[kolom] = (df[kolom].astype('float64').fillna(0) * 100).round().astype('int64')
+    for kolom in tipe['tanggal']:
+        df[kolom] = pd.to_datetime(df[kolom])
+    for kolom in tipe['kategori']:
+        df[kolom] = df[kolom].fillna('-').astype('category')
+    return df
+
+
+def _gabung_chunk(chunks, tipe, kolom):
+    """Gabungkan chunk, kolom categorical disatukan tanpa kembali ke object"""
+    if not chunks:
+        df = pd.DataFrame(columns=kolom)
+        return _ketik_chunk(df, tipe)
+
+    hasil = pd.concat(chunks, ignore_index=True)
+    for k in tipe['kategori']:
+        hasil[k] = union_categoricals([c[k] for c in chunks], ignore_order=True)
+    return hasil
+
+
+class AnalitikPenjualan:
+    """
+    Analitik penjualan: top menu, heatmap jam/hari, rata-rata basket,
+    perputaran meja dan pendapatan per kategori.
+    """
+
+    def __init__(self, db=None, chunksize=50000, cache_dir=CACHE_DIR):
+        self.db = db or DatabaseConnection()
+        self.chunksize = chunksize
+        self.cache_dir = cache_dir
+
+    # ---------- load data ----------
+
+    def _baca(self, conn, query, params, tipe, tambahan=None):
+        chunks = [
+            _ketik_chunk(chunk, tipe)
+            for chunk in pd.read_sql(query, conn, params=params, chunksize=self.chunksize)
+        ]
+        if tambahan is not None and len(tambahan):
+            chunks.append(_ketik_chunk(tambahan.copy(), tipe))
+        return _gabung_chunk(chunks, tipe, _kolom(tipe))
+
+    def _muat_arsip(self, mulai, akhir):
+        """Pesanan dan detail dari arsip parquet pada rentang yang sama"""
+        arsip = ArsipPesanan(self.db)
+        kolom_pesanan = _kolom(TIPE_PESANAN)
+        kolom_detail = _kolom(TIPE_DETAIL) + ['tanggal_pesanan']
+
+        pesanan = arsip.baca('pesanan', mulai, akhir, kolom=kolom_pesanan)
+        detail = arsip.baca('detail_pesanan', mulai, akhir, kolom=kolom_detail)
+        if pesanan.empty:
+            return pesanan, detail
+
+        batal = pesanan.loc[pesanan['status_pesanan'] == 'dibatalkan', 'pesanan_id']
+        pesanan = pesanan[pesanan['status_pesanan'] != 'dibatalkan']
+        detail = detail[~detail['pesanan_id'].isin(batal)].drop(columns='tanggal_pesanan')
+        return pesanan, detail
+
+    def muat_data(self, mulai, akhir):
+        """
+        Muat pesanan dan detail pada rentang [mulai, akhir) sebagai DataFrame bertipe.
+        Data live digabung dengan pesanan yang sudah diarsip. Kolom uang
+        (total_harga, harga_satuan, subtotal) dalam sen.
+        """
+        pesanan_arsip, detail_arsip = self._muat_arsip(mulai, akhir)
+
+        try:
+            conn = koneksi_baca(self.db)
+            pesanan = self._baca(conn, QUERY_PESANAN, (mulai, akhir), TIPE_PESANAN, pesanan_arsip)
+            detail = self._baca(conn, QUERY_DETAIL, (mulai, akhir), TIPE_DETAIL, detail_arsip)
+        finally:
+            if 'conn' in locals():
+                conn.close()
+
+        detail['subtotal'] = detail['jumlah'] * detail['harga_satuan']
+        return pesanan, detail
+
+    # ---------- cache ----------
+
+    def _versi_data(self, mulai, akhir):
+        """Sidik jari data pada rentang, berubah jika ada pesanan baru/berubah"""
+        try:
+            conn = koneksi_baca(self.db)
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(SUM(total_harga), 0),
+                       COALESCE(SUM(status_pesanan = 'dibatalkan'), 0)
+                FROM pesanan
+                WHERE tanggal_pesanan >= %s AND tanggal_pesanan < %s
+            """, (mulai, akhir))
+            return cursor.fetchone()
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def _path_cache(self, mulai, akhir, versi):
+        kunci = f"{VERSI_CACHE}|{mulai}|{akhir}|{versi}".encode()
+        return os.path.join(self.cache_dir, hashlib.sha1(kunci).hexdigest() + '.pkl')
+
+    # ---------- perhitungan ----------
+
+    @staticmethod
+    def top_menu(detail, n=10):
+        """Menu terlaris berdasarkan jumlah terjual (pendapatan dalam rupiah)"""
+        hasil = (
+            detail.groupby('nama_menu', observed=True)
+            .agg(jumlah=('jumlah', 'sum'), pendapatan=('subtotal', 'sum'))
+            .nlargest(n, 'jumlah')
+        )
+        hasil['pendapatan'] = hasil['pendapatan'] / 100
+        return hasil
+
+    @staticmethod
+    def heatmap(pesanan):
+        """Jumlah pesanan per hari (baris) x jam (kolom)"""
+        waktu = pesanan['tanggal_pesanan']
+        tabel = pd.crosstab(waktu.dt.dayofweek, waktu.dt.hour)
+        tabel = tabel.reindex(index=range(7), columns=range(24), fill_value=0)
+        tabel.index = NAMA_HARI
+        return tabel
+
+    @staticmethod
+    def rata_rata_basket(pesanan, detail):
+        """Rata-rata item dan nilai per pesanan"""
+        item_per_pesanan = detail.groupby('pesanan_id')['jumlah'].sum()
+        return {
+            'item_per_pesanan': float(item_per_pesanan.mean()) if len(item_per_pesanan) else 0.0,
+            'nilai_per_pesanan': float(pesanan['total_harga'].mean()) / 100 if len(pesanan) else 0.0,
+        }
+
+    @staticmethod
+    def perputaran_meja(pesanan):
+        """Rata-rata jumlah pesanan per meja per hari buka"""
+        harian = pesanan.groupby(
+            [pesanan['nomor_meja'], pesanan['tanggal_pesanan'].dt.date],
+            observed=True
+        ).size()
+        return harian.groupby(level=0, observed=True).mean().sort_values(ascending=False)
+
+    @staticmethod
+    def pendapatan_kategori(detail):
+        """Total pendapatan per kategori menu (rupiah)"""
+        return (
+            detail.groupby('nama_kategori', observed=True)['subtotal']
+            .sum()
+            .sort_values(ascending=False)
+        ) / 100
+
+    def hitung(self, mulai, akhir, pakai_cache=True):
+        """
+        Hitung semua analitik untuk rentang [mulai, akhir).
+        Hasil disimpan ke cache dan dipakai ulang selama data belum berubah.
+        """
+        path_cache = None
+        if pakai_cache:
+            path_cache = self._path_cache(mulai, akhir, self._versi_data(mulai, akhir))
+            if os.path.exists(path_cache):
+                with open(path_cache, 'rb') as f:
+                    logger.info(f"Analitik {mulai} - {akhir} diambil dari cache")
+                    return pickle.load(f)
+
+        pesanan, detail = self.muat_data(mulai, akhir)
+        hasil = {
+            'jumlah_pesanan': len(pesanan),
+            'total_pendapatan': _rupiah(pesanan['total_harga'].sum()),
+            'top_menu': self.top_menu(detail),
+            'heatmap': self.heatmap(pesanan),
+            'basket': self.rata_rata_basket(pesanan, detail),
+            'perputaran_meja': self.perputaran_meja(pesanan),
+            'pendapatan_kategori': self.pendapatan_kategori(detail),
+        }
+
+        if path_cache:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path_cache, 'wb') as f:
+                pickle.dump(hasil, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        logger.info(f"Analitik {mulai} - {akhir} dihitung: {len(pesanan)} pesanan")
+        return hasil
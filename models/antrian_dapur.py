@@ -0,0 +1,262 @@
+"""
+Class AntrianDapur - antrian pesanan terbuka untuk tampilan dapur
+Pesanan diurutkan berdasarkan umur lalu nomor meja,
+perubahan dikirim ke subscriber sebagai event (tanpa polling database)
+"""
+
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Status yang masih tampil di dapur dan urutan transisinya
+STATUS_TERBUKA = ('diproses', 'disajikan')
+TRANSISI_STATUS = {
+    'diproses': 'disajikan',
+    'disajikan': 'selesai',
+}
+
+# Pemetaan kategori menu ke stasiun dapur, default ke 'dapur'
+STASIUN_KATEGORI = {
+    'Beverage': 'bar',
+}
+STASIUN_DEFAULT = 'dapur'
+
+
+class AntrianDapur:
+    """
+    Priority queue pesanan terbuka.
+    Urutan (tanggal, meja, id) disimpan sebagai list terurut: pesanan masuk
+    dan keluar dengan bisect, daftar() dan teratas() membaca urutannya
+    langsung tanpa sort. Data pesanan disimpan di dict sehingga perubahan
+    status cukup O(1). Aman dipakai dari thread consumer outbox dan thread UI.
+    """
+
+    def __init__(self):
+        self._urutan = []
+        self._pesanan = {}
+        self._per_stasiun = {}
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    # ---------- subscriber ----------
+
+    def subscribe(self, callback, stasiun=None):
+        """
+        Daftarkan callback(event, pesanan) untuk event antrian.
+        Jika stasiun diisi, hanya event pesanan stasiun tersebut yang dikirim.
+        """
+        self._subscribers.append((callback, stasiun))
+
+    def unsubscribe(self, callback):
+        """Hapus callback dari daftar subscriber"""
+        self._subscribers = [(cb, st) for cb, st in self._subscribers if cb is not callback]
+
+    def _publish(self, event, pesanan):
+        for callback, stasiun in list(self._subscribers):
+            if stasiun and stasiun not in pesanan['stasiun']:
+                continue
+            try:
+                callback(event, pesanan)
+            except Exception as e:
+                logger.error(f"Subscriber antrian dapur gagal: {e}")
+
+    # ---------- perubahan antrian ----------
+
+    @staticmethod
+    def stasiun_untuk(nama_kategori):
+        """Tentukan stasiun dari nama kategori menu"""
+        return STASIUN_KATEGORI.get(nama_kategori, STASIUN_DEFAULT)
+
+    def tambah_pesanan(self, pesanan_id, kode_pesanan, nomor_meja, items,
+                       tanggal=None, status='diproses'):
+        """
+        Masukkan pesanan ke antrian.
+        items: list dict dengan key nama_menu, jumlah, nama_kategori
+        Pesanan yang sudah ada diganti datanya dan dikirim sebagai event 'ubah'.
+        """
+        if status not in STATUS_TERBUKA:
+            return None
+
+        with self._lock:
+            return self._tambah(pesanan_id, kode_pesanan, nomor_meja, items, tanggal, status)
+
+    def _tambah(self, pesanan_id, kode_pesanan, nomor_meja, items, tanggal, status):
+        tanggal = tanggal or datetime.now()
+        stasiun = {self.stasiun_untuk(item.get('nama_kategori')) for item in items}
+        pesanan = {
+            'id': pesanan_id,
+            'kode_pesanan': kode_pesanan,
+            'nomor_meja': nomor_meja or '-',
+            'tanggal': tanggal,
+            'status': status,
+            'items': items,
+            'stasiun': stasiun or {STASIUN_DEFAULT},
+        }
+
+        lama = self._pesanan.get(pesanan_id)
+        if lama:
+            # Stasiun lama yang tidak dipakai lagi dilepas
+            for st in lama['stasiun'] - pesanan['stasiun']:
+                self._per_stasiun.get(st, set()).discard(pesanan_id)
+
+        self._pesanan[pesanan_id] = pesanan
+        for st in pesanan['stasiun']:
+            self._per_stasiun.setdefault(st, set()).add(pesanan_id)
+        if not lama or self._kunci(lama) != self._kunci(pesanan):
+            if lama:
+                self._keluar(self._kunci(lama))
+            insort(self._urutan, self._kunci(pesanan))
+
+        self._publish('ubah' if lama else 'baru', pesanan)
+        return pesanan
+
+    def ubah_status(self, pesanan_id, status_baru):
+        """
+        Ubah status pesanan di antrian (O(1)).
+        Pesanan selesai/dibatalkan keluar dari antrian (bisect pada urutan).
+        """
+        with self._lock:
+            pesanan = self._pesanan.get(pesanan_id)
+            if not pesanan:
+                return None
+
+            pesanan['status'] = status_baru
+            if status_baru not in STATUS_TERBUKA:
+                del self._pesanan[pesanan_id]
+                self._keluar(self._kunci(pesanan))
+                for st in pesanan['stasiun']:
+                    self._per_stasiun.get(st, set()).discard(pesanan_id)
+                self._publish('keluar', pesanan)
+            else:
+                self._publish('status', pesanan)
+
+            return pesanan
+
+    def ganti_id(self, id_lama, id_baru):
+        """
+        Ganti id pesanan tanpa mengubah posisi antrian, misalnya id sementara
+        pesanan offline setelah tersimpan di database.
+        """
+        with self._lock:
+            pesanan = self._pesanan.pop(id_lama, None)
+            if not pesanan:
+                return None
+
+            self._keluar(self._kunci(pesanan))
+            pesanan['id'] = id_baru
+            self._pesanan[id_baru] = pesanan
+            insort(self._urutan, self._kunci(pesanan))
+            for st in pesanan['stasiun']:
+                ids = self._per_stasiun.setdefault(st, set())
+                ids.discard(id_lama)
+                ids.add(id_baru)
+            return pesanan
+
+    def get(self, pesanan_id):
+        """Data pesanan di antrian, None jika tidak ada"""
+        with self._lock:
+            return self._pesanan.get(pesanan_id)
+
+    def status_berikutnya(self, pesanan_id):
+        """Status selanjutnya untuk pesanan, None jika tidak ada"""
+        with self._lock:
+            pesanan = self._pesanan.get(pesanan_id)
+            if not pesanan:
+                return None
+            return TRANSISI_STATUS.get(pesanan['status'])
+
+    # ---------- query antrian ----------
+
+    @staticmethod
+    def _kunci(pesanan):
+        """Urutan antrian: umur, lalu nomor meja, lalu id"""
+        return (pesanan['tanggal'], pesanan['nomor_meja'], pesanan['id'])
+
+    def _keluar(self, kunci):
+        """Hapus kunci dari urutan antrian"""
+        i = bisect_left(self._urutan, kunci)
+        if i < len(self._urutan) and self._urutan[i] == kunci:
+            del self._urutan[i]
+
+    def teratas(self):
+        """Pesanan terbuka paling lama"""
+        with self._lock:
+            return self._pesanan[self._urutan[0][2]] if self._urutan else None
+
+    def daftar(self, stasiun=None, status=None):
+        """List pesanan terbuka terurut umur dan meja, bisa difilter per stasiun dan status"""
+        with self._lock:
+            hasil = [self._pesanan[kunci[2]] for kunci in self._urutan]
+            if stasiun:
+                ids = self._per_stasiun.get(stasiun, set())
+                hasil = [p for p in hasil if p['id'] in ids]
+        if status:
+            hasil = [p for p in hasil if p['status'] == status]
+        return hasil
+
+    def daftar_stasiun(self):
+        """Nama stasiun yang punya pesanan terbuka"""
+        with self._lock:
+            return sorted(st for st, ids in self._per_stasiun.items() if ids)
+
+    def __len__(self):
+        return len(self._pesanan)
+
+    # ---------- inisialisasi ----------
+
+    def muat_dari_db(self, db, pesanan_id=None):
+        """
+        Isi antrian dari pesanan terbuka di database.
+        Dipanggil sekali saat start, perubahan berikutnya masuk lewat event.
+        Jika pesanan_id diisi, hanya pesanan tersebut yang dimuat.
+        """
+        try:
+            conn = db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            query = """
+                SELECT
+                    p.id, p.kode_pesanan, p.tanggal_pesanan, p.status_pesanan,
+                    mj.nomor_meja, dp.nama_menu, dp.jumlah, dp.nama_kategori
+                FROM pesanan p
+                LEFT JOIN meja mj ON p.meja_id = mj.id
+                LEFT JOIN detail_pesanan dp ON dp.pesanan_id = p.id
+                WHERE p.status_pesanan IN ('diproses', 'disajikan')
+            """
+            params = ()
+            if pesanan_id is not None:
+                query += " AND p.id = %s"
+                params = (pesanan_id,)
+            cursor.execute(query + " ORDER BY p.id", params)
+
+            pesanan_map = {}
+            for row in cursor.fetchall():
+                data = pesanan_map.setdefault(row['id'], {
+                    'kode_pesanan': row['kode_pesanan'],
+                    'nomor_meja': row['nomor_meja'],
+                    'tanggal': row['tanggal_pesanan'],
+                    'status': row['status_pesanan'],
+                    'items': [],
+                })
+                if row['nama_menu']:
+                    data['items'].append({
+                        'nama_menu': row['nama_menu'],
+                        'jumlah': row['jumlah'],
+                        'nama_kategori': row['nama_kategori'],
+                    })
+
+            for pid, data in pesanan_map.items():
+                self.tambah_pesanan(pid, **data)
+
+            if pesanan_id is None:
+                logger.info(f"Antrian dapur dimuat: {len(pesanan_map)} pesanan terbuka")
+            return len(pesanan_map)
+
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
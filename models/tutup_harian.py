@@ -0,0 +1,195 @@
+"""
+Class TutupHarian - job tutup hari (end-of-day close)
+Pesanan dan detail_pesanan satu hari dibaca sekali secara streaming,
+semua agregat (per status, meja, kategori, pelayan) dihitung dalam satu
+lintasan, anomali dicatat, lalu record tutup_harian ditulis dan status
+meja direset dalam satu transaksi.
+"""
+
+import json
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+from database.db_connection import DatabaseConnection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Satu baris per item; pesanan tanpa item tetap muncul lewat LEFT JOIN
+QUERY_HARIAN = """
+    SELECT
+        p.id, p.kode_pesanan, p.status_pesanan, p.total_harga, p.pelayan,
+        mj.nomor_meja, dp.nama_kategori, dp.jumlah, dp.subtotal
+    FROM pesanan p
+    LEFT JOIN meja mj ON p.meja_id = mj.id
+    LEFT JOIN detail_pesanan dp ON dp.pesanan_id = p.id
+    WHERE p.tanggal_pesanan >= %s AND p.tanggal_pesanan < %s
+    ORDER BY p.id
+"""
+
+TANPA_PELAYAN = '-'
+
+
+def _agregat():
+    return {'jumlah': 0, 'total': Decimal(0)}
+
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Tipe {type(obj).__name__} tidak bisa dijadikan JSON")
+
+
+class TutupHarian:
+    """
+    Agregasi akhir hari dalam satu scan.
+    Pendapatan tidak menghitung pesanan 'dibatalkan', jumlah pesanan per
+    status tetap menghitung semua status.
+    """
+
+    def __init__(self, db=None, batch_size=2000):
+        self.db = db or DatabaseConnection()
+        self.batch_size = batch_size
+
+    def _baris_harian(self, cursor, mulai, akhir):
+        """Generator baris hasil QUERY_HARIAN per batch fetchmany"""
+        cursor.execute(QUERY_HARIAN, (mulai, akhir))
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def hitung(self, cursor, mulai, akhir):
+        """Satu lintasan atas pesanan hari itu, return dict agregat dan anomali pesanan"""
+        per_status = {}
+        per_meja = {}
+        per_kategori = {}
+        per_pelayan = {}
+        anomali = []
+
+        jumlah_pesanan = 0
+        total_pendapatan = Decimal(0)
+        pesanan = None
+        subtotal_item = Decimal(0)
+
+        def tutup_pesanan():
+            # Dipanggil saat id pesanan berganti: cek total vs jumlah subtotal item
+            if pesanan and pesanan['status'] != 'dibatalkan' and subtotal_item != pesanan['total']:
+                anomali.append({
+                    'jenis': 'total_tidak_cocok',
+                    'kode_pesanan': pesanan['kode'],
+                    'total_harga': pesanan['total'],
+                    'total_item': subtotal_item,
+                })
+
+        for (pid, kode, status, total_harga, pelayan,
+             nomor_meja, nama_kategori, jumlah, subtotal) in self._baris_harian(cursor, mulai, akhir):
+
+            if pesanan is None or pesanan['id'] != pid:
+                tutup_pesanan()
+                total_harga = total_harga or Decimal(0)
+                pesanan = {'id': pid, 'kode': kode, 'status': status, 'total': total_harga}
+                subtotal_item = Decimal(0)
+                jumlah_pesanan += 1
+
+                agregat = per_status.setdefault(status, _agregat())
+                agregat['jumlah'] += 1
+                agregat['total'] += total_harga
+
+                if status == 'diproses':
+                    anomali.append({'jenis': 'pesanan_macet', 'kode_pesanan': kode, 'meja': nomor_meja})
+
+                if status != 'dibatalkan':
+                    total_pendapatan += total_harga
+                    for kunci, grup in ((nomor_meja or '-', per_meja), (pelayan or TANPA_PELAYAN, per_pelayan)):
+                        agregat = grup.setdefault(kunci, _agregat())
+                        agregat['jumlah'] += 1
+                        agregat['total'] += total_harga
+
+            if jumlah is not None:
+                subtotal_item += subtotal
+                if status != 'dibatalkan':
+                    agregat = per_kategori.setdefault(nama_kategori or '-', _agregat())
+                    agregat['jumlah'] += jumlah
+                    agregat['total'] += subtotal
+
+        tutup_pesanan()
+
+        return {
+            'jumlah_pesanan': jumlah_pesanan,
+            'total_pendapatan': total_pendapatan,
+            'per_status': per_status,
+            'per_meja': per_meja,
+            'per_kategori': per_kategori,
+            'per_pelayan': per_pelayan,
+            'anomali': anomali,
+        }
+
+    def jalankan(self, tanggal=None, reset_meja=True):
+        """
+        Tutup hari untuk tanggal (default hari ini).
+        Menjalankan ulang tanggal yang sama menimpa record sebelumnya.
+        """
+        tanggal = tanggal or date.today()
+        if isinstance(tanggal, datetime):
+            tanggal = tanggal.date()
+        mulai = datetime.combine(tanggal, datetime.min.time())
+        akhir = mulai + timedelta(days=1)
+
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+
+            hasil = self.hitung(cursor, mulai, akhir)
+
+            # Meja yang belum kembali tersedia di akhir hari
+            cursor.execute("SELECT nomor_meja, status FROM meja WHERE status <> 'tersedia' ORDER BY nomor_meja")
+            for nomor_meja, status in cursor.fetchall():
+                hasil['anomali'].append({'jenis': 'meja_belum_reset', 'meja': nomor_meja, 'status': status})
+
+            meja_direset = 0
+            if reset_meja:
+                cursor.execute("UPDATE meja SET status = 'tersedia' WHERE status <> 'tersedia'")
+                meja_direset = cursor.rowcount
+
+            ringkasan = {k: hasil[k] for k in ('per_status', 'per_meja', 'per_kategori', 'per_pelayan')}
+            cursor.execute("""
+                INSERT INTO tutup_harian
+                    (tanggal, jumlah_pesanan, total_pendapatan, ringkasan, anomali, meja_direset)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    jumlah_pesanan = VALUES(jumlah_pesanan),
+                    total_pendapatan = VALUES(total_pendapatan),
+                    ringkasan = VALUES(ringkasan),
+                    anomali = VALUES(anomali),
+                    meja_direset = VALUES(meja_direset),
+                    dibuat_pada = CURRENT_TIMESTAMP
+            """, (
+                tanggal,
+                hasil['jumlah_pesanan'],
+                hasil['total_pendapatan'],
+                json.dumps(ringkasan, default=_json_default),
+                json.dumps(hasil['anomali'], default=_json_default),
+                meja_direset,
+            ))
+            conn.commit()
+
+            hasil['tanggal'] = tanggal
+            hasil['meja_direset'] = meja_direset
+            logger.info(f"Tutup harian {tanggal}: {hasil['jumlah_pesanan']} pesanan, "
+                        f"{len(hasil['anomali'])} anomali, {meja_direset} meja direset")
+            return hasil
+
+        except Exception as e:
+            logger.error(f"Tutup harian {tanggal} gagal: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+            raise
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
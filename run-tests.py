@@ -2,86 +2,290 @@
 """
 Test Runner utama untuk menjalankan semua unit tests
 Memenuhi kompetensi J.620100.033.02
+
+Setiap modul test dijalankan di proses worker sendiri dengan database
+sementara (dibuat dari database_schema.sql, dihapus setelah modul selesai),
+sehingga test tidak berbagi state dengan database asli maupun modul lain.
+Modul yang memakai database palsu (BUTUH_DATABASE = False) dijalankan
+tanpa database sementara dan tanpa server MySQL.
+Jalankan: python run-tests.py [--workers N] [--slowest N] [--tanpa-isolasi] [modul ...]
+Koneksi admin untuk membuat database test: TEST_DB_HOST, TEST_DB_PORT,
+TEST_DB_USER, TEST_DB_PASSWORD.
 """
+import argparse
+import importlib
+import io
 import unittest
 import sys
 import os
+import time
+import traceback
 from datetime import datetime
+from multiprocessing import Pool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILE = os.path.join(BASE_DIR, 'database_schema.sql')
+
+MODUL_TEST = [
+    'tests.test_kode_pesanan',
+    'tests.test_ketahanan',
+    'tests.test_outbox',
+    'tests.test_stok_ledger',
+    'tests.test_verifikasi_total',
+    'tests.test_migrasi',
+    'tests.test_timeline_meja',
+    'tests.test_antrian_dapur',
+    'tests.test_validasi_batch',
+    'tests.test_metrics',
+    'tests.test_shard',
+    'tests.test_tampilan',
+]
+
+
+class HasilTerukur(unittest.TextTestResult):
+    """TextTestResult yang mencatat durasi setiap test"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.durasi = {}
+        self._mulai = None
+    
+    def startTest(self, test):
+        self._mulai = time.perf_counter()
+        super().startTest(test)
+    
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.durasi[test.id()] = time.perf_counter() - self._mulai
+
+
+def _config_admin():
+    return {
+        'host': os.environ.get('TEST_DB_HOST', 'localhost'),
+        'port': int(os.environ.get('TEST_DB_PORT', 3306)),
+        'user': os.environ.get('TEST_DB_USER', 'root'),
+        'password': os.environ.get('TEST_DB_PASSWORD', ''),
+    }
 
-def run_all_tests():
+
+def _buat_database(nama_db):
+    """Buat database sementara dari database_schema.sql (tanpa DROP/CREATE/USE restoran_db)"""
+    import mysql.connector
+    from database.migrasi import pecah_statement
+    
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        statements = pecah_statement(f.read())
+    
+    conn = mysql.connector.connect(**_config_admin())
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE `{nama_db}`")
+        cursor.execute(f"USE `{nama_db}`")
+        for statement in statements:
+            awal = statement.split(None, 2)
+            if awal[0].upper() == 'USE' or (len(awal) > 1 and awal[1].upper() == 'DATABASE'):
+                continue
+            cursor.execute(statement)
+            if cursor.with_rows:
+                cursor.fetchall()
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def _hapus_database(nama_db):
+    import mysql.connector
+    
+    conn = mysql.connector.connect(**_config_admin())
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{nama_db}`")
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def _arahkan_koneksi(nama_db):
+    """
+    Semua koneksi MySQL di proses worker ini diarahkan ke database sementara,
+    termasuk pool yang dibuat DatabaseConnection saat test berjalan.
+    """
+    import mysql.connector
+    from mysql.connector import pooling
+    
+    connect_asli = mysql.connector.connect
+    init_pool_asli = pooling.MySQLConnectionPool.__init__
+    
+    def connect(*args, **kwargs):
+        kwargs['database'] = nama_db
+        return connect_asli(*args, **kwargs)
+    
+    def init_pool(self, *args, **kwargs):
+        kwargs['database'] = nama_db
+        init_pool_asli(self, *args, **kwargs)
+    
+    mysql.connector.connect = connect
+    pooling.MySQLConnectionPool.__init__ = init_pool
+
+
+def _jalankan_modul(tugas):
+    """Worker proses: jalankan satu modul test di database sementara, return ringkasan yang bisa di-pickle"""
+    indeks, nama_modul, isolasi = tugas
+    sys.path.insert(0, BASE_DIR)
+    
+    nama_db = f"restoran_test_{os.getpid()}_{indeks}" if isolasi else None
+    stream = io.StringIO()
+    hasil = {
+        'modul': nama_modul,
+        'database': None,
+        'tests_run': 0,
+        'failures': [],
+        'errors': [],
+        'skipped': 0,
+        'durasi': {},
+        'durasi_modul': 0.0,
+    }
+    
+    mulai = time.perf_counter()
+    db_dibuat = False
+    try:
+        modul = importlib.import_module(nama_modul)
+        if isolasi and getattr(modul, 'BUTUH_DATABASE', True):
+            _buat_database(nama_db)
+            db_dibuat = True
+            hasil['database'] = nama_db
+            _arahkan_koneksi(nama_db)
+        
+        suite = unittest.TestLoader().loadTestsFromModule(modul)
+        runner = unittest.TextTestRunner(
+            stream=stream,
+            verbosity=2,
+            failfast=False,  # Jangan berhenti di test pertama yang gagal
+            buffer=True,     # Capture output selama test
+            resultclass=HasilTerukur
+        )
+        result = runner.run(suite)
+        
+        hasil['tests_run'] = result.testsRun
+        hasil['failures'] = [(str(test), tb) for test, tb in result.failures]
+        hasil['errors'] = [(str(test), tb) for test, tb in result.errors]
+        hasil['skipped'] = len(result.skipped)
+        hasil['durasi'] = result.durasi
+    except Exception:
+        # Gagal menyiapkan database atau memuat modul: dihitung satu error untuk modul ini
+        hasil['errors'].append((f"{nama_modul} (setup)", traceback.format_exc()))
+    finally:
+        if db_dibuat:
+            try:
+                _hapus_database(nama_db)
+            except Exception as e:
+                stream.write(f"\n⚠️ Gagal menghapus database {nama_db}: {e}\n")
+    
+    hasil['durasi_modul'] = time.perf_counter() - mulai
+    hasil['output'] = stream.getvalue()
+    return hasil
+
+
+def run_all_tests(modul_list=None, workers=None, slowest=10, isolasi=True):
     """Jalankan semua test suites"""
+    modul_list = modul_list or MODUL_TEST
+    workers = max(1, min(workers or os.cpu_count() or 1, len(modul_list)))
     
     print("=" * 70)
     print("UNIT TESTING SYSTEM - RESTORAN PEMESANAN APP")
     print(f"Test Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Workers: {workers}, database {'sementara per modul' if isolasi else 'dari konfigurasi aplikasi'}")
     print("=" * 70)
     
-    # Discover semua test
-    test_loader = unittest.TestLoader()
-    
-    # Test suites
-    test_suites = [
-        test_loader.loadTestsFromName('tests.test_model'),
-        test_loader.loadTestsFromName('tests.test_database'),
-        test_loader.loadTestsFromName('tests.test_integration'),
-    ]
-    
-    # Combine semua suites
-    complete_suite = unittest.TestSuite(test_suites)
-    
-    # Test runner dengan report detail
-    test_runner = unittest.TextTestRunner(
-        verbosity=2,
-        failfast=False,  # Jangan berhenti di test pertama yang gagal
-        buffer=True      # Capture output selama test
-    )
-    
     # Jalankan tests
     print("\n" + "="*70)
     print("EXECUTING TESTS...")
     print("="*70 + "\n")
     
-    result = test_runner.run(complete_suite)
+    mulai = time.perf_counter()
+    semua_hasil = []
+    tugas = [(i, nama, isolasi) for i, nama in enumerate(modul_list)]
+    # Satu proses baru per modul: state import dan pool koneksi tidak terbawa antar modul
+    with Pool(workers, maxtasksperchild=1) as pool:
+        for hasil in pool.imap_unordered(_jalankan_modul, tugas):
+            # Output modul dicetak utuh agar tidak bercampur antar worker
+            print(f"--- {hasil['modul']} ({hasil['durasi_modul']:.2f}s"
+                  f"{', db ' + hasil['database'] if hasil['database'] else ''}) ---")
+            print(hasil['output'])
+            semua_hasil.append(hasil)
+    durasi_total = time.perf_counter() - mulai
+    
+    tests_run = sum(h['tests_run'] for h in semua_hasil)
+    failures = [f for h in semua_hasil for f in h['failures']]
+    errors = [e for h in semua_hasil for e in h['errors']]
+    skipped = sum(h['skipped'] for h in semua_hasil)
+    passed = tests_run - len(failures) - len([e for e in errors if not e[0].endswith('(setup)')])
     
     # Print summary
     print("\n" + "="*70)
     print("TEST EXECUTION SUMMARY")
     print("="*70)
-    print(f"Total Tests Run   : {result.testsRun}")
-    print(f"Tests Passed      : {result.testsRun - len(result.failures) - len(result.errors)}")
-    print(f"Tests Failed      : {len(result.failures)}")
-    print(f"Tests with Errors : {len(result.errors)}")
-    print(f"Success Rate      : {(result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun * 100:.1f}%")
+    print(f"Total Tests Run   : {tests_run}")
+    print(f"Tests Passed      : {passed}")
+    print(f"Tests Failed      : {len(failures)}")
+    print(f"Tests with Errors : {len(errors)}")
+    print(f"Tests Skipped     : {skipped}")
+    print(f"Success Rate      : {passed / tests_run * 100 if tests_run else 0:.1f}%")
+    print(f"Wall Time         : {durasi_total:.2f}s "
+          f"(jumlah waktu modul {sum(h['durasi_modul'] for h in semua_hasil):.2f}s)")
+    
+    print("\nPer modul:")
+    for h in sorted(semua_hasil, key=lambda h: h['modul']):
+        status = "✅" if not h['failures'] and not h['errors'] else "❌"
+        print(f"  {status} {h['modul']:<30} {h['tests_run']:>4} test  {h['durasi_modul']:>7.2f}s")
+    
+    # Test paling lambat
+    durasi = [(nama, d) for h in semua_hasil for nama, d in h['durasi'].items()]
+    if slowest and durasi:
+        print("\n" + "="*70)
+        print(f"{slowest} TEST PALING LAMBAT:")
+        print("="*70)
+        for nama, d in sorted(durasi, key=lambda item: item[1], reverse=True)[:slowest]:
+            print(f"  {d:>8.3f}s  {nama}")
     
     # Print failures jika ada
-    if result.failures:
+    if failures:
         print("\n" + "="*70)
         print("FAILED TESTS:")
         print("="*70)
-        for test, traceback in result.failures:
+        for test, tb in failures:
             print(f"\n❌ {test}")
             print("-" * 50)
-            print(traceback)
+            print(tb)
     
     # Print errors jika ada
-    if result.errors:
+    if errors:
         print("\n" + "="*70)
         print("TESTS WITH ERRORS:")
         print("="*70)
-        for test, traceback in result.errors:
+        for test, tb in errors:
             print(f"\n⚠️ {test}")
             print("-" * 50)
-            print(traceback)
+            print(tb)
     
     # Return exit code
-    return 0 if result.wasSuccessful() else 1
+    return 0 if tests_run and not failures and not errors else 1
 
 if __name__ == '__main__':
     # Add current directory to Python path
-    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, BASE_DIR)
+    
+    parser = argparse.ArgumentParser(description='Jalankan unit test paralel dengan database sementara')
+    parser.add_argument('modul', nargs='*', help=f"Modul test (default: {', '.join(MODUL_TEST)})")
+    parser.add_argument('--workers', '-j', type=int, help='Jumlah proses worker (default: jumlah CPU)')
+    parser.add_argument('--slowest', type=int, default=10, help='Tampilkan N test paling lambat (0 = tidak)')
+    parser.add_argument('--tanpa-isolasi', action='store_true',
+                        help='Pakai database dari konfigurasi aplikasi, tanpa database sementara')
+    args = parser.parse_args()
     
     # Run tests
-    exit_code = run_all_tests()
+    exit_code = run_all_tests(args.modul, args.workers, args.slowest, not args.tanpa_isolasi)
     
     print("\n" + "="*70)
     if exit_code == 0:
@@ -90,4 +294,4 @@ if __name__ == '__main__':
         print("❌ SOME TESTS FAILED!")
     print("="*70)
     
-    sys.exit(exit_code)
\ No newline at end of file
+    sys.exit(exit_code)
@@ -0,0 +1,92 @@
+"""
+Database palsu untuk unit test tanpa server MySQL
+Test mendaftarkan handler per pola query (regex); handler menerima cursor
+dan params, mengembalikan list baris (atau None untuk query tanpa hasil)
+dan boleh mengisi cursor.rowcount / cursor.lastrowid. Handler pertama yang
+cocok dipakai, query yang tidak punya handler menggagalkan test.
+"""
+import re
+
+
+class CursorPalsu:
+    """Cursor dengan antarmuka yang dipakai modul database"""
+
+    def __init__(self, db, dictionary=False):
+        self.db = db
+        self.dictionary = dictionary
+        self.rowcount = -1
+        self.lastrowid = None
+        self.with_rows = False
+        self._baris = []
+
+    def execute(self, query, params=()):
+        params = tuple(params or ())
+        self.db.riwayat.append((' '.join(query.split()), params))
+        self.rowcount = 0
+        baris = self.db._jawab(self, query, params)
+        self.with_rows = baris is not None
+        self._baris = list(baris or [])
+        if baris is not None and not self.rowcount:
+            self.rowcount = len(self._baris)
+
+    def executemany(self, query, seq_params):
+        total = 0
+        for params in seq_params:
+            self.execute(query, params)
+            total += max(self.rowcount, 0)
+        self.rowcount = total
+
+    def fetchone(self):
+        return self._baris.pop(0) if self._baris else None
+
+    def fetchall(self):
+        baris, self._baris = self._baris, []
+        return baris
+
+    def close(self):
+        pass
+
+
+class KoneksiPalsu:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, dictionary=False, **kwargs):
+        return CursorPalsu(self.db, dictionary)
+
+    def commit(self):
+        self.db.jumlah_commit += 1
+
+    def rollback(self):
+        self.db.jumlah_rollback += 1
+
+    def close(self):
+        pass
+
+
+class DatabasePalsu:
+    """Pengganti DatabaseConnection: get_connection() mengembalikan KoneksiPalsu"""
+
+    def __init__(self):
+        self.handler = []
+        self.riwayat = []
+        self.jumlah_commit = 0
+        self.jumlah_rollback = 0
+
+    def saat(self, pola, fungsi):
+        """Daftarkan fungsi(cursor, params) untuk query yang cocok dengan pola"""
+        self.handler.append((re.compile(pola, re.IGNORECASE | re.DOTALL), fungsi))
+
+    def _jawab(self, cursor, query, params):
+        for pola, fungsi in self.handler:
+            if pola.search(query):
+                return fungsi(cursor, params)
+        raise AssertionError(f"Query tanpa handler: {' '.join(query.split())[:120]}")
+
+    def get_connection(self, *args, **kwargs):
+        return KoneksiPalsu(self)
+
+    def query(self, pola):
+        """Riwayat query yang cocok dengan pola: list (query, params)"""
+        regex = re.compile(pola, re.IGNORECASE)
+        return [(q, p) for q, p in self.riwayat if regex.search(q)]
@@ -0,0 +1,90 @@
+"""
+Unit test antrian dapur (models/antrian_dapur.py)
+"""
+import unittest
+from datetime import datetime
+
+from models.antrian_dapur import AntrianDapur
+
+BUTUH_DATABASE = False
+
+MAKANAN = [{'nama_menu': 'Nasi Goreng', 'jumlah': 1, 'nama_kategori': 'Makanan Utama'}]
+MINUMAN = [{'nama_menu': 'Es Teh', 'jumlah': 2, 'nama_kategori': 'Beverage'}]
+
+
+def menit(m):
+    return datetime(2026, 3, 2, 12, m)
+
+
+class TestAntrianDapur(unittest.TestCase):
+    """Urutan antrian, filter stasiun dan event subscriber"""
+
+    def setUp(self):
+        self.antrian = AntrianDapur()
+        self.event = []
+        self.antrian.subscribe(lambda event, pesanan: self.event.append((event, pesanan['id'])))
+        self.antrian.tambah_pesanan(1, 'K1', 'M05', MAKANAN, tanggal=menit(10))
+        self.antrian.tambah_pesanan(2, 'K2', 'M02', MAKANAN + MINUMAN, tanggal=menit(5))
+        self.antrian.tambah_pesanan(3, 'K3', 'M01', MINUMAN, tanggal=menit(10))
+
+    def ids(self, **filter):
+        return [p['id'] for p in self.antrian.daftar(**filter)]
+
+    def test_urut_umur_lalu_meja(self):
+        self.assertEqual(self.ids(), [2, 3, 1])
+        self.assertEqual(self.antrian.teratas()['id'], 2)
+
+    def test_filter_stasiun_dan_status(self):
+        self.assertEqual(self.ids(stasiun='bar'), [2, 3])
+        self.assertEqual(self.ids(stasiun='dapur'), [2, 1])
+        self.antrian.ubah_status(3, 'disajikan')
+        self.assertEqual(self.ids(status='disajikan'), [3])
+        self.assertEqual(self.antrian.daftar_stasiun(), ['bar', 'dapur'])
+
+    def test_transisi_status_dan_keluar(self):
+        self.assertEqual(self.antrian.status_berikutnya(2), 'disajikan')
+        self.antrian.ubah_status(2, 'disajikan')
+        self.assertEqual(self.antrian.status_berikutnya(2), 'selesai')
+        self.antrian.ubah_status(2, 'selesai')
+
+        self.assertIsNone(self.antrian.get(2))
+        self.assertEqual(self.ids(), [3, 1])
+        self.assertEqual(self.antrian.daftar_stasiun(), ['bar', 'dapur'])
+        self.assertEqual(self.event[-2:], [('status', 2), ('keluar', 2)])
+        self.assertIsNone(self.antrian.ubah_status(99, 'selesai'))
+
+    def test_pesanan_diganti_pindah_posisi(self):
+        self.antrian.tambah_pesanan(1, 'K1', 'M05', MINUMAN, tanggal=menit(1))
+        self.assertEqual(self.ids(), [1, 2, 3])
+        self.assertEqual(self.ids(stasiun='dapur'), [2])
+        self.assertEqual(self.event[-1], ('ubah', 1))
+
+    def test_ganti_id_tanpa_pindah_posisi(self):
+        self.antrian.tambah_pesanan(-1, 'K4', 'M03', MAKANAN, tanggal=menit(7))
+        self.antrian.ganti_id(-1, 40)
+        self.assertEqual(self.ids(), [2, 40, 3, 1])
+        self.assertIsNone(self.antrian.get(-1))
+        self.assertEqual(self.ids(stasiun='dapur'), [2, 40, 1])
+
+    def test_urutan_tidak_tumbuh_tanpa_batas(self):
+        for i in range(100):
+            self.antrian.tambah_pesanan(100 + i, f"X{i}", 'M09', MAKANAN, tanggal=menit(i % 60))
+            self.antrian.tambah_pesanan(100 + i, f"X{i}", 'M08', MAKANAN, tanggal=menit(i % 60))
+            self.antrian.ubah_status(100 + i, 'dibatalkan')
+        self.assertEqual(len(self.antrian._urutan), len(self.antrian))
+        self.assertEqual(self.ids(), [2, 3, 1])
+
+    def test_status_tertutup_tidak_masuk(self):
+        self.assertIsNone(self.antrian.tambah_pesanan(5, 'K5', 'M01', MAKANAN, status='selesai'))
+        self.assertEqual(len(self.antrian), 3)
+
+    def test_subscriber_per_stasiun(self):
+        bar = []
+        self.antrian.subscribe(lambda event, pesanan: bar.append(pesanan['id']), stasiun='bar')
+        self.antrian.ubah_status(1, 'disajikan')
+        self.antrian.ubah_status(3, 'disajikan')
+        self.assertEqual(bar, [3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+"""
+Unit test jurnal offline dan replay (database/ketahanan.py)
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from mysql.connector import Error
+
+from database.ketahanan import (
+    PENANDA_KOMPAKSI, CacheMaster, CircuitBreaker, DatabaseTidakTersedia,
+    JurnalPesanan, JurnalTerkunci, KoneksiTangguh, replay_jurnal
+)
+from tests.db_palsu import DatabasePalsu
+
+BUTUH_DATABASE = False
+
+
+def data_pesanan(kode, menu_id=1, jumlah=2):
+    return {
+        'kode_pesanan': kode,
+        'pelanggan_id': 1,
+        'meja_id': 3,
+        'tanggal': datetime(2026, 3, 2, 12, 0).isoformat(),
+        'total_harga': '50000.00',
+        'items': [{'menu_id': menu_id, 'jumlah': jumlah, 'harga_satuan': '25000.00'}],
+    }
+
+
+class DatabaseRestoranPalsu(DatabasePalsu):
+    """Tabel pesanan, detail dan stok ledger di memori"""
+
+    def __init__(self, stok=None):
+        super().__init__()
+        self.pesanan = {}
+        self.detail = []
+        self.stok = dict(stok or {1: 10})
+        self.putus = False
+
+        self.saat(r'SELECT id FROM pesanan WHERE kode_pesanan', self._cari_pesanan)
+        self.saat(r'FROM stok_snapshot', self._stok)
+        self.saat(r'INSERT INTO pesanan', self._insert_pesanan)
+        self.saat(r'INSERT INTO detail_pesanan', self._insert_detail)
+        self.saat(r'UPDATE meja', lambda cursor, params: None)
+        self.saat(r'UPDATE pesanan SET status_pesanan', lambda cursor, params: None)
+
+    def get_connection(self, *args, **kwargs):
+        if self.putus:
+            raise Error(msg="Can't connect to MySQL server", errno=2003)
+        return super().get_connection()
+
+    def _cari_pesanan(self, cursor, params):
+        pid = self.pesanan.get(params[0])
+        return [(pid,)] if pid else []
+
+    def _stok(self, cursor, params):
+        return [(menu_id, self.stok.get(menu_id, 0)) for menu_id in params]
+
+    def _insert_pesanan(self, cursor, params):
+        cursor.lastrowid = len(self.pesanan) + 1
+        self.pesanan[params[0]] = cursor.lastrowid
+
+    def _insert_detail(self, cursor, params):
+        # Meniru trigger trg_detail_pesanan_stok
+        self.detail.append(params)
+        self.stok[params[1]] -= params[2]
+        cursor.rowcount = 1
+
+
+class DatabaseBergilir:
+    """get_connection() menjalankan hasil berikutnya: exception di-raise, selain itu dikembalikan"""
+
+    def __init__(self, *hasil):
+        self.hasil = list(hasil)
+
+    def get_connection(self, *args, **kwargs):
+        hasil = self.hasil.pop(0)
+        if isinstance(hasil, BaseException):
+            raise hasil
+        return hasil
+
+
+class TestKoneksiTangguh(unittest.TestCase):
+    """Retry dan circuit breaker di depan DatabaseConnection"""
+
+    def koneksi(self, db, ambang_gagal=2, waktu_buka=0.0):
+        breaker = CircuitBreaker(ambang_gagal=ambang_gagal, waktu_buka=waktu_buka)
+        return KoneksiTangguh(db, percobaan=3, jeda_awal=0.0, breaker=breaker)
+
+    def test_error_koneksi_membuka_breaker(self):
+        putus = Error(msg="Can't connect to MySQL server", errno=2003)
+        koneksi = self.koneksi(DatabaseBergilir(putus, putus, 'conn'), waktu_buka=60.0)
+
+        with self.assertRaises(DatabaseTidakTersedia):
+            koneksi.get_connection()
+        self.assertTrue(koneksi.breaker.terbuka)
+        with self.assertRaises(DatabaseTidakTersedia):
+            koneksi.get_connection()
+
+        # Percobaan setengah-terbuka yang sukses menutup breaker
+        koneksi.breaker.waktu_buka = 0.0
+        self.assertEqual(koneksi.get_connection(), 'conn')
+        self.assertEqual(koneksi.breaker.status, CircuitBreaker.TERTUTUP)
+
+    def test_percobaan_gagal_bukan_error_koneksi_tidak_mengunci_breaker(self):
+        for gagal in (Error(msg="Failed getting connection; pool exhausted"),
+                      Error(msg="Too many connections", errno=1040),
+                      RuntimeError("bug")):
+            with self.subTest(gagal=gagal):
+                koneksi = self.koneksi(DatabaseBergilir(gagal, 'conn'), ambang_gagal=1)
+                koneksi.breaker.catat_gagal()
+
+                with self.assertRaises(type(gagal)):
+                    koneksi.get_connection()
+                self.assertEqual(koneksi.breaker._status, CircuitBreaker.TERBUKA)
+
+                # Setelah waktu_buka, percobaan berikutnya tetap mendapat giliran
+                self.assertEqual(koneksi.get_connection(), 'conn')
+                self.assertEqual(koneksi.breaker.status, CircuitBreaker.TERTUTUP)
+
+    def test_error_query_saat_tertutup_tidak_dihitung(self):
+        koneksi = self.koneksi(DatabaseBergilir(Error(msg="pool exhausted"), 'conn'), ambang_gagal=1)
+        with self.assertRaises(Error):
+            koneksi.get_connection()
+        self.assertEqual(koneksi.breaker.status, CircuitBreaker.TERTUTUP)
+
+
+class TestJurnalPesanan(unittest.TestCase):
+    """Penulisan, status selesai dan kompaksi jurnal"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.jurnal = JurnalPesanan(jurnal_dir=self.folder)
+
+    def tearDown(self):
+        self.jurnal._file.close()
+        self.jurnal._file_kunci.close()
+        shutil.rmtree(self.folder)
+
+    def buka_ulang(self):
+        self.jurnal._file.close()
+        self.jurnal._file_kunci.close()
+        self.jurnal = JurnalPesanan(jurnal_dir=self.folder)
+        return self.jurnal
+
+    def test_catat_dan_tertunda(self):
+        seq1 = self.jurnal.catat('pesanan', data_pesanan('A1'))
+        seq2 = self.jurnal.catat('status', {'kode_pesanan': 'A1', 'status': 'selesai'})
+        self.assertEqual((seq1, seq2), (1, 2))
+
+        self.jurnal.tandai_selesai(seq1)
+        self.assertEqual([e['seq'] for e in self.jurnal.tertunda()], [2])
+        self.assertEqual(self.buka_ulang().jumlah_tertunda(), 1)
+
+    def test_folder_terkunci_untuk_proses_kedua(self):
+        with self.assertRaises(JurnalTerkunci):
+            JurnalPesanan(jurnal_dir=self.folder)
+
+    def test_baris_terpotong_dilewati(self):
+        self.jurnal.catat('pesanan', data_pesanan('A1'))
+        with open(self.jurnal.path, 'a', encoding='utf-8') as f:
+            f.write('{"seq": 2, "jenis": "pes')
+        self.assertEqual(self.buka_ulang().jumlah_tertunda(), 1)
+
+    def test_kompaksi_hanya_jika_semua_selesai(self):
+        seq = self.jurnal.catat('pesanan', data_pesanan('A1'))
+        self.assertFalse(self.jurnal.kompaksi())
+        self.jurnal.tandai_selesai(seq)
+        self.assertTrue(self.jurnal.kompaksi())
+
+        with open(self.jurnal.path, encoding='utf-8') as f:
+            baris = [json.loads(b) for b in f]
+        self.assertEqual(baris, [{'seq': 1, 'jenis': PENANDA_KOMPAKSI, 'waktu': baris[0]['waktu']}])
+
+    def test_seq_lanjut_setelah_kompaksi_dan_restart(self):
+        for kode in ('A1', 'A2', 'A3'):
+            self.jurnal.tandai_selesai(self.jurnal.catat('pesanan', data_pesanan(kode)))
+        self.jurnal.kompaksi()
+
+        # Proses mati setelah jurnal diganti tapi sebelum .selesai dikosongkan
+        with open(self.jurnal.path_selesai, 'w', encoding='utf-8') as f:
+            f.write("1\n2\n3\n")
+
+        jurnal = self.buka_ulang()
+        seq = jurnal.catat('pesanan', data_pesanan('A4'))
+        self.assertEqual(seq, 4)
+        self.assertEqual([e['seq'] for e in jurnal.tertunda()], [4])
+
+
+class TestReplayJurnal(unittest.TestCase):
+    """Replay entri jurnal ke database"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.jurnal = JurnalPesanan(jurnal_dir=self.folder)
+        self.db = DatabaseRestoranPalsu()
+
+    def tearDown(self):
+        self.jurnal._file.close()
+        self.jurnal._file_kunci.close()
+        shutil.rmtree(self.folder)
+
+    def test_replay_menyimpan_dan_kompaksi(self):
+        self.jurnal.catat('pesanan', data_pesanan('A1'))
+        self.jurnal.catat('status', {'kode_pesanan': 'A1', 'status': 'diproses'})
+
+        hasil = replay_jurnal(self.jurnal, self.db)
+
+        self.assertEqual(hasil, {'A1': 1})
+        self.assertEqual(self.db.stok[1], 8)
+        self.assertEqual(self.jurnal.jumlah_tertunda(), 0)
+        self.assertEqual(self.db.jumlah_commit, 2)
+        with open(self.jurnal.path, encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline())['jenis'], PENANDA_KOMPAKSI)
+
+    def test_kode_yang_sudah_ada_tidak_disimpan_ulang(self):
+        self.db.pesanan['A1'] = 7
+        self.jurnal.catat('pesanan', data_pesanan('A1'))
+
+        hasil = replay_jurnal(self.jurnal, self.db)
+
+        self.assertEqual(hasil, {'A1': 7})
+        self.assertEqual(self.db.detail, [])
+        self.assertEqual(self.db.stok[1], 10)
+
+    def test_stok_tidak_cukup_masuk_file_gagal(self):
+        self.jurnal.catat('pesanan', data_pesanan('A1', jumlah=11))
+        self.jurnal.catat('pesanan', data_pesanan('A2', jumlah=1))
+
+        hasil = replay_jurnal(self.jurnal, self.db)
+
+        self.assertEqual(hasil, {'A2': 1})
+        self.assertEqual(self.db.jumlah_rollback, 1)
+        with open(self.jurnal.path_gagal, encoding='utf-8') as f:
+            gagal = [json.loads(b) for b in f]
+        self.assertEqual([g['entri']['data']['kode_pesanan'] for g in gagal], ['A1'])
+        self.assertIn('Stok tidak cukup', gagal[0]['alasan'])
+
+    def test_koneksi_putus_menghentikan_replay(self):
+        self.jurnal.catat('pesanan', data_pesanan('A1'))
+        self.db.putus = True
+
+        self.assertEqual(replay_jurnal(self.jurnal, self.db), {})
+        self.assertEqual(self.jurnal.jumlah_tertunda(), 1)
+        self.assertFalse(os.path.exists(self.jurnal.path_gagal))
+
+        self.db.putus = False
+        self.assertEqual(replay_jurnal(self.jurnal, self.db), {'A1': 1})
+
+
+class TestCacheMaster(unittest.TestCase):
+    """Cache data master bertahan lintas restart"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_decimal_dan_datetime_dipulihkan(self):
+        data = [{'id': 1, 'harga': Decimal('25000.00'), 'dibuat': datetime(2026, 3, 2, 12, 0)}]
+        CacheMaster(self.folder).simpan('menu', data)
+        self.assertEqual(CacheMaster(self.folder).get('menu'), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit test generator kode_pesanan (utils/kode_pesanan.py)
+"""
+import os
+import unittest
+from unittest import mock
+
+from utils.kode_pesanan import (
+    MAX_WORKER, PREFIX, GeneratorKodePesanan, urai_kode, worker_id_dari_env
+)
+
+BUTUH_DATABASE = False
+
+
+class TestWorkerIdDariEnv(unittest.TestCase):
+    """Worker id default dari TERMINAL_ID, tanpa fallback pid"""
+
+    def test_terminal_id_valid(self):
+        with mock.patch.dict(os.environ, {'TERMINAL_ID': '17'}):
+            self.assertEqual(worker_id_dari_env(), 17)
+
+    def test_tanpa_terminal_id_gagal(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                worker_id_dari_env()
+
+    def test_terminal_id_tidak_valid_gagal(self):
+        for nilai in ('', 'abc', '-1', str(MAX_WORKER + 1)):
+            with self.subTest(nilai=nilai), mock.patch.dict(os.environ, {'TERMINAL_ID': nilai}):
+                with self.assertRaises(ValueError):
+                    worker_id_dari_env()
+
+    def test_generator_default_pakai_env(self):
+        with mock.patch.dict(os.environ, {'TERMINAL_ID': '5'}):
+            self.assertEqual(GeneratorKodePesanan().worker_id, 5)
+
+    def test_generator_default_tanpa_env_gagal(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                GeneratorKodePesanan()
+
+
+class TestGeneratorKodePesanan(unittest.TestCase):
+    """Kode unik, monoton dan bisa diurai kembali"""
+
+    def test_kode_unik_dan_urut(self):
+        generator = GeneratorKodePesanan(3)
+        kode = [generator.next_kode() for _ in range(10000)]
+        self.assertEqual(len(set(kode)), len(kode))
+        self.assertEqual(kode, sorted(kode))
+        self.assertTrue(all(k.startswith(PREFIX) and len(k) <= 20 for k in kode))
+
+    def test_worker_berbeda_tidak_bentrok(self):
+        a, b = GeneratorKodePesanan(1), GeneratorKodePesanan(2)
+        kode_a = {a.next_kode() for _ in range(5000)}
+        kode_b = {b.next_kode() for _ in range(5000)}
+        self.assertFalse(kode_a & kode_b)
+
+    def test_urai_kode(self):
+        generator = GeneratorKodePesanan(42)
+        _, worker, urut = urai_kode(generator.next_kode())
+        self.assertEqual(worker, 42)
+        self.assertEqual(urut, 0)
+
+    def test_jam_mundur_tetap_monoton(self):
+        generator = GeneratorKodePesanan(7)
+        with mock.patch('utils.kode_pesanan.time.time', return_value=1800000000.0):
+            pertama = generator.next_id()
+        with mock.patch('utils.kode_pesanan.time.time', return_value=1799999999.0):
+            kedua = generator.next_id()
+        self.assertGreater(kedua, pertama)
+
+    def test_worker_id_di_luar_rentang(self):
+        with self.assertRaises(ValueError):
+            GeneratorKodePesanan(MAX_WORKER + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
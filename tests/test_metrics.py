@@ -0,0 +1,162 @@
+"""
+Unit test registry metrik (utils/metrics.py) dan metrik koneksi (database/terukur.py)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mysql.connector import Error, pooling
+
+from database.terukur import ERROR_DB, KONEKSI_POOL_DIPINJAM, KoneksiTerukur, instrumentasi_pool
+from utils.metrics import RegistryMetrik
+
+BUTUH_DATABASE = False
+
+
+class TestRegistryMetrik(unittest.TestCase):
+    """Format teks Prometheus dari registry"""
+
+    def setUp(self):
+        self.registry = RegistryMetrik()
+
+    def test_counter_dan_gauge(self):
+        counter = self.registry.counter('uji_total', 'Jumlah uji', ('jenis',))
+        counter.inc(jenis='a')
+        counter.inc(2, jenis='b"x')
+        gauge = self.registry.gauge('uji_gauge', 'Nilai uji')
+        gauge.set(1.5)
+
+        self.assertEqual(self.registry.render(), (
+            '# HELP uji_gauge Nilai uji\n'
+            '# TYPE uji_gauge gauge\n'
+            'uji_gauge 1.5\n'
+            '# HELP uji_total Jumlah uji\n'
+            '# TYPE uji_total counter\n'
+            'uji_total{jenis="a"} 1\n'
+            'uji_total{jenis="b\\"x"} 2\n'
+        ))
+
+    def test_metrik_tanpa_label_tampil_nol(self):
+        self.registry.counter('kosong_total', 'Belum pernah naik')
+        self.assertIn('kosong_total 0\n', self.registry.render())
+
+    def test_histogram_kumulatif(self):
+        histogram = self.registry.histogram('uji_detik', 'Durasi', ('op',), bucket=(0.1, 1.0))
+        for nilai in (0.05, 0.5, 0.5, 3):
+            histogram.observe(nilai, op='select')
+
+        self.assertEqual(self.registry.render().splitlines()[2:], [
+            'uji_detik_bucket{op="select",le="0.1"} 1',
+            'uji_detik_bucket{op="select",le="1"} 3',
+            'uji_detik_bucket{op="select",le="+Inf"} 4',
+            'uji_detik_sum{op="select"} 4.05',
+            'uji_detik_count{op="select"} 4',
+        ])
+
+    def test_daftar_ulang_dan_label_salah(self):
+        counter = self.registry.counter('uji_total', 'Jumlah uji', ('jenis',))
+        self.assertIs(self.registry.counter('uji_total', 'Jumlah uji', ('jenis',)), counter)
+        with self.assertRaises(ValueError):
+            self.registry.gauge('uji_total', 'Jumlah uji', ('jenis',))
+        with self.assertRaises(ValueError):
+            counter.inc(operasi='a')
+        with self.assertRaises(ValueError):
+            counter.inc(-1, jenis='a')
+
+    def test_dump_ke_file(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, 'textfile', 'resto.prom')
+        self.registry.gauge('uji_gauge', 'Nilai uji').set(3)
+
+        self.registry.dump(path)
+
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), self.registry.render())
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['resto.prom'])
+
+
+class PoolUji(pooling.MySQLConnectionPool):
+    pool_name = 'uji'
+    pool_size = 2
+
+    def __init__(self):
+        pass
+
+
+class KoneksiAsli:
+    def cursor(self, *args, **kwargs):
+        return mock.Mock()
+
+    def close(self):
+        pass
+
+
+class DatabaseUji:
+    """Seperti DatabaseConnection: error pool ditelan dan dikembalikan sebagai None"""
+
+    def __init__(self, telan_error=True):
+        self.pool = PoolUji()
+        self.telan_error = telan_error
+
+    def get_connection(self):
+        try:
+            return self.pool.get_connection()
+        except Error:
+            if self.telan_error:
+                return None
+            raise
+
+
+class TestKoneksiTerukur(unittest.TestCase):
+    """Error koneksi dihitung sekali, di pool jika pool terinstrumentasi"""
+
+    def pasang_pool(self, get_connection, instrumentasi=True):
+        patcher = mock.patch.object(pooling.MySQLConnectionPool, 'get_connection', get_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        if instrumentasi:
+            instrumentasi_pool()
+
+    def error_koneksi(self):
+        return ERROR_DB.nilai(jenis='koneksi')
+
+    @staticmethod
+    def pool_habis(pool):
+        raise Error(msg="Failed getting connection; pool exhausted")
+
+    def test_error_pool_ditelan_dihitung_sekali(self):
+        self.pasang_pool(self.pool_habis)
+        sebelum = self.error_koneksi()
+        self.assertIsNone(KoneksiTerukur(DatabaseUji()).get_connection())
+        self.assertEqual(self.error_koneksi() - sebelum, 1)
+
+    def test_error_pool_diteruskan_dihitung_sekali(self):
+        self.pasang_pool(self.pool_habis)
+        sebelum = self.error_koneksi()
+        with self.assertRaises(Error):
+            KoneksiTerukur(DatabaseUji(telan_error=False)).get_connection()
+        self.assertEqual(self.error_koneksi() - sebelum, 1)
+
+    def test_tanpa_instrumentasi_pool_dihitung_pembungkus(self):
+        self.pasang_pool(self.pool_habis, instrumentasi=False)
+        sebelum = self.error_koneksi()
+        self.assertIsNone(KoneksiTerukur(DatabaseUji()).get_connection())
+        self.assertEqual(self.error_koneksi() - sebelum, 1)
+
+    def test_koneksi_dipinjam_per_pool(self):
+        self.pasang_pool(lambda pool: KoneksiAsli())
+        db = KoneksiTerukur(DatabaseUji())
+        sebelum = KONEKSI_POOL_DIPINJAM.nilai(pool='uji')
+
+        conn = db.get_connection()
+        self.assertEqual(KONEKSI_POOL_DIPINJAM.nilai(pool='uji') - sebelum, 1)
+        conn.close()
+        conn.close()
+        self.assertEqual(KONEKSI_POOL_DIPINJAM.nilai(pool='uji'), sebelum)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Unit test pemecah statement dan penerap migrasi (database/migrasi.py)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from mysql.connector import Error
+
+from database.migrasi import (
+    Migrator, _checksum, _perubahan_ganda, daftar_file_migrasi, pecah_statement
+)
+from tests.db_palsu import DatabasePalsu
+
+BUTUH_DATABASE = False
+
+
+class TestPecahStatement(unittest.TestCase):
+    """Pemecahan isi file SQL menjadi statement"""
+
+    def test_titik_koma_dan_komentar(self):
+        sql = (
+            "-- komentar baris\n"
+            "CREATE TABLE a (id INT); # komentar pagar\n"
+            "/* komentar; blok */ INSERT INTO a VALUES (1);\n"
+        )
+        self.assertEqual(pecah_statement(sql), ["CREATE TABLE a (id INT)", "INSERT INTO a VALUES (1)"])
+
+    def test_titik_koma_di_dalam_string(self):
+        sql = "INSERT INTO a VALUES ('x;y', \"it\\\"s;\"); SELECT `a;b` FROM a"
+        self.assertEqual(pecah_statement(sql), [
+            "INSERT INTO a VALUES ('x;y', \"it\\\"s;\")",
+            "SELECT `a;b` FROM a",
+        ])
+
+    def test_delimiter_trigger(self):
+        sql = (
+            "DROP TRIGGER IF EXISTS t;\n"
+            "DELIMITER $$\n"
+            "CREATE TRIGGER t AFTER INSERT ON a\n"
+            "FOR EACH ROW BEGIN\n"
+            "    UPDATE b SET n = n + 1;\n"
+            "END$$\n"
+            "DELIMITER ;\n"
+            "SELECT 1;\n"
+        )
+        hasil = pecah_statement(sql)
+        self.assertEqual(len(hasil), 3)
+        self.assertTrue(hasil[1].startswith("CREATE TRIGGER t"))
+        self.assertTrue(hasil[1].endswith("END"))
+        self.assertIn("UPDATE b SET n = n + 1;", hasil[1])
+        self.assertEqual(hasil[2], "SELECT 1")
+
+    def test_file_migrasi_terpecah_tanpa_alter_ganda(self):
+        for versi, nama, path in daftar_file_migrasi():
+            with self.subTest(file=nama), open(path, encoding='utf-8') as f:
+                statements = pecah_statement(f.read())
+            self.assertTrue(statements)
+            self.assertFalse(any(s.upper().startswith('DELIMITER') for s in statements))
+            self.assertEqual([s for s in statements if _perubahan_ganda(s)], [])
+
+
+class TestPerubahanGanda(unittest.TestCase):
+    """Deteksi ALTER TABLE dengan lebih dari satu perubahan"""
+
+    def test_satu_perubahan(self):
+        self.assertFalse(_perubahan_ganda("ALTER TABLE a ADD COLUMN b DECIMAL(10,2)"))
+        self.assertFalse(_perubahan_ganda("ALTER TABLE a ADD INDEX idx (b, c), ALGORITHM=INPLACE, LOCK=NONE"))
+        self.assertFalse(_perubahan_ganda("ALTER TABLE a ADD COLUMN s ENUM('x', 'y')"))
+
+    def test_beberapa_perubahan(self):
+        self.assertTrue(_perubahan_ganda("ALTER TABLE a ADD COLUMN b INT, ADD INDEX idx (b)"))
+
+    def test_bukan_alter(self):
+        self.assertFalse(_perubahan_ganda("CREATE TABLE a (b INT, c INT)"))
+
+
+class TestDaftarFileMigrasi(unittest.TestCase):
+    """Penomoran file migrasi"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def tulis(self, nama, isi="SELECT 1;\n", newline=None):
+        with open(os.path.join(self.folder, nama), 'w', encoding='utf-8', newline=newline) as f:
+            f.write(isi)
+
+    def test_urut_versi_dan_abaikan_file_lain(self):
+        self.tulis('010_b.sql')
+        self.tulis('002_a.sql')
+        self.tulis('catatan.txt')
+        self.assertEqual([v for v, _, _ in daftar_file_migrasi(self.folder)], [2, 10])
+
+    def test_versi_ganda_error(self):
+        self.tulis('002_a.sql')
+        self.tulis('02_b.sql')
+        with self.assertRaises(ValueError):
+            daftar_file_migrasi(self.folder)
+
+    def test_checksum_sama_untuk_crlf(self):
+        self.tulis('001_lf.sql', "SELECT 1;\nSELECT 2;\n", newline='\n')
+        self.tulis('002_crlf.sql', "SELECT 1;\nSELECT 2;\n", newline='\r\n')
+        (_, _, lf), (_, _, crlf) = daftar_file_migrasi(self.folder)
+        self.assertEqual(_checksum(lf), _checksum(crlf))
+
+
+class TestJalankanFile(unittest.TestCase):
+    """Error "sudah diterapkan" hanya dilewati untuk statement satu perubahan"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.db = DatabasePalsu()
+        self.cursor = self.db.get_connection().cursor()
+        self.migrator = Migrator(db=self.db, folder=self.folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def jalankan(self, sql):
+        path = os.path.join(self.folder, '001_uji.sql')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(sql)
+        self.migrator._jalankan_file(self.cursor, path)
+
+    def gagal(self, errno):
+        def handler(cursor, params):
+            raise Error(msg=f"error {errno}", errno=errno)
+        return handler
+
+    def test_kolom_sudah_ada_dilewati(self):
+        self.db.saat(r'ADD COLUMN', self.gagal(1060))
+        self.db.saat(r'ADD INDEX', lambda cursor, params: None)
+
+        self.jalankan("ALTER TABLE a ADD COLUMN b INT;\nALTER TABLE a ADD INDEX idx_b (b);\n")
+        self.assertEqual(len(self.db.query(r'ADD INDEX')), 1)
+
+    def test_alter_ganda_tidak_dilewati(self):
+        self.db.saat(r'ADD COLUMN', self.gagal(1060))
+
+        with self.assertRaises(Error):
+            self.jalankan("ALTER TABLE a ADD COLUMN b INT, ADD INDEX idx_b (b);\n")
+
+    def test_error_lain_tidak_dilewati(self):
+        self.db.saat(r'CREATE TABLE', self.gagal(1064))
+
+        with self.assertRaises(Error):
+            self.jalankan("CREATE TABLE a (id INT);\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Unit test consumer outbox (database/outbox.py)
+"""
+import json
+import unittest
+from unittest import mock
+
+from database.outbox import OutboxConsumer
+from tests.db_palsu import DatabasePalsu
+
+BUTUH_DATABASE = False
+
+
+class OutboxPalsu(DatabasePalsu):
+    """outbox_event dan outbox_offset di memori; umur event dalam detik"""
+
+    def __init__(self):
+        super().__init__()
+        self.event = {}
+        self.offset = {}
+
+        self.saat(r'SELECT last_event_id FROM outbox_offset', self._baca_offset)
+        self.saat(r'INSERT INTO outbox_offset', self._simpan_offset)
+        self.saat(r'SELECT COALESCE\(MAX\(id\), 0\) FROM outbox_event', self._max_id)
+        self.saat(r'FROM outbox_event\s+WHERE id > %s', self._baca_event)
+        self.saat(r'FROM outbox_event\s+WHERE id IN', self._baca_celah)
+        self.saat(r'@@innodb_lock_wait_timeout', lambda cursor, params: [(50,)])
+
+    def tambah(self, event_id, tabel='pesanan', umur=60, payload=None):
+        self.event[event_id] = {
+            'tabel': tabel, 'aksi': 'insert', 'row_id': event_id,
+            'payload': json.dumps(payload or {'id': event_id}), 'umur': umur,
+        }
+
+    def _baca_offset(self, cursor, params):
+        return [(self.offset[params[0]],)] if params[0] in self.offset else []
+
+    def _simpan_offset(self, cursor, params):
+        self.offset[params[0]] = params[1]
+
+    def _max_id(self, cursor, params):
+        return [(max(self.event, default=0),)]
+
+    def _baris(self, i):
+        e = self.event[i]
+        return {'id': i, 'tabel': e['tabel'], 'aksi': e['aksi'], 'row_id': e['row_id'],
+                'payload': e['payload'], 'dibuat_pada': None}
+
+    def _baca_celah(self, cursor, params):
+        return [self._baris(i) for i in sorted(params) if i in self.event]
+
+    def _baca_event(self, cursor, params):
+        jeda, offset, limit = params
+        return [
+            dict(self._baris(i), matang=int(e['umur'] >= jeda))
+            for i, e in sorted(self.event.items()) if i > offset
+        ][:limit]
+
+
+class TestOutboxConsumer(unittest.TestCase):
+    """Tailing outbox dengan offset dan penanganan celah id"""
+
+    def setUp(self):
+        self.db = OutboxPalsu()
+        self.consumer = OutboxConsumer('test', db=self.db, batch_size=10, jeda_aman=10)
+        self.diterima = []
+        self.consumer.subscribe('*', lambda event: self.diterima.append(event['id']))
+
+    def test_event_berurutan_dan_offset_disimpan(self):
+        for i in (1, 2, 3):
+            self.db.tambah(i)
+
+        self.assertEqual(self.consumer.poll_sekali(), 3)
+        self.assertEqual(self.diterima, [1, 2, 3])
+        self.assertEqual(self.db.offset['test'], 3)
+        self.assertEqual(self.consumer.poll_sekali(), 0)
+
+    def test_subscriber_per_tabel_dan_payload_json(self):
+        payload = []
+        self.consumer.subscribe('menu', lambda event: payload.append(event['payload']))
+        self.db.tambah(1, tabel='pesanan')
+        self.db.tambah(2, tabel='menu', payload={'harga': 25000})
+
+        self.consumer.poll_sekali()
+        self.assertEqual(payload, [{'harga': 25000}])
+
+    def test_celah_baru_ditunggu(self):
+        self.db.tambah(1)
+        self.db.tambah(3, umur=2)
+
+        self.assertEqual(self.consumer.poll_sekali(), 1)
+        self.assertEqual(self.db.offset['test'], 1)
+
+        # Transaksi id 2 commit belakangan: tetap terkirim berurutan
+        self.db.tambah(2, umur=1)
+        self.consumer.poll_sekali()
+        self.assertEqual(self.diterima, [1, 2, 3])
+
+    def test_celah_matang_dilewati(self):
+        self.db.tambah(1)
+        self.db.tambah(3, umur=30)
+
+        self.assertEqual(self.consumer.poll_sekali(), 2)
+        self.assertEqual(self.diterima, [1, 3])
+        self.assertEqual(self.db.offset['test'], 3)
+
+    def test_celah_dilewati_tetap_dicari_ulang(self):
+        self.db.tambah(1)
+        self.db.tambah(4, umur=30)
+        self.consumer.poll_sekali()
+        self.assertEqual(sorted(self.consumer._celah), [2, 3])
+
+        # Transaksi lambat id 3 commit setelah celahnya dilewati
+        terlambat = []
+        self.consumer.subscribe('*', lambda event: terlambat.append(event.get('terlambat', False)))
+        self.db.tambah(3, umur=0)
+        self.db.tambah(5)
+
+        self.assertEqual(self.consumer.poll_sekali(), 2)
+        self.assertEqual(self.diterima, [1, 4, 3, 5])
+        self.assertEqual(terlambat, [True, False])
+        self.assertEqual(sorted(self.consumer._celah), [2])
+        self.assertEqual(self.db.offset['test'], 5)
+
+    def test_celah_kedaluwarsa_dianggap_rollback(self):
+        self.db.tambah(1)
+        self.db.tambah(3, umur=30)
+        with mock.patch('database.outbox.time.monotonic', return_value=1000.0):
+            self.consumer.poll_sekali()
+        # jeda_aman 10 + 2 x innodb_lock_wait_timeout 50
+        self.assertEqual(self.consumer._celah, {2: 1110.0})
+
+        self.db.riwayat = []
+        with mock.patch('database.outbox.time.monotonic', return_value=1110.0):
+            self.assertEqual(self.consumer.poll_sekali(), 0)
+        self.assertEqual(self.consumer._celah, {})
+        self.assertEqual(self.db.query(r'WHERE id IN'), [])
+
+    def test_subscriber_gagal_menyimpan_event_terakhir_yang_sukses(self):
+        def gagal_di_dua(event):
+            if event['id'] == 2:
+                raise RuntimeError("subscriber gagal")
+        self.consumer.subscribe('pesanan', gagal_di_dua)
+        for i in (1, 2, 3):
+            self.db.tambah(i)
+
+        with self.assertRaises(RuntimeError):
+            self.consumer.poll_sekali()
+        self.assertEqual(self.db.offset['test'], 1)
+
+    def test_lanjutkan_tanpa_checkpoint_mulai_dari_event_terbaru(self):
+        for i in (1, 2, 3):
+            self.db.tambah(i)
+
+        self.assertEqual(self.consumer.lanjutkan(), 3)
+        self.db.tambah(4)
+        self.consumer.poll_sekali()
+        self.assertEqual(self.diterima, [4])
+
+    def test_lanjutkan_dari_checkpoint(self):
+        for i in (1, 2, 3):
+            self.db.tambah(i)
+        self.db.offset['test'] = 1
+
+        self.assertEqual(self.consumer.lanjutkan(), 1)
+        self.consumer.poll_sekali()
+        self.assertEqual(self.diterima, [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Unit test penggabungan hasil fan-out multi-outlet (database/shard.py)
+"""
+import unittest
+from decimal import Decimal
+
+from database.shard import HasilFanOut, gabung_halaman, gabung_jumlah, gabung_top_n
+
+BUTUH_DATABASE = False
+
+
+def hasil_dari(per_outlet):
+    hasil = HasilFanOut()
+    for outlet, rows in per_outlet.items():
+        hasil.per_outlet[outlet] = [dict(row, outlet=outlet) for row in rows]
+    return hasil
+
+
+class TestGabungJumlah(unittest.TestCase):
+    """Penjumlahan per kunci grup lintas outlet"""
+
+    def test_total_tanpa_kunci(self):
+        hasil = hasil_dari({
+            'pusat': [{'jumlah': 3, 'pendapatan': Decimal('150000.50')}],
+            'cabang': [{'jumlah': 2, 'pendapatan': None}],
+        })
+        self.assertEqual(gabung_jumlah(hasil, (), ('jumlah', 'pendapatan')), [
+            {'jumlah': 5, 'pendapatan': Decimal('150000.50'), 'jumlah_outlet': 2},
+        ])
+
+    def test_per_kunci(self):
+        hasil = hasil_dari({
+            'pusat': [{'menu': 'Nasi', 'jumlah': 3}, {'menu': 'Teh', 'jumlah': 1}],
+            'cabang': [{'menu': 'Nasi', 'jumlah': 4}],
+        })
+        self.assertEqual(gabung_jumlah(hasil, ('menu',), ('jumlah',)), [
+            {'menu': 'Nasi', 'jumlah': 7, 'jumlah_outlet': 2},
+            {'menu': 'Teh', 'jumlah': 1, 'jumlah_outlet': 1},
+        ])
+
+    def test_tanpa_hasil(self):
+        self.assertEqual(gabung_jumlah(HasilFanOut(), ('menu',), ('jumlah',)), [])
+
+
+class TestGabungTopN(unittest.TestCase):
+    """Top-N lintas outlet, dengan dan tanpa penjumlahan grup"""
+
+    def test_top_n_grup_dijumlahkan_dulu(self):
+        # Teh bukan teratas di outlet mana pun, tetapi teratas secara total
+        hasil = hasil_dari({
+            'pusat': [{'menu': 'Nasi', 'jumlah': 5, 'pendapatan': 50}, {'menu': 'Teh', 'jumlah': 4, 'pendapatan': 8}],
+            'cabang': [{'menu': 'Mie', 'jumlah': 6, 'pendapatan': 60}, {'menu': 'Teh', 'jumlah': 4, 'pendapatan': 8}],
+        })
+        top = gabung_top_n(hasil, 2, 'jumlah', kunci=('menu',), jumlahkan=('pendapatan',))
+        self.assertEqual([(r['menu'], r['jumlah'], r['pendapatan']) for r in top], [('Teh', 8, 16), ('Mie', 6, 60)])
+
+    def test_top_n_baris_mandiri(self):
+        hasil = hasil_dari({
+            'pusat': [{'id': 1, 'total': 90}, {'id': 2, 'total': 40}],
+            'cabang': [{'id': 1, 'total': 70}, {'id': 3, 'total': None}],
+        })
+        top = gabung_top_n(hasil, 3, 'total')
+        self.assertEqual([(r['outlet'], r['id']) for r in top], [('pusat', 1), ('cabang', 1), ('pusat', 2)])
+
+
+class TestGabungHalaman(unittest.TestCase):
+    """Halaman dari merge hasil terurut per outlet"""
+
+    def setUp(self):
+        self.hasil = hasil_dari({
+            'pusat': [{'waktu': 9}, {'waktu': 6}, {'waktu': 2}],
+            'cabang': [{'waktu': 8}, {'waktu': 7}, {'waktu': 1}],
+            'kosong': [],
+        })
+
+    def test_halaman_menurun(self):
+        halaman = gabung_halaman(self.hasil, 'waktu', offset=2, limit=3)
+        self.assertEqual([r['waktu'] for r in halaman], [7, 6, 2])
+
+    def test_halaman_menaik_dan_melewati_akhir(self):
+        for rows in self.hasil.per_outlet.values():
+            rows.reverse()
+        halaman = gabung_halaman(self.hasil, 'waktu', offset=4, limit=5, menurun=False)
+        self.assertEqual([r['waktu'] for r in halaman], [8, 9])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit test ledger stok dan kompaksi (database/stok_ledger.py)
+"""
+import unittest
+
+from database.stok_ledger import StokLedger, StokTidakCukup, periksa_stok
+from tests.db_palsu import DatabasePalsu
+
+BUTUH_DATABASE = False
+
+
+class LedgerPalsu(DatabasePalsu):
+    """menu, stok_ledger dan stok_snapshot di memori; umur baris ledger dalam detik"""
+
+    def __init__(self, menu):
+        super().__init__()
+        self.menu = dict(menu)
+        self.ledger = []
+        self.snapshot = {}
+
+        self.saat(r'INSERT IGNORE INTO stok_snapshot', self._seed_snapshot)
+        self.saat(r'SELECT COALESCE\(MAX\(id\), 0\) FROM stok_ledger\s+WHERE dibuat_pada', self._batas_id)
+        self.saat(r'SELECT l\.menu_id, SUM\(l\.delta\)', self._delta_per_menu)
+        self.saat(r'UPDATE stok_snapshot\s+SET stok = stok', self._lipat)
+        self.saat(r'UPDATE stok_snapshot SET ledger_id_terakhir', self._geser)
+        self.saat(r'FROM stok_snapshot s\s+LEFT JOIN stok_ledger', self._stok)
+        self.saat(r'INSERT INTO stok_ledger', self._catat)
+
+    def tambah_ledger(self, menu_id, delta, umur=120):
+        self.ledger.append({'id': len(self.ledger) + 1, 'menu_id': menu_id, 'delta': delta, 'umur': umur})
+
+    def _id_max(self):
+        return max((l['id'] for l in self.ledger), default=0)
+
+    def _seed_snapshot(self, cursor, params):
+        for menu_id, stok in self.menu.items():
+            self.snapshot.setdefault(menu_id, [stok, self._id_max()])
+
+    def _batas_id(self, cursor, params):
+        return [(max((l['id'] for l in self.ledger if l['umur'] > params[0]), default=0),)]
+
+    def _delta_per_menu(self, cursor, params):
+        delta = {}
+        for l in self.ledger:
+            snapshot = self.snapshot.get(l['menu_id'])
+            if snapshot and snapshot[1] < l['id'] <= params[0]:
+                delta[l['menu_id']] = delta.get(l['menu_id'], 0) + l['delta']
+        return sorted(delta.items())
+
+    def _lipat(self, cursor, params):
+        delta, batas_id, menu_id, batas = params
+        snapshot = self.snapshot[menu_id]
+        if snapshot[1] < batas:
+            snapshot[0] += delta
+            snapshot[1] = batas_id
+            cursor.rowcount = 1
+
+    def _geser(self, cursor, params):
+        for snapshot in self.snapshot.values():
+            if snapshot[1] < params[1]:
+                snapshot[1] = params[0]
+
+    def _stok(self, cursor, params):
+        menu_ids = params or sorted(self.snapshot)
+        return [
+            (menu_id, self.snapshot[menu_id][0] + sum(
+                l['delta'] for l in self.ledger
+                if l['menu_id'] == menu_id and l['id'] > self.snapshot[menu_id][1]))
+            for menu_id in menu_ids if menu_id in self.snapshot
+        ]
+
+    def _catat(self, cursor, params):
+        self.tambah_ledger(params[0], params[2], umur=0)
+        cursor.lastrowid = self._id_max()
+
+
+class TestStokLedger(unittest.TestCase):
+    """Stok = snapshot + delta ledger, kompaksi tidak mengubah stok"""
+
+    def setUp(self):
+        self.db = LedgerPalsu({1: 10, 2: 5})
+        self.ledger = StokLedger(db=self.db, jeda_aman_detik=60)
+        self.ledger.kompaksi()
+
+    def test_catat_mengubah_stok(self):
+        self.ledger.catat(1, 'penjualan', -3)
+        self.ledger.catat(2, 'restock', 4)
+        self.assertEqual(self.ledger.stok_semua(), {1: 7, 2: 9})
+        self.assertEqual(self.ledger.stok_saat_ini(1), 7)
+
+    def test_jenis_tidak_valid(self):
+        with self.assertRaises(ValueError):
+            self.ledger.catat(1, 'hilang', -1)
+
+    def test_kompaksi_tidak_mengubah_stok(self):
+        self.db.tambah_ledger(1, -2)
+        self.db.tambah_ledger(2, 3)
+        self.db.tambah_ledger(1, -1, umur=5)
+        sebelum = self.ledger.stok_semua()
+
+        hasil = self.ledger.kompaksi()
+
+        self.assertEqual(hasil, {'menu_diperbarui': 2, 'batas_id': 2})
+        self.assertEqual(self.ledger.stok_semua(), sebelum)
+        self.assertEqual(self.db.snapshot[1], [8, 2])
+
+    def test_baris_muda_tidak_dikompaksi(self):
+        self.db.tambah_ledger(1, -2, umur=5)
+        self.assertEqual(self.ledger.kompaksi()['batas_id'], 0)
+        self.assertEqual(self.db.snapshot[1], [10, 0])
+
+    def test_kompaksi_diulang_aman(self):
+        self.db.tambah_ledger(1, -2)
+        self.ledger.kompaksi()
+        self.ledger.kompaksi()
+        self.assertEqual(self.ledger.stok_semua(), {1: 8, 2: 5})
+
+    def test_menu_baru_mulai_dari_posisi_ledger_saat_ini(self):
+        self.db.tambah_ledger(1, -2)
+        self.db.tambah_ledger(3, -4)
+        # Penjualan lama menu 3 sudah tercermin di menu.stok
+        self.db.menu[3] = 6
+
+        self.ledger.kompaksi()
+        self.assertEqual(self.ledger.stok_semua([3]), {3: 6})
+
+
+class TestPeriksaStok(unittest.TestCase):
+    """Pemeriksaan stok ledger saat pesanan disimpan"""
+
+    def setUp(self):
+        self.db = LedgerPalsu({1: 10, 2: 5})
+        StokLedger(db=self.db).kompaksi()
+        self.cursor = self.db.get_connection().cursor()
+
+    def test_stok_cukup(self):
+        periksa_stok(self.cursor, [(1, 4), (1, 6), (2, 5)])
+
+    def test_jumlah_per_menu_dijumlahkan(self):
+        with self.assertRaises(StokTidakCukup) as konteks:
+            periksa_stok(self.cursor, [(1, 6), (1, 6), (2, 1)])
+        self.assertEqual(str(konteks.exception), "Stok tidak cukup: menu 1 (diminta 12, tersedia 10)")
+
+    def test_menu_tanpa_stok(self):
+        with self.assertRaises(StokTidakCukup):
+            periksa_stok(self.cursor, [(9, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Unit test buffer layar terminal (utils/tampilan.py)
+"""
+import io
+import os
+import unittest
+from unittest import mock
+
+from utils.tampilan import ESC_CLEAR, ESC_HAPUS_BARIS, ESC_HAPUS_SAMPAI_AKHIR, Layar
+
+BUTUH_DATABASE = False
+
+
+class TestLayarRender(unittest.TestCase):
+    """render() menggambar penuh sekali, lalu hanya baris yang berubah"""
+
+    def setUp(self):
+        patcher = mock.patch('utils.tampilan.shutil.get_terminal_size',
+                             return_value=os.terminal_size((80, 15)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stream = io.StringIO()
+        self.layar = Layar(self.stream)
+
+    def render(self, *baris):
+        for teks in baris:
+            self.layar.tulis(teks)
+        awal = self.stream.tell()
+        self.layar.render()
+        return self.stream.getvalue()[awal:]
+
+    def test_render_pertama_penuh(self):
+        self.assertEqual(self.render("A", "B"), ESC_CLEAR + "A\nB\n")
+
+    def test_hanya_baris_berubah_ditulis_ulang(self):
+        self.render("Judul", "1 Nasi 5 mnt", "2 Teh 3 mnt")
+        output = self.render("Judul", "1 Nasi 6 mnt", "2 Teh 3 mnt")
+        self.assertEqual(output, "\033[2;1H1 Nasi 6 mnt" + ESC_HAPUS_BARIS + "\033[4;1H" + ESC_HAPUS_SAMPAI_AKHIR)
+
+    def test_frame_memendek_sisa_dihapus(self):
+        self.render("Judul", "1 Nasi", "2 Teh")
+        self.assertEqual(self.render("Judul"), "\033[2;1H" + ESC_HAPUS_SAMPAI_AKHIR)
+
+    def test_baris_baru_ditambahkan(self):
+        self.render("Judul")
+        self.assertEqual(self.render("Judul", "1 Nasi"),
+                         "\033[2;1H1 Nasi" + ESC_HAPUS_BARIS + "\033[3;1H" + ESC_HAPUS_SAMPAI_AKHIR)
+
+    def test_frame_setinggi_terminal_digambar_penuh(self):
+        baris = [f"baris {i}" for i in range(10)]
+        self.render(*baris)
+        self.assertTrue(self.render(*baris).startswith(ESC_CLEAR))
+
+    def test_cetak_dan_invalidasi_memaksa_gambar_penuh(self):
+        self.render("A")
+        self.layar.tulis("log")
+        self.layar.cetak()
+        self.assertTrue(self.render("A").startswith(ESC_CLEAR))
+
+        self.layar.invalidasi()
+        self.assertTrue(self.render("A").startswith(ESC_CLEAR))
+
+    def test_tulis_multibaris(self):
+        self.assertEqual(self.render("A\nB"), ESC_CLEAR + "A\nB\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Unit test timeline status meja (models/timeline_meja.py)
+"""
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from models.timeline_meja import TimelineMeja, TimelineRestoran, format_durasi
+from tests.db_palsu import DatabasePalsu
+
+BUTUH_DATABASE = False
+
+
+def jam(h, m=0):
+    return datetime(2026, 3, 2, h, m)
+
+
+class TestTimelineMeja(unittest.TestCase):
+    """Pencarian status dan sesi pada satu meja"""
+
+    def setUp(self):
+        self.timeline = TimelineMeja(1)
+        self.timeline.tambah(jam(9), 'tersedia')
+        self.timeline.tambah(jam(10, 30), 'terisi')
+        self.timeline.tambah(jam(11, 15), 'tersedia')
+
+    def test_status_pada(self):
+        self.assertIsNone(self.timeline.status_pada(jam(8)))
+        self.assertEqual(self.timeline.status_pada(jam(10, 30)), 'terisi')
+        self.assertEqual(self.timeline.status_pada(jam(11)), 'terisi')
+        self.assertEqual(self.timeline.status_pada(jam(12)), 'tersedia')
+        self.assertEqual(self.timeline.sejak(jam(11)), jam(10, 30))
+
+    def test_status_sama_diabaikan_dan_urutan_dijaga(self):
+        self.timeline.tambah(jam(11, 30), 'tersedia')
+        self.timeline.tambah(jam(10), 'dipesan')
+        self.assertEqual(len(self.timeline), 4)
+        self.assertEqual(self.timeline.status_pada(jam(10, 15)), 'dipesan')
+        self.assertEqual(list(self.timeline.waktu), sorted(self.timeline.waktu))
+
+    def test_segmen_dipotong_ke_rentang(self):
+        segmen = [(a, b, s) for a, b, s in self.timeline.segmen(jam(10), jam(12))]
+        self.assertEqual(segmen, [
+            (jam(10).timestamp(), jam(10, 30).timestamp(), 0),
+            (jam(10, 30).timestamp(), jam(11, 15).timestamp(), 2),
+            (jam(11, 15).timestamp(), jam(12).timestamp(), 0),
+        ])
+
+    def test_sesi_hanya_yang_selesai(self):
+        self.assertEqual(self.timeline.sesi(), [45 * 60])
+        self.timeline.tambah(jam(11, 40), 'terisi')
+        self.assertEqual(self.timeline.sesi(), [45 * 60])
+        self.assertEqual(self.timeline.sesi(mulai=jam(11)), [])
+
+    def test_buang_sebelum_menyisakan_status_yang_berlaku(self):
+        self.timeline.buang_sebelum(jam(11))
+        self.assertEqual(len(self.timeline), 2)
+        self.assertEqual(self.timeline.status_pada(jam(11)), 'terisi')
+        self.assertIsNone(self.timeline.status_pada(jam(10)))
+
+
+class TestTimelineRestoran(unittest.TestCase):
+    """Utilisasi dan lama duduk semua meja dari riwayat_status_meja"""
+
+    def setUp(self):
+        self.db = DatabasePalsu()
+        self.riwayat = [
+            (1, 'tersedia', jam(9)),
+            (2, 'terisi', jam(10)),
+            (1, 'terisi', jam(10, 30)),
+            (1, 'tersedia', jam(11, 15)),
+        ]
+        # Status terakhir sebelum rentang, lalu transisi di dalam rentang
+        self.db.saat(r'WHERE diubah_pada < %s', lambda cursor, params: [
+            r for r in self.riwayat if r[2] < params[0]
+        ])
+        self.db.saat(r'WHERE diubah_pada >= %s', lambda cursor, params: [
+            r for r in self.riwayat if params[0] <= r[2] < params[1]
+        ])
+        self.timeline = TimelineRestoran(self.db).muat(jam(10), jam(12))
+
+    def test_okupansi_dan_status_sekarang(self):
+        self.assertEqual(self.timeline.okupansi_pada(jam(10, 45)), {1: 'terisi', 2: 'terisi'})
+        self.assertEqual(self.timeline.status_sekarang(), {1: ('tersedia', jam(11, 15)), 2: ('terisi', jam(10))})
+
+    def test_rata_dwell(self):
+        self.assertEqual(self.timeline.rata_dwell(), {
+            1: {'jumlah_sesi': 1, 'rata_detik': 45 * 60},
+            2: {'jumlah_sesi': 0, 'rata_detik': None},
+        })
+
+    def test_utilisasi_per_jam(self):
+        hasil = self.timeline.utilisasi_per_jam()
+        self.assertEqual([row['jam'] for row in hasil], [jam(10), jam(11), jam(12)])
+        self.assertEqual([row['utilisasi'] for row in hasil], [0.75, 0.625, None])
+
+    def test_profil_jam(self):
+        profil = self.timeline.profil_jam()
+        self.assertEqual(len(profil), 24)
+        self.assertEqual(profil[10], {'jam': 10, 'rata_utilisasi': 0.75, 'jumlah_hari': 1})
+        self.assertEqual(profil[11], {'jam': 11, 'rata_utilisasi': 0.625, 'jumlah_hari': 1})
+        self.assertEqual(profil[12], {'jam': 12, 'rata_utilisasi': None, 'jumlah_hari': 0})
+
+    def test_deret_per_jam_dipakai_ulang(self):
+        per_jam = self.timeline.utilisasi_per_jam()
+        with mock.patch.object(self.timeline, 'utilisasi_per_jam') as hitung_ulang:
+            profil = self.timeline.profil_jam(per_jam=per_jam)
+            total = self.timeline.utilisasi_total(per_jam=per_jam)
+        hitung_ulang.assert_not_called()
+        self.assertEqual(profil, self.timeline.profil_jam())
+        self.assertEqual(total, self.timeline.utilisasi_total())
+
+    def test_utilisasi_total(self):
+        self.assertEqual(self.timeline.utilisasi_total(), (45 + 120) / 240)
+        self.assertIsNone(TimelineRestoran(self.db).muat(jam(8), jam(9)).utilisasi_total())
+
+    def test_perbarui_hanya_membaca_transisi_baru(self):
+        self.riwayat += [(2, 'tersedia', jam(12, 10)), (1, 'terisi', jam(12, 20))]
+        self.db.riwayat = []
+
+        self.timeline.perbarui(jam(13))
+
+        (_, params), = self.db.query(r'FROM riwayat_status_meja')
+        self.assertEqual(params, (jam(11, 59), jam(13)))
+        self.assertEqual((self.timeline.mulai, self.timeline.akhir), (jam(11), jam(13)))
+        self.assertEqual(self.timeline.status_sekarang(), {1: ('terisi', jam(12, 20)), 2: ('tersedia', jam(12, 10))})
+        self.assertEqual(self.timeline.utilisasi_total(), (15 + 40 + 70) / 240)
+
+        # Hasil sama dengan memuat ulang rentang baru dari awal
+        dimuat_ulang = TimelineRestoran(self.db).muat(jam(11), jam(13))
+        self.assertEqual(self.timeline.utilisasi_per_jam(), dimuat_ulang.utilisasi_per_jam())
+        self.assertEqual(self.timeline.rata_dwell(), dimuat_ulang.rata_dwell())
+
+    def test_perbarui_transisi_terlambat_dan_ganda(self):
+        # Commit terlambat: waktu sebelum akhir rentang lama, belum terbaca saat muat
+        self.riwayat.append((2, 'tersedia', jam(11, 59)))
+        self.timeline.perbarui(jam(12, 30))
+        self.timeline.perbarui(jam(12, 40))
+
+        self.assertEqual(len(self.timeline.meja[2]), 2)
+        self.assertEqual(self.timeline.okupansi_pada(jam(12, 35)), {1: 'tersedia', 2: 'tersedia'})
+
+
+class TestFormatDurasi(unittest.TestCase):
+    def test_format(self):
+        self.assertEqual(format_durasi(None), '-')
+        self.assertEqual(format_durasi(45 * 60), '45m')
+        self.assertEqual(format_durasi(2 * 3600 + 5 * 60), '2j 05m')
+        self.assertEqual(format_durasi(3 * 86400 + 4 * 3600), '3h 4j')
+
+
+if __name__ == '__main__':
+    unittest.main()
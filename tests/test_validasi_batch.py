@@ -0,0 +1,112 @@
+"""
+Unit test validasi batch pelanggan (utils/validasi_batch.py)
+"""
+import unittest
+from unittest import mock
+
+from utils.validasi_batch import (
+    BatchValidator, KODE_VALID, POLA_EMAIL, POLA_NAMA, POLA_TELEPON, pd
+)
+from utils.validasi_input import Validator
+
+BUTUH_DATABASE = False
+
+NAMA = ['Budi', 'José Ramírez', 'Budi2', "O'Neil", 'Siti N. Aisyah', 'Ng-Wei', 'Ærøskøbing',
+        '', ' ', '2Budi', 'Budi_', 'Budi@rumah', 'A' * 100, 'A' * 101, None]
+TELEPON = ['081234567890', '0812345678', '08123456789012', '6281234567890', '+6281234567890',
+           '0212345678', '0812', '08123abc90', '', None]
+EMAIL = ['a@b.co', 'budi.santoso@contoh.co.id', 'budi+promo@contoh.com', 'x', 'a@b', 'a@@b.com',
+         'a..b@contoh.com', '@contoh.com', 'ana@contoh.' + 'c' * 95, '', None]
+
+
+def referensi(validator, nama, telepon, email):
+    """Pesan error pertama per baris jika setiap nilai dicek Validator satu per satu"""
+    hasil = []
+    for n, t, e in zip(nama, telepon, email):
+        for fungsi, nilai, opsional in ((validator.validasi_nama, n, False),
+                                        (validator.validasi_telepon, t, False),
+                                        (validator.validasi_email, e, True)):
+            nilai = nilai or ''
+            if opsional and not nilai:
+                continue
+            valid, pesan = fungsi(nilai)
+            if not valid:
+                hasil.append(pesan)
+                break
+        else:
+            hasil.append('')
+    return hasil
+
+
+def kolom_silang():
+    """Semua kombinasi nama x telepon x email sebagai tiga kolom sejajar"""
+    baris = [(n, t, e) for n in NAMA for t in TELEPON for e in EMAIL]
+    return [list(k) for k in zip(*baris)]
+
+
+class TestPolaPastiValid(unittest.TestCase):
+    """Nilai yang lolos jalur cepat juga harus diterima Validator"""
+
+    def setUp(self):
+        self.validator = Validator()
+
+    def periksa(self, pola, fungsi, nilai_list):
+        for nilai in nilai_list:
+            if nilai and pola.fullmatch(nilai):
+                with self.subTest(nilai=nilai):
+                    self.assertTrue(fungsi(nilai)[0])
+
+    def test_pola_subset_validator(self):
+        self.periksa(POLA_NAMA, self.validator.validasi_nama, NAMA)
+        self.periksa(POLA_TELEPON, self.validator.validasi_telepon, TELEPON)
+        self.periksa(POLA_EMAIL, self.validator.validasi_email, EMAIL)
+
+    def test_nama_unicode_dan_angka_lewat_jalur_cepat(self):
+        for nama in ('José Ramírez', 'Budi2', 'Ærøskøbing'):
+            self.assertTrue(POLA_NAMA.fullmatch(nama), nama)
+
+
+class TestBatchValidator(unittest.TestCase):
+    """Hasil batch sama dengan Validator per nilai, di kedua jalur"""
+
+    def setUp(self):
+        self.kolom = kolom_silang()
+        self.harapan = referensi(Validator(), *self.kolom)
+
+    def pesan(self, hasil):
+        return [hasil.pesan(i) for i in range(len(hasil))]
+
+    def test_jalur_python_sama_dengan_validator(self):
+        hasil = BatchValidator(pakai_pandas=False).validasi(*self.kolom)
+        self.assertEqual(self.pesan(hasil), self.harapan)
+        self.assertEqual(hasil.jumlah_valid(), self.harapan.count(''))
+
+    @unittest.skipIf(pd is None, "pandas tidak terpasang")
+    def test_jalur_pandas_sama_dengan_validator(self):
+        hasil = BatchValidator(ambang_pandas=0).validasi(*self.kolom)
+        self.assertEqual(self.pesan(hasil), self.harapan)
+        self.assertEqual(hasil.jumlah_valid(), self.harapan.count(''))
+
+    def test_hanya_baris_valid_dan_nilai_unik_yang_dicek(self):
+        for pakai_pandas in (False, True):
+            if pakai_pandas and pd is None:
+                continue
+            with self.subTest(pandas=pakai_pandas):
+                validator = mock.Mock(wraps=Validator())
+                batch = BatchValidator(validator, pakai_pandas=pakai_pandas, ambang_pandas=0)
+
+                hasil = batch.validasi(['', '', 'Budi', 'Budi'],
+                                       ['0812', '0812', '0812', '081234567890'],
+                                       ['x', 'x', 'x', 'x'])
+
+                self.assertEqual(list(hasil.valid), [False, False, False, False])
+                # Nama kosong dicek sekali; nama valid lewat pola tanpa Validator
+                validator.validasi_nama.assert_called_once_with('')
+                # Telepon baris yang namanya sudah ditolak tidak dicek lagi
+                validator.validasi_telepon.assert_called_once_with('0812')
+                validator.validasi_email.assert_called_once_with('x')
+                self.assertNotEqual(hasil.kode[3], KODE_VALID)
+
+
+if __name__ == '__main__':
+    unittest.main()
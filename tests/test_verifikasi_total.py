@@ -0,0 +1,111 @@
+"""
+Unit test verifikasi total pesanan (database/verifikasi_total.py)
+"""
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from database.verifikasi_total import VerifikasiTotal
+from tests.db_palsu import DatabasePalsu
+
+BUTUH_DATABASE = False
+
+
+class PesananPalsu(DatabasePalsu):
+    """pesanan (total tersimpan), total detail, checkpoint dan selisih di memori"""
+
+    def __init__(self, pesanan):
+        super().__init__()
+        # id -> [total_harga, total_item]
+        self.pesanan = {pid: [Decimal(a), Decimal(b)] for pid, (a, b) in pesanan.items()}
+        self.checkpoint = None
+        self.selisih = {}
+        self.diubah_lain = set()
+
+        self.saat(r'SELECT id_terakhir, diubah_terakhir FROM verifikasi_checkpoint', self._baca_checkpoint)
+        self.saat(r'SELECT NOW\(\), COALESCE\(MAX\(id\), 0\) FROM pesanan', self._watermark)
+        self.saat(r'HAVING p\.total_harga <> total_item', self._cari_selisih)
+        self.saat(r'INSERT INTO verifikasi_selisih', self._catat_selisih)
+        self.saat(r"SET status = 'teratasi'", lambda cursor, params: None)
+        self.saat(r'UPDATE pesanan SET total_harga', self._perbaiki)
+        self.saat(r"SET status = 'diperbaiki'", self._tandai_diperbaiki)
+        self.saat(r'INSERT INTO verifikasi_checkpoint', self._simpan_checkpoint)
+
+    def _baca_checkpoint(self, cursor, params):
+        return [self.checkpoint] if self.checkpoint else []
+
+    def _watermark(self, cursor, params):
+        return [(datetime(2026, 3, 2, 12, 0), max(self.pesanan, default=0))]
+
+    def _cari_selisih(self, cursor, params):
+        awal, akhir = params
+        return [(pid, total, item) for pid, (total, item) in sorted(self.pesanan.items())
+                if awal <= pid <= akhir and total != item]
+
+    def _catat_selisih(self, cursor, params):
+        self.selisih[params[0]] = 'terbuka'
+
+    def _perbaiki(self, cursor, params):
+        total_baru, pid, total_lama = params
+        if pid in self.diubah_lain:
+            # Total diubah transaksi lain setelah dibaca verifikasi
+            self.pesanan[pid][0] += 1
+        if self.pesanan[pid][0] == total_lama:
+            self.pesanan[pid][0] = total_baru
+            cursor.rowcount = 1
+
+    def _tandai_diperbaiki(self, cursor, params):
+        self.selisih[params[0]] = 'diperbaiki'
+
+    def _simpan_checkpoint(self, cursor, params):
+        _, id_terakhir, diubah = params
+        lama = self.checkpoint[1] if self.checkpoint else None
+        self.checkpoint = (id_terakhir, diubah or lama)
+
+
+class TestVerifikasiTotal(unittest.TestCase):
+    """Deteksi dan perbaikan selisih total per chunk"""
+
+    def setUp(self):
+        self.db = PesananPalsu({
+            1: ('100', '100'),
+            2: ('90', '120'),
+            3: ('50', '50'),
+            4: ('10', '40'),
+            5: ('70', '75'),
+        })
+        self.verifikasi = VerifikasiTotal(db=self.db, ukuran_chunk=2)
+
+    def test_selisih_dicatat_tanpa_perbaikan(self):
+        stats = self.verifikasi.jalankan()
+
+        self.assertEqual(stats['diperiksa_baru'], 5)
+        self.assertEqual((stats['selisih'], stats['diperbaiki']), (3, 0))
+        self.assertEqual(self.db.selisih, {2: 'terbuka', 4: 'terbuka', 5: 'terbuka'})
+        self.assertEqual(self.db.checkpoint[0], 5)
+
+    def test_hanya_perbaikan_yang_diterapkan_dihitung(self):
+        self.db.diubah_lain.add(4)
+
+        stats = self.verifikasi.jalankan(perbaiki=True)
+
+        self.assertEqual((stats['selisih'], stats['diperbaiki']), (3, 2))
+        self.assertEqual(self.db.selisih, {2: 'diperbaiki', 4: 'terbuka', 5: 'diperbaiki'})
+        self.assertEqual(self.db.pesanan[2][0], Decimal('120'))
+        self.assertEqual(self.db.pesanan[4][0], Decimal('11'))
+
+    def test_run_berikutnya_hanya_pesanan_baru(self):
+        self.verifikasi.jalankan()
+        self.db.pesanan[6] = [Decimal('5'), Decimal('6')]
+        self.db.riwayat = []
+
+        # Checkpoint sudah punya diubah_terakhir: pesanan yang berubah dicari dulu
+        self.db.saat(r'SELECT id FROM pesanan WHERE diubah_pada', lambda cursor, params: [])
+        stats = self.verifikasi.jalankan()
+
+        self.assertEqual((stats['diperiksa_baru'], stats['selisih']), (1, 1))
+        self.assertEqual(self.db.query(r'HAVING')[0][1], (6, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Generator kode_pesanan bergaya Snowflake
+Kode disusun dari waktu (ms), id terminal/worker dan nomor urut, sehingga
+unik antar terminal tanpa round-trip ke database dan bisa diurutkan.
+Contoh: RES0ABCDEF123456
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PREFIX = 'RES'
+
+# 2024-01-01 00:00:00 UTC dalam milidetik
+EPOCH_MS = 1704067200000
+
+BIT_WORKER = 10
+BIT_URUT = 12
+MAX_WORKER = (1 << BIT_WORKER) - 1
+MAX_URUT = (1 << BIT_URUT) - 1
+
+# 63 bit dalam base36 muat di 13 karakter: PREFIX + 13 = 16 <= VARCHAR(20)
+PANJANG_KODE = 13
+DIGIT_BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _base36(angka):
+    hasil = []
+    while angka:
+        angka, sisa = divmod(angka, 36)
+        hasil.append(DIGIT_BASE36[sisa])
+    return ''.join(reversed(hasil)).rjust(PANJANG_KODE, '0')
+
+
+def worker_id_dari_env():
+    """
+    Id worker dari env TERMINAL_ID (0-1023), wajib diset dan unik per terminal.
+    Tidak ada fallback (mis. pid): dua terminal dengan worker id sama bisa
+    menghasilkan kode_pesanan yang sama pada milidetik yang sama.
+    """
+    nilai = os.environ.get('TERMINAL_ID')
+    if nilai is None or not nilai.strip():
+        raise ValueError(f"TERMINAL_ID belum diset; beri setiap terminal id unik 0-{MAX_WORKER}")
+
+    nilai = nilai.strip()
+    if not nilai.isdigit() or int(nilai) > MAX_WORKER:
+        raise ValueError(f"TERMINAL_ID tidak valid: {nilai!r}, harus angka 0-{MAX_WORKER}")
+    return int(nilai)
+
+
+class GeneratorKodePesanan:
+    """
+    Generator id 63 bit: [41 bit waktu ms][10 bit worker][12 bit urut].
+    Monoton per worker: jika jam mundur, waktu terakhir tetap dipakai dan
+    saat nomor urut habis waktu logis maju 1 ms, sehingga tidak pernah
+    menunggu maupun menghasilkan kode yang sama.
+    """
+
+    def __init__(self, worker_id=None):
+        if worker_id is None:
+            worker_id = worker_id_dari_env()
+        if not 0 <= worker_id <= MAX_WORKER:
+            raise ValueError(f"worker_id harus 0-{MAX_WORKER}")
+
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._ms_terakhir = -1
+        self._urut = 0
+
+    def next_id(self):
+        """Id numerik berikutnya"""
+        with self._lock:
+            sekarang = int(time.time() * 1000) - EPOCH_MS
+            ms = max(sekarang, self._ms_terakhir)
+
+            if ms == self._ms_terakhir:
+                self._urut += 1
+                if self._urut > MAX_URUT:
+                    ms += 1
+                    self._urut = 0
+            else:
+                self._urut = 0
+
+            self._ms_terakhir = ms
+            return (ms << (BIT_WORKER + BIT_URUT)) | (self.worker_id << BIT_URUT) | self._urut
+
+    def next_kode(self):
+        """kode_pesanan berikutnya, contoh RES0ABCDEF123456"""
+        return PREFIX + _base36(self.next_id())
+
+
+def urai_kode(kode):
+    """Pecah kode_pesanan menjadi (waktu UTC, worker_id, nomor urut)"""
+    angka = int(kode[len(PREFIX):], 36)
+    urut = angka & MAX_URUT
+    worker = (angka >> BIT_URUT) & MAX_WORKER
+    ms = (angka >> (BIT_WORKER + BIT_URUT)) + EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc), worker, urut
+
+
+_generator_default = None
+_lock_default = threading.Lock()
+
+
+def buat_kode_pesanan():
+    """kode_pesanan baru dari generator default proses ini"""
+    global _generator_default
+    if _generator_default is None:
+        with _lock_default:
+            if _generator_default is None:
+                _generator_default = GeneratorKodePesanan()
+    return _generator_default.next_kode()
@@ -0,0 +1,346 @@
+"""
+Registry metrik (counter, gauge, histogram) format Prometheus
+Metrik dikumpulkan di memori proses; bisa diambil lewat endpoint HTTP
+lokal opsional (GET /metrics) atau ditulis berkala ke file teks yang
+dibaca textfile collector node_exporter untuk terminal tanpa akses jaringan.
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ENV_METRICS_PORT = 'RESTO_METRICS_PORT'
+ENV_METRICS_FILE = 'RESTO_METRICS_FILE'
+
+# Bucket latency (detik), cukup untuk query cepat sampai aksi menu yang lama
+BUCKET_DEFAULT = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(nilai):
+    return str(nilai).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_angka(nilai):
+    if nilai == math.inf:
+        return '+Inf'
+    if float(nilai).is_integer():
+        return str(int(nilai))
+    return repr(float(nilai))
+
+
+class _Metrik:
+    """Dasar metrik: nama, bantuan, nama label dan nilai per kombinasi label"""
+
+    tipe = None
+
+    def __init__(self, nama, bantuan, label=()):
+        self.nama = nama
+        self.bantuan = bantuan
+        self.label = tuple(label)
+        self._lock = threading.Lock()
+        self._nilai = {}
+
+    def _kunci(self, labels):
+        if len(labels) != len(self.label) or any(l not in labels for l in self.label):
+            raise ValueError(f"Metrik {self.nama} butuh label {self.label}, diberi {tuple(labels)}")
+        return tuple(str(labels[l]) for l in self.label)
+
+    def _label_teks(self, kunci, tambahan=()):
+        pasangan = list(zip(self.label, kunci)) + list(tambahan)
+        if not pasangan:
+            return ''
+        return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pasangan) + '}'
+
+    def render(self):
+        baris = [f"# HELP {self.nama} {self.bantuan}", f"# TYPE {self.nama} {self.tipe}"]
+        baris.extend(self._sampel())
+        return baris
+
+
+class Counter(_Metrik):
+    """Nilai yang hanya naik, nama sebaiknya diakhiri _total"""
+
+    tipe = 'counter'
+
+    def inc(self, jumlah=1, **labels):
+        if jumlah < 0:
+            raise ValueError("Counter tidak boleh turun")
+        kunci = self._kunci(labels)
+        with self._lock:
+            self._nilai[kunci] = self._nilai.get(kunci, 0) + jumlah
+
+    def nilai(self, **labels):
+        return self._nilai.get(self._kunci(labels), 0)
+
+    def _sampel(self):
+        with self._lock:
+            items = sorted(self._nilai.items())
+        if not items and not self.label:
+            items = [((), 0)]
+        return [f"{self.nama}{self._label_teks(k)} {_format_angka(v)}" for k, v in items]
+
+
+class Gauge(_Metrik):
+    """Nilai yang bisa naik turun, atau dibaca dari fungsi saat render"""
+
+    tipe = 'gauge'
+
+    def __init__(self, nama, bantuan, label=()):
+        super().__init__(nama, bantuan, label)
+        self._fungsi = None
+
+    def set(self, nilai, **labels):
+        kunci = self._kunci(labels)
+        with self._lock:
+            self._nilai[kunci] = nilai
+
+    def inc(self, jumlah=1, **labels):
+        kunci = self._kunci(labels)
+        with self._lock:
+            self._nilai[kunci] = self._nilai.get(kunci, 0) + jumlah
+
+    def dec(self, jumlah=1, **labels):
+        self.inc(-jumlah, **labels)
+
+    def set_fungsi(self, fungsi):
+        """Nilai gauge tanpa label dibaca dari fungsi() setiap render"""
+        self._fungsi = fungsi
+
+    def nilai(self, **labels):
+        return self._nilai.get(self._kunci(labels), 0)
+
+    def _sampel(self):
+        if self._fungsi is not None:
+            try:
+                return [f"{self.nama} {_format_angka(self._fungsi())}"]
+            except Exception as e:
+                logger.error(f"Gagal membaca gauge {self.nama}: {e}")
+                return []
+
+        with self._lock:
+            items = sorted(self._nilai.items())
+        if not items and not self.label:
+            items = [((), 0)]
+        return [f"{self.nama}{self._label_teks(k)} {_format_angka(v)}" for k, v in items]
+
+
+class Histogram(_Metrik):
+    """Distribusi nilai (umumnya durasi detik) dalam bucket kumulatif"""
+
+    tipe = 'histogram'
+
+    def __init__(self, nama, bantuan, label=(), bucket=BUCKET_DEFAULT):
+        super().__init__(nama, bantuan, label)
+        self.bucket = tuple(sorted(bucket)) + (math.inf,)
+
+    def observe(self, nilai, **labels):
+        kunci = self._kunci(labels)
+        with self._lock:
+            data = self._nilai.get(kunci)
+            if data is None:
+                data = self._nilai[kunci] = [[0] * len(self.bucket), 0.0, 0]
+            for i, batas in enumerate(self.bucket):
+                if nilai <= batas:
+                    data[0][i] += 1
+                    break
+            data[1] += nilai
+            data[2] += 1
+
+    def waktu(self, **labels):
+        """Context manager: ukur durasi blok with"""
+        return _Pengukur(self, labels)
+
+    def _sampel(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._nilai.items())
+
+        baris = []
+        for kunci, (hitungan, total, jumlah) in items:
+            kumulatif = 0
+            for batas, n in zip(self.bucket, hitungan):
+                kumulatif += n
+                label = self._label_teks(kunci, (('le', _format_angka(batas)),))
+                baris.append(f"{self.nama}_bucket{label} {kumulatif}")
+            baris.append(f"{self.nama}_sum{self._label_teks(kunci)} {_format_angka(total)}")
+            baris.append(f"{self.nama}_count{self._label_teks(kunci)} {jumlah}")
+        return baris
+
+
+class _Pengukur:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.mulai, **self.labels)
+        return False
+
+
+class RegistryMetrik:
+    """
+    Kumpulan metrik satu proses.
+    Mendaftarkan nama yang sama dua kali mengembalikan metrik yang sudah ada,
+    sehingga modul boleh mendefinisikan metriknya sendiri saat import.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrik = {}
+
+    def _daftar(self, kelas, nama, bantuan, label, **kwargs):
+        with self._lock:
+            metrik = self._metrik.get(nama)
+            if metrik is None:
+                metrik = self._metrik[nama] = kelas(nama, bantuan, label, **kwargs)
+            elif not isinstance(metrik, kelas) or metrik.label != tuple(label):
+                raise ValueError(f"Metrik {nama} sudah terdaftar dengan tipe/label berbeda")
+            return metrik
+
+    def counter(self, nama, bantuan, label=()):
+        return self._daftar(Counter, nama, bantuan, label)
+
+    def gauge(self, nama, bantuan, label=()):
+        return self._daftar(Gauge, nama, bantuan, label)
+
+    def histogram(self, nama, bantuan, label=(), bucket=BUCKET_DEFAULT):
+        return self._daftar(Histogram, nama, bantuan, label, bucket=bucket)
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus"""
+        with self._lock:
+            daftar = sorted(self._metrik.values(), key=lambda m: m.nama)
+        baris = []
+        for metrik in daftar:
+            baris.extend(metrik.render())
+        return "\n".join(baris) + "\n"
+
+    def dump(self, path):
+        """Tulis metrik ke file secara atomik (tulis .tmp lalu rename)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        sementara = f"{path}.tmp"
+        with open(sementara, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(sementara, path)
+
+
+REGISTRY = RegistryMetrik()
+
+
+def ukur(fungsi, histogram, counter_error, **labels):
+    """Bungkus fungsi: durasi ke histogram, exception dihitung di counter_error lalu diteruskan"""
+    @functools.wraps(fungsi)
+    def wrapper(*args, **kwargs):
+        mulai = time.perf_counter()
+        try:
+            return fungsi(*args, **kwargs)
+        except BaseException:
+            counter_error.inc(**labels)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - mulai, **labels)
+    return wrapper
+
+
+def bungkus_aksi(obj, nama_aksi, histogram, counter_error, nama_label='aksi'):
+    """Ganti method nama_aksi di instance obj dengan versi yang diukur"""
+    for nama in nama_aksi:
+        fungsi = getattr(obj, nama, None)
+        if fungsi is not None:
+            setattr(obj, nama, ukur(fungsi, histogram, counter_error, **{nama_label: nama}))
+
+
+class ProxyTerukur:
+    """
+    Proxy objek yang mengukur setiap pemanggilan method publik.
+    Label operasi = nama method; atribut selain method diteruskan apa adanya.
+    """
+
+    def __init__(self, obj, histogram, counter_error, nama_label='operasi'):
+        self._obj = obj
+        self._histogram = histogram
+        self._counter_error = counter_error
+        self._nama_label = nama_label
+        self._cache = {}
+
+    def __getattr__(self, nama):
+        if nama.startswith('_'):
+            raise AttributeError(nama)
+
+        atribut = getattr(self._obj, nama)
+        if not callable(atribut):
+            return atribut
+        if nama not in self._cache:
+            self._cache[nama] = ukur(atribut, self._histogram, self._counter_error,
+                                     **{self._nama_label: nama})
+        return self._cache[nama]
+
+
+# ========== EKSPOR ==========
+
+def mulai_server(port, host='127.0.0.1', registry=REGISTRY):
+    """Endpoint GET /metrics di thread latar, return server (panggil shutdown() untuk berhenti)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            isi = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(isi)))
+            self.end_headers()
+            self.wfile.write(isi)
+
+        def log_message(self, format, *args):
+            # Jangan tulis access log ke terminal kasir
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"Endpoint metrik aktif di http://{host}:{port}/metrics")
+    return server
+
+
+class PenulisBerkala:
+    """Tulis metrik ke file setiap interval detik; stop() menulis sekali lagi"""
+
+    def __init__(self, path, interval=60.0, registry=REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._jalan, name='metrics-dump', daemon=True)
+
+    def _tulis(self):
+        try:
+            self.registry.dump(self.path)
+        except OSError as e:
+            logger.error(f"Gagal menulis metrik ke {self.path}: {e}")
+
+    def _jalan(self):
+        while not self._stop.wait(self.interval):
+            self._tulis()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._tulis()
@@ -0,0 +1,205 @@
+"""
+Mode profiling untuk aksi aplikasi
+Aktif lewat `app.py --profile` atau env RESTO_PROFILE=1 (folder output
+RESTO_PROFILE_DIR, default profil/). Setiap pemanggilan aksi diprofil
+dengan cProfile (waktu per fungsi), tracemalloc (peak memori dan lokasi
+alokasi terbesar) dan sampler stack (collapsed stack untuk flamegraph.pl
+atau speedscope). Saat mode tidak aktif method tidak dibungkus sama
+sekali, sehingga tidak ada overhead.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ENV_PROFILE = 'RESTO_PROFILE'
+ENV_PROFILE_DIR = 'RESTO_PROFILE_DIR'
+
+# Kedalaman traceback yang disimpan tracemalloc per alokasi
+FRAME_TRACEMALLOC = 10
+
+
+def profil_aktif(flag=False):
+    """True jika --profile diberikan atau env RESTO_PROFILE diset"""
+    return flag or os.environ.get(ENV_PROFILE, '').lower() in ('1', 'true', 'ya', 'on')
+
+
+def _ukuran(byte):
+    """Format byte ke KB/MB"""
+    if byte >= 1024 * 1024:
+        return f"{byte / (1024 * 1024):.1f} MB"
+    return f"{byte / 1024:.1f} KB"
+
+
+class SamplerStack:
+    """
+    Sampling stack satu thread dari thread latar setiap interval detik.
+    Stack yang sama dihitung, hasilnya format collapsed:
+    "fungsi_luar;fungsi_dalam jumlah_sampel" per baris.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.hitungan = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._jalan, name='sampler-stack', daemon=True)
+
+    def _jalan(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.hitungan[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {jumlah}\n" for stack, jumlah in self.hitungan.most_common())
+
+
+class Profiler:
+    """
+    Pembungkus method aksi dengan cProfile, tracemalloc dan sampler stack.
+    Per pemanggilan aksi ditulis ke output_dir:
+    - <aksi>_<waktu>.prof   : data pstats (snakeviz, pstats)
+    - <aksi>_<waktu>.folded : collapsed stack untuk flamegraph
+    - <aksi>_<waktu>.txt    : fungsi cumulative teratas dan alokasi terbesar
+    Aksi yang dipanggil dari aksi lain ikut masuk profil aksi luar.
+    """
+
+    def __init__(self, output_dir=None, top_n=25, interval_sampling=0.005):
+        self.output_dir = output_dir or os.environ.get(ENV_PROFILE_DIR, 'profil')
+        self.top_n = top_n
+        self.interval_sampling = interval_sampling
+        self.hasil = []
+        self._berjalan = False
+
+    def bungkus(self, obj, nama_aksi):
+        """Ganti method aksi di instance obj dengan versi yang diprofil"""
+        for nama in nama_aksi:
+            fungsi = getattr(obj, nama, None)
+            if fungsi is None:
+                logger.warning(f"Aksi {nama} tidak ada, tidak diprofil")
+                continue
+            setattr(obj, nama, self._pembungkus(nama, fungsi))
+        logger.info(f"Mode profiling aktif untuk {len(nama_aksi)} aksi, output ke {self.output_dir}/")
+
+    def _pembungkus(self, nama, fungsi):
+        @functools.wraps(fungsi)
+        def wrapper(*args, **kwargs):
+            return self.profil(nama, fungsi, *args, **kwargs)
+        return wrapper
+
+    def profil(self, nama, fungsi, *args, **kwargs):
+        """Jalankan fungsi dengan profiling, return hasil fungsi"""
+        # cProfile tidak bisa bersarang, aksi dalam aksi lain cukup dijalankan
+        if self._berjalan:
+            return fungsi(*args, **kwargs)
+
+        self._berjalan = True
+        tracemalloc_baru = not tracemalloc.is_tracing()
+        if tracemalloc_baru:
+            tracemalloc.start(FRAME_TRACEMALLOC)
+        tracemalloc.reset_peak()
+        memori_awal = tracemalloc.get_traced_memory()[0]
+
+        sampler = SamplerStack(threading.get_ident(), self.interval_sampling)
+        profile = cProfile.Profile()
+        sampler.start()
+        mulai = time.perf_counter()
+        profile.enable()
+        try:
+            return fungsi(*args, **kwargs)
+        finally:
+            profile.disable()
+            durasi = time.perf_counter() - mulai
+            sampler.stop()
+
+            peak = tracemalloc.get_traced_memory()[1] - memori_awal
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ))
+            if tracemalloc_baru:
+                tracemalloc.stop()
+            self._berjalan = False
+
+            try:
+                self._simpan(nama, profile, sampler, snapshot, durasi, peak)
+            except Exception as e:
+                logger.error(f"Gagal menyimpan profil {nama}: {e}")
+
+    def _simpan(self, nama, profile, sampler, snapshot, durasi, peak):
+        os.makedirs(self.output_dir, exist_ok=True)
+        dasar = os.path.join(self.output_dir, f"{nama}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+
+        profile.dump_stats(dasar + '.prof')
+        with open(dasar + '.folded', 'w', encoding='utf-8') as f:
+            f.write(sampler.collapsed())
+
+        buffer = io.StringIO()
+        buffer.write(f"Aksi        : {nama}\n")
+        buffer.write(f"Durasi      : {durasi:.3f} detik (termasuk menunggu input)\n")
+        buffer.write(f"Peak memori : {_ukuran(peak)}\n")
+        buffer.write(f"Sampel stack: {sum(sampler.hitungan.values())}\n\n")
+
+        buffer.write(f"=== {self.top_n} fungsi teratas (cumulative) ===\n")
+        pstats.Stats(profile, stream=buffer).strip_dirs().sort_stats('cumulative').print_stats(self.top_n)
+
+        buffer.write("=== Alokasi memori terbesar yang masih hidup ===\n")
+        for stat in snapshot.statistics('lineno')[:10]:
+            frame = stat.traceback[0]
+            buffer.write(f"{_ukuran(stat.size):>10}  {stat.count:>7} blok  {frame.filename}:{frame.lineno}\n")
+
+        with open(dasar + '.txt', 'w', encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+
+        self.hasil.append({'aksi': nama, 'durasi': durasi, 'peak': peak, 'path': dasar})
+        logger.info(f"Profil {nama}: {durasi:.3f} detik, peak {_ukuran(peak)} -> {dasar}.txt")
+        print(f"🔬 Profil {nama}: {durasi:.3f} dtk, peak {_ukuran(peak)} -> {dasar}.txt", file=sys.stderr)
+
+    def ringkasan(self):
+        """Ringkasan sesi per aksi (jumlah, total/maks durasi, peak maks), juga ditulis ke ringkasan.txt"""
+        if not self.hasil:
+            return "Tidak ada aksi yang diprofil"
+
+        per_aksi = {}
+        for h in self.hasil:
+            data = per_aksi.setdefault(h['aksi'], {'jumlah': 0, 'total': 0.0, 'maks': 0.0, 'peak': 0})
+            data['jumlah'] += 1
+            data['total'] += h['durasi']
+            data['maks'] = max(data['maks'], h['durasi'])
+            data['peak'] = max(data['peak'], h['peak'])
+
+        baris = [f"{'Aksi':<22} {'Jumlah':>6} {'Total':>10} {'Maks':>10} {'Peak':>10}", "-" * 62]
+        for aksi, data in sorted(per_aksi.items(), key=lambda item: item[1]['total'], reverse=True):
+            baris.append(f"{aksi:<22} {data['jumlah']:>6} {data['total']:>9.3f}s {data['maks']:>9.3f}s "
+                         f"{_ukuran(data['peak']):>10}")
+        teks = "\n".join(baris)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, 'ringkasan.txt'), 'w', encoding='utf-8') as f:
+            f.write(teks + "\n")
+        return teks
@@ -0,0 +1,221 @@
+"""
+Pipeline struk pesanan
+Template struk disusun sekali (header, garis, format kolom) dan metrik font
+dihitung sekali saat renderer dibuat, sehingga render satu struk hanya
+mengisi data pesanan. Output: PDF (satu atau banyak struk per file) atau
+teks printer thermal (opsional dengan perintah ESC/POS).
+"""
+
+import os
+from datetime import datetime
+
+from fpdf import FPDF
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NAMA_RESTORAN = "RESTORAN UNILA"
+ALAMAT_RESTORAN = "Jl. Sumantri Brojonegoro No.1"
+PESAN_PENUTUP = ("Terima kasih atas kunjungan Anda",)
+
+# Kolom karakter printer thermal (font A)
+KOLOM_THERMAL = {58: 32, 80: 48}
+
+ESCPOS_INIT = b"\x1b@"
+ESCPOS_POTONG = b"\n\n\n\x1dV\x01"
+
+
+def _rupiah(nilai):
+    """Format angka gaya Indonesia: 1.250.000"""
+    return f"{nilai:,.0f}".replace(",", ".")
+
+
+def data_struk(pesanan, items, nomor_meja=None, pelanggan=None, catatan=None):
+    """
+    Susun data struk dari hasil create_pesanan.
+    items: list dict nama_menu, jumlah, harga_satuan.
+    """
+    return {
+        'kode_pesanan': pesanan['kode_pesanan'],
+        'tanggal': pesanan.get('tanggal_pesanan') or datetime.now(),
+        'nomor_meja': nomor_meja,
+        'pelanggan': pelanggan,
+        'catatan': catatan,
+        'items': items,
+        'total_harga': pesanan['total_harga'],
+    }
+
+
+def muat_dari_db(db, pesanan_ids):
+    """Data struk beberapa pesanan sekaligus (dua query), urut sesuai pesanan_ids"""
+    if not pesanan_ids:
+        return []
+
+    placeholder = ", ".join(["%s"] * len(pesanan_ids))
+    try:
+        conn = db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT p.id, p.kode_pesanan, p.tanggal_pesanan, p.total_harga, p.catatan,
+                   pl.nama AS pelanggan, mj.nomor_meja
+            FROM pesanan p
+            LEFT JOIN pelanggan pl ON p.pelanggan_id = pl.id
+            LEFT JOIN meja mj ON p.meja_id = mj.id
+            WHERE p.id IN ({placeholder})
+        """, tuple(pesanan_ids))
+        pesanan_map = {row['id']: row for row in cursor.fetchall()}
+
+        cursor.execute(f"""
+            SELECT pesanan_id, nama_menu, jumlah, harga_satuan
+            FROM detail_pesanan
+            WHERE pesanan_id IN ({placeholder})
+            ORDER BY pesanan_id, id
+        """, tuple(pesanan_ids))
+        items_map = {}
+        for row in cursor.fetchall():
+            items_map.setdefault(row['pesanan_id'], []).append(row)
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+    return [
+        data_struk(pesanan_map[pid], items_map.get(pid, []), pesanan_map[pid]['nomor_meja'],
+                   pesanan_map[pid]['pelanggan'], pesanan_map[pid]['catatan'])
+        for pid in pesanan_ids if pid in pesanan_map
+    ]
+
+
+class TemplateStruk:
+    """
+    Tata letak struk dengan lebar kolom tetap.
+    Bagian statis (header, garis, penutup) disiapkan sekali di
+    constructor; baris() hanya mengisi data pesanan.
+    """
+
+    def __init__(self, kolom=32, nama_restoran=NAMA_RESTORAN, alamat=ALAMAT_RESTORAN,
+                 penutup=PESAN_PENUTUP):
+        self.kolom = kolom
+        self.garis = "-" * kolom
+        self.header = [nama_restoran[:kolom].center(kolom).rstrip(),
+                       alamat[:kolom].center(kolom).rstrip(),
+                       self.garis]
+        self.penutup = [self.garis] + [teks[:kolom].center(kolom).rstrip() for teks in penutup]
+
+    def _kiri_kanan(self, kiri, kanan):
+        kiri = kiri[:self.kolom - len(kanan) - 1]
+        return kiri + kanan.rjust(self.kolom - len(kiri))
+
+    def baris(self, data):
+        """List baris teks satu struk"""
+        kolom = self.kolom
+        tanggal = data['tanggal']
+        if isinstance(tanggal, datetime):
+            tanggal = tanggal.strftime('%d/%m/%Y %H:%M')
+
+        hasil = list(self.header)
+        hasil.append(f"Kode : {data['kode_pesanan']}")
+        hasil.append(f"Tgl  : {tanggal}")
+        if data.get('nomor_meja'):
+            hasil.append(f"Meja : {data['nomor_meja']}")
+        if data.get('pelanggan'):
+            hasil.append(f"Plg  : {data['pelanggan'][:kolom - 7]}")
+        hasil.append(self.garis)
+
+        for item in data['items']:
+            subtotal = item['jumlah'] * item['harga_satuan']
+            hasil.append(item['nama_menu'][:kolom])
+            hasil.append(self._kiri_kanan(f"  {item['jumlah']} x {_rupiah(item['harga_satuan'])}",
+                                          _rupiah(subtotal)))
+
+        hasil.append(self.garis)
+        hasil.append(self._kiri_kanan("TOTAL", _rupiah(data['total_harga'])))
+        if data.get('catatan'):
+            hasil.append(f"Catatan: {data['catatan']}"[:kolom])
+        hasil.extend(self.penutup)
+        return hasil
+
+
+class RendererStruk:
+    """
+    Renderer struk yang dibuat sekali dan dipakai ulang.
+    PDF memakai font Courier (monospace), sehingga lebar karakter cukup
+    diukur sekali untuk menentukan jumlah kolom dan tinggi halaman.
+    """
+
+    def __init__(self, lebar_mm=58, ukuran_font=8, margin_mm=3, output_dir='struk'):
+        self.lebar_mm = lebar_mm
+        self.ukuran_font = ukuran_font
+        self.margin_mm = margin_mm
+        self.output_dir = output_dir
+
+        # Metrik font dihitung sekali per renderer
+        pengukur = FPDF(unit='mm', format=(lebar_mm, 100))
+        pengukur.set_font('Courier', size=ukuran_font)
+        self.lebar_karakter = pengukur.get_string_width('M')
+        self.tinggi_baris = ukuran_font * 0.3528 * 1.25  # pt ke mm, spasi 1.25
+
+        kolom_pdf = int((lebar_mm - 2 * margin_mm) / self.lebar_karakter)
+        self.template_pdf = TemplateStruk(kolom_pdf)
+        self.template_teks = TemplateStruk(KOLOM_THERMAL.get(lebar_mm, kolom_pdf))
+
+    def _dokumen(self):
+        pdf = FPDF(unit='mm', format=(self.lebar_mm, 100))
+        pdf.set_auto_page_break(False)
+        pdf.set_margins(self.margin_mm, self.margin_mm)
+        pdf.set_font('Courier', size=self.ukuran_font)
+        return pdf
+
+    def _tambah_halaman(self, pdf, data):
+        baris = self.template_pdf.baris(data)
+        tinggi = 2 * self.margin_mm + len(baris) * self.tinggi_baris
+        pdf.add_page(format=(self.lebar_mm, tinggi))
+
+        y = self.margin_mm + self.tinggi_baris * 0.8
+        for teks in baris:
+            # Font inti PDF hanya latin-1
+            pdf.text(self.margin_mm, y, teks.encode('latin-1', 'replace').decode('latin-1'))
+            y += self.tinggi_baris
+
+    def pdf(self, data_list, path=None):
+        """
+        Render satu atau banyak struk ke satu PDF (satu struk per halaman).
+        Tanpa path, return bytes PDF.
+        """
+        if isinstance(data_list, dict):
+            data_list = [data_list]
+
+        pdf = self._dokumen()
+        for data in data_list:
+            self._tambah_halaman(pdf, data)
+
+        if path is None:
+            return bytes(pdf.output())
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        pdf.output(path)
+        logger.info(f"Struk PDF dibuat: {path} ({len(data_list)} struk)")
+        return path
+
+    def pdf_pesanan(self, data):
+        """Render struk satu pesanan ke output_dir/struk_<kode>.pdf"""
+        return self.pdf(data, os.path.join(self.output_dir, f"struk_{data['kode_pesanan']}.pdf"))
+
+    def teks(self, data_list, escpos=False):
+        """
+        Struk dalam format teks printer thermal.
+        escpos=True: bytes dengan perintah init dan potong kertas per struk.
+        """
+        if isinstance(data_list, dict):
+            data_list = [data_list]
+
+        if not escpos:
+            return "\n\n".join("\n".join(self.template_teks.baris(data)) for data in data_list) + "\n"
+
+        potongan = [ESCPOS_INIT]
+        for data in data_list:
+            potongan.append("\n".join(self.template_teks.baris(data)).encode('cp437', 'replace'))
+            potongan.append(ESCPOS_POTONG)
+        return b"".join(potongan)
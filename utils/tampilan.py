@@ -0,0 +1,183 @@
+"""
+Lapisan tampilan terminal berbasis buffer
+Setiap layar disusun dulu di buffer lalu ditulis sekali. Clear layar memakai
+escape ANSI (tanpa subprocess 'cls'/'clear'), redraw layar yang sama hanya
+menulis baris yang berubah, dan tabel panjang ditampilkan per halaman.
+"""
+
+import os
+import select
+import shutil
+import sys
+import time
+
+try:
+    import msvcrt
+except ImportError:  # bukan Windows
+    msvcrt = None
+
+ESC_CLEAR = "\033[2J\033[H"
+ESC_HAPUS_BARIS = "\033[K"
+ESC_HAPUS_SAMPAI_AKHIR = "\033[J"
+
+# Baris di bawah frame untuk prompt input dan pesan, agar terminal tidak scroll
+BARIS_CADANGAN = 5
+
+
+def _posisi(baris):
+    """Escape untuk pindah kursor ke awal baris (1-based)"""
+    return f"\033[{baris};1H"
+
+
+def aktifkan_ansi_windows():
+    """Aktifkan mode virtual terminal di console Windows 10+"""
+    if os.name != 'nt':
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            # ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)
+    except Exception:
+        pass
+
+
+def input_berwaktu(prompt, event=None, batas=None, interval=0.2):
+    """
+    Seperti input(), tetapi kembali None jika event di-set atau batas detik
+    lewat sebelum user mulai mengetik, agar layar bisa digambar ulang.
+    stdin yang bukan terminal dibaca dengan input() biasa.
+    """
+    if not sys.stdin.isatty():
+        return input(prompt)
+
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    habis = time.monotonic() + batas if batas is not None else None
+
+    if msvcrt is None:
+        while True:
+            siap, _, _ = select.select([sys.stdin], [], [], interval)
+            if siap:
+                return sys.stdin.readline().rstrip("\n")
+            if (event is not None and event.is_set()) or (habis is not None and time.monotonic() >= habis):
+                return None
+
+    # Console Windows: baca per karakter, jangan potong input yang sedang diketik
+    ketikan = []
+    while True:
+        while msvcrt.kbhit():
+            c = msvcrt.getwche()
+            if c in ("\r", "\n"):
+                sys.stdout.write("\n")
+                return "".join(ketikan)
+            if c == "\b":
+                if ketikan:
+                    ketikan.pop()
+                    sys.stdout.write(" \b")
+            else:
+                ketikan.append(c)
+        if not ketikan and ((event is not None and event.is_set())
+                            or (habis is not None and time.monotonic() >= habis)):
+            return None
+        time.sleep(interval)
+
+
+class Layar:
+    """
+    Buffer layar terminal.
+    - tulis(): tambah baris ke buffer, argumen sama seperti print()
+    - render(): gambar buffer sebagai satu layar penuh; jika layar sebelumnya
+      masih utuh, hanya baris yang berubah yang ditulis ulang
+    - cetak(): tulis buffer sebagai output biasa (satu kali write)
+    - halaman(): tampilkan baris panjang per halaman
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._buffer = []
+        self._frame_terakhir = None
+        aktifkan_ansi_windows()
+
+    # ---------- buffer ----------
+
+    def tulis(self, *args, sep=' '):
+        """Tambah teks ke buffer (boleh berisi newline)"""
+        self._buffer.extend(sep.join(str(a) for a in args).split("\n"))
+
+    def garis(self, karakter="=", panjang=60):
+        self._buffer.append(karakter * panjang)
+
+    def _ambil_buffer(self):
+        baris, self._buffer = self._buffer, []
+        return baris
+
+    # ---------- output ----------
+
+    def invalidasi(self):
+        """Tandai isi layar tidak diketahui, render berikutnya menggambar penuh"""
+        self._frame_terakhir = None
+
+    def bersihkan(self):
+        """Clear layar dengan escape ANSI"""
+        self._buffer = []
+        self._frame_terakhir = None
+        self.stream.write(ESC_CLEAR)
+        self.stream.flush()
+
+    def render(self):
+        """Gambar buffer sebagai layar penuh, hanya baris yang berubah jika bisa"""
+        baris = self._ambil_buffer()
+        tinggi = shutil.get_terminal_size().lines - BARIS_CADANGAN
+        sebelumnya = self._frame_terakhir
+
+        if sebelumnya is None or len(baris) >= tinggi or len(sebelumnya) >= tinggi:
+            output = ESC_CLEAR + "\n".join(baris) + "\n"
+        else:
+            potongan = [
+                _posisi(i + 1) + teks + ESC_HAPUS_BARIS
+                for i, teks in enumerate(baris)
+                if i >= len(sebelumnya) or sebelumnya[i] != teks
+            ]
+            # Hapus sisa frame lama dan input user di bawah layar
+            potongan.append(_posisi(len(baris) + 1) + ESC_HAPUS_SAMPAI_AKHIR)
+            output = "".join(potongan)
+
+        self.stream.write(output)
+        self.stream.flush()
+        self._frame_terakhir = baris if len(baris) < tinggi else None
+
+    def cetak(self):
+        """Tulis buffer sebagai output mengalir dengan satu kali write"""
+        baris = self._ambil_buffer()
+        if baris:
+            self.stream.write("\n".join(baris) + "\n")
+            self.stream.flush()
+        self._frame_terakhir = None
+
+    def halaman(self, baris_list, header=None, ukuran=None):
+        """
+        Tampilkan baris_list per halaman setinggi terminal.
+        Enter untuk halaman berikutnya, 'q' untuk berhenti.
+        """
+        header = header or []
+        if ukuran is None:
+            ukuran = max(5, shutil.get_terminal_size().lines - len(header) - 4)
+
+        total = len(baris_list)
+        for mulai in range(0, total, ukuran):
+            for teks in header:
+                self._buffer.append(teks)
+            self._buffer.extend(baris_list[mulai:mulai + ukuran])
+
+            akhir = min(mulai + ukuran, total)
+            if akhir < total:
+                self._buffer.append(f"-- {mulai + 1}-{akhir} dari {total} (Enter: lanjut, q: selesai) --")
+                self.cetak()
+                if input().strip().lower() == 'q':
+                    return
+            else:
+                self.cetak()
@@ -0,0 +1,159 @@
+"""
+Validasi batch data pelanggan
+Keputusan akhir tetap milik Validator (utils/validasi_input.py) agar import
+dan input interaktif menerima data yang sama. Nilai yang cocok dengan pola
+"pasti valid" (regex yang dikompilasi sekali) langsung lolos; hanya sisanya
+yang diperiksa Validator. Jika pandas tersedia, kolom di-factorize dulu
+sehingga pola dan Validator hanya dijalankan sekali per nilai unik. Kolom
+berikutnya hanya diperiksa untuk baris yang belum ditolak.
+Hasilnya berupa kode per baris (0 = valid) yang menunjuk ke pesan error
+Validator, bukan tuple (bool, pesan) per nilai.
+"""
+
+import re
+from array import array
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pandas opsional, jalur Python murni tetap dipakai
+    np = None
+    pd = None
+
+from utils.validasi_input import Validator
+
+KODE_VALID = 0
+
+# Pola "pasti valid": subset dari nilai yang diterima Validator (diuji silang
+# di tests/test_validasi_batch.py). Nama memakai kelas huruf Unicode sehingga
+# 'José Ramírez' dan 'Budi2' lolos di jalur cepat. Nilai di luar pola belum
+# tentu salah, keputusannya diserahkan ke Validator.
+POLA_NAMA = re.compile(r"[^\W\d_](?:[^\W_]|[ .,'-]){0,99}")
+POLA_TELEPON = re.compile(r"08[1-9][0-9]{7,10}")
+POLA_EMAIL = re.compile(r"(?=.{6,100}\Z)[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*"
+                        r"@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+
+# Di bawah jumlah baris ini overhead membuat Series lebih mahal dari loop biasa
+AMBANG_PANDAS = 5000
+
+
+class _DaftarPesan:
+    """Pesan error unik dalam satu batch; kode = indeks pesan (0 = valid)"""
+
+    __slots__ = ('pesan', '_indeks')
+
+    def __init__(self):
+        self.pesan = ['']
+        self._indeks = {'': KODE_VALID}
+
+    def kode(self, hasil):
+        """Tuple (valid, pesan) dari Validator ke kode"""
+        valid, pesan = hasil
+        if valid:
+            return KODE_VALID
+        kode = self._indeks.get(pesan)
+        if kode is None:
+            kode = self._indeks[pesan] = len(self.pesan)
+            self.pesan.append(pesan)
+        return kode
+
+
+class HasilValidasi:
+    """
+    Hasil validasi batch: satu kode per baris.
+    kode berupa array int16 (array('h') atau numpy), valid = kode == 0;
+    pesan error baris ke-i adalah daftar_pesan[kode[i]].
+    """
+
+    __slots__ = ('kode', 'daftar_pesan')
+
+    def __init__(self, kode, daftar_pesan):
+        self.kode = kode
+        self.daftar_pesan = daftar_pesan
+
+    def __len__(self):
+        return len(self.kode)
+
+    @property
+    def valid(self):
+        """Mask boolean baris yang valid"""
+        if np is not None and isinstance(self.kode, np.ndarray):
+            return self.kode == KODE_VALID
+        return [k == KODE_VALID for k in self.kode]
+
+    def jumlah_valid(self):
+        if np is not None and isinstance(self.kode, np.ndarray):
+            return int((self.kode == KODE_VALID).sum())
+        return self.kode.count(KODE_VALID)
+
+    def pesan(self, i):
+        """Pesan error baris ke-i ('' jika valid)"""
+        return self.daftar_pesan[int(self.kode[i])]
+
+
+class BatchValidator:
+    """
+    Validator kolom nama, no_telepon dan email dengan aturan Validator.
+    Nilai diharapkan sudah di-strip; email kosong/None dianggap tidak diisi.
+    Setiap baris mendapat error pertama yang ditemukan (nama, telepon, email);
+    kolom berikutnya hanya diperiksa untuk baris yang masih valid.
+    """
+
+    def __init__(self, validator=None, pakai_pandas=True, ambang_pandas=AMBANG_PANDAS):
+        self.validator = validator or Validator()
+        self.pakai_pandas = pakai_pandas and pd is not None
+        self.ambang_pandas = ambang_pandas
+
+    def _aturan(self):
+        """(fungsi Validator, pola pasti valid, opsional) per kolom, urut pemeriksaan"""
+        return (
+            (self.validator.validasi_nama, POLA_NAMA, False),
+            (self.validator.validasi_telepon, POLA_TELEPON, False),
+            (self.validator.validasi_email, POLA_EMAIL, True),
+        )
+
+    def validasi(self, nama, telepon, email):
+        """Validasi tiga kolom sejajar (list/Series), return HasilValidasi"""
+        if self.pakai_pandas and len(nama) >= self.ambang_pandas:
+            return self._validasi_pandas(nama, telepon, email)
+        return self._validasi_python(nama, telepon, email)
+
+    def _validasi_python(self, nama_list, telepon_list, email_list):
+        pesan = _DaftarPesan()
+        kode = array('h', bytes(2 * len(nama_list)))
+
+        for kolom, (fungsi, pola, opsional) in zip((nama_list, telepon_list, email_list), self._aturan()):
+            cocok = pola.fullmatch
+            cache = {}
+            for i, nilai in enumerate(kolom):
+                if kode[i] != KODE_VALID:
+                    continue
+                nilai = nilai or ''
+                if (opsional and not nilai) or cocok(nilai):
+                    continue
+                k = cache.get(nilai)
+                if k is None:
+                    k = cache[nilai] = pesan.kode(fungsi(nilai))
+                kode[i] = k
+        return HasilValidasi(kode, pesan.pesan)
+
+    def _validasi_pandas(self, nama_list, telepon_list, email_list):
+        pesan = _DaftarPesan()
+        kode = np.zeros(len(nama_list), dtype=np.int16)
+
+        for kolom, (fungsi, pola, opsional) in zip((nama_list, telepon_list, email_list), self._aturan()):
+            # Hanya baris yang belum ditolak kolom sebelumnya (urutan sama dengan jalur Python)
+            periksa = kode == KODE_VALID
+            if not periksa.any():
+                break
+            nilai = pd.Series(kolom, dtype=object).fillna('').to_numpy()[periksa]
+
+            # Pola dan Validator dijalankan per nilai unik, hasilnya dipetakan ke semua baris
+            indeks, unik = pd.factorize(nilai)
+            cocok = pola.fullmatch
+            kode_unik = np.array(
+                [KODE_VALID if (opsional and not v) or cocok(v) else pesan.kode(fungsi(v)) for v in unik],
+                dtype=np.int16
+            )
+            kode[periksa] = kode_unik[indeks]
+        return HasilValidasi(kode, pesan.pesan)